@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Benchmark CPU and RSS of the browser profiles over repeated page refreshes.
+
+Serves the saved facility page from target-pages/ on a local HTTP server and
+reloads it with each profile, reporting Chromium CPU seconds and RSS
+normalised per 1,000 refreshes.
+
+Usage:
+    python benchmarks/bench_browser_profiles.py [--refreshes 1000] [--headed]
+"""
+import argparse
+import asyncio
+import functools
+import os
+import sys
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import quote
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.browser_manager import BrowserManager  # noqa: E402
+from src.browser_profiles import FULL_PROFILE, MONITOR_PROFILE  # noqa: E402
+from src.process_stats import collect_chromium_stats, is_supported  # noqa: E402
+
+TARGET_PAGES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "target-pages")
+FACILITY_PAGE = "【e-kanagawa電子申請［面談×予約］】予約手続き：施設選択・予定日選択2.html"
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    """Static file handler without per-request logging."""
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server() -> ThreadingHTTPServer:
+    handler = functools.partial(QuietHandler, directory=TARGET_PAGES_DIR)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+async def run_profile(profile, url: str, refreshes: int, headless: bool) -> dict:
+    manager = BrowserManager(headless=headless, monitor_profile=profile)
+    await manager.start()
+    try:
+        await manager.page.goto(url, wait_until="networkidle")
+        await manager.enter_monitor_profile()
+
+        before = collect_chromium_stats()
+        peak_rss = before.total_rss_mb
+        started = time.perf_counter()
+
+        for i in range(refreshes):
+            await manager.refresh_page()
+            if i % 100 == 0:
+                peak_rss = max(peak_rss, collect_chromium_stats().total_rss_mb)
+
+        elapsed = time.perf_counter() - started
+        after = collect_chromium_stats()
+        peak_rss = max(peak_rss, after.total_rss_mb)
+    finally:
+        await manager.stop()
+
+    scale = 1000 / refreshes
+    return {
+        "profile": profile.name,
+        "cpu_s_per_1000": (after.cpu_seconds - before.cpu_seconds) * scale,
+        "wall_s_per_1000": elapsed * scale,
+        "rss_end_mb": after.total_rss_mb,
+        "rss_peak_mb": peak_rss,
+        "renderers": after.renderer_count,
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare browser profiles per 1,000 refreshes")
+    parser.add_argument("--refreshes", type=int, default=1000, help="Refreshes per profile")
+    parser.add_argument("--headed", action="store_true", help="Run with a visible browser")
+    args = parser.parse_args()
+
+    if not is_supported():
+        print("This benchmark reads /proc and only runs on Linux", file=sys.stderr)
+        sys.exit(1)
+
+    server = start_server()
+    url = f"http://127.0.0.1:{server.server_address[1]}/{quote(FACILITY_PAGE)}"
+
+    results = []
+    for profile in (FULL_PROFILE, MONITOR_PROFILE):
+        print(f"Running {args.refreshes} refreshes with '{profile.name}' profile...")
+        results.append(await run_profile(profile, url, args.refreshes, not args.headed))
+
+    server.shutdown()
+
+    print()
+    print(f"{'profile':<10}{'CPU s/1000':>12}{'wall s/1000':>13}{'RSS end MB':>12}{'RSS peak MB':>13}{'renderers':>11}")
+    for r in results:
+        print(
+            f"{r['profile']:<10}{r['cpu_s_per_1000']:>12.1f}{r['wall_s_per_1000']:>13.1f}"
+            f"{r['rss_end_mb']:>12.1f}{r['rss_peak_mb']:>13.1f}{r['renderers']:>11}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
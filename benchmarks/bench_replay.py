@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Run the full BookingController offline against a recorded traffic archive.
+
+The archive is recorded with ``python main.py --record logs/session.har``
+and served back through ``page.route`` with the recorded response times
+(scaled by --speed). Reports checks per minute, scan timings and how much
+of the archive was used, so changes can be compared on real markup without
+touching the site.
+
+Usage:
+    python benchmarks/bench_replay.py logs/session.har [--seconds 60] [--speed 1.0] [--headed]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.booking_controller import BookingController  # noqa: E402
+from src.config import Config  # noqa: E402
+from src.logger import setup_logger  # noqa: E402
+
+
+async def run(config: Config, seconds: float) -> BookingController:
+    controller = BookingController(config)
+    task = asyncio.create_task(controller.start())
+    started = time.perf_counter()
+    try:
+        await asyncio.wait_for(asyncio.shield(task), seconds)
+    except asyncio.TimeoutError:
+        controller.stop()
+        try:
+            # A successful booking waits for Ctrl+C, so don't wait for it forever
+            await asyncio.wait_for(task, 30)
+        except asyncio.TimeoutError:
+            pass
+    controller.elapsed = time.perf_counter() - started
+    return controller
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the controller against a recorded session")
+    parser.add_argument("archive", help="HAR file written with --record")
+    parser.add_argument("--seconds", type=float, default=60, help="How long to run")
+    parser.add_argument("--speed", type=float, default=1.0, help="Replay timing factor (0 = no delays)")
+    parser.add_argument("--headed", action="store_true", help="Run with a visible browser")
+    args = parser.parse_args()
+
+    config = Config.load()
+    config.traffic_record = ""
+    config.traffic_replay = args.archive
+    config.traffic_replay_speed = args.speed
+    config.headless = not args.headed
+    config.release_times = ""  # The server clock probe would go to the live site
+    config.user_email = config.user_email or "replay@example.com"
+    config.user_password = config.user_password or "replay"
+    if not config.target_categories:
+        config.target_categories = ["準中型車ＡＭ"]
+    setup_logger("WARNING")
+
+    controller = await run(config, args.seconds)
+
+    metrics = controller.metrics
+    stats = controller.traffic.stats
+    checks = metrics.counters.get("snapshots", 0)
+    print(f"Ran {controller.elapsed:.1f}s against {args.archive} (speed {args.speed})")
+    print(f"checks: {checks} ({checks / controller.elapsed * 60:.1f}/min)")
+    print(f"metrics: {metrics.summary()}")
+    print(f"archive: {stats.served} served, {stats.repeated} repeated, {len(stats.missed)} not in archive")
+    for request in stats.missed[:10]:
+        print(f"  missed: {request}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
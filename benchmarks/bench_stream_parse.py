@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Compare a full parse of the facility page with the streamed, early-stopping read.
+
+Uses the saved facility pages in target-pages/ and times, per page:
+  - full: decode the whole body and parse it (how HttpPoller.fetch used to work)
+  - streamed: decode CHUNK_SIZE chunks until table#TBL is closed, then parse
+    only that part (HttpPoller.fetch with stop_after_table)
+  - streamed + hash hit: the same, when the table is unchanged (ParseCache)
+
+These numbers are pure CPU per poll. The socket section then serves each
+page from a local server that sends everything after the table --tail-ms
+later, like a slow tail on the site, and times HttpPoller.fetch until it
+returns: the full read waits for the tail, the early-stopping one does not.
+
+Usage:
+    python benchmarks/bench_stream_parse.py [--iterations 200] [--tail-ms 200]
+"""
+import argparse
+import asyncio
+import codecs
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aiohttp import web  # noqa: E402
+from aiohttp.test_utils import TestServer  # noqa: E402
+
+from src.grid_parser import ParseCache, TableEndScanner, parse_page  # noqa: E402
+from src.http_poller import CHUNK_SIZE, CapturedRequest, HttpPoller  # noqa: E402
+
+PAGES = Path(__file__).resolve().parent.parent / "target-pages"
+FACILITY_PAGES = sorted(PAGES.glob("*施設選択・予定日選択*.html"))
+
+
+def full(body: bytes) -> str:
+    html = body.decode("utf-8")
+    parse_page(html)
+    return html
+
+
+def streamed(body: bytes, cache: ParseCache = None) -> str:
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    scanner = TableEndScanner()
+    parts = []
+    for start in range(0, len(body), CHUNK_SIZE):
+        text = decoder.decode(body[start:start + CHUNK_SIZE])
+        parts.append(text)
+        if scanner.feed(text):
+            break
+    html = "".join(parts)
+    if cache:
+        cache.parse(html)
+    else:
+        parse_page(html)
+    return html
+
+
+def timed(run, iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        run()
+    return (time.perf_counter() - started) / iterations * 1000
+
+
+async def time_to_return(body: bytes, tail_ms: float, fetches: int) -> tuple:
+    """Mean ms until HttpPoller.fetch returns, reading the whole body and stopping after the table."""
+    split = body.index(b"</table>") + len(b"</table>")
+
+    async def handler(request):
+        response = web.StreamResponse(headers={"Content-Type": "text/html; charset=utf-8"})
+        response.content_length = len(body)
+        await response.prepare(request)
+        await response.write(body[:split])
+        await asyncio.sleep(tail_ms / 1000)
+        await response.write(body[split:])
+        await response.write_eof()
+        return response
+
+    app = web.Application()
+    app.router.add_get("/{tail:.*}", handler)
+    server = TestServer(app)
+    await server.start_server()
+    url = str(server.make_url("/reserve/facilitySelect_dateTrans"))
+    poller = HttpPoller(CapturedRequest(method="GET", url=url, headers={}))
+    results = []
+    try:
+        for stop_after_table in (False, True):
+            started = time.perf_counter()
+            for _ in range(fetches):
+                await poller.fetch("GET", url, stop_after_table=stop_after_table)
+            results.append((time.perf_counter() - started) / fetches * 1000)
+    finally:
+        await poller.close()
+        await server.close()
+    return tuple(results)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Full vs streamed facility page parsing")
+    parser.add_argument("--iterations", type=int, default=200, help="Parses per mode and page")
+    parser.add_argument("--tail-ms", type=float, default=200, help="Delay before the body after the table is sent")
+    parser.add_argument("--fetches", type=int, default=10, help="Fetches per mode and page over the socket")
+    args = parser.parse_args()
+
+    for path in FACILITY_PAGES:
+        body = path.read_bytes()
+        cache = ParseCache()
+        streamed(body, cache)  # Prime the cache
+
+        full_ms = timed(lambda: full(body), args.iterations)
+        streamed_ms = timed(lambda: streamed(body), args.iterations)
+        hit_ms = timed(lambda: streamed(body, cache), args.iterations)
+        kept = len(streamed(body).encode("utf-8"))
+
+        print(path.name)
+        print(f"  {'full':<22}{full_ms:>8.2f} ms  {len(body) / 1024:>6.0f} KB decoded and parsed")
+        print(f"  {'streamed':<22}{streamed_ms:>8.2f} ms  {kept / 1024:>6.0f} KB decoded and parsed")
+        print(f"  {'streamed + hash hit':<22}{hit_ms:>8.2f} ms")
+        print(f"  full -> streamed: {full_ms / streamed_ms:.2f}x, full -> hash hit: {full_ms / hit_ms:.1f}x")
+
+        read_all_ms, stopped_ms = asyncio.run(time_to_return(body, args.tail_ms, args.fetches))
+        print(f"  socket, tail after {args.tail_ms:.0f} ms:")
+        print(f"  {'  fetch, whole body':<22}{read_all_ms:>8.2f} ms until fetch returns")
+        print(f"  {'  fetch, stop at table':<22}{stopped_ms:>8.2f} ms until fetch returns")
+
+
+if __name__ == "__main__":
+    main()
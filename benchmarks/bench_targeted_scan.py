@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Compare per-row category matching with the targeted (row ID) scan.
+
+Loads the saved facility page (12 category rows, 31 available cells) and
+times, per check:
+  - per-row: every category row is queried and its name cell read to skip
+    non-targets (how check_availability used to work)
+  - targeted: one query for available links in the target rows only,
+    selected by their height_auto_ IDs
+  - full grid vs targeted grid: SCAN_GRID_SCRIPT over all rows vs the target rows
+
+Usage:
+    python benchmarks/bench_targeted_scan.py [--iterations 300] [--target 準中型車ＡＭ]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from playwright.async_api import async_playwright  # noqa: E402
+from src.selectors import (  # noqa: E402
+    CATEGORY_NAME_CELL,
+    CATEGORY_ROW_ID_PREFIX,
+    CATEGORY_ROW_PREFIX,
+    DATE_HEADER_CELLS,
+    SLOT_CELLS,
+)
+from src.slot_detector import SCAN_GRID_SCRIPT, SlotDetector  # noqa: E402
+
+FACILITY_PAGE = (
+    Path(__file__).resolve().parent.parent / "target-pages"
+    / "【e-kanagawa電子申請［面談×予約］】予約手続き：施設選択・予定日選択2.html"
+)
+
+
+async def per_row(page, targets):
+    for row in await page.query_selector_all(CATEGORY_ROW_PREFIX):
+        cell = await row.query_selector(CATEGORY_NAME_CELL)
+        if cell and (await cell.inner_text()).strip() in targets:
+            await row.query_selector_all(SLOT_CELLS["available"])
+
+
+async def targeted(page, detector):
+    await page.query_selector_all(detector.target_link_selector)
+
+
+async def full_grid(page, detector):
+    await page.evaluate(SCAN_GRID_SCRIPT, [DATE_HEADER_CELLS, CATEGORY_ROW_PREFIX, CATEGORY_ROW_ID_PREFIX])
+
+
+async def targeted_grid(page, detector):
+    await detector.scan_grid()
+
+
+async def timed(check, iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        await check()
+    return (time.perf_counter() - started) / iterations * 1000
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Per-row vs targeted slot scanning")
+    parser.add_argument("--iterations", type=int, default=300, help="Checks per mode")
+    parser.add_argument("--target", default="準中型車ＡＭ", help="Target category")
+    args = parser.parse_args()
+
+    async with async_playwright() as playwright:
+        browser = await playwright.chromium.launch()
+        page = await browser.new_page()
+        await page.goto(FACILITY_PAGE.as_uri(), wait_until="domcontentloaded")
+        detector = SlotDetector(page, [args.target])
+
+        results = {
+            "per-row": await timed(lambda: per_row(page, [args.target]), args.iterations),
+            "targeted": await timed(lambda: targeted(page, detector), args.iterations),
+            "full grid": await timed(lambda: full_grid(page, detector), args.iterations),
+            "targeted grid": await timed(lambda: targeted_grid(page, detector), args.iterations),
+        }
+        await browser.close()
+
+    for name, ms in results.items():
+        print(f"{name:<15}{ms:>9.3f} ms/check")
+    print(f"per-row -> targeted: {results['per-row'] / results['targeted']:.1f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -10,6 +10,10 @@ import sys
 from src.config import Config
 from src.logger import setup_logger
 from src.booking_controller import BookingController
+from src.watch_mode import AvailabilityWatcher
+from src.fleet import FleetCoordinator
+from src.booking_lock import LockServer
+from src.browser_server import BrowserServer
 
 
 async def main() -> None:
@@ -38,6 +42,41 @@ async def main() -> None:
         choices=["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"],
         help="Set log level (overrides .env)"
     )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Only report availability for all categories, never book (same as WATCH_ONLY=true)"
+    )
+    parser.add_argument(
+        "--record",
+        metavar="PATH",
+        help="Record all browser traffic to a scrubbed HAR archive (same as TRAFFIC_RECORD)"
+    )
+    parser.add_argument(
+        "--replay",
+        metavar="PATH",
+        help="Serve browser traffic from a recorded archive instead of the site (same as TRAFFIC_REPLAY)"
+    )
+    parser.add_argument(
+        "--fleet-coordinator",
+        action="store_true",
+        help="Run only the fleet coordinator, without a browser (same as FLEET_ROLE=coordinator)"
+    )
+    parser.add_argument(
+        "--lock-server",
+        metavar="HOST:PORT",
+        help="Run only the booking lock server for BOOKING_LOCK=tcp, without a browser"
+    )
+    parser.add_argument(
+        "--auto-submit",
+        action="store_true",
+        help="Submit the autofilled reservation form instead of leaving it to you (same as AUTO_SUBMIT=true)"
+    )
+    parser.add_argument(
+        "--stop-browser-server",
+        action="store_true",
+        help="Stop the detached browser started for BROWSER_SERVER_PORT and exit"
+    )
     
     args = parser.parse_args()
     
@@ -54,9 +93,20 @@ async def main() -> None:
             config.test_mode = True
         if args.log_level:
             config.log_level = args.log_level
+        if args.watch:
+            config.watch_only = True
+        if args.record:
+            config.traffic_record = args.record
+        if args.replay:
+            config.traffic_replay = args.replay
+        if args.auto_submit:
+            config.auto_submit = True
+        if args.fleet_coordinator:
+            config.fleet_role = "coordinator"
         
-        # Validate configuration
-        config.validate()
+        # The coordinator needs no account settings, so skip full validation
+        if config.fleet_role != "coordinator" and not args.lock_server and not args.stop_browser_server:
+            config.validate()
     
     except Exception as e:
         print(f"Configuration error: {e}", file=sys.stderr)
@@ -68,8 +118,35 @@ async def main() -> None:
     logger.info("JP Driving License Auto-Booking System")
     logger.info("=" * 60)
     
+    if args.stop_browser_server:
+        server = BrowserServer(config.browser_server_port, config.browser_server_data_dir)
+        if not server.stop():
+            logger.info("No browser server was running")
+        return
+    
+    if args.lock_server:
+        host, _, port = args.lock_server.rpartition(":")
+        server = LockServer(host or "127.0.0.1", int(port))
+        try:
+            await server.serve_forever()
+        except (KeyboardInterrupt, asyncio.CancelledError):
+            logger.info("Lock server stopped")
+        finally:
+            await server.stop()
+        return
+    
+    if config.fleet_role == "coordinator":
+        coordinator = FleetCoordinator(config.fleet_host, config.fleet_port)
+        try:
+            await coordinator.serve_forever()
+        except (KeyboardInterrupt, asyncio.CancelledError):
+            logger.info("Coordinator stopped")
+        finally:
+            await coordinator.stop()
+        return
+    
     # Create and start controller
-    controller = BookingController(config)
+    controller = AvailabilityWatcher(config) if config.watch_only else BookingController(config)
     
     try:
         await controller.start()
@@ -1,19 +1,67 @@
 """Main controller for the booking system."""
 import asyncio
 import signal
-from typing import Optional
+import time
+from datetime import date, datetime, timedelta
+from typing import List, Optional, Tuple, Union
+from playwright.async_api import Page
 from src.config import Config
+from src.config_reloader import ConfigReloader
 from src.browser_manager import BrowserManager
-from src.slot_detector import SlotDetector, AvailableSlot
-from src.booking_handler import BookingHandler
-from src.telegram_notifier import TelegramNotifier
-from src.error_handler import handle_network_error, handle_page_parsing_error, handle_booking_error
-from src.logger import get_logger
+from src.browser_profiles import get_profile
+from src.browser_server import BrowserServer
+from src.memory_watchdog import MemoryWatchdog, RecycleAction
+from src.slot_detector import SlotDetector, AvailableSlot, GridSnapshot
+from src.booking_handler import BookingHandler, BookingResult
+from src.booking_journal import AGREE_CLICKING, CLOSED, LOCKED, SUBMITTED, BookingJournal, JournalEntry
+from src.domain import parse_slot_date, window_reference
+from src.lock_keeper import COMPLETED, LAPSED, STOPPED, LockKeeper
+from src.form_autofill import ApplicantProfile, FormAutofill
+from src.notifications import (
+    Notification,
+    NotificationHub,
+    availability_notification,
+    booking_notification,
+    build_channels,
+)
+from src.error_handler import (
+    BookingSystemError,
+    classify_error,
+    handle_booking_error,
+    retry_with_backoff,
+)
+from src.recovery_policy import CircuitBreaker, RecoveryAction, RecoveryPolicy
+from src.maintenance_schedule import MaintenanceSchedule, site_now
+from src.release_scheduler import BurstPlan, ReleaseSchedule, ServerClock
+from src.fleet import Assignment, FleetWorker
+from src.booking_lock import LOCK_BACKEND_ERRORS, BookingLock, Lease, create_booking_lock, lock_key
+from src.evidence import EvidenceRecorder
+from src.traffic_archive import TrafficRecorder, TrafficReplayer
+from src.response_sniffer import ResponseSniffer
+from src.inpage_poller import InPagePoller
+from src.event_bus import (
+    DROP_OLDEST,
+    BookingResultEvent,
+    EventBus,
+    GridSnapshotEvent,
+    SlotDiffEvent,
+    SnapshotPublisher,
+)
+from src.metrics import MonitorMetrics
+from src.slot_history import SlotHistory
+from src.logger import get_logger, setup_logger
 
 
 class BookingController:
     """Orchestrates the monitoring loop and booking flow."""
     
+    # Re-measure the server clock offset after this many seconds
+    CLOCK_RESYNC_SECONDS = 1800
+    # How long a fleet worker waits for an assignment after reporting a hit
+    ASSIGNMENT_WAIT_SECONDS = 0.5
+    # How long a hit read from the raw response waits for its link to be attached
+    ATTACH_TIMEOUT_SECONDS = 10
+    
     def __init__(self, config: Config):
         """
         Initialize booking controller.
@@ -24,10 +72,60 @@ class BookingController:
         self.config = config
         self.logger = get_logger()
         self.running = False
+        self._shutdown_requested = False  # Ends a reservation hold, unlike running
+        self._relocks = 0
         self.browser_manager: Optional[BrowserManager] = None
         self.slot_detector: Optional[SlotDetector] = None
         self.booking_handler: Optional[BookingHandler] = None
-        self.telegram_notifier: Optional[TelegramNotifier] = None
+        self.notification_hub: Optional[NotificationHub] = None
+        self.memory_watchdog: Optional[MemoryWatchdog] = None
+        self.fleet_worker: Optional[FleetWorker] = None
+        self.booking_lock: Optional[BookingLock] = None
+        self.event_bus: Optional[EventBus] = None
+        self.config_reloader: Optional[ConfigReloader] = None
+        self.response_sniffer: Optional[ResponseSniffer] = None
+        self.page_poller: Optional[InPagePoller] = None
+        self.metrics = MonitorMetrics()
+        self.evidence: Optional[EvidenceRecorder] = None
+        if config.evidence_buffer_size > 0:
+            self.evidence = EvidenceRecorder(
+                config.evidence_buffer_size,
+                screenshots=config.evidence_screenshots,
+                max_flushes=config.evidence_max_flushes,
+            )
+        self._evidence_cycle = 0
+        self.applicant_profile = ApplicantProfile(
+            name=config.applicant_name,
+            kana=config.applicant_kana,
+            birthdate=config.applicant_birthdate,
+            license_number=config.applicant_license_number,
+            phone=config.applicant_phone,
+        )
+        self.booking_journal: Optional[BookingJournal] = None
+        if config.booking_journal:
+            self.booking_journal = BookingJournal(config.booking_journal)
+        self.traffic: Optional[Union[TrafficRecorder, TrafficReplayer]] = None
+        secrets = (config.user_email, config.user_password, *self.applicant_profile.values().values())
+        if config.traffic_record:
+            self.traffic = TrafficRecorder(config.traffic_record, secrets=secrets)
+        elif config.traffic_replay:
+            self.traffic = TrafficReplayer(config.traffic_replay, speed=config.traffic_replay_speed, secrets=secrets)
+        self._refresh_before_check = False
+        self.maintenance_schedule = MaintenanceSchedule.parse(config.maintenance_windows)
+        self.release_schedule = ReleaseSchedule.parse(
+            config.release_times,
+            preload_seconds=config.burst_preload_seconds,
+            duration_seconds=config.burst_duration_seconds,
+            interval_seconds=config.burst_interval_ms / 1000,
+        )
+        self.server_clock = ServerClock(BrowserManager.LOGIN_URL)
+        self._clock_sync: Optional[asyncio.Task] = None
+        self.recovery_policy = RecoveryPolicy(
+            circuit_breaker=CircuitBreaker(
+                failure_threshold=config.circuit_failure_threshold,
+                recovery_timeout=config.circuit_recovery_timeout,
+            )
+        )
     
     async def start(self) -> None:
         """Start the booking system."""
@@ -40,32 +138,122 @@ class BookingController:
         self._setup_signal_handlers()
         
         # Initialize components
+        browser_server = None
+        if self.config.browser_server_port > 0:
+            browser_server = BrowserServer(self.config.browser_server_port, self.config.browser_server_data_dir)
         self.browser_manager = BrowserManager(
             headless=self.config.headless,
             user_email=self.config.user_email,
-            user_password=self.config.user_password
+            user_password=self.config.user_password,
+            monitor_profile=get_profile(
+                self.config.browser_profile,
+                javascript_enabled=self.config.monitor_javascript,
+            ),
+            month_offset=self.config.month_offset,
+            evidence=self.evidence,
+            traffic=self.traffic,
+            browser_server=browser_server,
         )
-        self.telegram_notifier = TelegramNotifier(
-            bot_token=self.config.telegram_bot_token,
-            chat_id=self.config.telegram_chat_id
+        self.notification_hub = NotificationHub(
+            build_channels(self.config),
+            digest_seconds=self.config.notify_digest_seconds,
+            dedupe_seconds=self.config.notify_dedupe_seconds,
+            rate_per_minute=self.config.notify_rate_per_minute,
         )
+        if self.config.memory_check_interval > 0:
+            self.memory_watchdog = MemoryWatchdog(
+                renderer_limit_mb=self.config.renderer_memory_limit_mb,
+                js_heap_limit_mb=self.config.js_heap_limit_mb,
+                browser_limit_mb=self.config.browser_memory_limit_mb,
+            )
+        self.booking_lock = create_booking_lock(self.config.booking_lock, self.config.booking_lock_location)
+        if self.config.fleet_role == "worker":
+            self.fleet_worker = FleetWorker(
+                worker_id=self.config.fleet_worker_id,
+                host=self.config.fleet_host,
+                port=self.config.fleet_port,
+                month_offset=self.config.month_offset,
+                categories=self.config.target_categories,
+            )
+            self.logger.info(
+                f"Fleet worker {self.config.fleet_worker_id} "
+                f"(coordinator {self.config.fleet_host}:{self.config.fleet_port}, "
+                f"month +{self.config.month_offset})"
+            )
         
         try:
+            # Don't launch into a scheduled maintenance window
+            window = self.maintenance_schedule.current_window()
+            if window:
+                self.running = True
+                self.logger.info(f"Site is in scheduled maintenance until {window[1]:%Y-%m-%d %H:%M} JST")
+                await self._sleep_until(window[1] - self._prewarm_lead())
+            
             # Start browser
             await self.browser_manager.start()
+            if browser_server and self.memory_watchdog:
+                # The detached browser is not our child process
+                self.memory_watchdog.browser_pid = browser_server.read_pid()
+            if self.release_schedule.times:
+                # Measured while logging in, well before the first release window
+                self._resync_clock_if_stale()
+            
+            # A booking interrupted by a crash is resumed before monitoring starts
+            pending = self.booking_journal.pending() if self.booking_journal else None
+            on_booking_page = False
+            if pending:
+                self.logger.info(
+                    f"Booking journal: '{pending.state}' booking for {pending.category} on {pending.date} "
+                    f"was interrupted at {pending.at}"
+                )
+                on_booking_page = self.browser_manager.booking_step(self.browser_manager.page.url)
+            
+            if not on_booking_page and not await self._resume_reattached_page():
+                # Login first
+                await retry_with_backoff(self.browser_manager.login, operation_name="Login")
+                
+                # Navigate to facility page
+                await retry_with_backoff(
+                    self.browser_manager.navigate_to_facility_page,
+                    operation_name="Navigation to facility page",
+                )
             
-            # Login first
-            await self.browser_manager.login()
+            if on_booking_page:
+                # The flow continues with the full profile it was started with
+                page = self.browser_manager.page
+            else:
+                # Switch to the lean engine profile for polling
+                page = await self.browser_manager.enter_monitor_profile()
             
-            # Navigate to facility page
-            page = await self.browser_manager.navigate_to_facility_page()
+            # Wire up the event bus consumers
+            self.event_bus = EventBus()
+            self._subscribe_consumers()
             
             # Initialize detector and handler
-            self.slot_detector = SlotDetector(page, self.config.target_categories)
-            self.booking_handler = BookingHandler(page)
+            self.slot_detector = SlotDetector(
+                page,
+                self.config.target_categories,
+                publisher=SnapshotPublisher(self.event_bus),
+                month_offset=self.config.month_offset,
+                cutoff=self._initial_cutoff(),
+            )
+            self.booking_handler = BookingHandler(page, journal=self.booking_journal)
+            if self.config.response_sniffing:
+                self.response_sniffer = ResponseSniffer(page)
+                self.logger.info("Response sniffing: slots are read from the HTTP response, not the rendered page")
+            elif self.config.in_page_polling:
+                self.page_poller = InPagePoller(page, self.browser_manager.capture_document_request)
+                self.logger.info("In-page polling: only the slot table is fetched and replaced")
+            
+            # Pick up .env changes without restarting the browser session
+            self.config_reloader = ConfigReloader(self.config, self._apply_config)
+            self.config_reloader.start()
             
-            # Start monitoring loop
             self.running = True
+            if pending and await self._resume_booking(pending, on_booking_page):
+                return
+            
+            # Start monitoring loop
             await self._monitoring_loop()
         
         except KeyboardInterrupt:
@@ -76,6 +264,96 @@ class BookingController:
         finally:
             await self._cleanup()
     
+    def _subscribe_consumers(self) -> None:
+        """
+        Register the stages that react to scans.
+        
+        Metrics, history and notifications each get their own queue, so a slow
+        Telegram call never delays the next check. Booking keeps only the
+        latest snapshot; in fleet mode the coordinator decides what to book.
+        """
+        bus = self.event_bus
+        bus.subscribe("metrics", (GridSnapshotEvent, SlotDiffEvent, BookingResultEvent), self.metrics.on_event)
+        bus.subscribe("history", (SlotDiffEvent,), SlotHistory().on_event)
+        self.notification_hub.start()
+        bus.subscribe("notifications", (BookingResultEvent, SlotDiffEvent), self._notify)
+        if not self.fleet_worker:
+            bus.subscribe("booking", (GridSnapshotEvent,), self._book_from_snapshot, maxsize=1, overflow=DROP_OLDEST)
+    
+    async def _apply_config(self, config: Config, changed: List[str]) -> None:
+        """
+        Swap in a reloaded configuration.
+        
+        Everything derived from it is built first and then assigned without
+        awaiting in between, so the monitoring loop never sees a mix of old
+        and new settings.
+        
+        Args:
+            config: Validated configuration to run with
+            changed: Names of the settings that changed
+        """
+        maintenance_schedule = MaintenanceSchedule.parse(config.maintenance_windows)
+        release_schedule = ReleaseSchedule.parse(
+            config.release_times,
+            preload_seconds=config.burst_preload_seconds,
+            duration_seconds=config.burst_duration_seconds,
+            interval_seconds=config.burst_interval_ms / 1000,
+        )
+        
+        self.config = config
+        self.maintenance_schedule = maintenance_schedule
+        self.release_schedule = release_schedule
+        if self.slot_detector:
+            self.slot_detector.target_categories = config.target_categories
+            if "current_booking_date" in changed:
+                self.slot_detector.cutoff = self._upgrade_cutoff(config)
+        if self.fleet_worker:
+            # Sent to the coordinator with the next hello (after a reconnect)
+            self.fleet_worker.categories = config.target_categories
+        if "log_level" in changed:
+            setup_logger(config.log_level)
+        
+        self.logger.info(f"Configuration reloaded: {', '.join(changed)}")
+    
+    async def _notify(self, event: object) -> None:
+        """Notification stage: booking results always, new slots if NOTIFY_AVAILABILITY is on."""
+        hub = self.notification_hub
+        if isinstance(event, BookingResultEvent):
+            await hub.notify(booking_notification(event.result))
+        elif isinstance(event, SlotDiffEvent) and self.config.notify_availability:
+            for category, date in event.disappeared:
+                hub.forget(f"slot:{category}:{date}")
+            for category, date in event.appeared:
+                await hub.notify(availability_notification(category, date, event.month_offset))
+    
+    async def _book_from_snapshot(self, event: GridSnapshotEvent) -> None:
+        """
+        Booking stage: try the first target cell of a snapshot that is still available.
+        
+        Args:
+            event: Snapshot published by the detector
+        """
+        targets = [
+            (category, date) for category, date in event.snapshot.slots()
+            if category in self.slot_detector.target_mask
+        ]
+        if not targets or not self.running:
+            return
+        
+        # A sniffed hit is booked as soon as its link is attached, while the page renders
+        timeout = 0.0 if event.rendered else self.ATTACH_TIMEOUT_SECONDS
+        dates = None if event.rendered else event.snapshot.dates
+        if not await self.slot_detector.ensure_consent_checked(timeout):
+            self.logger.warning("Cannot book - consent checkbox issue")
+            return
+        
+        for category, date in targets:
+            slot = await self.slot_detector.locate_slot(category, date, dates, timeout)
+            if slot:
+                self.logger.info(f"✓ Found available slot: {category} on {date}")
+                await self._handle_available_slot(slot)
+                return
+    
     async def _monitoring_loop(self) -> None:
         """Main monitoring loop that checks for available slots."""
         self.logger.info("Starting monitoring loop")
@@ -86,122 +364,883 @@ class BookingController:
         
         while self.running:
             try:
+                # Stay off the site while the circuit breaker is open
+                circuit = self.recovery_policy.circuit_breaker
+                if not circuit.allow_request():
+                    await asyncio.sleep(circuit.time_until_retry())
+                    continue
+                
+                # Suspend during scheduled maintenance / off-hours
+                window = self.maintenance_schedule.current_window()
+                if window:
+                    await self._suspend(window[1], "scheduled maintenance window")
+                    continue
+                
+                # Retry a failed refresh right away instead of checking a stale page
+                if self._refresh_before_check:
+                    self._refresh_before_check = False
+                    if not self._check_fetches_table:
+                        await self.browser_manager.refresh_page()
+                
                 refresh_count += 1
                 
                 # Log periodic status (every 60 seconds)
                 if refresh_count - last_status_log >= (60 // self.config.refresh_interval):
                     self.logger.info(f"Monitoring active - checked {refresh_count} times")
+                    self._record_handle_stats()
+                    if self.response_sniffer:
+                        self.metrics.record_parse_cache(self.response_sniffer.cache.stats)
+                    self.metrics.log_summary()
                     last_status_log = refresh_count
                 
                 # Check for available slots
                 self.logger.debug(f"Check #{refresh_count}: Looking for available slots...")
-                available_slot = await self.slot_detector.check_availability()
-                
-                if available_slot:
-                    await self._handle_available_slot(available_slot)
-                    # If booking was successful, loop will stop (self.running = False)
-                    # If booking failed, continue monitoring
-                else:
+                # If booking was successful, loop will stop (self.running = False)
+                # If booking failed, continue monitoring
+                if not await self._check_and_book():
                     self.logger.debug(f"Check #{refresh_count}: No slots available")
+                if not self.running:
+                    break
+                
+                # Burst-poll around a release instant if one is due before the next check
+                if await self._run_burst_if_due():
+                    continue
                 
                 # Wait for refresh interval before next check
                 await asyncio.sleep(self.config.refresh_interval)
                 
-                # Refresh the page to get latest data
-                self.logger.debug(f"Refreshing page for check #{refresh_count + 1}")
-                await self.browser_manager.refresh_page()
+                # Refresh the page to get latest data (unless the check fetches it itself)
+                if not self._check_fetches_table:
+                    self.logger.debug(f"Refreshing page for check #{refresh_count + 1}")
+                    await self.browser_manager.refresh_page()
+                    
+                    # Wait a moment for page to load
+                    await asyncio.sleep(1)
                 
-                # Wait a moment for page to load
-                await asyncio.sleep(1)
+                # Keep renderer memory flat on long runs
+                await self._check_memory(refresh_count)
+                
+                self.recovery_policy.record_success()
             
             except Exception as e:
                 await self._handle_error(e)
-                # Wait before retrying
-                await asyncio.sleep(self.config.refresh_interval)
     
-    async def _handle_available_slot(self, slot: AvailableSlot) -> None:
+    async def _run_burst_if_due(self) -> bool:
+        """
+        Run a release burst if its preload time falls before the next regular check.
+        
+        Returns:
+            True if a burst was run
+        """
+        if not self.release_schedule.times:
+            return False
+        
+        self._resync_clock_if_stale()
+        plan = self.release_schedule.next_burst(self.server_clock.server_now())
+        if plan is None or self.server_clock.seconds_until(plan.preload_at) > self.config.refresh_interval:
+            return False
+        
+        await self._run_burst(plan)
+        return True
+    
+    def _resync_clock_if_stale(self) -> None:
+        """
+        Re-measure the server clock offset in the background when it is stale.
+        
+        A measurement takes several HEAD requests, so it must not hold up the
+        check cycle; until it finishes, the previous offset is used.
+        """
+        if self._clock_sync and not self._clock_sync.done():
+            return
+        age = self.server_clock.age()
+        if age is None or age > self.CLOCK_RESYNC_SECONDS:
+            self._clock_sync = asyncio.create_task(self.server_clock.measure())
+    
+    async def _run_burst(self, plan: BurstPlan) -> None:
+        """
+        Poll in a tight burst aligned to a release instant on the server clock.
+        
+        The page is reloaded shortly before the instant so connections and
+        caches are warm, then polled every ``plan.interval`` seconds until the
+        burst window ends or a slot is booked.
+        
+        Args:
+            plan: Burst to run
+        """
+        clock = self.server_clock
+        self.logger.info(
+            f"Release burst for {plan.instant:%H:%M:%S} JST "
+            f"(every {plan.interval * 1000:.0f}ms until {plan.end:%H:%M:%S})"
+        )
+        
+        await asyncio.sleep(max(0.0, clock.seconds_until(plan.preload_at)))
+        await self.browser_manager.refresh_page(wait_until="domcontentloaded")
+        await asyncio.sleep(max(0.0, clock.seconds_until(plan.instant)))
+        
+        polls = 0
+        while self.running and clock.seconds_until(plan.end) > 0:
+            started = time.monotonic()
+            if not self._check_fetches_table:
+                await self.browser_manager.refresh_page(wait_until="domcontentloaded")
+            polls += 1
+            
+            if await self._check_and_book():
+                self.logger.info(
+                    f"Burst poll #{polls} attempted a slot "
+                    f"{-clock.seconds_until(plan.instant):.2f}s after release"
+                )
+                continue
+            
+            await asyncio.sleep(max(0.0, plan.interval - (time.monotonic() - started)))
+        
+        self.logger.info(f"Release burst finished after {polls} polls")
+    
+    async def _check_and_book(self) -> bool:
+        """
+        Scan the current page and publish the result to the event bus.
+        
+        The booking stage reacts to the snapshot; since it needs the page, the
+        loop waits for it before touching the page again.
+        
+        Returns:
+            True if a target slot was seen
+        """
+        if self.fleet_worker:
+            return await self._fleet_check_and_book()
+        
+        snapshot = await self._scan_and_publish()
+        if not snapshot.available:
+            return False
+        
+        await self.event_bus.wait_handled("booking")
+        return True
+    
+    async def _fleet_check_and_book(self) -> bool:
+        """
+        Report this worker's grid to the coordinator and book only if assigned.
+        
+        Returns:
+            True if a booking was attempted
+        """
+        worker = self.fleet_worker
+        snapshot = await self._scan_and_publish()
+        await worker.report_snapshot(snapshot)
+        
+        if worker.stopped:
+            self.logger.info(f"Fleet finished ({worker.stop_reason}) - stopping monitoring")
+            self.running = False
+            return False
+        
+        # The coordinator answers a new hit immediately, so wait briefly for it
+        wait = self.ASSIGNMENT_WAIT_SECONDS if snapshot.available else 0.0
+        assignment = await worker.take_assignment(timeout=wait)
+        if not assignment:
+            return False
+        
+        self.logger.info(f"Fleet assignment #{assignment.assignment_id}: {assignment.category} on {assignment.date}")
+        slot = None
+        timeout = self.ATTACH_TIMEOUT_SECONDS if self.response_sniffer else 0.0
+        dates = snapshot.dates if self.response_sniffer else None
+        if await self.slot_detector.ensure_consent_checked(timeout):
+            slot = await self.slot_detector.locate_slot(assignment.category, assignment.date, dates, timeout)
+        if not slot:
+            self.logger.warning("Assigned slot is no longer available")
+            await worker.report_result(assignment, success=False)
+            return False
+        
+        await self._handle_available_slot(slot, assignment)
+        return True
+    
+    @property
+    def _check_fetches_table(self) -> bool:
+        """Whether each check gets a fresh slot table by itself (no page refresh needed)."""
+        return self.response_sniffer is not None or self.page_poller is not None
+    
+    async def _scan_and_publish(self) -> GridSnapshot:
+        """
+        Read the slot table, publish it to the event bus and keep it as evidence.
+        
+        With response sniffing the page is reloaded here and the table is
+        parsed from the response body instead of the rendered page; with
+        in-page polling the table is fetched and swapped in without a reload.
+        
+        Returns:
+            Snapshot of the target rows
+        """
+        if self.page_poller:
+            snapshot = self.slot_detector.apply_cutoff(await self.page_poller.poll(self.slot_detector.target_categories))
+            await self.slot_detector.publisher.publish(snapshot, self.slot_detector.month_offset)
+            await self._capture_evidence(snapshot)
+            return snapshot
+        
+        if not self.response_sniffer:
+            snapshot, _ = await self.slot_detector.scan_and_publish()
+            await self._capture_evidence(snapshot)
+            return snapshot
+        
+        result = await self.response_sniffer.reload(self.slot_detector.target_categories)
+        self.metrics.observe("sniff_body", result.body_ms / 1000)
+        snapshot = self.slot_detector.apply_cutoff(result.snapshot)
+        await self.slot_detector.publisher.publish(snapshot, self.slot_detector.month_offset, rendered=False)
+        await self._capture_evidence(snapshot, html=result.html, url=result.url)
+        return snapshot
+    
+    async def _capture_evidence(self, snapshot: GridSnapshot, html: Optional[str] = None, url: str = "") -> None:
+        """
+        Keep this cycle's page in the in-memory evidence buffer.
+        
+        Args:
+            snapshot: Snapshot taken this cycle
+            html: Response HTML, stored instead of the (possibly half-rendered) page
+            url: URL of the response HTML
+        """
+        if not self.evidence:
+            return
+        self._evidence_cycle += 1
+        metadata = dict(
+            cycle=self._evidence_cycle,
+            month_offset=self.config.month_offset,
+            profile=self.browser_manager.active_profile.name,
+            available_cells=len(snapshot.slots()),
+        )
+        if html is not None:
+            self.evidence.record("cycle", url, html, source="response", **metadata)
+        else:
+            await self.evidence.capture(self.browser_manager.page, **metadata)
+    
+    async def _flush_evidence(self, label: str, **metadata) -> None:
+        """Add the current page to the evidence buffer and write the buffer to disk."""
+        if not self.evidence:
+            return
+        await self.evidence.capture(self.browser_manager.page, label, **metadata)
+        await asyncio.to_thread(self.evidence.flush, label)
+    
+    def _record_handle_stats(self) -> None:
+        """Publish the detector's ElementHandle counts (live should stay flat)."""
+        stats = self.slot_detector.handle_stats
+        self.metrics.gauge("handles_live", stats.live)
+        self.metrics.gauge("handles_kept", stats.kept)
+        self.metrics.gauge("handles_disposed", stats.disposed)
+    
+    async def _check_memory(self, refresh_count: int) -> None:
+        """
+        Sample browser memory and recycle the page or context when needed.
+        
+        Args:
+            refresh_count: Number of monitoring cycles completed so far
+        """
+        action = RecycleAction.NONE
+        
+        if self.memory_watchdog and refresh_count % self.config.memory_check_interval == 0:
+            sample = await self.memory_watchdog.sample(self.browser_manager.page)
+            action = self.memory_watchdog.evaluate(sample)
+            
+            # Log the growth trend roughly every 10 samples
+            if refresh_count % (self.config.memory_check_interval * 10) == 0:
+                self.memory_watchdog.log_trend()
+        
+        if (
+            action == RecycleAction.NONE
+            and self.config.page_recycle_interval > 0
+            and refresh_count % self.config.page_recycle_interval == 0
+        ):
+            self.logger.info(f"Periodic page recycle after {refresh_count} checks")
+            action = RecycleAction.RECYCLE_PAGE
+        
+        if action == RecycleAction.RECYCLE_PAGE:
+            page = await self.browser_manager.recycle_page()
+        elif action == RecycleAction.RECYCLE_CONTEXT:
+            page = await self.browser_manager.recycle_context()
+        else:
+            return
+        
+        self._attach_page(page)
+        if self.memory_watchdog:
+            self.memory_watchdog.record_recycle(action)
+    
+    def _attach_page(self, page: Page) -> None:
+        """
+        Point the detector and booking handler at a (new) page.
+        
+        Args:
+            page: Page the monitoring loop should use from now on
+        """
+        self.slot_detector.page = page
+        self.booking_handler.page = page
+        if self.response_sniffer:
+            self.response_sniffer.page = page
+        if self.page_poller:
+            self.page_poller.reset(page)
+    
+    async def _handle_available_slot(
+        self,
+        slot: AvailableSlot,
+        assignment: Optional[Assignment] = None,
+    ) -> None:
         """
         Handle an available slot by attempting to book it.
         
         Args:
             slot: Available slot to book
+            assignment: Fleet assignment this booking fulfils, if any
         """
         self.logger.info(
             f"Available slot detected: {slot.slot_info.category} on {slot.slot_info.date}"
         )
+        lease: Optional[Lease] = None
+        held = False  # A locked reservation keeps the page on the booking flow
         
         try:
+            # Hand the page over to the full profile before clicking
+            if await self.browser_manager.enter_full_profile():
+                # The page was reloaded with JavaScript on, so re-detect for a fresh handle
+                refreshed_slot = await self.slot_detector.locate_slot(slot.slot_info.category, slot.slot_info.date)
+                await self.slot_detector.release_slot(slot)
+                if not refreshed_slot:
+                    self.logger.warning("Slot disappeared during profile handoff, continuing monitoring")
+                    if assignment:
+                        await self.fleet_worker.report_result(assignment, success=False)
+                    return
+                slot = refreshed_slot
+            
+            # Make sure no other instance is booking the same slot for this account
+            if self.booking_lock:
+                acquired, lease = await self._acquire_booking_lock(slot)
+                if not acquired:
+                    self.logger.info("Another instance is already booking this slot, continuing monitoring")
+                    if assignment:
+                        await self.fleet_worker.report_result(assignment, success=False)
+                    return
+            
             # Attempt booking
-            result = await self.booking_handler.complete_booking(slot)
+            result = await self.booking_handler.complete_booking(
+                slot,
+                lease_check=(lambda: self._lease_is_valid(lease)) if lease else None,
+            )
+            
+            await self._flush_evidence(
+                "booking_succeeded" if result.success else "booking_failed",
+                category=result.category,
+                date=result.date,
+                error=result.error_message,
+            )
             
-            # Send notification
-            await self.telegram_notifier.send_booking_success(result)
+            # A successful booking keeps the lease until it expires
+            if lease and not result.success:
+                await self._release_booking_lock(lease)
+            
+            # Tell the coordinator straight away so other workers stop or retry
+            if assignment:
+                await self.fleet_worker.report_result(assignment, result.success)
+                assignment = None
+            
+            # Notify in the background
+            await self.event_bus.publish(BookingResultEvent(result=result))
             
             if result.success:
-                self.logger.info("=" * 60)
-                self.logger.info("🎉 RESERVATION LOCKED SUCCESSFULLY!")
-                self.logger.info("=" * 60)
-                self.logger.info(f"Category: {result.category}")
-                self.logger.info(f"Date: {result.date}")
-                self.logger.info(f"Time: {result.time}")
-                self.logger.info("=" * 60)
-                self.logger.info("⚠️  IMPORTANT: Browser will remain open")
-                self.logger.info("📝 Please complete the remaining form fields manually")
-                self.logger.info("🔔 Telegram notification has been sent")
-                self.logger.info("=" * 60)
-                self.logger.info("")
-                self.logger.info("Press Ctrl+C when you're done to close the browser")
-                
-                # Stop monitoring but keep browser open
-                self.running = False
-                
-                # Wait indefinitely until user presses Ctrl+C
-                try:
-                    while True:
-                        await asyncio.sleep(1)
-                except KeyboardInterrupt:
-                    self.logger.info("User requested shutdown")
+                held = True
+                await self._hold_reservation(result)
             else:
                 self.logger.warning("Booking failed, continuing monitoring")
         
         except Exception as e:
+            await self._flush_evidence("booking_error", error=str(e))
+            if lease:
+                await self._release_booking_lock(lease)
+            if assignment:
+                await self.fleet_worker.report_result(assignment, success=False)
             await handle_booking_error(
                 e,
                 slot.slot_info.category,
                 slot.slot_info.date
             )
+        finally:
+            # Only the booking link was kept out of the detector's arenas
+            await self.slot_detector.release_slot(slot)
+            # Back to the lean profile, also when the booking flow raised
+            if not held:
+                await self.browser_manager.enter_monitor_profile()
+    
+    async def _hold_reservation(self, result: BookingResult, locked_at: Optional[datetime] = None) -> None:
+        """
+        Stop monitoring and keep the locked reservation alive for the user.
+        
+        The lock keeper tracks the hold deadline, keeps the session alive and
+        sends countdown reminders. If the hold lapses before the form is
+        submitted, the same slot is booked again. Only a 完了 page (or a
+        successful auto-submit) records the booking as submitted and, in
+        upgrade mode, moves the cutoff to its date.
+        
+        Args:
+            result: Successful booking result
+            locked_at: When the reservation was locked (None = just now)
+        """
+        self.logger.info("=" * 60)
+        self.logger.info("🎉 RESERVATION LOCKED SUCCESSFULLY!")
+        self.logger.info("=" * 60)
+        self.logger.info(f"Category: {result.category}")
+        self.logger.info(f"Date: {result.date}")
+        self.logger.info(f"Time: {result.time}")
+        self.logger.info("=" * 60)
+        
+        # Stop monitoring but keep browser open
+        self.running = False
+        submitted = await self._autofill_form()
+        
+        self.logger.info("⚠️  IMPORTANT: Browser will remain open")
+        if not submitted:
+            self.logger.info("📝 Please complete the remaining form fields manually")
+        self.logger.info("🔔 Telegram notification has been sent")
+        self.logger.info("=" * 60)
+        self.logger.info("")
+        self.logger.info("Press Ctrl+C when you're done to close the browser")
+        
+        keeper = LockKeeper(
+            self.browser_manager.page,
+            result.category,
+            result.date,
+            hold_seconds=self.config.reservation_hold_minutes * 60,
+            notify=self.notification_hub.notify,
+            keepalive_seconds=self.config.hold_keepalive_seconds,
+            warning_minutes=self.config.hold_warning_minutes,
+            locked_at=locked_at,
+        )
+        outcome = await keeper.keep(lambda: self._shutdown_requested)
+        # Only a 完了 page shows the date was really booked
+        finished = submitted or outcome == COMPLETED
+        if self.booking_journal:
+            self.booking_journal.mark_closed(
+                SUBMITTED if finished else CLOSED, upgrading=self.config.current_booking_date
+            )
+        
+        if outcome == STOPPED:
+            self.logger.info("User requested shutdown")
+        elif outcome == LAPSED:
+            await self._relock(result, relogin=keeper.session_expired)
+        elif not finished:
+            self.logger.warning("Reservation form was left without a 完了 page; nothing was booked")
+            if self.slot_detector.cutoff is not None:
+                # Still looking for a date before the unchanged cutoff
+                self.running = True
+                await self._recover_session(relogin=False)
+        elif self.slot_detector.cutoff is not None:
+            await self._continue_upgrading(result)
+        else:
+            self.logger.info("Reservation form finished - stopping")
+    
+    async def _continue_upgrading(self, result: BookingResult) -> None:
+        """
+        Move the upgrade cutoff to the date just booked and resume monitoring.
+        
+        Args:
+            result: Booking whose form was finished
+        """
+        day = result.day or parse_slot_date(
+            result.date, window_reference(site_now().date(), self.config.month_offset)
+        )
+        if day and day < self.slot_detector.cutoff:
+            self.slot_detector.cutoff = day
+        self.logger.info(
+            f"Upgrade booked - now looking for dates before {self.slot_detector.cutoff:%Y-%m-%d}"
+        )
+        self.running = True
+        await self._recover_session(relogin=False)
+    
+    def _upgrade_cutoff(self, config: Config) -> Optional[date]:
+        """
+        Upgrade cutoff for a configuration: its current booking date, or an earlier
+        date the journal shows was booked to improve on that same booking.
+        
+        Journal days that have already passed are ignored, as are bookings made
+        while a different CURRENT_BOOKING_DATE was configured.
+        
+        Args:
+            config: Configuration to take CURRENT_BOOKING_DATE from
+        
+        Returns:
+            Cutoff date, or None when upgrade mode is off
+        """
+        if not config.current_booking_date:
+            return None
+        cutoff = date.fromisoformat(config.current_booking_date)
+        if self.booking_journal:
+            booked = [
+                day
+                for day in self.booking_journal.submitted_days(config.current_booking_date, since=site_now().date())
+                if day < cutoff
+            ]
+            if booked:
+                cutoff = min(booked)
+                self.logger.info(f"Booking journal: an earlier date was already booked ({cutoff:%Y-%m-%d})")
+        return cutoff
+    
+    def _initial_cutoff(self) -> Optional[date]:
+        """
+        Upgrade cutoff to start with: the configured current booking date, or an
+        earlier date already booked in upgrade mode (from the booking journal).
+        
+        Returns:
+            Cutoff date, or None when upgrade mode is off
+        """
+        cutoff = self._upgrade_cutoff(self.config)
+        if cutoff is None:
+            return None
+        
+        window_start = window_reference(site_now().date(), self.config.month_offset)
+        self.logger.info(f"Upgrade mode: only dates before {cutoff:%Y-%m-%d} are booked")
+        if window_start >= cutoff:
+            self.logger.warning(
+                f"The monitored month starts on {window_start:%Y-%m-%d}, on or after the cutoff; "
+                "no slot in it can be booked"
+            )
+        return cutoff
+    
+    async def _autofill_form(self) -> bool:
+        """
+        Fill the reservation form from the applicant profile (and submit it with AUTO_SUBMIT).
+        
+        Returns:
+            True if the form was submitted and a completion page reached
+        """
+        page = self.browser_manager.page
+        if not self.applicant_profile or not self.browser_manager.booking_step(page.url):
+            return False
+        autofill = FormAutofill(page)
+        try:
+            await autofill.fill(self.applicant_profile)
+            if self.config.auto_submit and await autofill.submit():
+                self.logger.info("✓ Reservation form submitted")
+                return True
+        except Exception as e:
+            # The form stays open for the human either way
+            self.logger.error(f"Form autofill failed: {e}")
+        return False
+    
+    async def _relock(self, result: BookingResult, relogin: bool) -> None:
+        """
+        Book the slot of a lapsed hold again.
+        
+        Args:
+            result: Booking whose hold lapsed
+            relogin: The session expired with the hold
+        """
+        await self.notification_hub.notify(Notification(
+            key=f"hold:lapsed:{result.category}:{result.date}:{self._relocks}",
+            title="予約ロック失効",
+            text=f"⌛ <b>{result.category}</b> {result.date}: ロックが失効しました",
+            urgent=True,
+        ))
+        if self._relocks >= self.config.hold_relock_limit:
+            self.logger.warning(f"Reservation hold lapsed; re-lock limit ({self.config.hold_relock_limit}) reached")
+            return
+        self._relocks += 1
+        self.logger.warning(
+            f"Reservation hold lapsed - locking {result.category} on {result.date} again "
+            f"(attempt {self._relocks}/{self.config.hold_relock_limit})"
+        )
+        
+        # Monitoring resumes if the slot is gone or the new attempt fails
+        self.running = True
+        await self._recover_session(relogin=relogin)
+        slot = None
+        if await self.slot_detector.ensure_consent_checked():
+            slot = await self.slot_detector.locate_slot(result.category, result.date)
+        if not slot:
+            self.logger.warning("Slot was taken after the hold lapsed, continuing monitoring")
+            return
+        await self._handle_available_slot(slot)
+    
+    async def _resume_booking(self, entry: JournalEntry, on_booking_page: bool) -> bool:
+        """
+        Pick up a booking the journal shows as interrupted.
+        
+        Args:
+            entry: Last journaled step of the interrupted attempt
+            on_booking_page: The browser is still on a page of the booking flow
+        
+        Returns:
+            True if monitoring must not start (the reservation was held to the end)
+        """
+        result = await self.booking_handler.resume_booking(entry)
+        if result is None:
+            self.logger.warning(
+                "The interrupted booking cannot be continued; check the site for a "
+                "half-finished reservation. Continuing monitoring"
+            )
+        elif result.success:
+            await self.event_bus.publish(BookingResultEvent(result=result))
+            # The hold (possibly) started when "同意する" was clicked
+            clicked_agree = entry.state in (LOCKED, AGREE_CLICKING)
+            if clicked_agree and not on_booking_page:
+                self.logger.warning("The reservation page did not survive the restart; open it from the site")
+            await self._hold_reservation(result, locked_at=entry.recorded_at if clicked_agree else None)
+            # A lapsed hold that could not be locked again falls back to monitoring
+            return not self.running
+        else:
+            await self.event_bus.publish(BookingResultEvent(result=result))
+        
+        if on_booking_page:
+            await self._recover_session(relogin=False)
+        return False
+    
+    async def _acquire_booking_lock(self, slot: AvailableSlot) -> Tuple[bool, Optional[Lease]]:
+        """
+        Take the booking lock for a slot.
+        
+        If the lock backend is unreachable the booking goes ahead without a
+        lease: missing a slot is worse than the rare double attempt.
+        
+        Args:
+            slot: Slot about to be booked
+        
+        Returns:
+            (may_book, lease) - may_book is False if another instance holds the lock
+        """
+        key = lock_key(self.config.user_email, slot.slot_info.category, slot.slot_info.date)
+        try:
+            lease = await self.booking_lock.acquire(key, self.config.fleet_worker_id, self.config.booking_lock_ttl)
+        except LOCK_BACKEND_ERRORS as e:
+            self.logger.warning(f"Booking lock unavailable ({e}), booking without it")
+            return True, None
+        
+        if lease:
+            self.logger.debug(f"Booking lock acquired (fencing token {lease.token})")
+        return lease is not None, lease
+    
+    async def _lease_is_valid(self, lease: Lease) -> bool:
+        """Fencing check before an irreversible booking step."""
+        try:
+            return await self.booking_lock.is_valid(lease)
+        except LOCK_BACKEND_ERRORS as e:
+            self.logger.warning(f"Could not verify booking lock ({e}), continuing")
+            return True
+    
+    async def _release_booking_lock(self, lease: Lease) -> None:
+        """Release a lease after a failed attempt so other instances can retry."""
+        try:
+            await self.booking_lock.release(lease)
+        except LOCK_BACKEND_ERRORS as e:
+            self.logger.warning(f"Could not release booking lock ({e}); it expires in {self.config.booking_lock_ttl}s")
     
     async def _handle_error(self, error: Exception) -> None:
         """
-        Handle errors during monitoring.
+        Classify an error from the monitoring loop and recover from it.
+        
+        Transient faults are retried quickly with jittered backoff, expired
+        sessions trigger a re-login, and maintenance or rate limiting open the
+        circuit breaker so the site is not hammered during an outage.
         
         Args:
             error: Error that occurred
         """
-        error_type = type(error).__name__
+        classified = classify_error(error)
+        decision = self.recovery_policy.decide(classified)
+        await self._flush_evidence(type(classified).__name__, error=str(error))
         
-        # Categorize and handle different error types
-        if "network" in str(error).lower() or "timeout" in str(error).lower():
-            await handle_network_error(error, self.config.refresh_interval)
-        elif "element" in str(error).lower() or "selector" in str(error).lower():
-            await handle_page_parsing_error(error)
-        else:
+        if type(classified) is BookingSystemError:
             self.logger.error(f"Unexpected error in monitoring loop: {error}", exc_info=True)
+        else:
+            self.logger.warning(
+                f"{type(classified).__name__}: {classified}. "
+                f"Next step: {decision.action.value} in {decision.delay:.1f} seconds"
+            )
+        
+        if decision.action == RecoveryAction.SUSPEND:
+            # The site told us it is down; the policy's delay is our best guess of the window
+            await self._suspend(site_now() + timedelta(seconds=decision.delay), "maintenance page detected")
+            return
+        
+        await asyncio.sleep(decision.delay)
+        
+        try:
+            if decision.action == RecoveryAction.RELOGIN:
+                await self._recover_session(relogin=True)
+            elif decision.action == RecoveryAction.RENAVIGATE:
+                await self._recover_session(relogin=False)
+            else:
+                self._refresh_before_check = True
+        except Exception as e:
+            # Counted as a failure on the next cycle's refresh
+            self.logger.warning(f"Recovery ({decision.action.value}) failed: {e}")
+    
+    async def _suspend(self, until: datetime, reason: str) -> None:
+        """
+        Suspend monitoring until the site is expected back.
+        
+        The browser is parked (or released) for the duration and pre-warmed
+        shortly before ``until`` so the first check happens as early as possible.
+        
+        Args:
+            until: Timezone-aware time the site should be available again
+            reason: Why monitoring is suspended (for logging)
+        """
+        duration = (until - site_now()).total_seconds()
+        self.logger.info(
+            f"Suspending monitoring ({reason}) until {until:%H:%M:%S} JST "
+            f"({duration / 60:.1f} min)"
+        )
+        
+        prewarm_at = until - self._prewarm_lead()
+        # Only worth tearing down the page if we are away for longer than the pre-warm lead
+        if prewarm_at > site_now():
+            try:
+                if self.config.maintenance_browser_mode == "release":
+                    await self.browser_manager.stop()
+                else:
+                    await self.browser_manager.park()
+            except Exception as e:
+                self.logger.warning(f"Could not park browser: {e}")
+            
+            await self._sleep_until(prewarm_at)
+            if not self.running:
+                return
+            await self._prewarm(until)
+        else:
+            # Short pause: the page was left as is, so reload it on resume
+            self._refresh_before_check = True
+        
+        await self._sleep_until(until)
+        if self.running:
+            self.logger.info("Resuming monitoring")
+    
+    async def _prewarm(self, until: datetime) -> None:
+        """
+        Get the browser back to the facility page before a window ends.
+        
+        Keeps retrying at short intervals until the site answers again, so the
+        session is ready the moment maintenance is over.
+        
+        Args:
+            until: End of the maintenance window
+        """
+        self.logger.info("Pre-warming browser session for end of maintenance")
+        attempt = 0
+        
+        while self.running:
+            attempt += 1
+            try:
+                if not self.browser_manager.is_started:
+                    await self.browser_manager.start()
+                    await self.browser_manager.login()
+                
+                try:
+                    await self.browser_manager.navigate_to_facility_page()
+                except Exception:
+                    # A parked session may have expired during maintenance
+                    await self.browser_manager.login()
+                    await self.browser_manager.navigate_to_facility_page()
+                
+                page = await self.browser_manager.enter_monitor_profile()
+                self._attach_page(page)
+                self.logger.info(f"✓ Session pre-warmed after {attempt} attempt(s)")
+                return
+            except Exception as e:
+                # Poll tightly near the end of the window, gently before it
+                remaining = (until - site_now()).total_seconds()
+                delay = 2 if remaining < 10 else min(10, max(2, remaining / 4))
+                self.logger.debug(f"Pre-warm attempt {attempt} failed ({e}); retrying in {delay:.0f}s")
+                await asyncio.sleep(delay)
+    
+    def _prewarm_lead(self) -> timedelta:
+        """How long before a window ends the session is pre-warmed."""
+        return timedelta(seconds=self.config.maintenance_prewarm_seconds)
+    
+    async def _sleep_until(self, deadline: datetime) -> None:
+        """
+        Sleep until a deadline, waking up early if the controller is stopped.
+        
+        Args:
+            deadline: Timezone-aware time to wake up
+        """
+        while self.running:
+            remaining = (deadline - site_now()).total_seconds()
+            if remaining <= 0:
+                return
+            await asyncio.sleep(min(remaining, 5))
+    
+    async def _recover_session(self, relogin: bool) -> None:
+        """
+        Bring the browser back to the facility page.
+        
+        Args:
+            relogin: Log in again before navigating
+        """
+        if relogin:
+            self.logger.info("Session expired - logging in again")
+            await retry_with_backoff(
+                self.browser_manager.login,
+                initial_delay=2,
+                operation_name="Re-login",
+            )
+        
+        await retry_with_backoff(
+            self.browser_manager.navigate_to_facility_page,
+            initial_delay=2,
+            operation_name="Navigation to facility page",
+        )
+        page = await self.browser_manager.enter_monitor_profile()
+        self._attach_page(page)
+        self.logger.info("✓ Recovered monitoring session")
     
     async def _cleanup(self) -> None:
         """Clean up resources."""
         self.logger.info("Cleaning up resources")
         
+        if self._clock_sync:
+            self._clock_sync.cancel()
+            await asyncio.gather(self._clock_sync, return_exceptions=True)
+        
+        if self.config_reloader:
+            await self.config_reloader.stop()
+        
+        if self.fleet_worker:
+            await self.fleet_worker.close()
+        
+        if self.booking_lock:
+            await self.booking_lock.close()
+        
+        if self.event_bus:
+            # Let pending notifications go out before shutting down
+            self.event_bus.log_stats()
+            self.metrics.log_summary()
+            await self.event_bus.close(timeout=10)
+        
+        if self.notification_hub:
+            await self.notification_hub.close()
+        
         if self.browser_manager:
             await self.browser_manager.stop()
         
+        if isinstance(self.traffic, TrafficRecorder):
+            self.traffic.save()
+        elif isinstance(self.traffic, TrafficReplayer):
+            self.traffic.log_stats()
+        
         self.logger.info("Shutdown complete")
     
+    async def _resume_reattached_page(self) -> bool:
+        """
+        Check whether the browser server's facility page can be monitored as is.
+        
+        Returns:
+            True if login and navigation can be skipped
+        """
+        if not self.browser_manager.reattached:
+            return False
+        try:
+            await self.browser_manager.check_page_state()
+        except BookingSystemError as e:
+            self.logger.info(f"Reattached page is not usable ({e}), logging in again")
+            return False
+        self.logger.info("Resuming on the reattached facility page (login skipped)")
+        return True
+    
     def _setup_signal_handlers(self) -> None:
         """Set up signal handlers for graceful shutdown."""
         def signal_handler(signum, frame):
             self.logger.info(f"Received signal {signum}")
             self.running = False
+            self._shutdown_requested = True
         
         signal.signal(signal.SIGINT, signal_handler)
         signal.signal(signal.SIGTERM, signal_handler)
@@ -210,3 +1249,4 @@ class BookingController:
         """Stop the monitoring loop."""
         self.logger.info("Stop requested")
         self.running = False
+        self._shutdown_requested = True
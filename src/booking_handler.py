@@ -1,9 +1,21 @@
 """Booking flow handler for completing reservations."""
 import time
 from dataclasses import dataclass
-from typing import Optional
+from datetime import date
+from typing import Awaitable, Callable, Optional
 from playwright.async_api import Page, TimeoutError as PlaywrightTimeoutError
 from src.slot_detector import AvailableSlot
+from src.booking_journal import (
+    AGREE_CLICKING,
+    FAILED,
+    LOCKED,
+    RESERVE_CLICKED,
+    RESERVE_CLICKING,
+    STARTED,
+    TIME_SELECTED,
+    BookingJournal,
+    JournalEntry,
+)
 from src.logger import get_logger
 
 
@@ -15,6 +27,7 @@ class BookingResult:
     date: str
     time: str
     error_message: Optional[str] = None
+    day: Optional[date] = None  # Full date of the slot, if known
 
 
 class BookingHandler:
@@ -26,17 +39,23 @@ class BookingHandler:
     
     MAX_BOOKING_TIME = 15  # seconds
     
-    def __init__(self, page: Page):
+    def __init__(self, page: Page, journal: Optional[BookingJournal] = None):
         """
         Initialize booking handler.
         
         Args:
             page: Playwright page object
+            journal: Write-ahead journal that records each step of the flow
         """
         self.page = page
+        self.journal = journal
         self.logger = get_logger()
     
-    async def complete_booking(self, slot: AvailableSlot) -> BookingResult:
+    async def complete_booking(
+        self,
+        slot: AvailableSlot,
+        lease_check: Optional[Callable[[], Awaitable[bool]]] = None,
+    ) -> BookingResult:
         """
         Complete the booking flow for an available slot.
         
@@ -49,32 +68,33 @@ class BookingHandler:
         
         Args:
             slot: Available slot to book
+            lease_check: Called before each irreversible click; the flow is
+                aborted if it returns False (booking lock lost)
         
         Returns:
             BookingResult with success status and details
         """
         start_time = time.time()
+        attempt = JournalEntry(
+            booking_id=BookingJournal.new_booking_id(),
+            state=STARTED,
+            category=slot.slot_info.category,
+            date=slot.slot_info.date,
+            day=slot.slot_info.day.isoformat() if slot.slot_info.day else "",
+        )
         
         try:
-            self.logger.info(f"Starting booking flow for {slot.slot_info.category} on {slot.slot_info.date}")
+            self.logger.info(f"Starting booking flow for {attempt.category} on {attempt.date}")
             
             # Step 1: Click the slot
+            self._journal(attempt, STARTED, sync=True)
             await self._click_slot(slot.slot_info.element)
             
             # Step 2: Wait for time selection page
             await self._wait_for_time_selection_page()
             
-            # Step 3: Select first available time
-            selected_time = await self._select_first_available_time()
-            
-            # Step 4: Click "予約する" button
-            await self._click_reserve_button()
-            
-            # Step 5: Wait for procedure explanation page
-            await self._wait_for_procedure_explanation_page()
-            
-            # Step 6: Click "同意する" button to lock the reservation
-            await self._click_agree_button()
+            # Steps 3-6: time, "予約する", procedure page, "同意する"
+            selected_time = await self._finish_from_time_selection(attempt, lease_check)
             
             elapsed_time = time.time() - start_time
             self.logger.info(f"✓ Reservation locked successfully in {elapsed_time:.2f} seconds")
@@ -85,12 +105,14 @@ class BookingHandler:
                 category=slot.slot_info.category,
                 date=slot.slot_info.date,
                 time=selected_time,
+                day=slot.slot_info.day,
             )
         
         except Exception as e:
             elapsed_time = time.time() - start_time
             error_msg = f"Booking failed after {elapsed_time:.2f} seconds: {str(e)}"
             self.logger.error(error_msg, exc_info=True)
+            self._journal(attempt, FAILED)
             
             return BookingResult(
                 success=False,
@@ -100,6 +122,135 @@ class BookingHandler:
                 error_message=error_msg,
             )
     
+    async def resume_booking(
+        self,
+        entry: JournalEntry,
+        lease_check: Optional[Callable[[], Awaitable[bool]]] = None,
+    ) -> Optional[BookingResult]:
+        """
+        Continue a journaled booking flow after a restart.
+        
+        A held reservation needs no further clicks. An unfinished flow is
+        continued from the step the current page is on, which requires the
+        page to have survived the restart (browser server mode). A crash
+        after "同意する" was clicked but before it was confirmed may have
+        left the reservation held: unless the page is still on the
+        procedure page, it is treated as held rather than failed, so no
+        second slot is booked while it might be.
+        
+        Args:
+            entry: Last journaled step of the interrupted attempt
+            lease_check: Called before each irreversible click
+        
+        Returns:
+            BookingResult, or None if the page is not at a step the flow can continue from
+        """
+        day = date.fromisoformat(entry.day) if entry.day else None
+        if entry.state == LOCKED:
+            self.logger.info(f"Journal: reservation for {entry.category} on {entry.date} is already held")
+            return BookingResult(success=True, category=entry.category, date=entry.date, time=entry.time, day=day)
+        
+        url = self.page.url
+        on_time_selection = "facilitySelect_decide" in url and entry.state in (STARTED, TIME_SELECTED, RESERVE_CLICKING)
+        on_procedure = "offerDetail_initDisplay" in url and entry.state in (
+            STARTED, TIME_SELECTED, RESERVE_CLICKING, RESERVE_CLICKED, AGREE_CLICKING,
+        )
+        if entry.state == AGREE_CLICKING and not on_procedure:
+            if "offerDetail_mailto" in url:
+                self.logger.info(f"Journal: '同意する' went through, reservation for {entry.category} on {entry.date} is held")
+                self._journal(entry, LOCKED, entry.time, sync=True)
+            else:
+                self.logger.warning(
+                    f"Journal: '同意する' may have gone through for {entry.category} on {entry.date} "
+                    f"(page is now {url}); treating the reservation as held"
+                )
+            return BookingResult(success=True, category=entry.category, date=entry.date, time=entry.time, day=day)
+        if not on_time_selection and not on_procedure:
+            self.logger.warning(f"Journal: cannot resume '{entry.state}' booking from {url}")
+            self._journal(entry, FAILED, entry.time)
+            return None
+        
+        self.logger.info(f"Resuming booking flow for {entry.category} on {entry.date} after '{entry.state}'")
+        try:
+            if on_time_selection:
+                selected_time = await self._finish_from_time_selection(entry, lease_check)
+            else:
+                selected_time = entry.time
+                await self._finish_from_procedure(entry, selected_time, lease_check)
+        except Exception as e:
+            error_msg = f"Resumed booking failed: {e}"
+            self.logger.error(error_msg, exc_info=True)
+            self._journal(entry, FAILED, entry.time)
+            return BookingResult(
+                success=False,
+                category=entry.category,
+                date=entry.date,
+                time="",
+                error_message=error_msg,
+            )
+        
+        self.logger.info("✓ Reservation locked successfully (resumed)")
+        return BookingResult(success=True, category=entry.category, date=entry.date, time=selected_time, day=day)
+    
+    async def _finish_from_time_selection(
+        self,
+        attempt: JournalEntry,
+        lease_check: Optional[Callable[[], Awaitable[bool]]],
+    ) -> str:
+        """
+        Select a time and click "予約する", then finish on the procedure page.
+        
+        Returns:
+            Selected time
+        """
+        selected_time = await self._select_first_available_time()
+        self._journal(attempt, TIME_SELECTED, selected_time)
+        
+        await self._check_lease(lease_check)
+        self._journal(attempt, RESERVE_CLICKING, selected_time, sync=True)
+        await self._click_reserve_button()
+        self._journal(attempt, RESERVE_CLICKED, selected_time, sync=True)
+        
+        await self._wait_for_procedure_explanation_page()
+        await self._finish_from_procedure(attempt, selected_time, lease_check)
+        return selected_time
+    
+    async def _finish_from_procedure(
+        self,
+        attempt: JournalEntry,
+        selected_time: str,
+        lease_check: Optional[Callable[[], Awaitable[bool]]],
+    ) -> None:
+        """Click "同意する" on the procedure explanation page to lock the reservation."""
+        await self._check_lease(lease_check)
+        self._journal(attempt, AGREE_CLICKING, selected_time, sync=True)
+        await self._click_agree_button()
+        self._journal(attempt, LOCKED, selected_time, sync=True)
+    
+    def _journal(self, attempt: JournalEntry, state: str, selected_time: str = "", sync: bool = False) -> None:
+        """Record a step of an attempt in the journal, if there is one."""
+        if self.journal:
+            self.journal.record(
+                attempt.booking_id,
+                state,
+                attempt.category,
+                attempt.date,
+                selected_time,
+                url=self.page.url,
+                day=attempt.day,
+                sync=sync,
+            )
+    
+    async def _check_lease(self, lease_check: Optional[Callable[[], Awaitable[bool]]]) -> None:
+        """
+        Make sure this instance still holds the booking lock.
+        
+        Raises:
+            RuntimeError: If the lock was lost to another instance
+        """
+        if lease_check and not await lease_check():
+            raise RuntimeError("Booking lock lost to another instance")
+    
     async def _click_slot(self, element) -> None:
         """
         Click on the slot element.
@@ -0,0 +1,197 @@
+"""Write-ahead journal of booking flow steps, for resuming after a crash."""
+import json
+import os
+import uuid
+from dataclasses import asdict, dataclass
+from datetime import date, datetime, timedelta
+from typing import List, Optional
+from src.logger import get_logger
+
+
+# Booking flow steps, in order. A "_clicking" step is written before its click
+# and the next step after it, so a crash in between shows the click may have landed.
+STARTED = "started"                    # About to click the slot link
+TIME_SELECTED = "time_selected"        # Time checkbox ticked on the time selection page
+RESERVE_CLICKING = "reserve_clicking"  # About to click "予約する"
+RESERVE_CLICKED = "reserve_clicked"    # "予約する" clicked
+AGREE_CLICKING = "agree_clicking"      # About to click "同意する": the reservation may be held from here on
+LOCKED = "locked"                      # "同意する" clicked, the reservation is held
+# Terminal states: nothing to resume
+FAILED = "failed"
+CLOSED = "closed"                    # The hold ended without the form being finished
+SUBMITTED = "submitted"              # The held reservation's form was finished
+
+TERMINAL_STATES = (FAILED, CLOSED, SUBMITTED)
+
+
+@dataclass
+class JournalEntry:
+    """One recorded step of a booking flow."""
+    booking_id: str
+    state: str
+    category: str
+    date: str
+    time: str = ""
+    url: str = ""  # Page the step left the browser on
+    at: str = ""
+    day: str = ""  # Full slot date (ISO), if known
+    upgrading: str = ""  # CURRENT_BOOKING_DATE the booking was made to improve on (upgrade mode)
+
+    @property
+    def recorded_at(self) -> datetime:
+        """When the step was recorded."""
+        return datetime.fromisoformat(self.at)
+
+
+class BookingJournal:
+    """
+    Append-only JSON-lines log of BookingHandler transitions.
+
+    The click steps that leave something behind on the site (the slot
+    link, "予約する" and "同意する") are journaled and fsynced before the
+    click, and confirmed after it, so after a restart the controller knows
+    whether a flow was in progress and whether a reservation may already
+    be held. A torn last line from a crash mid-write is ignored on replay.
+    """
+
+    # Older unfinished flows are not resumed (the site has released them by then)
+    RESUME_WINDOW = timedelta(hours=1)
+
+    def __init__(self, path: str = os.path.join("logs", "booking_journal.jsonl")):
+        """
+        Initialize booking journal.
+
+        Args:
+            path: JSON-lines file to append to
+        """
+        self.path = path
+        self.logger = get_logger()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def new_booking_id() -> str:
+        """Id grouping the steps of one booking attempt."""
+        return uuid.uuid4().hex[:12]
+
+    def record(
+        self,
+        booking_id: str,
+        state: str,
+        category: str,
+        date: str,
+        time: str = "",
+        url: str = "",
+        day: str = "",
+        upgrading: str = "",
+        sync: bool = False,
+    ) -> JournalEntry:
+        """
+        Append a step.
+
+        Args:
+            booking_id: Attempt the step belongs to
+            state: Step reached (one of the module's state constants)
+            category: Slot category
+            date: Slot date
+            time: Selected time, once known
+            url: Current page URL
+            day: Full slot date (ISO)
+            upgrading: CURRENT_BOOKING_DATE in effect (upgrade mode)
+            sync: fsync before returning
+
+        Returns:
+            The recorded entry
+        """
+        entry = JournalEntry(
+            booking_id=booking_id,
+            state=state,
+            category=category,
+            date=date,
+            time=time,
+            url=url,
+            at=datetime.now().isoformat(timespec="seconds"),
+            day=day,
+            upgrading=upgrading,
+        )
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(asdict(entry), ensure_ascii=False) + "\n")
+            if sync:
+                f.flush()
+                os.fsync(f.fileno())
+        return entry
+
+    def read(self) -> List[JournalEntry]:
+        """
+        Load all recorded steps.
+
+        Returns:
+            Entries, oldest first (unreadable lines are skipped)
+        """
+        if not os.path.exists(self.path):
+            return []
+        entries = []
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entries.append(JournalEntry(**json.loads(line)))
+                except (ValueError, TypeError):
+                    continue  # Torn write from a crash
+        return entries
+
+    def mark_closed(self, state: str = CLOSED, upgrading: str = "") -> None:
+        """
+        Record how the last attempt's held reservation ended.
+
+        Args:
+            state: CLOSED, or SUBMITTED if the form was finished
+            upgrading: CURRENT_BOOKING_DATE in effect (upgrade mode)
+        """
+        entries = self.read()
+        if entries and entries[-1].state not in TERMINAL_STATES:
+            last = entries[-1]
+            self.record(
+                last.booking_id, state, last.category, last.date, last.time,
+                day=last.day, upgrading=upgrading, sync=True,
+            )
+
+    def submitted_days(self, upgrading: str, since: date) -> List[date]:
+        """
+        Dates of the reservations whose form was finished while upgrading a booking.
+
+        Args:
+            upgrading: CURRENT_BOOKING_DATE the bookings were made to improve on
+            since: Earliest slot date to include (older bookings are over)
+
+        Returns:
+            Slot dates, oldest attempt first (attempts without a full date are skipped)
+        """
+        days = [
+            date.fromisoformat(entry.day)
+            for entry in self.read()
+            if entry.state == SUBMITTED and entry.day and entry.upgrading == upgrading
+        ]
+        return [day for day in days if day >= since]
+
+    def pending(self, now: Optional[datetime] = None) -> Optional[JournalEntry]:
+        """
+        Replay the journal and return the unfinished step of the last attempt.
+
+        Args:
+            now: Current time (defaults to now)
+
+        Returns:
+            Last step of the most recent attempt, or None if it ended,
+            is too old to resume, or there is none
+        """
+        entries = self.read()
+        if not entries:
+            return None
+        last = entries[-1]
+        if last.state in TERMINAL_STATES:
+            return None
+        if (now or datetime.now()) - last.recorded_at > self.RESUME_WINDOW:
+            self.logger.info(f"Ignoring stale booking journal entry from {last.at} ({last.state})")
+            return None
+        return last
@@ -0,0 +1,440 @@
+"""Lease-based booking locks with fencing tokens, shared between instances."""
+import asyncio
+import json
+import os
+import sqlite3
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from hashlib import sha1
+from typing import Dict, Optional, Tuple
+from src.logger import get_logger
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+
+# Errors that mean the lock backend itself is unavailable (not that the lock is taken)
+LOCK_BACKEND_ERRORS = (OSError, sqlite3.Error, asyncio.TimeoutError, json.JSONDecodeError, KeyError)
+
+
+def lock_key(account: str, category: str, date: str) -> str:
+    """
+    Build the lock key for one booking target.
+
+    Args:
+        account: Account the booking is made for (login e-mail)
+        category: Category name, e.g. "普通車ＡＭ"
+        date: Date header text, e.g. "01/20 (Tue)"
+
+    Returns:
+        Key string shared by every instance booking the same slot
+    """
+    return f"{account}|{category}|{date}"
+
+
+@dataclass(frozen=True)
+class Lease:
+    """A held booking lock."""
+    key: str
+    owner: str
+    token: int  # Fencing token, strictly increasing per key
+    expires_at: float  # Wall-clock expiry (time.time())
+
+
+def _grant(
+    holder: Optional[dict],
+    last_token: int,
+    key: str,
+    owner: str,
+    ttl: float,
+    now: float,
+) -> Optional[Lease]:
+    """Shared acquire rule: free, expired or already ours -> new lease with the next token."""
+    if holder and holder["owner"] != owner and holder["expires_at"] > now:
+        return None
+    return Lease(key=key, owner=owner, token=last_token + 1, expires_at=now + ttl)
+
+
+def _holds(holder: Optional[dict], lease: Lease, now: float) -> bool:
+    """Shared validity rule: the lease is the current, unexpired holder."""
+    return bool(holder) and holder["token"] == lease.token and holder["expires_at"] > now
+
+
+class BookingLock(ABC):
+    """
+    Base class for lock backends.
+
+    A lease is granted to one owner per key until it expires or is released.
+    Every grant carries a fencing token larger than any earlier token for the
+    same key, so a holder whose lease lapsed (e.g. after a long GC pause) is
+    detected by ``is_valid`` before it clicks through an irreversible step.
+    """
+
+    @abstractmethod
+    async def acquire(self, key: str, owner: str, ttl: float) -> Optional[Lease]:
+        """
+        Try to take the lock.
+
+        Args:
+            key: Lock key (see lock_key)
+            owner: Unique name of this instance
+            ttl: Lease duration in seconds
+
+        Returns:
+            Lease if granted, None if another owner holds the key
+        """
+
+    @abstractmethod
+    async def release(self, lease: Lease) -> None:
+        """Release a lease (no-op if it is no longer the current holder)."""
+
+    @abstractmethod
+    async def is_valid(self, lease: Lease) -> bool:
+        """Return True if the lease is still the current holder of its key."""
+
+    async def close(self) -> None:
+        """Release backend resources."""
+
+
+class MemoryLockTable(BookingLock):
+    """In-process lock table (used by LockServer and for tests)."""
+
+    def __init__(self, clock=time.time):
+        """
+        Initialize lock table.
+
+        Args:
+            clock: Wall-clock time source (injectable for tests)
+        """
+        self.clock = clock
+        self.holders: Dict[str, dict] = {}
+        self.tokens: Dict[str, int] = {}
+
+    async def acquire(self, key: str, owner: str, ttl: float) -> Optional[Lease]:
+        lease = _grant(self.holders.get(key), self.tokens.get(key, 0), key, owner, ttl, self.clock())
+        if lease:
+            self.tokens[key] = lease.token
+            self.holders[key] = {"owner": owner, "token": lease.token, "expires_at": lease.expires_at}
+        return lease
+
+    async def release(self, lease: Lease) -> None:
+        holder = self.holders.get(lease.key)
+        if holder and holder["token"] == lease.token:
+            del self.holders[lease.key]
+
+    async def is_valid(self, lease: Lease) -> bool:
+        return _holds(self.holders.get(lease.key), lease, self.clock())
+
+
+class FileBookingLock(BookingLock):
+    """
+    One JSON state file per key in a shared directory, guarded by flock.
+
+    The file keeps the last fencing token even after release, so tokens keep
+    increasing across restarts. Requires POSIX file locking. flock blocks
+    while another process holds the file, so each update runs in a worker
+    thread instead of on the event loop.
+    """
+
+    def __init__(self, directory: str):
+        """
+        Initialize file lock backend.
+
+        Args:
+            directory: Directory shared by all instances
+
+        Raises:
+            RuntimeError: If the platform has no fcntl (use the SQLite backend)
+        """
+        if fcntl is None:
+            raise RuntimeError("The file lock backend needs fcntl; use BOOKING_LOCK=sqlite on this platform")
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        # Keys contain an e-mail address and Japanese text, so hash them for the file name
+        return os.path.join(self.directory, sha1(key.encode("utf-8")).hexdigest() + ".lock")
+
+    def _update(self, key: str, change) -> object:
+        """Run ``change(state) -> (new_state, result)`` under an exclusive flock."""
+        fd = os.open(self._path(key), os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            raw = b""
+            while True:
+                chunk = os.read(fd, 4096)
+                if not chunk:
+                    break
+                raw += chunk
+            state = json.loads(raw) if raw else {"key": key, "last_token": 0, "holder": None}
+
+            new_state, result = change(state)
+            if new_state is not None:
+                os.lseek(fd, 0, os.SEEK_SET)
+                os.ftruncate(fd, 0)
+                os.write(fd, json.dumps(new_state, ensure_ascii=False).encode("utf-8"))
+                os.fsync(fd)
+            return result
+        finally:
+            os.close(fd)  # Closing the descriptor drops the flock
+
+    async def acquire(self, key: str, owner: str, ttl: float) -> Optional[Lease]:
+        def change(state):
+            lease = _grant(state["holder"], state["last_token"], key, owner, ttl, time.time())
+            if not lease:
+                return None, None
+            state["last_token"] = lease.token
+            state["holder"] = {"owner": owner, "token": lease.token, "expires_at": lease.expires_at}
+            return state, lease
+        return await asyncio.to_thread(self._update, key, change)
+
+    async def release(self, lease: Lease) -> None:
+        def change(state):
+            holder = state["holder"]
+            if holder and holder["token"] == lease.token:
+                state["holder"] = None
+                return state, None
+            return None, None
+        await asyncio.to_thread(self._update, lease.key, change)
+
+    async def is_valid(self, lease: Lease) -> bool:
+        return await asyncio.to_thread(
+            self._update, lease.key, lambda state: (None, _holds(state["holder"], lease, time.time()))
+        )
+
+
+class SQLiteBookingLock(BookingLock):
+    """
+    Lock table in a shared SQLite database (works wherever SQLite locking does).
+
+    SQLite waits up to its busy timeout while another process holds the write
+    lock, so queries run in a worker thread, one at a time.
+    """
+
+    def __init__(self, path: str):
+        """
+        Initialize SQLite lock backend.
+
+        Args:
+            path: Database file shared by all instances
+        """
+        self.path = path
+        self.connection = sqlite3.connect(path, timeout=5.0, isolation_level=None, check_same_thread=False)
+        self._lock = asyncio.Lock()
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS booking_locks ("
+            " key TEXT PRIMARY KEY,"
+            " last_token INTEGER NOT NULL,"
+            " owner TEXT,"
+            " token INTEGER,"
+            " expires_at REAL)"
+        )
+
+    def _load(self, key: str) -> Tuple[Optional[dict], int]:
+        row = self.connection.execute(
+            "SELECT last_token, owner, token, expires_at FROM booking_locks WHERE key = ?", (key,)
+        ).fetchone()
+        if not row:
+            return None, 0
+        holder = {"owner": row[1], "token": row[2], "expires_at": row[3]} if row[1] is not None else None
+        return holder, row[0]
+
+    async def _run(self, operation, *args):
+        """Run a blocking query in a worker thread, serialized on the connection."""
+        async with self._lock:
+            return await asyncio.to_thread(operation, *args)
+
+    def _acquire(self, key: str, owner: str, ttl: float) -> Optional[Lease]:
+        # BEGIN IMMEDIATE takes the write lock up front, so read-check-write is atomic
+        self.connection.execute("BEGIN IMMEDIATE")
+        try:
+            holder, last_token = self._load(key)
+            lease = _grant(holder, last_token, key, owner, ttl, time.time())
+            if lease:
+                self.connection.execute(
+                    "INSERT INTO booking_locks (key, last_token, owner, token, expires_at)"
+                    " VALUES (?, ?, ?, ?, ?)"
+                    " ON CONFLICT(key) DO UPDATE SET last_token = excluded.last_token,"
+                    " owner = excluded.owner, token = excluded.token, expires_at = excluded.expires_at",
+                    (key, lease.token, owner, lease.token, lease.expires_at),
+                )
+            self.connection.execute("COMMIT")
+            return lease
+        except Exception:
+            self.connection.execute("ROLLBACK")
+            raise
+
+    def _release(self, lease: Lease) -> None:
+        self.connection.execute(
+            "UPDATE booking_locks SET owner = NULL, token = NULL, expires_at = NULL"
+            " WHERE key = ? AND token = ?",
+            (lease.key, lease.token),
+        )
+
+    def _is_valid(self, lease: Lease) -> bool:
+        holder, _ = self._load(lease.key)
+        return _holds(holder, lease, time.time())
+
+    async def acquire(self, key: str, owner: str, ttl: float) -> Optional[Lease]:
+        return await self._run(self._acquire, key, owner, ttl)
+
+    async def release(self, lease: Lease) -> None:
+        await self._run(self._release, lease)
+
+    async def is_valid(self, lease: Lease) -> bool:
+        return await self._run(self._is_valid, lease)
+
+    async def close(self) -> None:
+        async with self._lock:
+            self.connection.close()
+
+
+class LockServer:
+    """Serves a MemoryLockTable to TCPBookingLock clients (JSON lines over TCP)."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8766):
+        """
+        Initialize lock server.
+
+        Args:
+            host: Interface to listen on
+            port: TCP port to listen on
+        """
+        self.host = host
+        self.port = port
+        self.table = MemoryLockTable()
+        self._server: Optional[asyncio.AbstractServer] = None
+        self.logger = get_logger()
+
+    async def start(self) -> None:
+        """Start listening."""
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.logger.info(f"Booking lock server listening on {self.host}:{self.port}")
+
+    async def serve_forever(self) -> None:
+        """Run the lock server until cancelled."""
+        if not self._server:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def stop(self) -> None:
+        """Stop listening."""
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                request = json.loads(line)
+                op = request.get("op")
+
+                if op == "acquire":
+                    lease = await self.table.acquire(request["key"], request["owner"], request["ttl"])
+                    response = {"lease": lease.__dict__ if lease else None}
+                elif op in ("release", "is_valid"):
+                    lease = Lease(**request["lease"])
+                    if op == "release":
+                        await self.table.release(lease)
+                        response = {"ok": True}
+                    else:
+                        response = {"valid": await self.table.is_valid(lease)}
+                else:
+                    response = {"error": f"unknown op {op!r}"}
+
+                writer.write((json.dumps(response, ensure_ascii=False) + "\n").encode("utf-8"))
+                await writer.drain()
+        except (ConnectionError, json.JSONDecodeError, KeyError, TypeError) as e:
+            self.logger.debug(f"Lock client error: {e}")
+        finally:
+            writer.close()
+
+
+class TCPBookingLock(BookingLock):
+    """Client for a LockServer."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8766, timeout: float = 2.0):
+        """
+        Initialize TCP lock client.
+
+        Args:
+            host: Lock server host
+            port: Lock server port
+            timeout: Per-request timeout in seconds
+        """
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._lock = asyncio.Lock()
+
+    async def _request(self, message: dict) -> dict:
+        async with self._lock:
+            try:
+                if self._writer is None or self._writer.is_closing():
+                    self._reader, self._writer = await asyncio.wait_for(
+                        asyncio.open_connection(self.host, self.port), self.timeout
+                    )
+                self._writer.write((json.dumps(message, ensure_ascii=False) + "\n").encode("utf-8"))
+                await self._writer.drain()
+                line = await asyncio.wait_for(self._reader.readline(), self.timeout)
+                if not line:
+                    raise ConnectionError("Lock server closed the connection")
+                return json.loads(line)
+            except (OSError, asyncio.TimeoutError):
+                # Reconnect on the next request
+                if self._writer:
+                    self._writer.close()
+                self._writer = None
+                raise
+
+    async def acquire(self, key: str, owner: str, ttl: float) -> Optional[Lease]:
+        response = await self._request({"op": "acquire", "key": key, "owner": owner, "ttl": ttl})
+        return Lease(**response["lease"]) if response.get("lease") else None
+
+    async def release(self, lease: Lease) -> None:
+        await self._request({"op": "release", "lease": lease.__dict__})
+
+    async def is_valid(self, lease: Lease) -> bool:
+        response = await self._request({"op": "is_valid", "lease": lease.__dict__})
+        return bool(response.get("valid"))
+
+    async def close(self) -> None:
+        if self._writer:
+            self._writer.close()
+            self._writer = None
+
+
+def create_booking_lock(backend: str, location: str = "") -> Optional[BookingLock]:
+    """
+    Create a lock backend from configuration.
+
+    Args:
+        backend: "none", "file", "sqlite" or "tcp"
+        location: Directory (file), database path (sqlite) or host:port (tcp)
+
+    Returns:
+        BookingLock, or None if locking is disabled
+
+    Raises:
+        ValueError: If the backend name is unknown
+    """
+    if backend == "none":
+        return None
+    if backend == "file":
+        return FileBookingLock(location or "locks")
+    if backend == "sqlite":
+        return SQLiteBookingLock(location or "booking_locks.db")
+    if backend == "tcp":
+        host, _, port = (location or "127.0.0.1:8766").rpartition(":")
+        return TCPBookingLock(host or "127.0.0.1", int(port))
+    raise ValueError(f"Unknown booking lock backend: {backend}. Valid backends: none, file, sqlite, tcp")
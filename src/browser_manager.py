@@ -1,6 +1,14 @@
 """Browser management using Playwright."""
-from typing import Optional
-from playwright.async_api import async_playwright, Browser, Page, Playwright
+import asyncio
+from typing import Optional, Union
+from playwright.async_api import async_playwright, Browser, BrowserContext, CDPSession, Page, Playwright, Response
+from src.browser_profiles import BrowserProfile, FULL_PROFILE
+from src.browser_server import BrowserServer
+from src.error_handler import PageStructureError, diagnose_page
+from src.evidence import EvidenceRecorder
+from src.http_poller import CapturedRequest
+from src.traffic_archive import TrafficRecorder, TrafficReplayer
+from src.selectors import SLOT_TABLE
 from src.logger import get_logger
 
 
@@ -14,7 +22,17 @@ class BrowserManager:
     # Final facility selection page
     FACILITY_URL = "https://dshinsei.e-kanagawa.lg.jp/140007-u/reserve/facilitySelect_dateTrans?movePage=oneMonthLater"
     
-    def __init__(self, headless: bool = True, user_email: str = "", user_password: str = ""):
+    def __init__(
+        self,
+        headless: bool = True,
+        user_email: str = "",
+        user_password: str = "",
+        monitor_profile: BrowserProfile = FULL_PROFILE,
+        month_offset: int = 1,
+        evidence: Optional[EvidenceRecorder] = None,
+        traffic: Optional[Union[TrafficRecorder, TrafficReplayer]] = None,
+        browser_server: Optional[BrowserServer] = None,
+    ):
         """
         Initialize browser manager.
         
@@ -22,22 +40,52 @@ class BrowserManager:
             headless: Whether to run browser in headless mode
             user_email: Email address for login
             user_password: Password for login
+            monitor_profile: Engine profile used while polling the facility page
+            month_offset: Month window to monitor (1 = the page reached with one "1か月後" click)
+            evidence: Recorder that receives a frame (with screenshot) on login/navigation errors
+            traffic: Records the context's traffic, or serves it from an archive instead of the site
+            browser_server: Detached browser to connect to (and launch if needed) instead of
+                launching one that dies with this process
         """
         self.headless = headless
         self.user_email = user_email
         self.user_password = user_password
+        self.monitor_profile = monitor_profile
+        self.month_offset = month_offset
+        self.evidence = evidence
+        self.traffic = traffic
+        self.browser_server = browser_server
+        self.reattached = False  # Connected to a browser server that still had the facility page open
+        self.active_profile: BrowserProfile = FULL_PROFILE
         self.playwright: Optional[Playwright] = None
         self.browser: Optional[Browser] = None
+        self.context: Optional[BrowserContext] = None
         self.page: Optional[Page] = None
+        self._cdp_session: Optional[CDPSession] = None
         self.logger = get_logger()
     
     async def start(self) -> None:
         """Start the browser and create a new page."""
-        self.logger.info(f"Starting browser (headless={self.headless})")
+        self.logger.info(
+            f"Starting browser (headless={self.headless}, profile={self.monitor_profile.name})"
+        )
         
         self.playwright = await async_playwright().start()
-        self.browser = await self.playwright.chromium.launch(headless=self.headless)
-        self.page = await self.browser.new_page()
+        if self.browser_server:
+            await self._connect_browser_server()
+            return
+        
+        # Launch flags are browser-wide, so the monitor profile's flags apply to booking too
+        self.browser = await self.playwright.chromium.launch(
+            headless=self.headless,
+            args=list(self.monitor_profile.launch_args),
+        )
+        # Keep an explicit context so pages can be recycled without losing the session
+        self.context = await self.browser.new_context(viewport=FULL_PROFILE.viewport)
+        if self.traffic:
+            await self.traffic.attach(self.context)
+        self.page = await self.context.new_page()
+        self.active_profile = FULL_PROFILE
         
         self.logger.debug("Browser started successfully")
     
@@ -53,6 +101,8 @@ class BrowserManager:
         if not self.page:
             raise RuntimeError("Browser not started. Call start() first.")
         
+        await self._ensure_full_profile()
+        
         self.logger.info(f"Navigating to login page: {self.LOGIN_URL}")
         await self.page.goto(self.LOGIN_URL, wait_until="domcontentloaded", timeout=30000)
         
@@ -121,22 +171,76 @@ class BrowserManager:
                 
         except Exception as e:
             self.logger.error(f"Error during login: {e}")
-            # Take a screenshot for debugging
-            try:
-                await self.page.screenshot(path="logs/login_error.png")
-                self.logger.info("Screenshot saved to logs/login_error.png")
-            except:
-                pass
+            await self._save_error_evidence("login_error", e)
             raise
     
+    async def _connect_browser_server(self) -> None:
+        """Connect to the browser server, launching it first if nothing is listening."""
+        server = self.browser_server
+        if not await asyncio.to_thread(server.is_running):
+            self.logger.info(f"No browser server on {server.endpoint}, launching one")
+            await asyncio.to_thread(
+                server.launch,
+                self.playwright.chromium.executable_path,
+                self.headless,
+                list(self.monitor_profile.launch_args),
+            )
+        
+        self.browser = await self.playwright.chromium.connect_over_cdp(server.endpoint)
+        # Contexts created over CDP are disposed when we disconnect; the default one is not
+        self.context = self.browser.contexts[0]
+        if self.traffic:
+            await self.traffic.attach(self.context)
+        
+        pages = self.context.pages
+        # A page in the middle of the booking flow wins over the facility page
+        site_pages = sorted(
+            (page for page in pages if self.booking_step(page.url) or "facilitySelect" in page.url),
+            key=lambda page: not self.booking_step(page.url),
+        )
+        self.reattached = bool(site_pages)
+        self.page = site_pages[0] if site_pages else (pages[0] if pages else await self.context.new_page())
+        await self.page.set_viewport_size(FULL_PROFILE.viewport)
+        # Per-page emulation ended with the previous connection's CDP sessions
+        self.active_profile = FULL_PROFILE
+        
+        if self.reattached:
+            self.logger.info(f"Reattached to browser server page {self.page.url}")
+        else:
+            self.logger.info(f"Connected to browser server on {server.endpoint}")
+    
+    @staticmethod
+    def booking_step(url: str) -> bool:
+        """True if the URL is a page of the booking flow (after the slot click)."""
+        return "facilitySelect_decide" in url or "offerDetail" in url
+    
     async def stop(self) -> None:
-        """Stop the browser and clean up resources."""
+        """Stop the browser and clean up resources (a browser server is only disconnected)."""
         self.logger.info("Stopping browser")
         
+        self._cdp_session = None
+        
+        if self.browser_server:
+            # Leave the page and its session in the server for the next start
+            self.page = None
+            self.context = None
+            if self.browser:
+                await self.browser.close()
+                self.browser = None
+            if self.playwright:
+                await self.playwright.stop()
+                self.playwright = None
+            self.logger.debug("Disconnected from browser server")
+            return
+        
         if self.page:
             await self.page.close()
             self.page = None
         
+        if self.context:
+            await self.context.close()
+            self.context = None
+        
         if self.browser:
             await self.browser.close()
             self.browser = None
@@ -164,6 +268,8 @@ class BrowserManager:
         if not self.page:
             raise RuntimeError("Browser not started. Call start() first.")
         
+        await self._ensure_full_profile()
+        
         self.logger.info(f"Navigating to initial page: {self.INITIAL_URL}")
         await self.page.goto(self.INITIAL_URL, wait_until="domcontentloaded", timeout=30000)
         
@@ -240,20 +346,39 @@ class BrowserManager:
             if not checkbox_found:
                 self.logger.warning("Could not find agreement checkbox, attempting to continue anyway")
             
+            # Step 3: Move further ahead if a later month window is monitored
+            for _ in range(self.month_offset - 1):
+                await self._advance_one_month()
+            
             self.logger.info("✓ Ready to start monitoring for available slots")
             
         except Exception as e:
             self.logger.error(f"Error during navigation flow: {e}")
-            # Take a screenshot for debugging
-            try:
-                await self.page.screenshot(path="logs/navigation_error.png")
-                self.logger.info("Screenshot saved to logs/navigation_error.png")
-            except:
-                pass
+            await self._save_error_evidence("navigation_error", e)
             raise
         
         return self.page
     
+    async def _save_error_evidence(self, label: str, error: Exception) -> None:
+        """Keep the failing page (with a screenshot) for debugging."""
+        if self.evidence:
+            await self.evidence.capture(self.page, label, screenshot=True, error=str(error))
+            await asyncio.to_thread(self.evidence.flush, label)
+            return
+        
+        try:
+            await self.page.screenshot(path=f"logs/{label}.png")
+            self.logger.info(f"Screenshot saved to logs/{label}.png")
+        except:
+            pass
+    
+    async def _advance_one_month(self) -> None:
+        """Click the facility page's "1か月後＞" pager button and wait for the new table."""
+        self.logger.info("Advancing facility calendar by one month")
+        button = self.page.locator("input[type='button'][onclick*='oneMonthLater']").first
+        await button.click()
+        await self.page.wait_for_load_state("domcontentloaded", timeout=10000)
+    
     async def get_page(self) -> Page:
         """
         Get the current page object.
@@ -269,25 +394,261 @@ class BrowserManager:
         
         return self.page
     
-    async def refresh_page(self) -> Page:
+    async def refresh_page(self, wait_until: str = "networkidle") -> Page:
         """
         Refresh the current page.
         Used for monitoring loop - just refreshes the facility page.
         
+        Args:
+            wait_until: Load state to wait for ("domcontentloaded" for fast polls)
+        
         Returns:
             The page object after refresh
         
         Raises:
             RuntimeError: If browser is not started
+            BookingSystemError: If the reloaded page is an error, login or maintenance page
         """
         if not self.page:
             raise RuntimeError("Browser not started. Call start() first.")
         
         self.logger.debug("Refreshing page")
-        await self.page.reload(wait_until="networkidle")
+        response = await self.page.reload(wait_until=wait_until)
+        await self.check_page_state(response)
+        
+        return self.page
+    
+    async def capture_document_request(self) -> CapturedRequest:
+        """
+        Reload the facility page once and capture its request and cookies.
+        
+        The result lets HttpPoller replay the page without the browser.
+        
+        Returns:
+            CapturedRequest for the current page
+        
+        Raises:
+            RuntimeError: If browser is not started
+            BookingSystemError: If the page is not a healthy facility page
+        """
+        if not self.page:
+            raise RuntimeError("Browser not started. Call start() first.")
+        
+        response = await self.page.reload(wait_until="domcontentloaded")
+        await self.check_page_state(response)
+        
+        request = response.request
+        return CapturedRequest(
+            method=request.method,
+            url=request.url,
+            headers=await request.all_headers(),
+            post_data=request.post_data,
+            cookies=await self.context.cookies(),
+        )
+    
+    async def check_page_state(self, response: Optional[Response] = None) -> None:
+        """
+        Raise a classified error if the current page is not a healthy facility page.
+        
+        The page text is only read when the status is bad or the slot table is
+        missing, so healthy refreshes cost a single element count.
+        
+        Args:
+            response: Main document response of the last navigation, if known
+        
+        Raises:
+            BookingSystemError: Classified error for the page state
+        """
+        status = response.status if response else None
+        retry_after = response.headers.get("retry-after") if response else None
+        has_table = await self.page.locator(SLOT_TABLE).count() > 0
+        
+        text = ""
+        if not has_table or (status is not None and status >= 400):
+            try:
+                text = await self.page.locator("body").inner_text(timeout=5000)
+            except Exception as e:
+                self.logger.debug(f"Could not read page text: {e}")
+        
+        error = diagnose_page(status, self.page.url, text, retry_after)
+        if error:
+            raise error
+        
+        if not has_table:
+            raise PageStructureError(f"Slot table not found on {self.page.url}")
+    
+    async def park(self) -> None:
+        """
+        Park the browser during maintenance.
+        
+        The page is moved to about:blank so its renderer memory and timers are
+        released, while the context (and its login cookies) is kept.
+        """
+        if not self.page:
+            return
+        
+        self.logger.info("Parking browser (about:blank)")
+        await self.page.goto("about:blank")
+    
+    @property
+    def is_started(self) -> bool:
+        """True while a browser is running or connected."""
+        return self.browser is not None
+    
+    async def recycle_page(self) -> Page:
+        """
+        Replace the current page with a fresh one in the same browser context.
+        
+        The context keeps the login cookies, so only the facility page navigation
+        has to be repeated. This releases the renderer memory held by the old page.
         
+        Returns:
+            The new page, already on the facility selection page
+        
+        Raises:
+            RuntimeError: If browser is not started
+        """
+        if not self.context:
+            raise RuntimeError("Browser not started. Call start() first.")
+        
+        self.logger.info("Recycling page (keeping session)")
+        old_page = self.page
+        self.page = await self.context.new_page()
+        self._cdp_session = None
+        self.active_profile = FULL_PROFILE
+        
+        if old_page:
+            try:
+                await old_page.close()
+            except Exception as e:
+                self.logger.debug(f"Error closing old page: {e}")
+        
+        await self.navigate_to_facility_page()
+        return await self.enter_monitor_profile()
+    
+    async def recycle_context(self) -> Page:
+        """
+        Replace the whole browser context, carrying the session over.
+        
+        Cookies and local storage are exported from the old context and
+        imported into the new one, so no new login is required.
+        
+        Returns:
+            The new page, already on the facility selection page
+        
+        Raises:
+            RuntimeError: If browser is not started
+        """
+        if not self.browser or not self.context:
+            raise RuntimeError("Browser not started. Call start() first.")
+        
+        if self.browser_server:
+            # A new context would not survive a restart; the default context stays
+            return await self.recycle_page()
+        
+        self.logger.info("Recycling browser context (keeping session)")
+        storage_state = await self.context.storage_state()
+        old_context = self.context
+        
+        self.context = await self.browser.new_context(
+            storage_state=storage_state,
+            viewport=FULL_PROFILE.viewport,
+        )
+        if self.traffic:
+            await self.traffic.attach(self.context)
+        self.page = await self.context.new_page()
+        self._cdp_session = None
+        self.active_profile = FULL_PROFILE
+        
+        try:
+            await old_context.close()
+        except Exception as e:
+            self.logger.debug(f"Error closing old context: {e}")
+        
+        await self.navigate_to_facility_page()
+        return await self.enter_monitor_profile()
+    
+    async def enter_monitor_profile(self) -> Page:
+        """
+        Switch the current page to the lean monitor profile.
+        
+        Called once the facility page is reached. If the profile disables
+        JavaScript the page is reloaded so later refreshes run script-free.
+        
+        Returns:
+            The page object
+        """
+        if self.active_profile == self.monitor_profile:
+            return await self.get_page()
+        
+        needs_reload = await self.apply_profile(self.monitor_profile)
+        if needs_reload:
+            await self.refresh_page()
         return self.page
     
+    async def enter_full_profile(self) -> bool:
+        """
+        Switch the current page back to the full profile for booking.
+        
+        Returns:
+            True if the page was reloaded (element handles from before are stale)
+        """
+        if self.active_profile == FULL_PROFILE:
+            return False
+        
+        needs_reload = await self.apply_profile(FULL_PROFILE)
+        if needs_reload:
+            # Page scripts were skipped while JS was off; the booking links need them
+            await self.page.reload(wait_until="domcontentloaded")
+        return needs_reload
+    
+    async def _ensure_full_profile(self) -> None:
+        """Re-enable the full profile before flows that depend on page scripts."""
+        if self.active_profile != FULL_PROFILE:
+            # The next goto reloads the document, so no extra reload is needed
+            await self.apply_profile(FULL_PROFILE)
+    
+    async def apply_profile(self, profile: BrowserProfile) -> bool:
+        """
+        Apply the per-page settings of a profile to the current page.
+        
+        Args:
+            profile: Profile to apply
+        
+        Returns:
+            True if the JavaScript setting changed and the page needs a reload
+        
+        Raises:
+            RuntimeError: If browser is not started
+        """
+        if not self.page:
+            raise RuntimeError("Browser not started. Call start() first.")
+        
+        self.logger.debug(f"Applying '{profile.name}' browser profile")
+        previous = self.active_profile
+        
+        await self.page.set_viewport_size(profile.viewport)
+        
+        if self._cdp_session is None:
+            self._cdp_session = await self.page.context.new_cdp_session(self.page)
+            await self._cdp_session.send("Network.enable")
+        
+        await self._cdp_session.send(
+            "Emulation.setScriptExecutionDisabled",
+            {"value": not profile.javascript_enabled},
+        )
+        await self._cdp_session.send(
+            "Network.setBlockedURLs",
+            {"urls": list(profile.blocked_url_patterns)},
+        )
+        await self._cdp_session.send(
+            "Network.setCacheDisabled",
+            {"cacheDisabled": not profile.cache_enabled},
+        )
+        
+        self.active_profile = profile
+        return previous.javascript_enabled != profile.javascript_enabled
+    
     async def __aenter__(self):
         """Context manager entry."""
         await self.start()
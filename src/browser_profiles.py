@@ -0,0 +1,99 @@
+"""Browser engine profiles for monitoring and booking."""
+from dataclasses import dataclass, replace
+from typing import Dict, Tuple
+
+
+@dataclass(frozen=True)
+class BrowserProfile:
+    """
+    Engine settings applied to the browser and the monitored page.
+
+    Launch arguments are browser-wide and only take effect at launch. The
+    remaining settings are applied per page (through Playwright and CDP) and
+    can be switched at runtime, which is how the booking handoff works.
+    """
+    name: str
+    viewport: Dict[str, int]
+    javascript_enabled: bool = True
+    # URL patterns blocked through CDP Network.setBlockedURLs. Unlike page.route,
+    # this keeps the HTTP cache enabled for the resources that are still loaded.
+    blocked_url_patterns: Tuple[str, ...] = ()
+    cache_enabled: bool = True
+    launch_args: Tuple[str, ...] = ()
+
+
+# Flags that trim Chromium down to a single lean renderer for polling
+MONITOR_LAUNCH_ARGS = (
+    "--disable-gpu",
+    "--disable-gpu-compositing",
+    "--disable-extensions",
+    "--disable-background-networking",
+    "--disable-component-update",
+    "--disable-default-apps",
+    "--disable-sync",
+    "--disable-translate",
+    "--disable-dev-shm-usage",
+    "--disable-features=site-per-process,Translate,MediaRouter,OptimizationHints",
+    "--disable-site-isolation-trials",
+    "--renderer-process-limit=1",
+    "--metrics-recording-only",
+    "--mute-audio",
+    "--no-first-run",
+)
+
+# Static assets the slot table does not need
+MONITOR_BLOCKED_URL_PATTERNS = (
+    "*.png",
+    "*.jpg",
+    "*.jpeg",
+    "*.gif",
+    "*.webp",
+    "*.ico",
+    "*.woff",
+    "*.woff2",
+    "*.ttf",
+)
+
+# Default Playwright engine settings, used for login, navigation and booking
+FULL_PROFILE = BrowserProfile(
+    name="full",
+    viewport={"width": 1280, "height": 720},
+)
+
+# Lean settings for the refresh/detect loop
+MONITOR_PROFILE = BrowserProfile(
+    name="monitor",
+    viewport={"width": 800, "height": 600},
+    javascript_enabled=False,
+    blocked_url_patterns=MONITOR_BLOCKED_URL_PATTERNS,
+    cache_enabled=True,
+    launch_args=MONITOR_LAUNCH_ARGS,
+)
+
+PROFILES = {
+    FULL_PROFILE.name: FULL_PROFILE,
+    MONITOR_PROFILE.name: MONITOR_PROFILE,
+}
+
+
+def get_profile(name: str, javascript_enabled: bool = False) -> BrowserProfile:
+    """
+    Look up a profile by name.
+
+    Args:
+        name: Profile name ("full" or "monitor")
+        javascript_enabled: Keep JavaScript on in the monitor profile
+
+    Returns:
+        The matching BrowserProfile
+
+    Raises:
+        ValueError: If the profile name is unknown
+    """
+    if name not in PROFILES:
+        raise ValueError(f"Unknown browser profile: {name}. Valid profiles: {', '.join(PROFILES)}")
+
+    profile = PROFILES[name]
+    if name == MONITOR_PROFILE.name and javascript_enabled:
+        profile = replace(profile, javascript_enabled=True)
+    return profile
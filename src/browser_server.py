@@ -0,0 +1,135 @@
+"""Long-lived Chromium reached over CDP, so the Python process can restart without it."""
+import os
+import signal
+import subprocess
+import time
+import urllib.error
+import urllib.request
+from typing import Optional, Sequence
+from src.logger import get_logger
+
+
+class BrowserServer:
+    """
+    A detached Chromium listening on a local remote-debugging port.
+
+    Python Playwright has no ``launch_server``, so Chromium is started as
+    its own process session (it survives the Python process) with a
+    persistent user data directory, and BrowserManager connects to it with
+    ``connect_over_cdp``. The default browser context lives as long as the
+    Chromium process, so the logged-in page is still there after a restart.
+    """
+
+    HOST = "127.0.0.1"
+
+    def __init__(self, port: int, user_data_dir: str = ".browser-server"):
+        """
+        Initialize browser server handle.
+
+        Args:
+            port: Remote debugging port
+            user_data_dir: Chromium profile directory (also holds the pid file)
+        """
+        self.port = port
+        self.user_data_dir = user_data_dir
+        self.logger = get_logger()
+
+    @property
+    def endpoint(self) -> str:
+        """CDP endpoint URL for connect_over_cdp."""
+        return f"http://{self.HOST}:{self.port}"
+
+    @property
+    def pid_file(self) -> str:
+        """File holding the pid of the browser this handle launched."""
+        return os.path.join(self.user_data_dir, "server.pid")
+
+    def is_running(self, timeout: float = 1.0) -> bool:
+        """True if a browser answers on the debugging port."""
+        try:
+            with urllib.request.urlopen(f"{self.endpoint}/json/version", timeout=timeout) as response:
+                return response.status == 200
+        except (urllib.error.URLError, OSError):
+            return False
+
+    def read_pid(self) -> Optional[int]:
+        """Pid of the launched browser, if it is still alive."""
+        try:
+            with open(self.pid_file) as f:
+                pid = int(f.read().strip())
+            os.kill(pid, 0)
+            return pid
+        except (OSError, ValueError):
+            return None
+
+    def launch(self, executable: str, headless: bool = True, args: Sequence[str] = (), timeout: float = 15.0) -> int:
+        """
+        Start Chromium detached from this process and wait until it listens.
+
+        Args:
+            executable: Chromium binary (e.g. ``playwright.chromium.executable_path``)
+            headless: Run without a window
+            args: Extra command-line flags (the monitor profile's launch args)
+            timeout: Seconds to wait for the debugging port
+
+        Returns:
+            Pid of the browser process
+
+        Raises:
+            RuntimeError: If the browser does not come up in time
+        """
+        os.makedirs(self.user_data_dir, exist_ok=True)
+        command = [
+            executable,
+            f"--remote-debugging-port={self.port}",
+            f"--remote-debugging-address={self.HOST}",
+            f"--user-data-dir={os.path.abspath(self.user_data_dir)}",
+            "--no-first-run",
+            "--no-default-browser-check",
+            *args,
+        ]
+        if headless:
+            command.append("--headless=new")
+
+        process = subprocess.Popen(
+            command,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,  # Not killed with our process group
+        )
+        with open(self.pid_file, "w") as f:
+            f.write(str(process.pid))
+
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise RuntimeError(f"Browser server exited with code {process.returncode}")
+            if self.is_running():
+                self.logger.info(f"Browser server started (pid {process.pid}) on {self.endpoint}")
+                return process.pid
+            time.sleep(0.1)
+
+        process.terminate()
+        raise RuntimeError(f"Browser server did not listen on {self.endpoint} within {timeout:.0f}s")
+
+    def stop(self) -> bool:
+        """
+        Terminate the launched browser.
+
+        Returns:
+            True if a running browser was signalled
+        """
+        pid = self.read_pid()
+        try:
+            os.remove(self.pid_file)
+        except OSError:
+            pass
+        if pid is None:
+            return False
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except OSError:
+            return False
+        self.logger.info(f"Browser server (pid {pid}) stopped")
+        return True
@@ -1,9 +1,51 @@
 """Configuration management for the booking system."""
 import os
+import re
+import socket
 import sys
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from datetime import date
 from typing import List
 from dotenv import load_dotenv
+from src.domain import CATEGORY_LABELS
+from src.maintenance_schedule import MaintenanceSchedule
+from src.release_scheduler import ReleaseSchedule
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    """Read a boolean environment variable (true/1/yes)."""
+    return os.getenv(name, "true" if default else "false").lower() in ("true", "1", "yes")
+
+
+def _env_list(name: str) -> List[str]:
+    """Read a comma-separated environment variable into a list of non-empty items."""
+    return [item.strip() for item in os.getenv(name, "").split(",") if item.strip()]
+
+
+def _env_int(name: str, default: int) -> int:
+    """Read an integer environment variable, falling back to default if invalid."""
+    try:
+        return int(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    """Read a float environment variable, falling back to default if invalid."""
+    try:
+        return float(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+def _env_float_list(name: str, default: List[float]) -> List[float]:
+    """Read a comma-separated list of numbers, falling back to default if unset or invalid."""
+    if os.getenv(name) is None:
+        return list(default)
+    try:
+        return [float(item) for item in _env_list(name)]
+    except ValueError:
+        return list(default)
 
 
 @dataclass
@@ -18,12 +60,100 @@ class Config:
     headless: bool
     test_mode: bool
     log_level: str = "INFO"
+    # Memory watchdog (checks are counted in monitoring cycles)
+    memory_check_interval: int = 60
+    renderer_memory_limit_mb: int = 768
+    js_heap_limit_mb: int = 256
+    browser_memory_limit_mb: int = 1024
+    page_recycle_interval: int = 0
+    # Browser engine profile used while polling ("full" or "monitor")
+    browser_profile: str = "full"
+    monitor_javascript: bool = False
+    # Circuit breaker for the monitoring loop
+    circuit_failure_threshold: int = 5
+    circuit_recovery_timeout: int = 30
+    # Scheduled maintenance windows (JST), e.g. "daily 00:00-06:00, sun 06:00-09:00"
+    maintenance_windows: str = ""
+    maintenance_browser_mode: str = "park"
+    maintenance_prewarm_seconds: int = 60
+    # Burst polling around known release times (JST), e.g. "00:00,09:00"
+    release_times: str = ""
+    burst_preload_seconds: int = 3
+    burst_duration_seconds: int = 20
+    burst_interval_ms: int = 300
+    # Fleet mode: "standalone", "worker" or "coordinator"
+    fleet_role: str = "standalone"
+    fleet_host: str = "127.0.0.1"
+    fleet_port: int = 8765
+    fleet_worker_id: str = ""
+    # Month window this process monitors (1 = next month, as reached by navigation)
+    month_offset: int = 1
+    # Booking lock shared by redundant instances: "none", "file", "sqlite" or "tcp"
+    booking_lock: str = "none"
+    booking_lock_location: str = ""
+    booking_lock_ttl: int = 60
+    # Extra notification channels (TELEGRAM_CHAT_ID may also list several chats)
+    notify_webhook_urls: List[str] = field(default_factory=list)
+    notify_smtp_host: str = ""
+    notify_smtp_port: int = 25
+    notify_email_from: str = ""
+    notify_email_to: List[str] = field(default_factory=list)
+    notify_desktop: bool = False
+    notify_availability: bool = False
+    notify_digest_seconds: int = 10
+    notify_dedupe_seconds: int = 300
+    notify_rate_per_minute: int = 20
+    # Watch-only mode: alert on every category over HTTP, never book
+    watch_only: bool = False
+    watch_months: int = 3
+    # Evidence buffer: last N page snapshots kept in memory, written on error/booking
+    evidence_buffer_size: int = 20
+    evidence_screenshots: bool = False
+    evidence_max_flushes: int = 50  # Flushed evidence directories kept on disk (0 = all)
+    # Traffic archive: record live traffic to a HAR file, or serve a recorded one offline
+    traffic_record: str = ""
+    traffic_replay: str = ""
+    traffic_replay_speed: float = 1.0
+    # Read slots from the facility page's HTTP response instead of the rendered page
+    response_sniffing: bool = False
+    # Refresh only the slot table with fetch() inside the page instead of reloading it
+    in_page_polling: bool = False
+    # Detached browser server: Chromium outlives the Python process (0 = launch our own)
+    browser_server_port: int = 0
+    browser_server_data_dir: str = ".browser-server"
+    # Write-ahead journal of booking steps, replayed on startup (empty = off)
+    booking_journal: str = os.path.join("logs", "booking_journal.jsonl")
+    # Locked reservation hold: site hold time, session keep-alive, reminders, re-locks
+    reservation_hold_minutes: float = 30.0
+    hold_keepalive_seconds: int = 240
+    hold_warning_minutes: List[float] = field(default_factory=lambda: [10.0, 5.0, 2.0, 1.0])
+    hold_relock_limit: int = 3
+    # Applicant profile typed into the reservation form after the lock (empty = manual)
+    applicant_name: str = ""
+    applicant_kana: str = ""
+    applicant_birthdate: str = ""
+    applicant_license_number: str = ""
+    applicant_phone: str = ""
+    auto_submit: bool = False  # Also submit the filled form instead of leaving it to you
+    # Upgrade mode: only book dates strictly earlier than this one (YYYY-MM-DD, empty = off)
+    current_booking_date: str = ""
+
+    @property
+    def telegram_chat_ids(self) -> List[str]:
+        """Telegram chats to notify (TELEGRAM_CHAT_ID may be comma-separated)."""
+        return [chat.strip() for chat in self.telegram_chat_id.split(",") if chat.strip()]
 
     @classmethod
-    def load(cls) -> "Config":
-        """Load configuration from environment variables and .env file."""
+    def load(cls, override: bool = False) -> "Config":
+        """
+        Load configuration from environment variables and .env file.
+
+        Args:
+            override: Let .env values replace variables already in the environment
+                (used when reloading a changed .env)
+        """
         # Load .env file if it exists
-        load_dotenv()
+        load_dotenv(override=override)
 
         # Read configuration values
         telegram_bot_token = os.getenv("TELEGRAM_BOT_TOKEN", "")
@@ -47,6 +177,98 @@ class Config:
         
         log_level = os.getenv("LOG_LEVEL", "INFO").upper()
 
+        # Memory watchdog settings
+        memory_check_interval = _env_int("MEMORY_CHECK_INTERVAL", 60)
+        renderer_memory_limit_mb = _env_int("RENDERER_MEMORY_LIMIT_MB", 768)
+        js_heap_limit_mb = _env_int("JS_HEAP_LIMIT_MB", 256)
+        browser_memory_limit_mb = _env_int("BROWSER_MEMORY_LIMIT_MB", 1024)
+        page_recycle_interval = _env_int("PAGE_RECYCLE_INTERVAL", 0)
+
+        # Browser engine profile
+        browser_profile = os.getenv("BROWSER_PROFILE", "full").lower()
+        monitor_javascript = _env_bool("MONITOR_JAVASCRIPT", False)
+
+        # Circuit breaker settings
+        circuit_failure_threshold = _env_int("CIRCUIT_FAILURE_THRESHOLD", 5)
+        circuit_recovery_timeout = _env_int("CIRCUIT_RECOVERY_TIMEOUT", 30)
+
+        # Maintenance window settings
+        maintenance_windows = os.getenv("MAINTENANCE_WINDOWS", "")
+        maintenance_browser_mode = os.getenv("MAINTENANCE_BROWSER_MODE", "park").lower()
+        maintenance_prewarm_seconds = _env_int("MAINTENANCE_PREWARM_SECONDS", 60)
+
+        # Release burst settings
+        release_times = os.getenv("RELEASE_TIMES", "")
+        burst_preload_seconds = _env_int("BURST_PRELOAD_SECONDS", 3)
+        burst_duration_seconds = _env_int("BURST_DURATION_SECONDS", 20)
+        burst_interval_ms = _env_int("BURST_INTERVAL_MS", 300)
+
+        # Fleet settings
+        fleet_role = os.getenv("FLEET_ROLE", "standalone").lower()
+        fleet_host = os.getenv("FLEET_HOST", "127.0.0.1")
+        fleet_port = _env_int("FLEET_PORT", 8765)
+        fleet_worker_id = os.getenv("FLEET_WORKER_ID", "") or f"{socket.gethostname()}-{os.getpid()}"
+        month_offset = _env_int("MONTH_OFFSET", 1)
+
+        # Booking lock settings
+        booking_lock = os.getenv("BOOKING_LOCK", "none").lower()
+        booking_lock_location = os.getenv("BOOKING_LOCK_LOCATION", "")
+        booking_lock_ttl = _env_int("BOOKING_LOCK_TTL", 60)
+
+        # Notification channel settings
+        notify_webhook_urls = _env_list("NOTIFY_WEBHOOK_URLS")
+        notify_smtp_host = os.getenv("NOTIFY_SMTP_HOST", "")
+        notify_smtp_port = _env_int("NOTIFY_SMTP_PORT", 25)
+        notify_email_from = os.getenv("NOTIFY_EMAIL_FROM", "jp-booking@localhost")
+        notify_email_to = _env_list("NOTIFY_EMAIL_TO")
+        notify_desktop = _env_bool("NOTIFY_DESKTOP", False)
+        notify_availability = _env_bool("NOTIFY_AVAILABILITY", False)
+        notify_digest_seconds = _env_int("NOTIFY_DIGEST_SECONDS", 10)
+        notify_dedupe_seconds = _env_int("NOTIFY_DEDUPE_SECONDS", 300)
+        notify_rate_per_minute = _env_int("NOTIFY_RATE_PER_MINUTE", 20)
+
+        # Watch-only settings
+        watch_only = _env_bool("WATCH_ONLY", False)
+        watch_months = _env_int("WATCH_MONTHS", 3)
+
+        # Evidence buffer settings
+        evidence_buffer_size = _env_int("EVIDENCE_BUFFER_SIZE", 20)
+        evidence_screenshots = _env_bool("EVIDENCE_SCREENSHOTS", False)
+        evidence_max_flushes = _env_int("EVIDENCE_MAX_FLUSHES", 50)
+
+        # Traffic archive settings
+        traffic_record = os.getenv("TRAFFIC_RECORD", "")
+        traffic_replay = os.getenv("TRAFFIC_REPLAY", "")
+        traffic_replay_speed = _env_float("TRAFFIC_REPLAY_SPEED", 1.0)
+
+        # How each check gets a fresh slot table
+        response_sniffing = _env_bool("RESPONSE_SNIFFING", False)
+        in_page_polling = _env_bool("IN_PAGE_POLLING", False)
+
+        # Browser server settings
+        browser_server_port = _env_int("BROWSER_SERVER_PORT", 0)
+        browser_server_data_dir = os.getenv("BROWSER_SERVER_DATA_DIR", ".browser-server")
+
+        # Booking journal
+        booking_journal = os.getenv("BOOKING_JOURNAL", os.path.join("logs", "booking_journal.jsonl"))
+
+        # Reservation hold settings
+        reservation_hold_minutes = _env_float("RESERVATION_HOLD_MINUTES", 30.0)
+        hold_keepalive_seconds = _env_int("HOLD_KEEPALIVE_SECONDS", 240)
+        hold_warning_minutes = _env_float_list("HOLD_WARNING_MINUTES", [10.0, 5.0, 2.0, 1.0])
+        hold_relock_limit = _env_int("HOLD_RELOCK_LIMIT", 3)
+
+        # Applicant profile for the reservation form
+        applicant_name = os.getenv("APPLICANT_NAME", "")
+        applicant_kana = os.getenv("APPLICANT_KANA", "")
+        applicant_birthdate = os.getenv("APPLICANT_BIRTHDATE", "")
+        applicant_license_number = os.getenv("APPLICANT_LICENSE_NUMBER", "")
+        applicant_phone = os.getenv("APPLICANT_PHONE", "")
+        auto_submit = _env_bool("AUTO_SUBMIT", False)
+
+        # Earlier-date upgrade mode
+        current_booking_date = os.getenv("CURRENT_BOOKING_DATE", "")
+
         config = cls(
             telegram_bot_token=telegram_bot_token,
             telegram_chat_id=telegram_chat_id,
@@ -57,12 +279,83 @@ class Config:
             headless=headless,
             test_mode=test_mode,
             log_level=log_level,
+            memory_check_interval=memory_check_interval,
+            renderer_memory_limit_mb=renderer_memory_limit_mb,
+            js_heap_limit_mb=js_heap_limit_mb,
+            browser_memory_limit_mb=browser_memory_limit_mb,
+            page_recycle_interval=page_recycle_interval,
+            browser_profile=browser_profile,
+            monitor_javascript=monitor_javascript,
+            circuit_failure_threshold=circuit_failure_threshold,
+            circuit_recovery_timeout=circuit_recovery_timeout,
+            maintenance_windows=maintenance_windows,
+            maintenance_browser_mode=maintenance_browser_mode,
+            maintenance_prewarm_seconds=maintenance_prewarm_seconds,
+            release_times=release_times,
+            burst_preload_seconds=burst_preload_seconds,
+            burst_duration_seconds=burst_duration_seconds,
+            burst_interval_ms=burst_interval_ms,
+            fleet_role=fleet_role,
+            fleet_host=fleet_host,
+            fleet_port=fleet_port,
+            fleet_worker_id=fleet_worker_id,
+            month_offset=month_offset,
+            booking_lock=booking_lock,
+            booking_lock_location=booking_lock_location,
+            booking_lock_ttl=booking_lock_ttl,
+            notify_webhook_urls=notify_webhook_urls,
+            notify_smtp_host=notify_smtp_host,
+            notify_smtp_port=notify_smtp_port,
+            notify_email_from=notify_email_from,
+            notify_email_to=notify_email_to,
+            notify_desktop=notify_desktop,
+            notify_availability=notify_availability,
+            notify_digest_seconds=notify_digest_seconds,
+            notify_dedupe_seconds=notify_dedupe_seconds,
+            notify_rate_per_minute=notify_rate_per_minute,
+            watch_only=watch_only,
+            watch_months=watch_months,
+            evidence_buffer_size=evidence_buffer_size,
+            evidence_screenshots=evidence_screenshots,
+            evidence_max_flushes=evidence_max_flushes,
+            traffic_record=traffic_record,
+            traffic_replay=traffic_replay,
+            traffic_replay_speed=traffic_replay_speed,
+            response_sniffing=response_sniffing,
+            in_page_polling=in_page_polling,
+            browser_server_port=browser_server_port,
+            browser_server_data_dir=browser_server_data_dir,
+            booking_journal=booking_journal,
+            reservation_hold_minutes=reservation_hold_minutes,
+            hold_keepalive_seconds=hold_keepalive_seconds,
+            hold_warning_minutes=hold_warning_minutes,
+            hold_relock_limit=hold_relock_limit,
+            applicant_name=applicant_name,
+            applicant_kana=applicant_kana,
+            applicant_birthdate=applicant_birthdate,
+            applicant_license_number=applicant_license_number,
+            applicant_phone=applicant_phone,
+            auto_submit=auto_submit,
+            current_booking_date=current_booking_date,
         )
         
         return config
 
     def validate(self) -> None:
-        """Validate configuration and raise errors for invalid values."""
+        """Validate configuration and exit with a message if it is invalid."""
+        errors = self.collect_errors()
+        if errors:
+            error_message = "Configuration errors:\n" + "\n".join(f"  - {error}" for error in errors)
+            print(error_message, file=sys.stderr)
+            sys.exit(1)
+
+    def collect_errors(self) -> List[str]:
+        """
+        Check all settings without exiting.
+
+        Returns:
+            One message per invalid setting (empty if the configuration is valid)
+        """
         errors = []
 
         # Check required credentials
@@ -78,24 +371,10 @@ class Config:
         if not self.user_password:
             errors.append("USER_PASSWORD is required")
 
-        # Check target categories
-        # Based on actual HTML structure, valid categories are:
-        valid_categories = [
-            "普通車ＡＭ",
-            "普通車ＰＭ",
-            "準中型車ＡＭ",
-            "準中型車ＰＭ",
-            "大型車ＡＭ",
-            "大型車ＰＭ",
-            "大型特殊車ＡＭ",
-            "大型特殊車ＰＭ",
-            "けん引車ＡＭ",
-            "けん引車ＰＭ",
-            "大型二輪車ＡＭ",
-            "大型二輪車ＰＭ",
-        ]
-        
-        if not self.target_categories:
+        # Check target categories (the row labels of the slot table)
+        valid_categories = CATEGORY_LABELS
+        
+        if not self.target_categories and not self.watch_only:
             errors.append("TARGET_CATEGORIES is required (at least one category)")
         else:
             for category in self.target_categories:
@@ -109,12 +388,169 @@ class Config:
         if self.refresh_interval < 1:
             errors.append("REFRESH_INTERVAL must be at least 1 second")
 
+        # Check memory watchdog settings
+        if self.memory_check_interval < 0:
+            errors.append("MEMORY_CHECK_INTERVAL must be 0 (disabled) or a positive number of cycles")
+        
+        if self.page_recycle_interval < 0:
+            errors.append("PAGE_RECYCLE_INTERVAL must be 0 (disabled) or a positive number of cycles")
+        
+        for name, value in (
+            ("RENDERER_MEMORY_LIMIT_MB", self.renderer_memory_limit_mb),
+            ("JS_HEAP_LIMIT_MB", self.js_heap_limit_mb),
+            ("BROWSER_MEMORY_LIMIT_MB", self.browser_memory_limit_mb),
+        ):
+            if value < 0:
+                errors.append(f"{name} must be 0 (disabled) or a positive number of MB")
+
+        # Check browser profile
+        valid_profiles = ["full", "monitor"]
+        if self.browser_profile not in valid_profiles:
+            errors.append(
+                f"Invalid BROWSER_PROFILE: {self.browser_profile}. "
+                f"Valid profiles: {', '.join(valid_profiles)}"
+            )
+
+        # Check circuit breaker settings
+        if self.circuit_failure_threshold < 1:
+            errors.append("CIRCUIT_FAILURE_THRESHOLD must be at least 1")
+        
+        if self.circuit_recovery_timeout < 1:
+            errors.append("CIRCUIT_RECOVERY_TIMEOUT must be at least 1 second")
+
+        # Check maintenance settings
+        try:
+            MaintenanceSchedule.parse(self.maintenance_windows)
+        except ValueError as e:
+            errors.append(f"Invalid MAINTENANCE_WINDOWS: {e}")
+        
+        if self.maintenance_browser_mode not in ("park", "release"):
+            errors.append(
+                f"Invalid MAINTENANCE_BROWSER_MODE: {self.maintenance_browser_mode}. "
+                "Valid modes: park, release"
+            )
+        
+        if self.maintenance_prewarm_seconds < 0:
+            errors.append("MAINTENANCE_PREWARM_SECONDS must be 0 or more")
+
+        # Check release burst settings
+        try:
+            ReleaseSchedule.parse(self.release_times)
+        except ValueError as e:
+            errors.append(f"Invalid RELEASE_TIMES: {e}")
+        
+        if self.burst_preload_seconds < 0:
+            errors.append("BURST_PRELOAD_SECONDS must be 0 or more")
+        
+        if self.burst_duration_seconds < 1:
+            errors.append("BURST_DURATION_SECONDS must be at least 1 second")
+        
+        if self.burst_interval_ms < 0:
+            errors.append("BURST_INTERVAL_MS must be 0 or more")
+
+        # Check fleet settings
+        if self.fleet_role not in ("standalone", "worker", "coordinator"):
+            errors.append(
+                f"Invalid FLEET_ROLE: {self.fleet_role}. "
+                "Valid roles: standalone, worker, coordinator"
+            )
+        
+        if not 1 <= self.fleet_port <= 65535:
+            errors.append("FLEET_PORT must be between 1 and 65535")
+        
+        if self.month_offset < 1:
+            errors.append("MONTH_OFFSET must be at least 1")
+
+        # Check booking lock settings
+        if self.booking_lock not in ("none", "file", "sqlite", "tcp"):
+            errors.append(
+                f"Invalid BOOKING_LOCK: {self.booking_lock}. "
+                "Valid backends: none, file, sqlite, tcp"
+            )
+        
+        if self.booking_lock == "tcp" and self.booking_lock_location:
+            port = self.booking_lock_location.rpartition(":")[2]
+            if not port.isdigit():
+                errors.append("BOOKING_LOCK_LOCATION must be host:port for the tcp backend")
+        
+        if self.booking_lock_ttl < 1:
+            errors.append("BOOKING_LOCK_TTL must be at least 1 second")
+
+        # Check notification settings
+        for url in self.notify_webhook_urls:
+            if not url.startswith(("http://", "https://")):
+                errors.append(f"Invalid NOTIFY_WEBHOOK_URLS entry: {url} (must be http(s)://...)")
+        
+        if self.notify_email_to and not self.notify_smtp_host:
+            errors.append("NOTIFY_SMTP_HOST is required when NOTIFY_EMAIL_TO is set")
+        
+        if self.notify_digest_seconds < 0:
+            errors.append("NOTIFY_DIGEST_SECONDS must be 0 or more")
+        
+        if self.notify_dedupe_seconds < 0:
+            errors.append("NOTIFY_DEDUPE_SECONDS must be 0 or more")
+        
+        if self.notify_rate_per_minute < 1:
+            errors.append("NOTIFY_RATE_PER_MINUTE must be at least 1")
+
+        # Check watch-only settings
+        if self.watch_months < 1:
+            errors.append("WATCH_MONTHS must be at least 1")
+
+        # Check evidence settings
+        if self.evidence_buffer_size < 0:
+            errors.append("EVIDENCE_BUFFER_SIZE must be 0 or more")
+        if self.evidence_max_flushes < 0:
+            errors.append("EVIDENCE_MAX_FLUSHES must be 0 or more")
+
+        # Check traffic archive settings
+        if self.traffic_record and self.traffic_replay:
+            errors.append("TRAFFIC_RECORD and TRAFFIC_REPLAY cannot be used together")
+        
+        if self.traffic_replay and not os.path.exists(self.traffic_replay):
+            errors.append(f"TRAFFIC_REPLAY file not found: {self.traffic_replay}")
+        
+        if self.traffic_replay_speed < 0:
+            errors.append("TRAFFIC_REPLAY_SPEED must be 0 or more")
+
+        # Check polling mode
+        if self.response_sniffing and self.in_page_polling:
+            errors.append("RESPONSE_SNIFFING and IN_PAGE_POLLING cannot be used together")
+
+        # Check browser server settings
+        if not 0 <= self.browser_server_port <= 65535:
+            errors.append("BROWSER_SERVER_PORT must be between 0 and 65535")
+
+        # Check reservation hold settings
+        if self.reservation_hold_minutes <= 0:
+            errors.append("RESERVATION_HOLD_MINUTES must be greater than 0")
+        
+        if self.hold_keepalive_seconds < 0:
+            errors.append("HOLD_KEEPALIVE_SECONDS must be 0 or more")
+        
+        if any(m <= 0 for m in self.hold_warning_minutes):
+            errors.append("HOLD_WARNING_MINUTES must be positive numbers")
+        
+        if self.hold_relock_limit < 0:
+            errors.append("HOLD_RELOCK_LIMIT must be 0 or more")
+
+        # Check applicant profile
+        if self.applicant_birthdate and not re.fullmatch(r"\d{4}[-/]\d{1,2}[-/]\d{1,2}", self.applicant_birthdate):
+            errors.append(f"Invalid APPLICANT_BIRTHDATE: {self.applicant_birthdate} (expected YYYY-MM-DD)")
+        
+        if self.auto_submit and not self.applicant_name:
+            errors.append("AUTO_SUBMIT requires at least APPLICANT_NAME")
+
+        # Check upgrade mode
+        if self.current_booking_date:
+            try:
+                date.fromisoformat(self.current_booking_date)
+            except ValueError:
+                errors.append(f"Invalid CURRENT_BOOKING_DATE: {self.current_booking_date} (expected YYYY-MM-DD)")
+
         # Check log level
         valid_log_levels = ["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"]
         if self.log_level not in valid_log_levels:
             errors.append(f"Invalid LOG_LEVEL: {self.log_level}. Valid levels: {', '.join(valid_log_levels)}")
 
-        if errors:
-            error_message = "Configuration errors:\n" + "\n".join(f"  - {error}" for error in errors)
-            print(error_message, file=sys.stderr)
-            sys.exit(1)
+        return errors
@@ -0,0 +1,161 @@
+"""Reload the configuration while running, on .env changes or SIGHUP."""
+import asyncio
+import os
+import signal
+from dataclasses import fields, replace
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+from src.config import Config
+from src.logger import get_logger
+
+
+# Settings that take effect without restarting the browser session
+RELOADABLE_FIELDS = frozenset({
+    "target_categories",
+    "refresh_interval",
+    "log_level",
+    "maintenance_windows",
+    "maintenance_prewarm_seconds",
+    "release_times",
+    "burst_preload_seconds",
+    "burst_duration_seconds",
+    "burst_interval_ms",
+    "notify_availability",
+    "page_recycle_interval",
+    "current_booking_date",
+})
+
+
+def diff_config(current: Config, new: Config) -> Dict[str, Tuple[object, object]]:
+    """
+    Compare two configurations.
+
+    Returns:
+        Field name -> (current value, new value) for every changed field
+    """
+    changes = {}
+    for f in fields(Config):
+        old_value, new_value = getattr(current, f.name), getattr(new, f.name)
+        if old_value != new_value:
+            changes[f.name] = (old_value, new_value)
+    return changes
+
+
+class ConfigReloader:
+    """
+    Watches the .env file (by polling its mtime) and SIGHUP.
+
+    A reload loads and validates the whole configuration. If it is invalid
+    it is rejected and the running configuration is kept; otherwise the
+    reloadable settings that changed since the last load are taken over
+    (others are logged as needing a restart) and the merged configuration is
+    handed to ``apply``. Comparing with the last load rather than the
+    running configuration keeps command-line overrides in place.
+    """
+
+    def __init__(
+        self,
+        current: Config,
+        apply: Callable[[Config, List[str]], Awaitable[None]],
+        path: str = ".env",
+        poll_interval: float = 2.0,
+        loader: Callable[[], Config] = lambda: Config.load(override=True),
+    ):
+        """
+        Initialize config reloader.
+
+        Args:
+            current: Running configuration
+            apply: Coroutine called with the new configuration and the changed field names
+            path: File to watch
+            poll_interval: Seconds between mtime checks
+            loader: Loads a fresh configuration (reads .env over the environment)
+        """
+        self.current = current
+        self.apply = apply
+        self.path = path
+        self.poll_interval = poll_interval
+        self.loader = loader
+        self._mtime = self._read_mtime()
+        self._loaded: Optional[Config] = None
+        self._task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+        self.logger = get_logger()
+
+    def start(self) -> None:
+        """Start watching the file and listening for SIGHUP."""
+        self._loaded = self.loader()
+        loop = asyncio.get_running_loop()
+        if hasattr(signal, "SIGHUP"):
+            loop.add_signal_handler(signal.SIGHUP, lambda: asyncio.ensure_future(self.reload("SIGHUP")))
+        self._task = asyncio.create_task(self._watch())
+        self.logger.info(f"Watching {self.path} for configuration changes (or send SIGHUP)")
+
+    async def stop(self) -> None:
+        """Stop watching."""
+        if hasattr(signal, "SIGHUP"):
+            try:
+                asyncio.get_running_loop().remove_signal_handler(signal.SIGHUP)
+            except (NotImplementedError, RuntimeError):
+                pass
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def _read_mtime(self) -> Optional[float]:
+        try:
+            return os.stat(self.path).st_mtime
+        except OSError:
+            return None
+
+    async def _watch(self) -> None:
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            mtime = self._read_mtime()
+            if mtime != self._mtime:
+                self._mtime = mtime
+                await self.reload(f"{self.path} changed")
+
+    async def reload(self, reason: str) -> bool:
+        """
+        Load, validate and apply a new configuration.
+
+        Args:
+            reason: What triggered the reload (for logging)
+
+        Returns:
+            True if a new configuration was applied
+        """
+        async with self._lock:
+            self.logger.info(f"Reloading configuration ({reason})")
+            try:
+                new = self.loader()
+                errors = new.collect_errors()
+            except Exception as e:
+                errors = [str(e)]
+            if errors:
+                self.logger.error(
+                    "Configuration reload rejected, keeping the current settings:\n"
+                    + "\n".join(f"  - {error}" for error in errors)
+                )
+                return False
+
+            changes = diff_config(self._loaded or self.current, new)
+            self._loaded = new
+            fixed = sorted(name for name in changes if name not in RELOADABLE_FIELDS)
+            if fixed:
+                self.logger.warning(f"Restart required for: {', '.join(fixed)} (ignored)")
+            applied = {name: getattr(new, name) for name in changes if name in RELOADABLE_FIELDS}
+            if not applied:
+                self.logger.info("No reloadable settings changed")
+                return False
+
+            merged = replace(self.current, **applied)
+            await self.apply(merged, sorted(applied))
+            for name in sorted(applied):
+                self.logger.info(f"  {name}: {getattr(self.current, name)!r} -> {applied[name]!r}")
+            self.current = merged
+            return True
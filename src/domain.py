@@ -0,0 +1,173 @@
+"""Typed categories, slot dates and target masks."""
+import re
+from datetime import date
+from enum import Enum
+from functools import lru_cache
+from typing import Dict, Iterable, Optional, Union
+
+
+class Category(str, Enum):
+    """
+    A 予約枠 row of the slot table.
+
+    Members compare equal to their label, so they can be used wherever the
+    label strings were used (dict keys, JSON, config values).
+    """
+    REGULAR_AM = "普通車ＡＭ"
+    REGULAR_PM = "普通車ＰＭ"
+    SEMI_MEDIUM_AM = "準中型車ＡＭ"
+    SEMI_MEDIUM_PM = "準中型車ＰＭ"
+    MEDIUM_AM = "中型車ＡＭ"
+    MEDIUM_PM = "中型車ＰＭ"
+    LARGE_AM = "大型車ＡＭ"
+    LARGE_PM = "大型車ＰＭ"
+    LARGE_SPECIAL_AM = "大型特殊車ＡＭ"
+    LARGE_SPECIAL_PM = "大型特殊車ＰＭ"
+    TOWING_AM = "けん引車ＡＭ"
+    TOWING_PM = "けん引車ＰＭ"
+    LARGE_MOTORCYCLE_AM = "大型二輪車ＡＭ"
+    LARGE_MOTORCYCLE_PM = "大型二輪車ＰＭ"
+
+    @property
+    def label(self) -> str:
+        """Label as shown on the page and used in row IDs."""
+        return self.value
+
+    @property
+    def bit(self) -> int:
+        """This category's bit in a TargetMask."""
+        return _BITS[self]
+
+    @classmethod
+    def from_label(cls, label: str) -> Optional["Category"]:
+        """Look up a category by its label (None if unknown)."""
+        return _BY_LABEL.get(label)
+
+
+_BY_LABEL: Dict[str, Category] = {category.value: category for category in Category}
+_BITS: Dict[Category, int] = {category: 1 << i for i, category in enumerate(Category)}
+
+CATEGORY_LABELS = [category.value for category in Category]
+
+
+class TargetMask:
+    """
+    Set of target categories as a bitset.
+
+    Membership is one dict lookup and one AND, for a Category or a label.
+    """
+
+    __slots__ = ("bits",)
+
+    def __init__(self, categories: Iterable[Union[Category, str]] = ()):
+        """
+        Initialize target mask.
+
+        Args:
+            categories: Categories or labels (unknown labels are ignored)
+        """
+        bits = 0
+        for category in categories:
+            category = category if isinstance(category, Category) else Category.from_label(category)
+            if category:
+                bits |= category.bit
+        self.bits = bits
+
+    def __contains__(self, category: Union[Category, str]) -> bool:
+        if not isinstance(category, Category):
+            category = _BY_LABEL.get(category)
+            if category is None:
+                return False
+        return bool(self.bits & _BITS[category])
+
+    def __bool__(self) -> bool:
+        return self.bits != 0
+
+    def __iter__(self):
+        return (category for category in Category if self.bits & _BITS[category])
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, TargetMask) and other.bits == self.bits
+
+    def __repr__(self) -> str:
+        return f"TargetMask({[category.value for category in self]})"
+
+
+# "01/20 (Tue)" or "01/20"; the month window decides the year
+_HEADER_DATE = re.compile(r"(\d{1,2})/(\d{1,2})")
+# onclick="selectDate("FC00023", "20260120", "1", this)"
+_ONCLICK_DATE = re.compile(r"selectDate\([^,]*,\s*(?:&quot;|[\"'])?(\d{8})")
+
+
+@lru_cache(maxsize=512)
+def parse_slot_date(text: str, reference: date) -> Optional[date]:
+    """
+    Parse a date header into a date, inferring the year.
+
+    Headers carry no year; the year is chosen so the date lies within six
+    months of ``reference`` (e.g. the first day of the month window), which
+    handles windows spanning New Year.
+
+    Args:
+        text: Header text, e.g. "01/20 (Tue)"
+        reference: A date inside (or near) the month window
+
+    Returns:
+        The date, or None if the text is not a date header
+    """
+    match = _HEADER_DATE.search(text)
+    if not match:
+        return None
+    month, day = int(match.group(1)), int(match.group(2))
+
+    candidates = []
+    for year in (reference.year - 1, reference.year, reference.year + 1):
+        try:
+            candidates.append(date(year, month, day))
+        except ValueError:
+            continue  # Feb 29 outside a leap year
+    if not candidates:
+        return None
+    return min(candidates, key=lambda d: abs(d - reference))
+
+
+def parse_onclick_date(onclick: str) -> Optional[date]:
+    """
+    Read the full date from a slot link's ``selectDate(...)`` handler.
+
+    Args:
+        onclick: The link's onclick attribute
+
+    Returns:
+        The date, or None if the handler has no date
+    """
+    match = _ONCLICK_DATE.search(onclick or "")
+    if not match:
+        return None
+    value = match.group(1)
+    try:
+        return date(int(value[:4]), int(value[4:6]), int(value[6:]))
+    except ValueError:
+        return None
+
+
+def window_reference(today: date, month_offset: int) -> date:
+    """
+    First day of the month window ``month_offset`` months after today's month.
+
+    Args:
+        today: Current date (JST)
+        month_offset: Month window (1 = next month)
+
+    Returns:
+        Reference date for parse_slot_date
+    """
+    months = today.year * 12 + (today.month - 1) + month_offset
+    return date(months // 12, months % 12 + 1, 1)
+
+
+def in_range(day: Optional[date], start: Optional[date] = None, end: Optional[date] = None) -> bool:
+    """True if a date lies within [start, end] (open ends allowed)."""
+    if day is None:
+        return False
+    return (start is None or day >= start) and (end is None or day <= end)
@@ -1,6 +1,7 @@
 """Error handling and retry logic."""
 import asyncio
-from typing import Callable, TypeVar, Any
+import random
+from typing import Callable, Optional, Tuple, Type, TypeVar, Any
 from src.logger import get_logger
 
 T = TypeVar('T')
@@ -10,13 +11,123 @@ MAX_RETRIES = 3
 INITIAL_DELAY = 5  # seconds
 BACKOFF_FACTOR = 2
 
+# Page text that identifies the portal's maintenance / outage pages
+MAINTENANCE_MARKERS = (
+    "メンテナンス",
+    "システム停止",
+    "サービスを停止",
+    "保守作業",
+    "ただいまアクセスが集中",
+    "Service Unavailable",
+)
+
+# Page text that identifies an expired or invalidated session
+SESSION_EXPIRED_MARKERS = (
+    "セッションがタイムアウト",
+    "タイムアウトしました",
+    "再度ログイン",
+    "ログインしてください",
+)
+
+
+class BookingSystemError(Exception):
+    """Base class for classified errors raised by the booking system."""
+
+
+class TransientError(BookingSystemError):
+    """Short-lived failure (timeout, dropped connection, 5xx) worth retrying quickly."""
+
+
+class RateLimitedError(BookingSystemError):
+    """The site is throttling us (HTTP 429 or equivalent)."""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class SiteMaintenanceError(BookingSystemError):
+    """The portal is in maintenance or otherwise unavailable for a longer period."""
+
+
+class SessionExpiredError(BookingSystemError):
+    """The login session is gone and we have been sent back to the login page."""
+
+
+class PageStructureError(BookingSystemError):
+    """The page loaded but the expected elements are missing."""
+
+
+def classify_error(error: Exception) -> BookingSystemError:
+    """
+    Map an arbitrary exception onto the error taxonomy.
+    
+    Args:
+        error: Exception raised in the monitoring loop
+    
+    Returns:
+        A BookingSystemError instance (the error itself if already classified)
+    """
+    if isinstance(error, BookingSystemError):
+        return error
+    
+    # Imported here so this module stays importable without the browser stack
+    from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+    
+    if isinstance(error, (PlaywrightTimeoutError, asyncio.TimeoutError, ConnectionError)):
+        classified: BookingSystemError = TransientError(str(error))
+    elif "net::ERR_" in str(error) or "Target closed" in str(error):
+        classified = TransientError(str(error))
+    elif "Browser not started" in str(error):
+        classified = PageStructureError(str(error))
+    else:
+        classified = BookingSystemError(str(error))
+    
+    classified.__cause__ = error
+    return classified
+
+
+def diagnose_page(status: Optional[int], url: str, text: str = "",
+                  retry_after: Optional[str] = None) -> Optional[BookingSystemError]:
+    """
+    Decide whether a loaded page represents an error condition.
+    
+    Args:
+        status: HTTP status of the main document (None if unknown)
+        url: Final URL of the page
+        text: Visible page text (only needed when the slot table is missing)
+        retry_after: Value of the Retry-After header, if any
+    
+    Returns:
+        The classified error, or None if the page looks healthy
+    """
+    if status == 429:
+        try:
+            delay = float(retry_after) if retry_after else None
+        except ValueError:
+            delay = None
+        return RateLimitedError(f"Rate limited by site (HTTP 429) at {url}", retry_after=delay)
+    
+    if any(marker in text for marker in MAINTENANCE_MARKERS) or status == 503:
+        return SiteMaintenanceError(f"Site maintenance page (HTTP {status}) at {url}")
+    
+    if "userLogin" in url or any(marker in text for marker in SESSION_EXPIRED_MARKERS):
+        return SessionExpiredError(f"Session expired, redirected to {url}")
+    
+    if status is not None and status >= 500:
+        return TransientError(f"Server error (HTTP {status}) at {url}")
+    
+    return None
+
 
 async def retry_with_backoff(
     operation: Callable[[], Any],
     max_retries: int = MAX_RETRIES,
     initial_delay: float = INITIAL_DELAY,
     backoff_factor: float = BACKOFF_FACTOR,
-    operation_name: str = "operation"
+    operation_name: str = "operation",
+    retry_on: Tuple[Type[BaseException], ...] = (Exception,),
+    jitter: bool = True,
 ) -> Any:
     """
     Retry an async operation with exponential backoff.
@@ -27,6 +138,8 @@ async def retry_with_backoff(
         initial_delay: Initial delay in seconds
         backoff_factor: Multiplier for delay on each retry
         operation_name: Name of operation for logging
+        retry_on: Exception types that are retried (others are raised at once)
+        jitter: Randomise each delay between 50% and 100% of its nominal value
     
     Returns:
         Result of the operation
@@ -39,43 +152,21 @@ async def retry_with_backoff(
     for attempt in range(max_retries):
         try:
             return await operation()
-        except Exception as e:
+        except retry_on as e:
             if attempt == max_retries - 1:
                 logger.error(f"{operation_name} failed after {max_retries} attempts: {e}")
                 raise
             
             delay = initial_delay * (backoff_factor ** attempt)
+            if jitter:
+                delay = random.uniform(delay / 2, delay)
             logger.warning(
                 f"{operation_name} failed (attempt {attempt + 1}/{max_retries}): {e}. "
-                f"Retrying in {delay} seconds..."
+                f"Retrying in {delay:.1f} seconds..."
             )
             await asyncio.sleep(delay)
 
 
-async def handle_network_error(error: Exception, retry_delay: float = 5.0) -> None:
-    """
-    Handle network errors with logging and delay.
-    
-    Args:
-        error: The network error that occurred
-        retry_delay: Delay before retry in seconds
-    """
-    logger = get_logger()
-    logger.warning(f"Network error: {error}. Retrying in {retry_delay} seconds...")
-    await asyncio.sleep(retry_delay)
-
-
-async def handle_page_parsing_error(error: Exception) -> None:
-    """
-    Handle page parsing errors with logging.
-    
-    Args:
-        error: The parsing error that occurred
-    """
-    logger = get_logger()
-    logger.warning(f"Page parsing error: {error}. Continuing to next refresh cycle...")
-
-
 async def handle_booking_error(error: Exception, category: str, date: str) -> None:
     """
     Handle booking flow errors with detailed logging.
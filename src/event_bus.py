@@ -0,0 +1,261 @@
+"""In-process async event bus with bounded per-subscriber queues."""
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple, Type
+from src.booking_handler import BookingResult
+from src.slot_detector import GridSnapshot
+from src.logger import get_logger
+
+
+@dataclass
+class GridSnapshotEvent:
+    """A fresh scan of the slot table."""
+    snapshot: GridSnapshot
+    month_offset: int = 1
+    rendered: bool = True  # False if parsed from the raw response while the page may still be rendering
+
+
+@dataclass
+class SlotDiffEvent:
+    """Cells that changed between two consecutive scans of the same month window."""
+    appeared: List[Tuple[str, str]]  # (category, date) that became available
+    disappeared: List[Tuple[str, str]]  # (category, date) that are no longer available
+    snapshot: GridSnapshot
+    month_offset: int = 1
+
+
+@dataclass
+class BookingResultEvent:
+    """Outcome of a booking attempt."""
+    result: BookingResult
+
+
+def diff_snapshots(previous: Optional[GridSnapshot], current: GridSnapshot) -> Tuple[list, list]:
+    """
+    Compare two snapshots.
+
+    Args:
+        previous: Earlier snapshot (None for the first scan)
+        current: Latest snapshot
+
+    Returns:
+        (appeared, disappeared) lists of (category, date)
+    """
+    before = set(previous.slots()) if previous else set()
+    after = set(current.slots())
+    return sorted(after - before), sorted(before - after)
+
+
+# Queue overflow policies
+BLOCK = "block"  # publisher waits: backpressure for consumers that must see every event
+DROP_OLDEST = "drop_oldest"  # keep only the newest events: for consumers that want the latest state
+
+
+@dataclass
+class SubscriptionStats:
+    """Per-subscriber counters, used to spot a slow stage."""
+    delivered: int = 0
+    dropped: int = 0
+    errors: int = 0
+    handler_seconds: float = 0.0
+    max_handler_seconds: float = 0.0
+    max_queue_depth: int = 0
+
+    def describe(self) -> str:
+        """Human-readable one-line summary."""
+        average = self.handler_seconds / self.delivered if self.delivered else 0.0
+        return (
+            f"{self.delivered} events, avg {average * 1000:.0f}ms, "
+            f"max {self.max_handler_seconds * 1000:.0f}ms, "
+            f"queue peak {self.max_queue_depth}, dropped {self.dropped}, errors {self.errors}"
+        )
+
+
+@dataclass
+class Subscription:
+    """One consumer: its event types, queue and worker task."""
+    name: str
+    event_types: Tuple[Type, ...]
+    handler: Callable[[object], Awaitable[None]]
+    queue: asyncio.Queue
+    overflow: str
+    stats: SubscriptionStats = field(default_factory=SubscriptionStats)
+    task: Optional[asyncio.Task] = None
+
+
+class EventBus:
+    """
+    Fans events out to independent subscribers.
+
+    Each subscriber has its own bounded queue and worker task, so a slow
+    consumer (e.g. a Telegram call) only delays itself. When a ``block``
+    queue is full, ``publish`` waits for it, which slows the producer down
+    instead of growing memory; ``drop_oldest`` queues never block.
+    """
+
+    def __init__(self):
+        """Initialize event bus."""
+        self.subscriptions: Dict[str, Subscription] = {}
+        self.logger = get_logger()
+
+    def subscribe(
+        self,
+        name: str,
+        event_types: Tuple[Type, ...],
+        handler: Callable[[object], Awaitable[None]],
+        maxsize: int = 100,
+        overflow: str = BLOCK,
+    ) -> Subscription:
+        """
+        Register a consumer and start its worker task.
+
+        Args:
+            name: Unique subscriber name (used in logs and stats)
+            event_types: Event classes this subscriber receives
+            handler: Coroutine function called once per event
+            maxsize: Queue capacity
+            overflow: BLOCK or DROP_OLDEST
+
+        Returns:
+            The new Subscription
+        """
+        if name in self.subscriptions:
+            raise ValueError(f"Subscriber {name} already registered")
+        if overflow not in (BLOCK, DROP_OLDEST):
+            raise ValueError(f"Unknown overflow policy: {overflow}")
+
+        subscription = Subscription(
+            name=name,
+            event_types=tuple(event_types),
+            handler=handler,
+            queue=asyncio.Queue(maxsize=maxsize),
+            overflow=overflow,
+        )
+        subscription.task = asyncio.create_task(self._run(subscription))
+        self.subscriptions[name] = subscription
+        return subscription
+
+    async def publish(self, event: object) -> None:
+        """
+        Deliver an event to every subscriber of its type.
+
+        Args:
+            event: Event instance
+        """
+        for subscription in self.subscriptions.values():
+            if not isinstance(event, subscription.event_types):
+                continue
+
+            queue = subscription.queue
+            if subscription.overflow == DROP_OLDEST and queue.full():
+                queue.get_nowait()
+                queue.task_done()
+                subscription.stats.dropped += 1
+            await queue.put(event)
+            subscription.stats.max_queue_depth = max(subscription.stats.max_queue_depth, queue.qsize())
+
+    async def _run(self, subscription: Subscription) -> None:
+        while True:
+            event = await subscription.queue.get()
+            started = time.monotonic()
+            try:
+                await subscription.handler(event)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                subscription.stats.errors += 1
+                self.logger.error(f"Subscriber {subscription.name} failed on {type(event).__name__}: {e}", exc_info=True)
+            finally:
+                elapsed = time.monotonic() - started
+                subscription.stats.delivered += 1
+                subscription.stats.handler_seconds += elapsed
+                subscription.stats.max_handler_seconds = max(subscription.stats.max_handler_seconds, elapsed)
+                subscription.queue.task_done()
+
+    async def wait_handled(self, name: str) -> None:
+        """
+        Wait until one subscriber has handled everything queued for it.
+
+        Args:
+            name: Subscriber name
+        """
+        subscription = self.subscriptions.get(name)
+        if subscription:
+            await subscription.queue.join()
+
+    async def drain(self) -> None:
+        """Wait until every queued event has been handled."""
+        for subscription in list(self.subscriptions.values()):
+            await subscription.queue.join()
+
+    async def close(self, timeout: Optional[float] = None) -> None:
+        """
+        Drain queues and stop all subscriber tasks.
+
+        Args:
+            timeout: Give up draining after this many seconds (None = wait)
+        """
+        try:
+            await asyncio.wait_for(self.drain(), timeout)
+        except asyncio.TimeoutError:
+            self.logger.warning("Event bus did not drain in time; dropping pending events")
+
+        for subscription in self.subscriptions.values():
+            if subscription.task:
+                subscription.task.cancel()
+        await asyncio.gather(
+            *(s.task for s in self.subscriptions.values() if s.task), return_exceptions=True
+        )
+        self.subscriptions.clear()
+
+    def log_stats(self) -> None:
+        """Log per-subscriber latency and queue statistics."""
+        for subscription in self.subscriptions.values():
+            self.logger.info(f"Subscriber {subscription.name}: {subscription.stats.describe()}")
+
+
+class SnapshotPublisher:
+    """Publishes a snapshot and, when something changed, the diff against the previous one."""
+
+    def __init__(self, bus: EventBus):
+        """
+        Initialize snapshot publisher.
+
+        Args:
+            bus: Bus to publish on
+        """
+        self.bus = bus
+        self.previous: Dict[int, GridSnapshot] = {}  # Last snapshot per month window
+
+    async def publish(self, snapshot: GridSnapshot, month_offset: int = 1, rendered: bool = True) -> SlotDiffEvent:
+        """
+        Publish a snapshot and its diff.
+
+        Args:
+            snapshot: Latest scan
+            month_offset: Month window the scan belongs to
+            rendered: Whether the page's DOM was complete when the snapshot was taken
+
+        Returns:
+            The diff event (also published if non-empty)
+        """
+        if snapshot.unchanged and month_offset in self.previous:
+            # The table hash matched the last parse, so there is nothing to diff
+            self.previous[month_offset] = snapshot
+            await self.bus.publish(GridSnapshotEvent(snapshot=snapshot, month_offset=month_offset, rendered=rendered))
+            return SlotDiffEvent(appeared=[], disappeared=[], snapshot=snapshot, month_offset=month_offset)
+
+        appeared, disappeared = diff_snapshots(self.previous.get(month_offset), snapshot)
+        self.previous[month_offset] = snapshot
+
+        await self.bus.publish(GridSnapshotEvent(snapshot=snapshot, month_offset=month_offset, rendered=rendered))
+        diff = SlotDiffEvent(
+            appeared=appeared,
+            disappeared=disappeared,
+            snapshot=snapshot,
+            month_offset=month_offset,
+        )
+        if appeared or disappeared:
+            await self.bus.publish(diff)
+        return diff
@@ -0,0 +1,180 @@
+"""In-memory ring buffer of recent page snapshots, written to disk only when needed."""
+import gzip
+import json
+import os
+import shutil
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Deque, Dict, List, Optional
+from playwright.async_api import Page
+from src.logger import get_logger
+
+
+@dataclass
+class EvidenceFrame:
+    """One captured page state with its cycle metadata."""
+    captured_at: datetime
+    label: str  # e.g. "cycle", "login_error", "booking"
+    url: str
+    html_gz: bytes  # gzip-compressed page HTML
+    screenshot: Optional[bytes] = None  # JPEG
+    metadata: Dict[str, object] = field(default_factory=dict)
+
+    def html(self) -> str:
+        """Decompressed page HTML."""
+        return gzip.decompress(self.html_gz).decode("utf-8")
+
+
+class EvidenceRecorder:
+    """
+    Keeps the last N page snapshots in memory for post-mortems.
+
+    Every monitoring cycle adds a compressed HTML frame (and optionally a
+    screenshot); nothing touches the disk until ``flush`` is called after
+    an error or a booking, which writes the whole buffer with a manifest.
+    Only the newest ``max_flushes`` directories are kept, so a flapping
+    error cannot fill the disk.
+    """
+
+    # Fast compression: one frame is compressed every cycle, so CPU time per
+    # cycle matters more than the few KB a higher level would save per frame
+    COMPRESS_LEVEL = 3
+
+    def __init__(
+        self,
+        capacity: int = 20,
+        screenshots: bool = False,
+        directory: str = os.path.join("logs", "evidence"),
+        max_flushes: int = 50,
+    ):
+        """
+        Initialize evidence recorder.
+
+        Args:
+            capacity: Number of frames kept in memory
+            screenshots: Also capture a JPEG screenshot with each frame
+            directory: Where flushed evidence is written
+            max_flushes: Flushed directories kept on disk, oldest deleted first (0 = all)
+        """
+        self.capacity = capacity
+        self.screenshots = screenshots
+        self.directory = directory
+        self.max_flushes = max_flushes
+        self.frames: Deque[EvidenceFrame] = deque(maxlen=capacity)
+        self.logger = get_logger()
+
+    def record(
+        self,
+        label: str,
+        url: str,
+        html: str,
+        screenshot: Optional[bytes] = None,
+        **metadata,
+    ) -> EvidenceFrame:
+        """
+        Add a frame to the buffer, evicting the oldest one when full.
+
+        Args:
+            label: What the frame was captured for
+            url: Page URL
+            html: Page HTML
+            screenshot: Optional JPEG bytes
+            **metadata: JSON-serialisable per-cycle details
+
+        Returns:
+            The stored frame
+        """
+        frame = EvidenceFrame(
+            captured_at=datetime.now(),
+            label=label,
+            url=url,
+            html_gz=gzip.compress(html.encode("utf-8"), compresslevel=self.COMPRESS_LEVEL),
+            screenshot=screenshot,
+            metadata=metadata,
+        )
+        self.frames.append(frame)
+        return frame
+
+    async def capture(self, page: Optional[Page], label: str = "cycle", screenshot: Optional[bool] = None, **metadata) -> None:
+        """
+        Capture the page into the buffer; never raises.
+
+        Args:
+            page: Page to capture
+            label: What the frame is captured for
+            screenshot: Override the recorder's screenshot setting
+            **metadata: JSON-serialisable per-cycle details
+        """
+        if not page or self.capacity <= 0:
+            return
+        try:
+            started = time.monotonic()
+            html = await page.content()
+            image = None
+            if self.screenshots if screenshot is None else screenshot:
+                image = await page.screenshot(type="jpeg", quality=60)
+            metadata.setdefault("capture_ms", round((time.monotonic() - started) * 1000))
+            self.record(label, page.url, html, image, **metadata)
+        except Exception as e:
+            self.logger.debug(f"Evidence capture failed: {e}")
+
+    def flush(self, reason: str) -> Optional[str]:
+        """
+        Write the buffered frames to a new directory and empty the buffer.
+
+        Args:
+            reason: Why evidence is being kept (used in the directory name)
+
+        Returns:
+            Path of the written directory, or None if the buffer was empty
+        """
+        if not self.frames:
+            return None
+
+        frames: List[EvidenceFrame] = list(self.frames)
+        self.frames.clear()
+
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+        safe_reason = "".join(c if c.isalnum() or c in "-_" else "_" for c in reason)
+        path = os.path.join(self.directory, f"{stamp}-{safe_reason}")
+        os.makedirs(path, exist_ok=True)
+
+        manifest = []
+        for i, frame in enumerate(frames):
+            name = f"{i:03d}-{frame.label}"
+            with open(os.path.join(path, f"{name}.html.gz"), "wb") as f:
+                f.write(frame.html_gz)
+            entry = {
+                "file": f"{name}.html.gz",
+                "captured_at": frame.captured_at.isoformat(timespec="milliseconds"),
+                "label": frame.label,
+                "url": frame.url,
+                **frame.metadata,
+            }
+            if frame.screenshot:
+                with open(os.path.join(path, f"{name}.jpg"), "wb") as f:
+                    f.write(frame.screenshot)
+                entry["screenshot"] = f"{name}.jpg"
+            manifest.append(entry)
+
+        with open(os.path.join(path, "manifest.json"), "w", encoding="utf-8") as f:
+            json.dump({"reason": reason, "frames": manifest}, f, ensure_ascii=False, indent=2, default=str)
+
+        self.logger.info(f"Evidence saved to {path} ({len(frames)} frames)")
+        self._prune()
+        return path
+
+    def _prune(self) -> None:
+        """Delete the oldest flushed directories beyond max_flushes."""
+        if self.max_flushes <= 0:
+            return
+        # Directory names start with the flush timestamp, so name order is age order
+        flushed = sorted(
+            entry.path for entry in os.scandir(self.directory)
+            if entry.is_dir() and entry.name[:8].isdigit()
+        )
+        for path in flushed[:-self.max_flushes]:
+            shutil.rmtree(path, ignore_errors=True)
+            self.logger.debug(f"Deleted old evidence {path}")
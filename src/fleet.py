@@ -0,0 +1,457 @@
+"""Coordinator/worker mode for running several pollers against one account."""
+import asyncio
+import json
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set, Tuple
+from src.slot_detector import GridSnapshot
+from src.logger import get_logger
+
+
+# Seconds without a message after which a worker is considered gone
+WORKER_TIMEOUT = 30
+# Seconds a worker has to report the result of a booking assignment
+ASSIGNMENT_TIMEOUT = 120
+
+
+@dataclass
+class Assignment:
+    """A slot the coordinator asked one worker to book."""
+    assignment_id: int
+    category: str
+    date: str
+    month_offset: int
+
+
+@dataclass
+class WorkerState:
+    """What the coordinator knows about a connected worker."""
+    worker_id: str
+    writer: asyncio.StreamWriter
+    month_offset: int = 1
+    categories: List[str] = field(default_factory=list)
+    last_seen: float = field(default_factory=time.monotonic)
+    busy: bool = False
+
+
+@dataclass
+class SlotRecord:
+    """Coordinator-side state of one (category, date) hit."""
+    first_seen: float
+    reported_by: Set[str] = field(default_factory=set)
+    status: str = "open"  # open, assigned, failed, gone, booked
+
+
+async def _send(writer: asyncio.StreamWriter, message: dict) -> None:
+    writer.write((json.dumps(message, ensure_ascii=False) + "\n").encode("utf-8"))
+    await writer.drain()
+
+
+class FleetCoordinator:
+    """
+    Collects grid snapshots from workers and hands out booking assignments.
+
+    Hits reported by several workers are de-duplicated on (category, date),
+    and at most one assignment is in flight at a time, because every worker
+    books for the same account. Once a booking succeeds all workers are told
+    to stop.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8765):
+        """
+        Initialize fleet coordinator.
+
+        Args:
+            host: Interface to listen on
+            port: TCP port to listen on
+        """
+        self.host = host
+        self.port = port
+        self.workers: Dict[str, WorkerState] = {}
+        self.slots: Dict[Tuple[str, str], SlotRecord] = {}
+        self.active: Optional[Tuple[Assignment, str, float]] = None  # (assignment, worker, sent_at)
+        self.booked = False
+        self._next_assignment_id = 1
+        self._server: Optional[asyncio.AbstractServer] = None
+        self.logger = get_logger()
+
+    async def start(self) -> None:
+        """
+        Start listening.
+
+        Raises:
+            OSError: If the address is already in use (another leader is running)
+        """
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.logger.info(f"Fleet coordinator listening on {self.host}:{self.port}")
+
+    async def serve_forever(self) -> None:
+        """Run the coordinator until cancelled."""
+        if not self._server:
+            await self.start()
+        async with self._server:
+            while True:
+                await asyncio.sleep(5)
+                await self._expire()
+
+    async def stop(self) -> None:
+        """Stop listening and drop all worker connections."""
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        for worker in list(self.workers.values()):
+            worker.writer.close()
+        self.workers.clear()
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        worker: Optional[WorkerState] = None
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                message = json.loads(line)
+                kind = message.get("type")
+
+                if kind == "hello":
+                    worker = WorkerState(
+                        worker_id=message["worker_id"],
+                        writer=writer,
+                        month_offset=message.get("month_offset", 1),
+                        categories=message.get("categories", []),
+                        busy=message.get("busy", False),
+                    )
+                    self.workers[worker.worker_id] = worker
+                    self.logger.info(
+                        f"Worker {worker.worker_id} joined "
+                        f"(month +{worker.month_offset}, {', '.join(worker.categories)})"
+                    )
+                    if self.booked:
+                        await _send(writer, {"type": "stop", "reason": "already booked"})
+                elif worker is None:
+                    continue
+                elif kind == "snapshot":
+                    worker.last_seen = time.monotonic()
+                    await self._on_snapshot(worker, message)
+                elif kind == "result":
+                    worker.last_seen = time.monotonic()
+                    await self._on_result(worker, message)
+        except (ConnectionError, json.JSONDecodeError, KeyError) as e:
+            self.logger.debug(f"Worker connection error: {e}")
+        finally:
+            if worker and self.workers.get(worker.worker_id) is worker:
+                del self.workers[worker.worker_id]
+                self.logger.warning(f"Worker {worker.worker_id} disconnected")
+                self._release_assignment_of(worker.worker_id)
+            writer.close()
+
+    async def _on_snapshot(self, worker: WorkerState, message: dict) -> None:
+        hits = {
+            (category, date)
+            for category, dates in message.get("available", {}).items()
+            for date in dates
+        }
+
+        # Cells this worker no longer sees are gone unless someone is booking them
+        for key, record in self.slots.items():
+            if worker.worker_id in record.reported_by and key not in hits:
+                record.reported_by.discard(worker.worker_id)
+                if not record.reported_by and record.status in ("open", "failed"):
+                    record.status = "gone"
+
+        for key in hits:
+            record = self.slots.get(key)
+            if record is None or record.status == "gone":
+                record = SlotRecord(first_seen=time.monotonic())
+                self.slots[key] = record
+                self.logger.info(f"New slot reported by {worker.worker_id}: {key[0]} on {key[1]}")
+            record.reported_by.add(worker.worker_id)
+
+        await self._maybe_assign()
+
+    async def _maybe_assign(self) -> None:
+        """Give the oldest open slot to one idle worker that can see it."""
+        await self._expire()
+        if self.booked or self.active:
+            return
+
+        candidates = sorted(
+            (record.first_seen, key) for key, record in self.slots.items()
+            if record.status in ("open", "failed")
+        )
+        for _, key in candidates:
+            record = self.slots[key]
+            workers = [
+                self.workers[w] for w in record.reported_by
+                if w in self.workers and not self.workers[w].busy
+            ]
+            if not workers:
+                continue
+
+            worker = random.choice(workers)
+            assignment = Assignment(
+                assignment_id=self._next_assignment_id,
+                category=key[0],
+                date=key[1],
+                month_offset=worker.month_offset,
+            )
+            self._next_assignment_id += 1
+            record.status = "assigned"
+            worker.busy = True
+            self.active = (assignment, worker.worker_id, time.monotonic())
+
+            self.logger.info(
+                f"Assigning {assignment.category} on {assignment.date} to {worker.worker_id} "
+                f"(assignment #{assignment.assignment_id})"
+            )
+            await _send(worker.writer, {"type": "assign", **assignment.__dict__})
+            return
+
+    async def _on_result(self, worker: WorkerState, message: dict) -> None:
+        worker.busy = False
+        if not self.active or self.active[0].assignment_id != message.get("assignment_id"):
+            return
+
+        assignment = self.active[0]
+        self.active = None
+        record = self.slots.get((assignment.category, assignment.date))
+
+        if message.get("success"):
+            self.booked = True
+            if record:
+                record.status = "booked"
+            self.logger.info(f"✓ Worker {worker.worker_id} booked {assignment.category} on {assignment.date}")
+            # Workers may connect or drop while a send is awaited
+            for other in list(self.workers.values()):
+                await _send(other.writer, {"type": "stop", "reason": f"booked by {worker.worker_id}"})
+        else:
+            if record:
+                record.status = "failed"
+            self.logger.warning(f"Worker {worker.worker_id} failed to book {assignment.category} on {assignment.date}")
+            await self._maybe_assign()
+
+    async def _expire(self) -> None:
+        now = time.monotonic()
+        for worker in list(self.workers.values()):
+            if now - worker.last_seen > WORKER_TIMEOUT and not worker.busy:
+                self.logger.warning(f"Worker {worker.worker_id} timed out")
+                worker.writer.close()
+
+        if self.active and now - self.active[2] > ASSIGNMENT_TIMEOUT:
+            self.logger.warning(f"Assignment #{self.active[0].assignment_id} timed out")
+            self._release_assignment_of(self.active[1])
+
+    def _release_assignment_of(self, worker_id: str) -> None:
+        if self.active and self.active[1] == worker_id:
+            assignment = self.active[0]
+            record = self.slots.get((assignment.category, assignment.date))
+            if record and record.status == "assigned":
+                record.status = "failed"
+            self.active = None
+        if worker_id in self.workers:
+            self.workers[worker_id].busy = False
+
+
+class FleetWorker:
+    """
+    Worker-side fleet client with leader failover.
+
+    The coordinator address doubles as the leader lock: when no coordinator
+    answers, a worker tries to bind the address itself and, if that succeeds,
+    hosts the coordinator in-process. Only one process can bind it, so exactly
+    one leader exists at a time on the coordinator host.
+    """
+
+    RECONNECT_DELAY = 2.0
+
+    def __init__(
+        self,
+        worker_id: str,
+        host: str = "127.0.0.1",
+        port: int = 8765,
+        month_offset: int = 1,
+        categories: Optional[List[str]] = None,
+        allow_promotion: bool = True,
+    ):
+        """
+        Initialize fleet worker.
+
+        Args:
+            worker_id: Unique name of this worker
+            host: Coordinator host
+            port: Coordinator port
+            month_offset: Month window this worker polls
+            categories: Categories this worker polls
+            allow_promotion: Become the coordinator if none is reachable
+        """
+        self.worker_id = worker_id
+        self.host = host
+        self.port = port
+        self.month_offset = month_offset
+        self.categories = categories or []
+        self.allow_promotion = allow_promotion
+        self.coordinator: Optional[FleetCoordinator] = None
+        self.stopped = False
+        self.stop_reason = ""
+        self.busy = False
+        self._assignments: "asyncio.Queue[Assignment]" = asyncio.Queue()
+        self._reader_task: Optional[asyncio.Task] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._next_attempt = 0.0
+        self.logger = get_logger()
+
+    @property
+    def connected(self) -> bool:
+        """True while connected to a coordinator."""
+        return self._writer is not None and not self._writer.is_closing()
+
+    @property
+    def is_leader(self) -> bool:
+        """True if this process hosts the coordinator."""
+        return self.coordinator is not None
+
+    async def ensure_connected(self) -> bool:
+        """
+        Connect to the coordinator, taking over leadership if it is gone.
+
+        Returns:
+            True if connected
+        """
+        if self.connected:
+            return True
+        if time.monotonic() < self._next_attempt:
+            return False
+
+        try:
+            await self._connect()
+            return True
+        except OSError:
+            pass
+
+        if self.allow_promotion and not self.is_leader:
+            # Random delay so surviving workers don't all race for the port at once
+            await asyncio.sleep(random.uniform(0, 1))
+            try:
+                coordinator = FleetCoordinator(self.host, self.port)
+                await coordinator.start()
+                self.coordinator = coordinator
+                self.logger.info(f"Worker {self.worker_id} is now the fleet leader")
+            except OSError:
+                self.logger.debug("Another worker took over leadership")
+
+        try:
+            await self._connect()
+            return True
+        except OSError as e:
+            self.logger.warning(f"Cannot reach fleet coordinator at {self.host}:{self.port}: {e}")
+            self._next_attempt = time.monotonic() + self.RECONNECT_DELAY
+            return False
+
+    async def _connect(self) -> None:
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        self._writer = writer
+        await _send(writer, {
+            "type": "hello",
+            "worker_id": self.worker_id,
+            "month_offset": self.month_offset,
+            "categories": self.categories,
+            "busy": self.busy,
+        })
+        self._reader_task = asyncio.create_task(self._read_loop(reader))
+        self.logger.info(f"✓ Connected to fleet coordinator at {self.host}:{self.port}")
+
+    async def _read_loop(self, reader: asyncio.StreamReader) -> None:
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                message = json.loads(line)
+                if message.get("type") == "assign":
+                    await self._assignments.put(Assignment(
+                        assignment_id=message["assignment_id"],
+                        category=message["category"],
+                        date=message["date"],
+                        month_offset=message.get("month_offset", self.month_offset),
+                    ))
+                elif message.get("type") == "stop":
+                    self.stopped = True
+                    self.stop_reason = message.get("reason", "")
+        except (ConnectionError, json.JSONDecodeError) as e:
+            self.logger.debug(f"Coordinator connection error: {e}")
+        finally:
+            if self._writer:
+                self._writer.close()
+            self.logger.warning("Lost connection to fleet coordinator")
+
+    async def report_snapshot(self, snapshot: GridSnapshot) -> None:
+        """
+        Send a grid snapshot to the coordinator (also acts as heartbeat).
+
+        Args:
+            snapshot: Snapshot of this worker's shard
+        """
+        if not await self.ensure_connected():
+            return
+        try:
+            await _send(self._writer, {
+                "type": "snapshot",
+                "worker_id": self.worker_id,
+                "taken_at": snapshot.taken_at.isoformat(),
+                "available": snapshot.available,
+            })
+        except ConnectionError as e:
+            self.logger.warning(f"Could not send snapshot: {e}")
+
+    async def take_assignment(self, timeout: float = 0.0) -> Optional[Assignment]:
+        """
+        Return the next booking assignment, if one arrives.
+
+        Args:
+            timeout: Seconds to wait for an assignment (0 = don't wait)
+
+        Returns:
+            Assignment, or None if none arrived in time
+        """
+        try:
+            if timeout > 0:
+                assignment = await asyncio.wait_for(self._assignments.get(), timeout)
+            else:
+                assignment = self._assignments.get_nowait()
+        except (asyncio.QueueEmpty, asyncio.TimeoutError):
+            return None
+        self.busy = True
+        return assignment
+
+    async def report_result(self, assignment: Assignment, success: bool) -> None:
+        """
+        Report the outcome of a booking assignment.
+
+        Args:
+            assignment: Assignment that was attempted
+            success: Whether the reservation was locked
+        """
+        self.busy = False
+        if not await self.ensure_connected():
+            return
+        try:
+            await _send(self._writer, {
+                "type": "result",
+                "worker_id": self.worker_id,
+                "assignment_id": assignment.assignment_id,
+                "success": success,
+            })
+        except ConnectionError as e:
+            self.logger.warning(f"Could not send booking result: {e}")
+
+    async def close(self) -> None:
+        """Disconnect (and stop the coordinator if this worker is the leader)."""
+        if self._reader_task:
+            self._reader_task.cancel()
+        if self._writer:
+            self._writer.close()
+        if self.coordinator:
+            await self.coordinator.stop()
+            self.coordinator = None
@@ -0,0 +1,224 @@
+"""Fill the post-lock reservation form from a stored applicant profile."""
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+from playwright.async_api import Page, TimeoutError as PlaywrightTimeoutError
+from src.logger import get_logger
+
+
+# Keywords that identify each field. They are checked against the field's
+# <label> and table header text first, and only if that names no field,
+# against its placeholder, title, aria-label, name and id. ASCII keywords
+# must be a whole word there ("tel" matches tel_1, not hotel). Order
+# matters: "氏名（フリガナ）" must be read as kana, not as the name.
+FIELD_KEYWORDS: Tuple[Tuple[str, Tuple[str, ...]], ...] = (
+    ("kana", ("フリガナ", "ふりがな", "カナ", "kana", "furigana")),
+    ("birthdate", ("生年月日", "birth", "birthday")),
+    ("license_number", ("免許証番号", "免許番号", "license")),
+    ("phone", ("電話番号", "電話", "携帯", "tel", "phone")),
+    ("name", ("氏名", "名前", "name")),
+)
+
+# Buttons that move the form on, tried in order on each page
+SUBMIT_LABELS = ("確認へ進む", "確認", "次へ", "申込む", "申し込む", "送信")
+
+# Finds the form fields, matches them to profile keys and fills them in one pass.
+# A key matched by several fields (姓/名, 年/月/日, split phone numbers) gets the
+# value's parts in order when the part count matches, otherwise the first field
+# gets the whole value.
+AUTOFILL_SCRIPT = """
+([keywords, values]) => {
+    const source = (parts) => {
+        const text = parts.filter(Boolean).join(' ').toLowerCase();
+        return {text, words: text.split(/[^a-z]+/).filter(Boolean)};
+    };
+    const labelSource = (el) => {
+        const parts = [];
+        if (el.id) {
+            const label = document.querySelector(`label[for="${CSS.escape(el.id)}"]`);
+            if (label) parts.push(label.textContent);
+        }
+        const wrapping = el.closest('label');
+        if (wrapping) parts.push(wrapping.textContent);
+        const row = el.closest('tr');
+        const header = row && row.querySelector('th');
+        if (header) parts.push(header.textContent);
+        return source(parts);
+    };
+    const attributeSource = (el) =>
+        source([el.placeholder, el.title, el.getAttribute('aria-label'), el.name, el.id]);
+    const mentions = ({text, words}, word) =>
+        /^[\\x00-\\x7f]+$/.test(word) ? words.includes(word.toLowerCase()) : text.includes(word);
+    const keyOf = (el) => {
+        for (const described of [labelSource(el), attributeSource(el)]) {
+            const hit = keywords.find(([, words]) => words.some(word => mentions(described, word)));
+            if (hit) return hit[0];
+        }
+        return null;
+    };
+    const visible = (el) => el.offsetParent !== null || el.getClientRects().length > 0;
+    const fields = Array.from(document.querySelectorAll('input, select, textarea')).filter(el =>
+        !el.disabled && !el.readOnly && visible(el)
+        && !['hidden', 'submit', 'button', 'checkbox', 'radio', 'file', 'image', 'reset'].includes(el.type));
+
+    const matched = {};
+    for (const el of fields) {
+        const key = keyOf(el);
+        if (key && key in values) (matched[key] = matched[key] || []).push(el);
+    }
+
+    const setValue = (el, value) => {
+        if (el.tagName === 'SELECT') {
+            const option = Array.from(el.options).find(o =>
+                o.value === value || o.text.trim() === value
+                || (/^\\d+$/.test(value) && (Number(o.value) === Number(value) || parseInt(o.text, 10) === Number(value))));
+            if (!option) return false;
+            el.value = option.value;
+        } else {
+            el.value = value;
+        }
+        el.dispatchEvent(new Event('input', {bubbles: true}));
+        el.dispatchEvent(new Event('change', {bubbles: true}));
+        return true;
+    };
+
+    const filled = [];
+    const failed = [];
+    for (const [key, elements] of Object.entries(matched)) {
+        const parts = values[key].split(/[\\s\\-\\/\\u3000]+/).filter(Boolean);
+        const split = elements.length > 1 && parts.length === elements.length;
+        const targets = split ? elements : elements.slice(0, 1);
+        targets.forEach((el, i) => {
+            const name = el.name || el.id;
+            (setValue(el, split ? parts[i] : values[key]) ? filled : failed).push([key, name]);
+        });
+    }
+    return {
+        filled,
+        failed,
+        missing: Object.keys(values).filter(key => !(key in matched)),
+        remaining: fields.filter(el => !el.value).length,
+    };
+}
+"""
+
+# Clicks the first visible submit control whose label is in the list (in list order)
+SUBMIT_SCRIPT = """
+(labels) => {
+    const controls = Array.from(document.querySelectorAll(
+        'input[type=submit], input[type=button], button'));
+    const label = (el) => (el.value || el.textContent || '').trim();
+    for (const wanted of labels) {
+        const control = controls.find(el =>
+            !el.disabled && el.offsetParent !== null && label(el).includes(wanted)
+            && !/戻る|やめる|中断/.test(label(el)));
+        if (control) {
+            control.click();
+            return label(control);
+        }
+    }
+    return null;
+}
+"""
+
+
+@dataclass
+class ApplicantProfile:
+    """Applicant data typed into the reservation form."""
+    name: str = ""
+    kana: str = ""
+    birthdate: str = ""  # e.g. 1990-04-01
+    license_number: str = ""
+    phone: str = ""
+
+    def values(self) -> Dict[str, str]:
+        """Non-empty fields by form key."""
+        return {key: value for key, value in vars(self).items() if value}
+
+    def __bool__(self) -> bool:
+        return bool(self.values())
+
+
+@dataclass
+class AutofillResult:
+    """What was filled on the form."""
+    filled: List[Tuple[str, str]] = field(default_factory=list)  # (profile key, field name)
+    failed: List[Tuple[str, str]] = field(default_factory=list)  # No matching <option>
+    missing: List[str] = field(default_factory=list)  # Profile keys with no field
+    remaining: int = 0  # Visible fields still empty (for the human)
+
+
+class FormAutofill:
+    """
+    Fills the reservation form reached after "同意する".
+
+    Fields are matched by keyword, since the form differs per procedure. The
+    whole form is filled in a single ``page.evaluate`` round trip. Nothing
+    is submitted unless ``submit`` is called (``--auto-submit``).
+    """
+
+    SUBMIT_STEPS = 2  # Input page -> confirmation page -> submitted
+    NAVIGATION_TIMEOUT_MS = 15000
+
+    def __init__(self, page: Page):
+        """
+        Initialize form autofill.
+
+        Args:
+            page: Page showing the reservation form
+        """
+        self.page = page
+        self.logger = get_logger()
+
+    async def fill(self, profile: ApplicantProfile) -> AutofillResult:
+        """
+        Fill every form field that matches a profile value.
+
+        Args:
+            profile: Applicant data
+
+        Returns:
+            AutofillResult of the pass
+        """
+        raw = await self.page.evaluate(AUTOFILL_SCRIPT, [FIELD_KEYWORDS, profile.values()])
+        result = AutofillResult(
+            filled=[tuple(item) for item in raw["filled"]],
+            failed=[tuple(item) for item in raw["failed"]],
+            missing=raw["missing"],
+            remaining=raw["remaining"],
+        )
+        self.logger.info(
+            f"Autofilled {len(result.filled)} form field(s); "
+            f"{result.remaining} field(s) left for you"
+        )
+        if result.missing:
+            self.logger.warning(f"No form field found for: {', '.join(result.missing)}")
+        for key, name in result.failed:
+            self.logger.warning(f"Could not set {key} in field {name}")
+        return result
+
+    async def submit(self) -> bool:
+        """
+        Submit the form, confirming on the confirmation page.
+
+        Returns:
+            True if a completion page was reached
+        """
+        for _ in range(self.SUBMIT_STEPS):
+            try:
+                async with self.page.expect_navigation(
+                    wait_until="domcontentloaded", timeout=self.NAVIGATION_TIMEOUT_MS
+                ):
+                    clicked = await self.page.evaluate(SUBMIT_SCRIPT, list(SUBMIT_LABELS))
+                    if not clicked:
+                        raise LookupError(f"No submit button found on {self.page.url}")
+            except LookupError as e:
+                self.logger.warning(str(e))
+                return False
+            except PlaywrightTimeoutError:
+                # Client-side validation kept the page (e.g. a required field is still empty)
+                self.logger.warning(f"'{clicked}' did not leave {self.page.url}")
+                return False
+            self.logger.info(f"✓ Clicked '{clicked}'")
+            if "完了" in await self.page.title():
+                return True
+        return False
@@ -0,0 +1,316 @@
+"""Parse the facility page HTML into a GridSnapshot without a browser."""
+import hashlib
+import html as html_lib
+import re
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from html.parser import HTMLParser
+from typing import Dict, Hashable, List, Optional, Tuple
+from src.domain import TargetMask
+from src.selectors import CATEGORY_ROW_ID_PREFIX
+from src.slot_detector import GridSnapshot
+
+
+_TABLE_START = re.compile(r"<table\b[^>]*\bid=[\"']?TBL\b")
+# Parts of the table that change without the slots changing, matched after
+# whitespace is removed: session/sequence tokens in link query strings, and the
+# minutes:seconds of clock times (a timestamp then forces one parse an hour).
+# Both start with literals, so the ~200KB region is scanned in well under 1ms.
+_VOLATILE_TOKEN = re.compile(r"[?&;](?:_csrf|csrf|CSRF|token|Token|tempSeq|jsessionid|JSESSIONID)=[^&\"']*")
+_CLOCK_TIME = re.compile(r":\d\d:\d\d")
+_COMMENT = re.compile(r"<!--.*?-->", re.DOTALL)
+_INPUT_TAG = re.compile(r"<input\b[^>]*>", re.IGNORECASE)
+_ATTRIBUTE = re.compile(r"""([^\s"'>/=]+)\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+))""")
+
+
+class FacilityPageParser(HTMLParser):
+    """
+    Single-pass parser for the slot table and the paging form.
+
+    Mirrors what SlotDetector reads in the browser: the date header row
+    (``tr#height_headday td.time--th--date``), one row per category
+    (``tr[id^='height_auto_']``) and available cells (``td.tdSelect.enable``
+    containing ``a.enable``).
+    """
+
+    def __init__(self, categories: Optional[List[str]] = None):
+        """
+        Initialize parser.
+
+        Args:
+            categories: Categories to collect (None = all rows)
+        """
+        super().__init__(convert_charrefs=True)
+        self.categories = categories
+        self.mask = TargetMask(categories) if categories is not None else None
+        self.dates: List[str] = []
+        self.available: Dict[str, List[str]] = {}
+        self.form_fields: List[Tuple[str, str]] = []
+        self.table_closed = False
+        self._row: Optional[str] = None  # "headday", a category, or None
+        self._column = -1
+        self._cell_enabled = False
+        self._cell_has_link = False
+        self._date_text: Optional[List[str]] = None
+        self._in_table = False
+
+    def handle_starttag(self, tag, attrs):
+        attributes = dict(attrs)
+
+        if tag == "table" and attributes.get("id") == "TBL":
+            self._in_table = True
+        elif tag == "tr" and self._in_table:
+            row_id = attributes.get("id") or ""
+            self._column = -1
+            if row_id == "height_headday":
+                self._row = "headday"
+            elif row_id.startswith(CATEGORY_ROW_ID_PREFIX):
+                category = row_id[len(CATEGORY_ROW_ID_PREFIX):]
+                wanted = self.mask is None or category in self.mask
+                self._row = category if wanted else None
+            else:
+                self._row = None
+        elif tag == "td" and self._row:
+            self._column += 1
+            classes = (attributes.get("class") or "").split()
+            if self._row == "headday":
+                if "time--th--date" in classes:
+                    self._date_text = []
+            else:
+                self._cell_enabled = "tdSelect" in classes and "enable" in classes
+                self._cell_has_link = False
+        elif tag == "a" and self._cell_enabled:
+            if "enable" in (attributes.get("class") or "").split():
+                self._cell_has_link = True
+        elif tag == "input" and attributes.get("type") == "hidden" and attributes.get("name"):
+            self.form_fields.append((attributes["name"], attributes.get("value") or ""))
+
+    def handle_endtag(self, tag):
+        if tag == "table" and self._in_table:
+            self._in_table = False
+            self.table_closed = True
+        elif tag == "td" and self._row:
+            if self._date_text is not None:
+                self.dates.append(" ".join(" ".join(self._date_text).split()))
+                self._date_text = None
+            elif self._cell_enabled and self._cell_has_link and self._column < len(self.dates):
+                self.available.setdefault(self._row, []).append(self.dates[self._column])
+            self._cell_enabled = False
+        elif tag == "tr":
+            self._row = None
+
+    def handle_data(self, data):
+        if self._date_text is not None:
+            self._date_text.append(data)
+
+    def snapshot(self) -> GridSnapshot:
+        """Build a GridSnapshot from what has been parsed so far."""
+        return GridSnapshot(taken_at=datetime.now(), dates=list(self.dates), available=dict(self.available))
+
+
+def parse_grid(html: str, categories: Optional[List[str]] = None) -> GridSnapshot:
+    """
+    Parse the facility page into a snapshot of available cells.
+
+    Args:
+        html: Facility page HTML
+        categories: Categories to include (None = all)
+
+    Returns:
+        GridSnapshot (empty if the page has no slot table)
+    """
+    parser = FacilityPageParser(categories)
+    parser.feed(html)
+    parser.close()
+    return parser.snapshot()
+
+
+def parse_page(html: str, categories: Optional[List[str]] = None) -> Tuple[GridSnapshot, List[Tuple[str, str]], bool]:
+    """
+    Parse the slot table and the hidden form fields needed to page months.
+
+    Args:
+        html: Facility page HTML
+        categories: Categories to include (None = all)
+
+    Returns:
+        (snapshot, hidden form fields as (name, value) pairs, whether the slot table was found)
+    """
+    parser = FacilityPageParser(categories)
+    parser.feed(html)
+    parser.close()
+    return parser.snapshot(), parser.form_fields, parser.table_closed
+
+
+class TableEndScanner:
+    """
+    Finds the end of ``table#TBL`` in a page arriving in chunks.
+
+    Only the chunk boundaries are searched (plus a few carried-over
+    characters for tags split across chunks), so a streamed body can be cut
+    off right after the slot table without joining or parsing it first.
+    """
+
+    _END_TAG = "</table>"
+
+    def __init__(self):
+        """Initialize scanner."""
+        self.started = False
+        self.closed = False
+        self._carry = ""
+
+    def feed(self, text: str) -> bool:
+        """
+        Scan the next decoded chunk.
+
+        Args:
+            text: Next part of the page
+
+        Returns:
+            True once the slot table's closing tag has been seen
+        """
+        if self.closed:
+            return True
+        window = self._carry + text
+        if not self.started:
+            match = _TABLE_START.search(window)
+            if not match:
+                self._carry = window[-64:]  # Long enough for '<table class=".." id="TBL"'
+                return False
+            self.started = True
+            window = window[match.end():]
+        if self._END_TAG in window:
+            self.closed = True
+            return True
+        self._carry = window[-(len(self._END_TAG) - 1):]
+        return False
+
+
+def table_digest(html: str) -> Optional[bytes]:
+    """
+    Hash of the normalised slot table region of a facility page.
+
+    Whitespace, session tokens and clock times are normalised away, so two
+    responses with the same slots hash the same.
+
+    Args:
+        html: Facility page HTML
+
+    Returns:
+        16-byte digest, or None if the page has no slot table
+    """
+    match = _TABLE_START.search(html)
+    if not match:
+        return None
+    end = html.find("</table>", match.end())
+    if end < 0:
+        return None
+    region = "".join(html[match.start():end].split())
+    region = _CLOCK_TIME.sub("", _VOLATILE_TOKEN.sub("", region))
+    return hashlib.blake2b(region.encode("utf-8"), digest_size=16).digest()
+
+
+def hidden_fields(html: str) -> List[Tuple[str, str]]:
+    """
+    Hidden form fields of a page, without a full parse.
+
+    Returns the same (name, value) pairs as FacilityPageParser.form_fields.
+
+    Args:
+        html: Page HTML
+
+    Returns:
+        Hidden fields in document order
+    """
+    fields = []
+    for tag in _INPUT_TAG.findall(_COMMENT.sub("", html)):
+        attributes = {}
+        for match in _ATTRIBUTE.finditer(tag):
+            value = next(group for group in match.groups()[1:] if group is not None)
+            attributes.setdefault(match.group(1).lower(), html_lib.unescape(value))
+        if attributes.get("type") == "hidden" and attributes.get("name"):
+            fields.append((attributes["name"], attributes.get("value") or ""))
+    return fields
+
+
+@dataclass
+class ParseCacheStats:
+    """Counters for the table hash short-circuit."""
+    hits: int = 0
+    misses: int = 0
+    saved_seconds: float = 0.0  # Parse time avoided by hits (parse cost minus hash cost)
+
+    @property
+    def hit_rate(self) -> float:
+        """Share of pages whose table was unchanged."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+@dataclass
+class _CacheEntry:
+    digest: bytes
+    categories: Optional[Tuple[str, ...]]
+    snapshot: GridSnapshot
+    parse_seconds: float
+
+
+class ParseCache:
+    """
+    Skips parsing when a page's slot table is unchanged.
+
+    Most polls return the same table. The normalised table region is hashed
+    (about 1ms against ~30ms for a full parse); if the hash matches the last
+    page with the same key, the previous snapshot is reused, marked
+    ``unchanged`` so the publisher skips diffing too, and only the hidden
+    form fields are read.
+    """
+
+    def __init__(self):
+        """Initialize parse cache."""
+        self.stats = ParseCacheStats()
+        self._entries: Dict[Hashable, _CacheEntry] = {}
+
+    def parse(
+        self,
+        html: str,
+        categories: Optional[List[str]] = None,
+        key: Hashable = 0,
+    ) -> Tuple[GridSnapshot, List[Tuple[str, str]], bool]:
+        """
+        ``parse_page`` with the hash short-circuit.
+
+        Args:
+            html: Facility page HTML
+            categories: Categories to include (None = all)
+            key: Which page this is (e.g. the month window), so pages don't evict each other
+
+        Returns:
+            (snapshot, hidden form fields, whether the slot table was found)
+        """
+        started = time.perf_counter()
+        digest = table_digest(html)
+        wanted = tuple(categories) if categories is not None else None
+        entry = self._entries.get(key)
+
+        if digest is not None and entry and entry.digest == digest and entry.categories == wanted:
+            fields = hidden_fields(html)
+            self.stats.hits += 1
+            self.stats.saved_seconds += max(0.0, entry.parse_seconds - (time.perf_counter() - started))
+            cached = entry.snapshot
+            snapshot = GridSnapshot(
+                taken_at=datetime.now(),
+                dates=cached.dates,
+                available=cached.available,
+                unchanged=True,
+            )
+            return snapshot, fields, True
+
+        snapshot, fields, table_found = parse_page(html, categories)
+        self.stats.misses += 1
+        if digest is not None and table_found:
+            self._entries[key] = _CacheEntry(digest, wanted, snapshot, time.perf_counter() - started)
+        else:
+            self._entries.pop(key, None)
+        return snapshot, fields, table_found
@@ -0,0 +1,104 @@
+"""Scoped ownership of Playwright ElementHandles."""
+import asyncio
+from dataclasses import dataclass
+from typing import List, Optional, Union
+from playwright.async_api import ElementHandle, JSHandle, Page
+
+
+@dataclass
+class HandleStats:
+    """Handle counts shared by all arenas of a component."""
+    created: int = 0
+    disposed: int = 0
+    kept: int = 0  # Handed out to a caller (e.g. the booking link)
+
+    @property
+    def live(self) -> int:
+        """Handles created and not yet disposed (should stay flat)."""
+        return self.created - self.disposed
+
+
+class HandleArena:
+    """
+    Tracks every handle created during one operation and disposes them together.
+
+    Use as ``async with HandleArena(stats) as arena:`` and query through the
+    arena; everything is disposed on exit except handles passed to ``keep``,
+    which the caller must release with ``release_handle`` when done.
+    """
+
+    def __init__(self, stats: Optional[HandleStats] = None):
+        """
+        Initialize handle arena.
+
+        Args:
+            stats: Counters to update (a private instance if omitted)
+        """
+        self.stats = stats or HandleStats()
+        self._handles: List[JSHandle] = []
+
+    def track(self, handle: Optional[JSHandle]) -> Optional[JSHandle]:
+        """Take ownership of a handle (None is passed through)."""
+        if handle is not None:
+            self._handles.append(handle)
+            self.stats.created += 1
+        return handle
+
+    async def query_selector(self, root: Union[Page, ElementHandle], selector: str) -> Optional[ElementHandle]:
+        """``root.query_selector`` with the result owned by the arena."""
+        return self.track(await root.query_selector(selector))
+
+    async def query_selector_all(self, root: Union[Page, ElementHandle], selector: str) -> List[ElementHandle]:
+        """``root.query_selector_all`` with the results owned by the arena."""
+        handles = await root.query_selector_all(selector)
+        for handle in handles:
+            self.track(handle)
+        return handles
+
+    async def evaluate_handle(self, root: Union[Page, JSHandle], expression: str, arg=None) -> JSHandle:
+        """``root.evaluate_handle`` with the result owned by the arena."""
+        return self.track(await root.evaluate_handle(expression, arg))
+
+    def keep(self, handle: JSHandle) -> JSHandle:
+        """Exclude a handle from disposal; the caller now owns it."""
+        self._handles.remove(handle)
+        self.stats.kept += 1
+        return handle
+
+    async def dispose(self) -> int:
+        """
+        Dispose all owned handles in one batch.
+
+        Returns:
+            Number of handles disposed
+        """
+        handles, self._handles = self._handles, []
+        if handles:
+            # A handle whose page was closed or navigated is already gone
+            await asyncio.gather(*(h.dispose() for h in handles), return_exceptions=True)
+            self.stats.disposed += len(handles)
+        return len(handles)
+
+    async def __aenter__(self) -> "HandleArena":
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        await self.dispose()
+
+
+async def release_handle(handle: Optional[JSHandle], stats: HandleStats) -> None:
+    """
+    Dispose a handle that was kept out of an arena.
+
+    Args:
+        handle: Handle to dispose (None is ignored)
+        stats: Counters the handle was created under
+    """
+    if handle is None:
+        return
+    try:
+        await handle.dispose()
+    except Exception:
+        pass  # Already gone with its page
+    stats.disposed += 1
+    stats.kept -= 1
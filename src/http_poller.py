@@ -0,0 +1,222 @@
+"""Poll the facility page over plain HTTP using the browser's session."""
+import asyncio
+import codecs
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set, Tuple
+from urllib.parse import urljoin
+import aiohttp
+from yarl import URL
+from src.error_handler import PageStructureError, TransientError, diagnose_page
+from src.grid_parser import ParseCache, TableEndScanner
+from src.slot_detector import GridSnapshot
+from src.logger import get_logger
+
+
+# Relative to the facility page URL; posts the page's hidden form to move one month ahead
+ONE_MONTH_LATER_PATH = "facilitySelect_dateTrans?movePage=oneMonthLater"
+
+# Bytes read per step when streaming a response body
+CHUNK_SIZE = 16384
+
+# Headers that aiohttp must compute itself
+_SKIPPED_HEADERS = {"cookie", "content-length", "host", "connection", "accept-encoding"}
+
+
+@dataclass
+class CapturedRequest:
+    """The request that loaded the facility page, plus the session cookies."""
+    method: str
+    url: str
+    headers: Dict[str, str]
+    post_data: Optional[str] = None
+    cookies: List[dict] = field(default_factory=list)
+
+
+class HttpPoller:
+    """
+    Replays the facility page request with aiohttp.
+
+    The browser logs in and navigates once; afterwards the same request is
+    sent directly, and later month windows are reached by posting each
+    response's hidden form to the "1か月後" endpoint, like the page's own
+    pager button does. No renderer, images or scripts are involved.
+    """
+
+    def __init__(self, captured: CapturedRequest, timeout: float = 15.0, cache: Optional[ParseCache] = None):
+        """
+        Initialize HTTP poller.
+
+        Args:
+            captured: Request and cookies taken from the browser
+            timeout: Per-request timeout in seconds
+            cache: Table hash cache (kept across session recaptures by the caller)
+        """
+        self.captured = captured
+        self.cache = cache or ParseCache()
+        self.timeout = timeout
+        self.headers = {k: v for k, v in captured.headers.items() if k.lower() not in _SKIPPED_HEADERS}
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._drains: Set[asyncio.Task] = set()
+        self.logger = get_logger()
+
+    async def open(self) -> None:
+        """Create the HTTP session and load the browser's cookies into it."""
+        jar = aiohttp.CookieJar()
+        for cookie in self.captured.cookies:
+            domain = cookie.get("domain", "").lstrip(".")
+            jar.update_cookies(
+                {cookie["name"]: cookie["value"]},
+                URL(f"https://{domain}{cookie.get('path', '/')}"),
+            )
+        self._session = aiohttp.ClientSession(
+            cookie_jar=jar,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+        )
+
+    async def close(self) -> None:
+        """Close the HTTP session."""
+        for task in self._drains:
+            task.cancel()
+        await asyncio.gather(*self._drains, return_exceptions=True)
+        if self._session:
+            await self._session.close()
+            self._session = None
+
+    async def fetch(self, method: str, url: str, data=None, stop_after_table: bool = False) -> str:
+        """
+        Send one request and return the body of a healthy facility page.
+
+        The body is streamed; with ``stop_after_table`` the method returns
+        as soon as the closing tag of ``table#TBL`` has arrived, with only
+        the HTML up to there. The rest of the body is read and discarded in
+        the background, so the caller does not wait for it and the
+        connection can still be reused.
+
+        Args:
+            method: HTTP method
+            url: Request URL
+            data: Form body (string or list of (name, value) pairs)
+            stop_after_table: Return as soon as the slot table is complete
+                (the hidden form fields after it are then missing)
+
+        Returns:
+            Response HTML (cut after the slot table with ``stop_after_table``)
+
+        Raises:
+            BookingSystemError: Classified error (session expired, maintenance, ...)
+        """
+        if not self._session:
+            await self.open()
+
+        headers = dict(self.headers)
+        if isinstance(data, list):
+            headers.pop("content-type", None)
+            headers.pop("Content-Type", None)
+
+        try:
+            response = await self._session.request(method, url, data=data, headers=headers)
+            try:
+                body, has_table = await _read_body(response, stop_after_table and response.status < 400)
+            except BaseException:
+                response.close()
+                raise
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            raise TransientError(f"HTTP poll failed: {e}") from e
+
+        if response.content.at_eof():
+            response.release()
+        else:
+            self._drain(response)
+
+        error = diagnose_page(
+            response.status,
+            str(response.url),
+            _visible_text(body) if response.status >= 400 or not has_table else "",
+            response.headers.get("Retry-After"),
+        )
+        if error:
+            raise error
+        if not has_table:
+            raise PageStructureError(f"Slot table not found in response from {response.url}")
+        return body
+
+    def _drain(self, response: aiohttp.ClientResponse) -> None:
+        """Read the rest of a body in the background, then hand its connection back to the pool."""
+        task = asyncio.create_task(_drain_body(response))
+        self._drains.add(task)
+        task.add_done_callback(self._drains.discard)
+
+    async def poll(
+        self,
+        months: int = 1,
+        categories: Optional[List[str]] = None,
+    ) -> List[GridSnapshot]:
+        """
+        Fetch the facility page and the following month windows.
+
+        Args:
+            months: Number of consecutive month windows to fetch
+            categories: Categories to include (None = all)
+
+        Returns:
+            One GridSnapshot per month window, in order
+        """
+        # Only the last window can stop after the table; the others need the
+        # hidden form fields that follow it to page on
+        captured = self.captured
+        body = await self.fetch(captured.method, captured.url, captured.post_data, stop_after_table=months == 1)
+        snapshot, form_fields, _ = self.cache.parse(body, categories, key=0)
+        snapshots = [snapshot]
+
+        next_url = urljoin(captured.url, ONE_MONTH_LATER_PATH)
+        for i in range(1, months):
+            body = await self.fetch("POST", next_url, _paging_form(form_fields), stop_after_table=i == months - 1)
+            snapshot, form_fields, _ = self.cache.parse(body, categories, key=i)
+            snapshots.append(snapshot)
+
+        return snapshots
+
+
+async def _read_body(response: aiohttp.ClientResponse, stop_after_table: bool) -> Tuple[str, bool]:
+    """
+    Stream and decode a response body, optionally stopping after the slot table.
+
+    Returns:
+        (decoded HTML, whether a complete slot table was seen)
+    """
+    decoder = codecs.getincrementaldecoder(response.get_encoding())(errors="replace")
+    scanner = TableEndScanner()
+    parts = []
+    async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+        text = decoder.decode(chunk)
+        parts.append(text)
+        if scanner.feed(text) and stop_after_table:
+            # The rest is left unread for the caller to drain
+            return "".join(parts), True
+    parts.append(decoder.decode(b"", final=True))
+    return "".join(parts), scanner.closed
+
+
+async def _drain_body(response: aiohttp.ClientResponse) -> None:
+    """Discard the unread rest of a body, so the connection can be reused."""
+    try:
+        while await response.content.readany():
+            pass
+    except (aiohttp.ClientError, asyncio.TimeoutError):
+        response.close()
+        return
+    except asyncio.CancelledError:
+        response.close()
+        raise
+    response.release()
+
+
+def _paging_form(fields: List[Tuple[str, str]]) -> List[Tuple[str, str]]:
+    """Hidden fields plus the consent checkbox, as the browser would submit them."""
+    return list(fields) + [("reserveCaution", "on")]
+
+
+def _visible_text(body: str) -> str:
+    """Rough visible text of an error page, for diagnose_page markers."""
+    return re.sub(r"<[^>]+>", " ", body)
@@ -0,0 +1,152 @@
+"""Poll the facility page with fetch() from inside the page, swapping only the slot table."""
+from datetime import datetime
+from typing import Awaitable, Callable, List, Optional
+from playwright.async_api import Page
+from src.error_handler import PageStructureError, diagnose_page
+from src.http_poller import CapturedRequest
+from src.selectors import CATEGORY_ROW_ID_PREFIX, DATE_HEADER_CELLS, SLOT_TABLE
+from src.slot_detector import SCAN_GRID_SCRIPT, GridSnapshot, target_row_selector
+from src.logger import get_logger
+
+
+# Fetches the page's own request, parses it off-screen and replaces table#TBL and
+# the hidden form values in place; then reads the new table like SCAN_GRID_SCRIPT.
+# A form body keeps the captured fields but takes their values from the page's
+# current forms, so each poll sends the token the previous response set.
+IN_PAGE_POLL_SCRIPT = """
+async ([method, url, body, contentType, tableSelector, dateSelector, rowSelector, rowPrefix]) => {
+    if (body !== null && contentType.startsWith('application/x-www-form-urlencoded')) {
+        const live = new URLSearchParams();
+        document.querySelectorAll('form').forEach(form => {
+            for (const [name, value] of new URLSearchParams(new FormData(form))) {
+                live.append(name, value);
+            }
+        });
+        const params = new URLSearchParams();
+        const refreshed = new Set();
+        for (const [name, value] of new URLSearchParams(body)) {
+            if (!live.has(name)) {
+                params.append(name, value);
+            } else if (!refreshed.has(name)) {
+                refreshed.add(name);
+                live.getAll(name).forEach(v => params.append(name, v));
+            }
+        }
+        body = params.toString();
+    }
+    const response = await fetch(url, {
+        method,
+        body: body === null ? undefined : body,
+        headers: body === null ? {} : {'Content-Type': contentType},
+        credentials: 'same-origin',
+        cache: 'no-store',
+    });
+    const html = await response.text();
+    const result = {
+        status: response.status,
+        url: response.url,
+        retryAfter: response.headers.get('retry-after'),
+        swapped: false,
+        text: '',
+    };
+    const doc = new DOMParser().parseFromString(html, 'text/html');
+    const fresh = doc.querySelector(tableSelector);
+    const current = document.querySelector(tableSelector);
+    if (!fresh || !current || response.status >= 400) {
+        result.text = doc.body ? doc.body.textContent : '';
+        return result;
+    }
+    current.replaceWith(document.adoptNode(fresh));
+
+    // Tokens rotate per response; the booking links and the next poll submit the page's form
+    const values = {};
+    doc.querySelectorAll('input[type=hidden][name]').forEach(input => {
+        (values[input.name] = values[input.name] || []).push(input.value);
+    });
+    document.querySelectorAll('input[type=hidden][name]').forEach(input => {
+        const queue = values[input.name];
+        if (queue && queue.length) input.value = queue.shift();
+    });
+
+    result.swapped = true;
+    Object.assign(result, (%s)([dateSelector, rowSelector, rowPrefix]));
+    return result;
+}
+""" % SCAN_GRID_SCRIPT.strip()
+
+
+class InPagePoller:
+    """
+    Refreshes the slot table without navigating.
+
+    The request that loaded the facility page is captured once and then
+    re-sent with ``fetch()`` from the page itself, so cookies and session
+    state are the browser's own. A form body is rebuilt from the page's
+    current form values on every poll, so the CSRF token is always the one
+    the last response handed out. The response is parsed
+    with DOMParser and only ``table#TBL`` (plus the hidden form values) is
+    replaced, so there is no navigation, full-page layout or asset reload,
+    and the new slot links are immediately clickable for BookingHandler.
+    Only a compact summary (dates and available target cells) crosses back
+    to Python.
+    """
+
+    def __init__(self, page: Page, capture: Callable[[], Awaitable[CapturedRequest]]):
+        """
+        Initialize in-page poller.
+
+        Args:
+            page: Page showing the facility page
+            capture: Captures the facility page request (e.g. BrowserManager.capture_document_request)
+        """
+        self.page = page
+        self.capture = capture
+        self.request: Optional[CapturedRequest] = None
+        self.logger = get_logger()
+
+    def reset(self, page: Page) -> None:
+        """Use a new page; its request is captured again on the next poll."""
+        self.page = page
+        self.request = None
+
+    async def poll(self, categories: Optional[List[str]] = None) -> GridSnapshot:
+        """
+        Fetch the facility page in the page and swap in the new slot table.
+
+        Args:
+            categories: Categories to include (None = all)
+
+        Returns:
+            GridSnapshot of the swapped-in table
+
+        Raises:
+            BookingSystemError: If the response is an error, login or maintenance page,
+                or the current page has no slot table to replace
+        """
+        if self.request is None:
+            self.request = await self.capture()
+            self.logger.debug(f"In-page polling {self.request.method} {self.request.url}")
+
+        request = self.request
+        result = await self.page.evaluate(IN_PAGE_POLL_SCRIPT, [
+            request.method,
+            request.url,
+            request.post_data,
+            request.headers.get("content-type", "application/x-www-form-urlencoded"),
+            SLOT_TABLE,
+            DATE_HEADER_CELLS,
+            target_row_selector(categories),
+            CATEGORY_ROW_ID_PREFIX,
+        ])
+
+        error = diagnose_page(result["status"], result["url"], result["text"], result["retryAfter"])
+        if error:
+            raise error
+        if not result["swapped"]:
+            raise PageStructureError(f"Slot table not found in page or in-page response from {result['url']}")
+
+        return GridSnapshot(
+            taken_at=datetime.now(),
+            dates=result["dates"],
+            available=result["available"],
+        )
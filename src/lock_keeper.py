@@ -0,0 +1,235 @@
+"""Keep a locked reservation alive until the user finishes the form."""
+import asyncio
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, List, Optional, Sequence
+from playwright.async_api import Page
+from src.browser_manager import BrowserManager
+from src.error_handler import SessionExpiredError, diagnose_page
+from src.notifications import Notification
+from src.logger import get_logger
+
+
+# Outcomes of LockKeeper.keep
+COMPLETED = "completed"  # The form was submitted: the page shows a 完了 page
+RELEASED = "released"    # The page left the booking flow without a 完了 page (戻る, cancelled, browsed away)
+LAPSED = "lapsed"        # The site dropped the hold (session expired or error page after the deadline)
+STOPPED = "stopped"      # Shutdown requested
+
+# Same-origin GET from the page that only touches the session
+KEEPALIVE_SCRIPT = """
+async (url) => {
+    const response = await fetch(url, {credentials: 'same-origin', cache: 'no-store'});
+    return {status: response.status, url: response.url};
+}
+"""
+
+# Visible text of the page, to tell the form from an error page
+PAGE_TEXT_SCRIPT = "() => document.body ? document.body.innerText : ''"
+
+
+def countdown_notification(category: str, date: str, minutes_left: float, urgent: bool) -> Notification:
+    """Build the reminder that a held reservation is about to lapse."""
+    icon = "🚨" if urgent else "⏳"
+    return Notification(
+        key=f"hold:{category}:{date}:{minutes_left:g}",
+        title="予約ロック期限",
+        text=f"{icon} <b>{category}</b> {date}: 残り{minutes_left:g}分 - フォームを送信してください",
+        urgent=urgent,
+    )
+
+
+class LockKeeper:
+    """
+    Watches a locked reservation until it is submitted, lapses or we shut down.
+
+    The hold deadline is counted from the "同意する" click. Reminders go out
+    as each warning threshold is crossed, the later ones as urgent
+    notifications. The session is kept alive with a small in-page fetch, so
+    the form page is never reloaded under the user. The hold ends when the
+    page reaches a 完了 page (the form was submitted) or leaves the booking
+    flow without one.
+
+    The deadline is only an estimate of the site's hold, so passing it does
+    not end the hold by itself: the hold counts as lapsed once the site
+    shows it is gone (the keep-alive finds the session expired, or the
+    form page turned into a login or error page). Until then the form is
+    checked again every HOLD_CHECK_SECONDS.
+    """
+
+    # Same-origin page fetched to keep the session alive
+    KEEPALIVE_URL = BrowserManager.INITIAL_URL
+    TICK_SECONDS = 1.0
+    # Interval between checks that a hold past its deadline is still there
+    HOLD_CHECK_SECONDS = 30.0
+    # Reminders at or below this many minutes are sent as urgent
+    URGENT_MINUTES = 5
+
+    def __init__(
+        self,
+        page: Page,
+        category: str,
+        date: str,
+        hold_seconds: float,
+        notify: Callable[[Notification], Awaitable[None]],
+        keepalive_seconds: float = 240,
+        warning_minutes: Sequence[float] = (10, 5, 2, 1),
+        locked_at: Optional[datetime] = None,
+        clock: Callable[[], datetime] = datetime.now,
+    ):
+        """
+        Initialize lock keeper.
+
+        Args:
+            page: Page showing the locked reservation's form
+            category: Reserved category
+            date: Reserved date
+            hold_seconds: How long the site holds the reservation after "同意する"
+            notify: Sends a notification (e.g. NotificationHub.notify)
+            keepalive_seconds: Interval between session keep-alive requests (0 = off)
+            warning_minutes: Remaining minutes at which to send reminders
+            locked_at: When the reservation was locked (defaults to now)
+            clock: Wall-clock time source (injectable for tests)
+        """
+        self.page = page
+        self.category = category
+        self.date = date
+        self.notify = notify
+        self.keepalive_seconds = keepalive_seconds
+        self.clock = clock
+        self.deadline = (locked_at or clock()) + timedelta(seconds=hold_seconds)
+        self.session_expired = False
+        self._warnings: List[float] = sorted(set(warning_minutes), reverse=True)
+        self.logger = get_logger()
+
+    @property
+    def remaining(self) -> timedelta:
+        """Time left before the hold lapses."""
+        return self.deadline - self.clock()
+
+    async def keep(self, should_stop: Callable[[], bool]) -> str:
+        """
+        Hold the reservation until something ends it.
+
+        Args:
+            should_stop: Returns True once shutdown was requested
+
+        Returns:
+            COMPLETED, RELEASED, LAPSED or STOPPED
+        """
+        # Without the form page (e.g. resumed after a crash) only the deadline is tracked
+        track_page = BrowserManager.booking_step(self.page.url)
+        if not track_page:
+            self.logger.warning("Reservation form page is not open; only the hold deadline is tracked")
+        self.logger.info(f"Holding reservation until {self.deadline:%H:%M:%S}")
+        next_keepalive = self.clock() + timedelta(seconds=self.keepalive_seconds)
+        next_check = self.deadline
+
+        while True:
+            if should_stop():
+                return STOPPED
+
+            if track_page:
+                if "userLogin" in self.page.url:
+                    self.logger.warning("Sent back to the login page while holding the reservation")
+                    self.session_expired = True
+                    return LAPSED
+                ended = await self._form_ended()
+                if ended == COMPLETED:
+                    self.logger.info("Reservation form submitted, hold ended")
+                    return COMPLETED
+                if ended == RELEASED:
+                    self.logger.warning(f"Reservation form left without submitting ({self.page.url}), hold ended")
+                    return RELEASED
+
+            remaining = self.remaining.total_seconds()
+            if remaining <= 0 and self.clock() >= next_check:
+                if await self._hold_gone(track_page):
+                    self.logger.warning("Reservation hold deadline passed and the site dropped the hold")
+                    return LAPSED
+                if next_check == self.deadline:
+                    self.logger.warning("Reservation hold deadline passed, but the form is still open; keeping it")
+                next_check = self.clock() + timedelta(seconds=self.HOLD_CHECK_SECONDS)
+            await self._send_due_warnings(remaining / 60)
+
+            if self.keepalive_seconds > 0 and self.clock() >= next_keepalive:
+                next_keepalive = self.clock() + timedelta(seconds=self.keepalive_seconds)
+                if not await self._keepalive():
+                    self.session_expired = True
+                    return LAPSED
+
+            await asyncio.sleep(min(self.TICK_SECONDS, remaining) if remaining > 0 else self.TICK_SECONDS)
+
+    async def _form_ended(self) -> Optional[str]:
+        """
+        Check whether the form page was left.
+
+        Returns:
+            COMPLETED on a 完了 page, RELEASED once the page left the booking
+            flow without one, None while the form is open
+        """
+        try:
+            if "完了" in await self.page.title():
+                return COMPLETED
+        except Exception:
+            return None  # Mid-navigation
+        return None if BrowserManager.booking_step(self.page.url) else RELEASED
+
+    async def _hold_gone(self, track_page: bool) -> bool:
+        """
+        Check on the site whether a hold past its deadline is gone.
+
+        Args:
+            track_page: The form page is open
+
+        Returns:
+            True if the session expired or the form page shows an error;
+            also True without the form page, where only the deadline is known
+        """
+        if not track_page:
+            return True
+        if not await self._keepalive():
+            self.session_expired = True
+            return True
+        try:
+            text = await self.page.evaluate(PAGE_TEXT_SCRIPT)
+        except Exception:
+            return False  # Mid-navigation; checked again later
+        error = diagnose_page(None, self.page.url, text)
+        if error:
+            self.logger.warning(f"Reservation form page shows an error: {error}")
+            self.session_expired = isinstance(error, SessionExpiredError)
+            return True
+        return False
+
+    async def _send_due_warnings(self, minutes_left: float) -> None:
+        """Send one reminder for the thresholds crossed since the last tick."""
+        due = [m for m in self._warnings if minutes_left <= m]
+        if not due:
+            return
+        self._warnings = [m for m in self._warnings if minutes_left > m]
+        threshold = min(due)
+        self.logger.warning(f"⏳ Reservation hold lapses in {minutes_left:.1f} minutes")
+        await self.notify(countdown_notification(
+            self.category, self.date, threshold, urgent=threshold <= self.URGENT_MINUTES
+        ))
+
+    async def _keepalive(self) -> bool:
+        """
+        Touch the session from the page.
+
+        Returns:
+            False if the session has expired
+        """
+        if "userLogin" in self.page.url:
+            return False
+        try:
+            result = await self.page.evaluate(KEEPALIVE_SCRIPT, self.KEEPALIVE_URL)
+        except Exception as e:
+            self.logger.debug(f"Keep-alive request failed: {e}")
+            return True  # Page busy or navigating; try again next interval
+        error = diagnose_page(result["status"], result["url"])
+        if isinstance(error, SessionExpiredError):
+            self.logger.warning(f"Session expired while holding the reservation: {error}")
+            return False
+        self.logger.debug(f"Session keep-alive: HTTP {result['status']}")
+        return True
@@ -0,0 +1,176 @@
+"""Scheduled maintenance / off-hours windows of the e-kanagawa portal."""
+from dataclasses import dataclass
+from datetime import datetime, time, timedelta, timezone
+from typing import FrozenSet, List, Optional, Tuple
+
+
+# The portal runs on Japan Standard Time (no daylight saving)
+SITE_TIMEZONE = timezone(timedelta(hours=9), "JST")
+
+WEEKDAYS = ["mon", "tue", "wed", "thu", "fri", "sat", "sun"]
+
+
+def site_now() -> datetime:
+    """Current time in the site's timezone."""
+    return datetime.now(SITE_TIMEZONE)
+
+
+def _parse_days(spec: str) -> FrozenSet[int]:
+    spec = spec.lower()
+    if spec in ("daily", "*"):
+        return frozenset(range(7))
+    if spec == "weekdays":
+        return frozenset(range(5))
+    if spec == "weekends":
+        return frozenset((5, 6))
+
+    days = set()
+    for part in spec.split("/"):
+        if "-" in part:
+            first, last = part.split("-", 1)
+            start, end = WEEKDAYS.index(first), WEEKDAYS.index(last)
+            day = start
+            while True:
+                days.add(day)
+                if day == end:
+                    break
+                day = (day + 1) % 7
+        else:
+            days.add(WEEKDAYS.index(part))
+    return frozenset(days)
+
+
+def parse_clock_time(value: str) -> time:
+    """Parse an HH:MM clock time (24:00 is accepted as midnight)."""
+    hours, minutes = value.split(":")
+    if hours == "24" and minutes == "00":
+        return time(0, 0)
+    return time(int(hours), int(minutes))
+
+
+@dataclass(frozen=True)
+class MaintenanceWindow:
+    """A recurring window, e.g. every Sunday 02:00-06:00 JST."""
+    weekdays: FrozenSet[int]  # Days on which the window starts (0 = Monday)
+    start: time
+    end: time
+
+    @classmethod
+    def parse(cls, spec: str) -> "MaintenanceWindow":
+        """
+        Parse a window specification.
+
+        Format: ``[DAYS ]HH:MM-HH:MM`` where DAYS is ``daily`` (default),
+        ``weekdays``, ``weekends``, a day (``sun``), a range (``mon-fri``)
+        or several joined with ``/`` (``sat/sun``). Windows may cross midnight.
+
+        Args:
+            spec: Window specification
+
+        Returns:
+            Parsed MaintenanceWindow
+
+        Raises:
+            ValueError: If the specification is malformed
+        """
+        parts = spec.split()
+        try:
+            if len(parts) == 1:
+                days, times = "daily", parts[0]
+            elif len(parts) == 2:
+                days, times = parts
+            else:
+                raise ValueError("too many fields")
+
+            start, end = times.split("-")
+            return cls(
+                weekdays=_parse_days(days),
+                start=parse_clock_time(start),
+                end=parse_clock_time(end),
+            )
+        except ValueError as e:
+            raise ValueError(
+                f"Invalid maintenance window '{spec}' (expected e.g. 'sun 02:00-06:00'): {e}"
+            ) from e
+
+    def occurrence_at(self, now: datetime) -> Optional[Tuple[datetime, datetime]]:
+        """
+        Return the occurrence of this window that contains ``now``, if any.
+
+        Args:
+            now: Timezone-aware current time
+
+        Returns:
+            (start, end) in the site timezone, or None
+        """
+        now = now.astimezone(SITE_TIMEZONE)
+        # A window that crosses midnight may have started yesterday
+        for days_back in (1, 0):
+            day = now.date() - timedelta(days=days_back)
+            if day.weekday() not in self.weekdays:
+                continue
+            start = datetime.combine(day, self.start, SITE_TIMEZONE)
+            end = datetime.combine(day, self.end, SITE_TIMEZONE)
+            if end <= start:
+                end += timedelta(days=1)
+            if start <= now < end:
+                return start, end
+        return None
+
+
+class MaintenanceSchedule:
+    """A set of recurring maintenance windows."""
+
+    def __init__(self, windows: Optional[List[MaintenanceWindow]] = None):
+        """
+        Initialize maintenance schedule.
+
+        Args:
+            windows: Recurring windows during which the site is unavailable
+        """
+        self.windows = windows or []
+
+    @classmethod
+    def parse(cls, spec: str) -> "MaintenanceSchedule":
+        """
+        Parse a comma-separated list of windows (see MaintenanceWindow.parse).
+
+        Args:
+            spec: e.g. ``"daily 00:00-06:00, sun 06:00-09:00"``
+
+        Returns:
+            MaintenanceSchedule (empty if spec is blank)
+
+        Raises:
+            ValueError: If any window is malformed
+        """
+        windows = [MaintenanceWindow.parse(part.strip()) for part in spec.split(",") if part.strip()]
+        return cls(windows)
+
+    def current_window(self, now: Optional[datetime] = None) -> Optional[Tuple[datetime, datetime]]:
+        """
+        Return the window the site is in right now.
+
+        Back-to-back or overlapping windows are merged, so the returned end is
+        the moment the site is expected to be available again.
+
+        Args:
+            now: Timezone-aware time to check (defaults to the current time)
+
+        Returns:
+            (start, end) of the merged window, or None outside maintenance
+        """
+        now = now or site_now()
+        found = None
+        probe = now
+        # Follow chained windows; bounded so a misconfigured 24/7 window terminates
+        for _ in range(len(self.windows) * 8):
+            occurrences = [w.occurrence_at(probe) for w in self.windows]
+            occurrences = [o for o in occurrences if o]
+            if not occurrences:
+                break
+            end = max(o[1] for o in occurrences)
+            start = min(o[0] for o in occurrences)
+            found = (found[0] if found else start, end)
+            probe = end
+        return found
@@ -0,0 +1,201 @@
+"""Memory watchdog that keeps long-running Chromium sessions at flat memory."""
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from enum import Enum
+from typing import Deque, Optional
+from playwright.async_api import CDPSession, Page
+from src.process_stats import collect_chromium_stats
+from src.logger import get_logger
+
+
+BYTES_PER_MB = 1024 * 1024
+
+
+class RecycleAction(Enum):
+    """What the controller should do after a memory sample."""
+    NONE = "none"
+    RECYCLE_PAGE = "page"
+    RECYCLE_CONTEXT = "context"
+
+
+@dataclass
+class MemorySample:
+    """A single memory measurement of the monitoring browser."""
+    taken_at: datetime
+    browser_rss_mb: Optional[float] = None
+    renderer_rss_mb: Optional[float] = None
+    js_heap_used_mb: Optional[float] = None
+    js_heap_total_mb: Optional[float] = None
+    dom_nodes: Optional[int] = None
+    event_listeners: Optional[int] = None
+
+    def describe(self) -> str:
+        """Human readable one-line summary."""
+        def fmt(value: Optional[float]) -> str:
+            return f"{value:.1f}MB" if value is not None else "n/a"
+
+        return (
+            f"browser={fmt(self.browser_rss_mb)} renderer={fmt(self.renderer_rss_mb)} "
+            f"js_heap={fmt(self.js_heap_used_mb)}/{fmt(self.js_heap_total_mb)} "
+            f"nodes={self.dom_nodes if self.dom_nodes is not None else 'n/a'}"
+        )
+
+
+class MemoryWatchdog:
+    """
+    Samples browser/renderer RSS and the page's JS heap and decides when to recycle.
+
+    RSS is read from /proc for the Chromium process tree, the JS heap and DOM
+    counters come from the CDP ``Performance.getMetrics`` domain.
+    """
+
+    # Number of samples kept for trend reporting
+    HISTORY_SIZE = 120
+    # Consecutive over-limit samples after a page recycle before escalating
+    ESCALATE_AFTER = 2
+
+    def __init__(
+        self,
+        renderer_limit_mb: float = 768,
+        js_heap_limit_mb: float = 256,
+        browser_limit_mb: float = 1024,
+        browser_pid: Optional[int] = None,
+    ):
+        """
+        Initialize memory watchdog.
+
+        Args:
+            renderer_limit_mb: Renderer RSS above which the page is recycled
+            js_heap_limit_mb: Used JS heap above which the page is recycled
+            browser_limit_mb: Browser process RSS above which the context is recycled
+            browser_pid: Root pid of a detached browser (None = our own children)
+        """
+        self.renderer_limit_mb = renderer_limit_mb
+        self.js_heap_limit_mb = js_heap_limit_mb
+        self.browser_limit_mb = browser_limit_mb
+        self.browser_pid = browser_pid
+        self.history: Deque[MemorySample] = deque(maxlen=self.HISTORY_SIZE)
+        self.recycle_count = 0
+        self._over_limit_after_recycle = 0
+        self._cdp_session: Optional[CDPSession] = None
+        self._cdp_page: Optional[Page] = None
+        self.logger = get_logger()
+
+    async def sample(self, page: Page) -> MemorySample:
+        """
+        Take a memory sample for the given page.
+
+        Args:
+            page: Page whose renderer/JS heap should be measured
+
+        Returns:
+            MemorySample (fields are None when a source is unavailable)
+        """
+        sample = MemorySample(taken_at=datetime.now())
+
+        stats = collect_chromium_stats(self.browser_pid)
+        if stats is not None and stats.pids:
+            sample.browser_rss_mb = stats.browser_rss_mb
+            sample.renderer_rss_mb = stats.renderer_rss_mb
+
+        try:
+            session = await self._get_cdp_session(page)
+            result = await session.send("Performance.getMetrics")
+            metrics = {m["name"]: m["value"] for m in result.get("metrics", [])}
+            if "JSHeapUsedSize" in metrics:
+                sample.js_heap_used_mb = metrics["JSHeapUsedSize"] / BYTES_PER_MB
+            if "JSHeapTotalSize" in metrics:
+                sample.js_heap_total_mb = metrics["JSHeapTotalSize"] / BYTES_PER_MB
+            if "Nodes" in metrics:
+                sample.dom_nodes = int(metrics["Nodes"])
+            if "JSEventListeners" in metrics:
+                sample.event_listeners = int(metrics["JSEventListeners"])
+        except Exception as e:
+            self.logger.debug(f"Could not read CDP performance metrics: {e}")
+            self._cdp_session = None
+            self._cdp_page = None
+
+        self.history.append(sample)
+        self.logger.debug(f"Memory sample: {sample.describe()}")
+        return sample
+
+    def evaluate(self, sample: MemorySample) -> RecycleAction:
+        """
+        Decide whether the page or the whole context should be recycled.
+
+        Args:
+            sample: Latest memory sample
+
+        Returns:
+            RecycleAction to perform
+        """
+        if self.browser_limit_mb and (sample.browser_rss_mb or 0) > self.browser_limit_mb:
+            self.logger.warning(
+                f"Browser RSS {sample.browser_rss_mb:.1f}MB exceeds "
+                f"{self.browser_limit_mb}MB - recycling browser context"
+            )
+            return RecycleAction.RECYCLE_CONTEXT
+
+        page_over_limit = (
+            (self.renderer_limit_mb and (sample.renderer_rss_mb or 0) > self.renderer_limit_mb)
+            or (self.js_heap_limit_mb and (sample.js_heap_used_mb or 0) > self.js_heap_limit_mb)
+        )
+        if not page_over_limit:
+            self._over_limit_after_recycle = 0
+            return RecycleAction.NONE
+
+        if self.recycle_count and self._over_limit_after_recycle >= self.ESCALATE_AFTER:
+            # Fresh pages did not bring memory back down; start over with a new context
+            self.logger.warning("Page recycling did not reduce memory - recycling browser context")
+            self._over_limit_after_recycle = 0
+            return RecycleAction.RECYCLE_CONTEXT
+
+        self._over_limit_after_recycle += 1
+        self.logger.warning(f"Renderer memory over limit ({sample.describe()}) - recycling page")
+        return RecycleAction.RECYCLE_PAGE
+
+    def record_recycle(self, action: RecycleAction) -> None:
+        """
+        Note that a recycle was performed so CDP state is re-created.
+
+        Args:
+            action: The recycle action that was carried out
+        """
+        self.recycle_count += 1
+        self._cdp_session = None
+        self._cdp_page = None
+        if action == RecycleAction.RECYCLE_CONTEXT:
+            self._over_limit_after_recycle = 0
+        self.logger.info(f"✓ Browser {action.value} recycled (total recycles: {self.recycle_count})")
+
+    def log_trend(self) -> None:
+        """Log the memory growth rate over the retained sample window."""
+        if len(self.history) < 2:
+            return
+
+        first, last = self.history[0], self.history[-1]
+        hours = (last.taken_at - first.taken_at).total_seconds() / 3600
+        if hours <= 0:
+            return
+
+        def rate(start: Optional[float], end: Optional[float]) -> str:
+            if start is None or end is None:
+                return "n/a"
+            return f"{(end - start) / hours:+.1f}MB/h"
+
+        self.logger.info(
+            f"Memory trend over {hours * 60:.0f} min: "
+            f"renderer {rate(first.renderer_rss_mb, last.renderer_rss_mb)}, "
+            f"browser {rate(first.browser_rss_mb, last.browser_rss_mb)}, "
+            f"js_heap {rate(first.js_heap_used_mb, last.js_heap_used_mb)} "
+            f"(now: {last.describe()}, recycles: {self.recycle_count})"
+        )
+
+    async def _get_cdp_session(self, page: Page) -> CDPSession:
+        """Return a CDP session for the page, creating one if the page changed."""
+        if self._cdp_session is None or self._cdp_page is not page:
+            self._cdp_session = await page.context.new_cdp_session(page)
+            await self._cdp_session.send("Performance.enable")
+            self._cdp_page = page
+        return self._cdp_session
@@ -0,0 +1,69 @@
+"""Counters and timings for the monitoring loop."""
+from collections import defaultdict
+from typing import TYPE_CHECKING, Dict
+from src.event_bus import BookingResultEvent, GridSnapshotEvent, SlotDiffEvent
+from src.logger import get_logger
+
+if TYPE_CHECKING:
+    from src.grid_parser import ParseCacheStats
+
+
+class MonitorMetrics:
+    """
+    Simple in-process counters and timing totals.
+
+    Subscribed to the event bus for snapshot/diff/booking counts; other
+    components can record their own counters and timings directly.
+    """
+
+    def __init__(self):
+        """Initialize metrics."""
+        self.counters: Dict[str, int] = defaultdict(int)
+        self.timings: Dict[str, float] = defaultdict(float)
+        self.gauges: Dict[str, float] = {}
+        self.logger = get_logger()
+
+    def increment(self, name: str, amount: int = 1) -> None:
+        """Add to a counter."""
+        self.counters[name] += amount
+
+    def observe(self, name: str, seconds: float) -> None:
+        """Add to a timing total (and count the observation)."""
+        self.timings[name] += seconds
+        self.counters[f"{name}.count"] += 1
+
+    def gauge(self, name: str, value: float) -> None:
+        """Set a point-in-time value (e.g. live handle count)."""
+        self.gauges[name] = value
+
+    def record_parse_cache(self, stats: "ParseCacheStats") -> None:
+        """Publish the table hash short-circuit counters as gauges."""
+        self.gauge("table_hash_hits", stats.hits)
+        self.gauge("table_hash_misses", stats.misses)
+        self.gauge("table_hash_hit_rate", round(stats.hit_rate, 3))
+        self.gauge("table_hash_saved_ms", round(stats.saved_seconds * 1000))
+
+    async def on_event(self, event: object) -> None:
+        """Event bus handler."""
+        if isinstance(event, GridSnapshotEvent):
+            self.increment("snapshots")
+            self.increment("available_cells", len(event.snapshot.slots()))
+        elif isinstance(event, SlotDiffEvent):
+            self.increment("slots_appeared", len(event.appeared))
+            self.increment("slots_disappeared", len(event.disappeared))
+        elif isinstance(event, BookingResultEvent):
+            self.increment("bookings_succeeded" if event.result.success else "bookings_failed")
+
+    def summary(self) -> str:
+        """One-line summary of all counters, gauges and average timings."""
+        parts = [f"{name}={value}" for name, value in sorted(self.counters.items()) if not name.endswith(".count")]
+        parts += [f"{name}={value}" for name, value in sorted(self.gauges.items())]
+        for name, total in sorted(self.timings.items()):
+            count = self.counters.get(f"{name}.count", 0)
+            if count:
+                parts.append(f"{name}.avg={total / count * 1000:.0f}ms")
+        return ", ".join(parts)
+
+    def log_summary(self) -> None:
+        """Log the current summary."""
+        self.logger.info(f"Metrics: {self.summary()}")
@@ -0,0 +1,416 @@
+"""Multi-channel notification fan-out with deduplication, digests and rate limits."""
+import asyncio
+import html
+import platform
+import re
+import smtplib
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from email.message import EmailMessage
+from typing import Callable, Dict, List, Optional
+import aiohttp
+from src.booking_handler import BookingResult
+from src.telegram_notifier import TelegramNotifier, format_booking_result
+from src.logger import get_logger
+
+
+@dataclass
+class Notification:
+    """One thing to tell the user about."""
+    key: str  # Identity used for de-duplication
+    title: str
+    text: str  # May contain Telegram HTML (<b>, <i>)
+    urgent: bool = False  # Sent right away instead of waiting for the next digest
+    created_at: float = field(default_factory=time.monotonic)
+
+    def plain_text(self) -> str:
+        """Text without HTML markup, for channels that don't render it."""
+        return html.unescape(re.sub(r"<[^>]+>", "", self.text))
+
+
+def booking_notification(result: BookingResult) -> Notification:
+    """Build the (urgent) notification for a booking result."""
+    outcome = "success" if result.success else "failure"
+    return Notification(
+        key=f"booking:{outcome}:{result.category}:{result.date}:{time.time():.0f}",
+        title="予約ロック成功" if result.success else "予約失敗",
+        text=format_booking_result(result),
+        urgent=True,
+    )
+
+
+def availability_notification(category: str, date: str, month_offset: int = 1) -> Notification:
+    """Build the (digestible) notification for a newly available cell."""
+    return Notification(
+        key=f"slot:{category}:{date}",
+        title="空き枠",
+        text=f"🟢 <b>{category}</b> {date}" + (f" (+{month_offset}か月)" if month_offset > 1 else ""),
+    )
+
+
+class TokenBucket:
+    """Rate limiter: ``rate`` messages per ``per`` seconds, bursts up to ``burst``."""
+
+    def __init__(
+        self,
+        rate: float,
+        per: float = 60.0,
+        burst: Optional[int] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initialize token bucket.
+
+        Args:
+            rate: Messages allowed per period
+            per: Period in seconds
+            burst: Bucket size (defaults to rate)
+            clock: Monotonic time source (injectable for tests)
+        """
+        self.capacity = float(burst if burst is not None else max(1, rate))
+        self.refill_per_second = rate / per
+        self.tokens = self.capacity
+        self.clock = clock
+        self.updated = clock()
+        self.paused_until = 0.0
+
+    def _refill(self) -> None:
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.refill_per_second)
+        self.updated = now
+
+    def try_acquire(self) -> bool:
+        """Take a token if one is available."""
+        if self.clock() < self.paused_until:
+            return False
+        self._refill()
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+    def wait_time(self) -> float:
+        """Seconds until a token will be available."""
+        self._refill()
+        missing = max(0.0, 1 - self.tokens)
+        refill = missing / self.refill_per_second if self.refill_per_second else float("inf")
+        return max(refill, self.paused_until - self.clock())
+
+    def pause(self, seconds: float) -> None:
+        """Stop handing out tokens for a while (e.g. after an HTTP 429)."""
+        self.paused_until = max(self.paused_until, self.clock() + seconds)
+
+
+class NotificationChannel(ABC):
+    """Base class for notification destinations."""
+
+    name = "channel"
+
+    @abstractmethod
+    async def send(self, title: str, notifications: List[Notification]) -> bool:
+        """
+        Deliver one message covering one or more notifications.
+
+        Args:
+            title: Message title
+            notifications: Notifications to include (several = digest)
+
+        Returns:
+            True if delivered
+        """
+
+    @staticmethod
+    def join(notifications: List[Notification], plain: bool = False) -> str:
+        """Body text for a single notification or a digest."""
+        texts = [n.plain_text() if plain else n.text for n in notifications]
+        # Digest lines are one-liners; full messages get a blank line between them
+        separator = "\n\n" if any(n.urgent for n in notifications) else "\n"
+        return separator.join(texts)
+
+
+class TelegramChannel(NotificationChannel):
+    """One Telegram chat."""
+
+    def __init__(self, bot_token: str, chat_id: str):
+        """
+        Initialize Telegram channel.
+
+        Args:
+            bot_token: Telegram bot token
+            chat_id: Chat to send to
+        """
+        self.name = f"telegram:{chat_id}"
+        self.notifier = TelegramNotifier(bot_token=bot_token, chat_id=chat_id)
+
+    async def send(self, title: str, notifications: List[Notification]) -> bool:
+        body = self.join(notifications)
+        if len(notifications) > 1:
+            body = f"<b>{html.escape(title)}</b>\n\n{body}"
+        return await self.notifier.send_text(body)
+
+
+class WebhookChannel(NotificationChannel):
+    """POSTs JSON to a URL."""
+
+    def __init__(self, url: str, timeout: float = 10.0):
+        """
+        Initialize webhook channel.
+
+        Args:
+            url: Endpoint to POST to
+            timeout: Request timeout in seconds
+        """
+        self.name = f"webhook:{url}"
+        self.url = url
+        self.timeout = timeout
+        self.logger = get_logger()
+
+    async def send(self, title: str, notifications: List[Notification]) -> bool:
+        payload = {
+            "title": title,
+            "text": self.join(notifications, plain=True),
+            "events": [{"key": n.key, "title": n.title, "text": n.plain_text()} for n in notifications],
+        }
+        try:
+            async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=self.timeout)) as session:
+                async with session.post(self.url, json=payload) as response:
+                    if response.status >= 400:
+                        self.logger.error(f"Webhook {self.url} returned {response.status}")
+                    return response.status < 400
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            self.logger.error(f"Webhook {self.url} failed: {e}")
+            return False
+
+
+class EmailChannel(NotificationChannel):
+    """Sends e-mail through an SMTP server (e.g. a local relay)."""
+
+    def __init__(self, host: str, port: int, sender: str, recipients: List[str]):
+        """
+        Initialize e-mail channel.
+
+        Args:
+            host: SMTP host
+            port: SMTP port
+            sender: From address
+            recipients: To addresses
+        """
+        self.name = f"email:{','.join(recipients)}"
+        self.host = host
+        self.port = port
+        self.sender = sender
+        self.recipients = recipients
+        self.logger = get_logger()
+
+    def _send_sync(self, subject: str, body: str) -> None:
+        message = EmailMessage()
+        message["Subject"] = subject
+        message["From"] = self.sender
+        message["To"] = ", ".join(self.recipients)
+        message.set_content(body)
+        with smtplib.SMTP(self.host, self.port, timeout=10) as smtp:
+            smtp.send_message(message)
+
+    async def send(self, title: str, notifications: List[Notification]) -> bool:
+        try:
+            # smtplib is blocking; keep it off the event loop
+            await asyncio.to_thread(self._send_sync, title, self.join(notifications, plain=True))
+            return True
+        except (OSError, smtplib.SMTPException) as e:
+            self.logger.error(f"E-mail via {self.host}:{self.port} failed: {e}")
+            return False
+
+
+class DesktopChannel(NotificationChannel):
+    """Desktop notification via notify-send (Linux) or osascript (macOS)."""
+
+    name = "desktop"
+
+    def __init__(self):
+        """Initialize desktop channel."""
+        self.logger = get_logger()
+
+    async def send(self, title: str, notifications: List[Notification]) -> bool:
+        body = self.join(notifications, plain=True)
+        if platform.system() == "Darwin":
+            script = f"display notification {self._quote(body)} with title {self._quote(title)}"
+            command = ["osascript", "-e", script]
+        else:
+            command = ["notify-send", title, body]
+
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *command,
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.DEVNULL,
+            )
+            return await process.wait() == 0
+        except OSError as e:
+            self.logger.warning(f"Desktop notification unavailable: {e}")
+            return False
+
+    @staticmethod
+    def _quote(text: str) -> str:
+        return '"' + text.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+@dataclass
+class _ChannelState:
+    channel: NotificationChannel
+    limiter: TokenBucket
+    pending: List[Notification] = field(default_factory=list)
+    failures: int = 0
+
+
+class NotificationHub:
+    """
+    Fans notifications out to every channel.
+
+    Repeats of the same key within ``dedupe_seconds`` are dropped. Non-urgent
+    notifications wait up to ``digest_seconds`` and are merged into one
+    digest per channel; a channel that is out of rate-limit tokens keeps
+    merging instead of queueing, so bursts of slot churn never hit an API
+    limit. Urgent notifications (booking results) skip the digest wait.
+    """
+
+    MAX_SEND_FAILURES = 3  # Pending notifications are dropped after this many failed sends
+
+    def __init__(
+        self,
+        channels: List[NotificationChannel],
+        digest_seconds: float = 10.0,
+        dedupe_seconds: float = 300.0,
+        rate_per_minute: float = 20.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initialize notification hub.
+
+        Args:
+            channels: Destinations
+            digest_seconds: Max wait for coalescing non-urgent notifications
+            dedupe_seconds: Window in which a repeated key is ignored
+            rate_per_minute: Per-channel message rate limit
+            clock: Monotonic time source (injectable for tests)
+        """
+        self.states = [
+            _ChannelState(channel=c, limiter=TokenBucket(rate_per_minute, 60.0, clock=clock))
+            for c in channels
+        ]
+        self.digest_seconds = digest_seconds
+        self.dedupe_seconds = dedupe_seconds
+        self.clock = clock
+        self._seen: Dict[str, float] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.logger = get_logger()
+
+    def start(self) -> None:
+        """Start the background digest flusher."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._flush_loop())
+
+    async def notify(self, notification: Notification) -> None:
+        """
+        Queue a notification on every channel.
+
+        Args:
+            notification: Notification to send
+        """
+        now = self.clock()
+        seen_at = self._seen.get(notification.key)
+        if seen_at is not None and now - seen_at < self.dedupe_seconds:
+            self.logger.debug(f"Duplicate notification suppressed: {notification.key}")
+            return
+        self._seen[notification.key] = now
+        self._forget_old(now)
+
+        notification.created_at = now
+        for state in self.states:
+            state.pending.append(notification)
+            if notification.urgent:
+                await self._flush(state, force=True)
+
+    def forget(self, key: str) -> None:
+        """Allow a key to be notified again (e.g. a slot that disappeared)."""
+        self._seen.pop(key, None)
+
+    async def flush_due(self) -> None:
+        """Send every channel's digest whose wait is over (and that has a token)."""
+        for state in self.states:
+            await self._flush(state)
+
+    async def close(self) -> None:
+        """Stop the flusher and send whatever is still pending."""
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        for state in self.states:
+            await self._flush(state, force=True)
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(1)
+            await self.flush_due()
+
+    async def _flush(self, state: _ChannelState, force: bool = False) -> None:
+        if not state.pending:
+            return
+        oldest = min(n.created_at for n in state.pending)
+        urgent = any(n.urgent for n in state.pending)
+        if not (force or urgent or self.clock() - oldest >= self.digest_seconds):
+            return
+
+        if not state.limiter.try_acquire():
+            if not urgent:
+                return  # Keep merging until a token is free
+            # Urgent messages wait for a token rather than being held for a digest
+            await asyncio.sleep(state.limiter.wait_time())
+            state.limiter.try_acquire()
+
+        batch, state.pending = state.pending, []
+        title = batch[0].title if len(batch) == 1 else f"{len(batch)}件の通知"
+        if await state.channel.send(title, batch):
+            state.failures = 0
+            return
+
+        state.failures += 1
+        if state.failures >= self.MAX_SEND_FAILURES:
+            self.logger.error(f"Dropping {len(batch)} notification(s) for {state.channel.name} after repeated failures")
+            state.failures = 0
+        else:
+            # Retry with the next digest, ahead of anything newer
+            state.pending = batch + state.pending
+            state.limiter.pause(5 * state.failures)
+
+    def _forget_old(self, now: float) -> None:
+        if len(self._seen) > 1000:
+            self._seen = {k: t for k, t in self._seen.items() if now - t < self.dedupe_seconds}
+
+
+def build_channels(config) -> List[NotificationChannel]:
+    """
+    Create the configured notification channels.
+
+    Args:
+        config: Application Config
+
+    Returns:
+        List of channels (Telegram chats first)
+    """
+    channels: List[NotificationChannel] = [
+        TelegramChannel(config.telegram_bot_token, chat_id)
+        for chat_id in config.telegram_chat_ids
+    ]
+    channels += [WebhookChannel(url) for url in config.notify_webhook_urls]
+    if config.notify_smtp_host and config.notify_email_to:
+        channels.append(EmailChannel(
+            config.notify_smtp_host,
+            config.notify_smtp_port,
+            config.notify_email_from,
+            config.notify_email_to,
+        ))
+    if config.notify_desktop:
+        channels.append(DesktopChannel())
+    return channels
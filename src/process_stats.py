@@ -0,0 +1,154 @@
+"""Process-level resource statistics for the Chromium processes we drive."""
+import os
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+
+# Executable names used by Playwright's Chromium builds
+CHROMIUM_EXECUTABLES = ("chrome", "chromium", "headless_shell")
+
+PROC_ROOT = "/proc"
+
+
+@dataclass
+class ChromiumProcessStats:
+    """Aggregated resource usage of a Chromium process tree."""
+    browser_rss_mb: float = 0.0
+    renderer_rss_mb: float = 0.0
+    other_rss_mb: float = 0.0
+    cpu_seconds: float = 0.0
+    renderer_count: int = 0
+    pids: List[int] = field(default_factory=list)
+
+    @property
+    def total_rss_mb(self) -> float:
+        """Total resident memory of the whole tree in MB."""
+        return self.browser_rss_mb + self.renderer_rss_mb + self.other_rss_mb
+
+
+def is_supported() -> bool:
+    """Return True if process statistics can be read on this platform."""
+    return os.path.isdir(os.path.join(PROC_ROOT, "self"))
+
+
+def _read_file(path: str) -> Optional[str]:
+    try:
+        with open(path, "rb") as f:
+            return f.read().decode("utf-8", errors="replace")
+    except OSError:
+        return None
+
+
+def _read_ppid_map() -> Dict[int, int]:
+    """Map every visible pid to its parent pid."""
+    ppids: Dict[int, int] = {}
+    for entry in os.listdir(PROC_ROOT):
+        if not entry.isdigit():
+            continue
+        stat = _read_file(os.path.join(PROC_ROOT, entry, "stat"))
+        if not stat:
+            continue
+        # The command name is wrapped in parentheses and may contain spaces
+        fields = stat[stat.rfind(")") + 2:].split()
+        try:
+            ppids[int(entry)] = int(fields[1])
+        except (IndexError, ValueError):
+            continue
+    return ppids
+
+
+def _descendants(root_pid: int, ppids: Dict[int, int]) -> List[int]:
+    children: Dict[int, List[int]] = {}
+    for pid, ppid in ppids.items():
+        children.setdefault(ppid, []).append(pid)
+
+    result = []
+    stack = [root_pid]
+    while stack:
+        pid = stack.pop()
+        for child in children.get(pid, []):
+            result.append(child)
+            stack.append(child)
+    return result
+
+
+def _rss_mb(pid: int) -> float:
+    status = _read_file(os.path.join(PROC_ROOT, str(pid), "status"))
+    if not status:
+        return 0.0
+    for line in status.splitlines():
+        if line.startswith("VmRSS:"):
+            # Format: "VmRSS:	  123456 kB"
+            return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def _cpu_seconds(pid: int) -> float:
+    stat = _read_file(os.path.join(PROC_ROOT, str(pid), "stat"))
+    if not stat:
+        return 0.0
+    fields = stat[stat.rfind(")") + 2:].split()
+    try:
+        # utime and stime are fields 14 and 15 of /proc/<pid>/stat
+        ticks = int(fields[11]) + int(fields[12])
+    except (IndexError, ValueError):
+        return 0.0
+    return ticks / os.sysconf("SC_CLK_TCK")
+
+
+def _cmdline(pid: int) -> List[str]:
+    raw = _read_file(os.path.join(PROC_ROOT, str(pid), "cmdline"))
+    if not raw:
+        return []
+    return [arg for arg in raw.split("\0") if arg]
+
+
+def collect_chromium_stats(root_pid: Optional[int] = None) -> Optional[ChromiumProcessStats]:
+    """
+    Collect RSS and CPU usage of all Chromium processes below a root process.
+
+    Playwright starts Chromium as a grandchild of the Python process (through
+    its driver), so by default the current process is used as the root.
+
+    Args:
+        root_pid: Pid whose descendants are inspected (defaults to this process)
+
+    Returns:
+        ChromiumProcessStats, or None if /proc is not available
+    """
+    if not is_supported():
+        return None
+
+    root_pid = root_pid if root_pid is not None else os.getpid()
+    ppids = _read_ppid_map()
+    candidates = _descendants(root_pid, ppids)
+    if root_pid != os.getpid():
+        # A detached browser server is itself the browser process
+        candidates.insert(0, root_pid)
+
+    stats = ChromiumProcessStats()
+    for pid in candidates:
+        args = _cmdline(pid)
+        if not args:
+            continue
+        executable = os.path.basename(args[0]).lower()
+        if not any(name in executable for name in CHROMIUM_EXECUTABLES):
+            continue
+
+        rss = _rss_mb(pid)
+        process_type = next(
+            (arg.split("=", 1)[1] for arg in args if arg.startswith("--type=")),
+            None,
+        )
+        if process_type is None:
+            stats.browser_rss_mb += rss
+        elif process_type == "renderer":
+            stats.renderer_rss_mb += rss
+            stats.renderer_count += 1
+        else:
+            stats.other_rss_mb += rss
+
+        stats.cpu_seconds += _cpu_seconds(pid)
+        stats.pids.append(pid)
+
+    return stats
@@ -0,0 +1,230 @@
+"""Circuit breaker and jittered backoff policy for the monitoring loop."""
+import random
+import time
+from dataclasses import dataclass
+from enum import Enum
+from typing import Callable, Dict, Optional, Type
+from src.error_handler import (
+    BookingSystemError,
+    PageStructureError,
+    RateLimitedError,
+    SessionExpiredError,
+    SiteMaintenanceError,
+    TransientError,
+)
+from src.logger import get_logger
+
+
+@dataclass(frozen=True)
+class BackoffPolicy:
+    """Exponential backoff with "full jitter" between a floor and a cap."""
+    base: float
+    cap: float
+    multiplier: float = 2.0
+    minimum: float = 0.0
+
+    def delay(self, attempt: int) -> float:
+        """
+        Delay before the given retry attempt.
+
+        Args:
+            attempt: Zero-based number of consecutive failures
+
+        Returns:
+            Delay in seconds, uniformly drawn from [minimum, nominal backoff]
+        """
+        nominal = min(self.cap, self.base * (self.multiplier ** attempt))
+        return random.uniform(min(self.minimum, nominal), nominal)
+
+
+class CircuitState(Enum):
+    """Circuit breaker states."""
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Stops requests to the site after repeated failures.
+
+    After ``failure_threshold`` consecutive failures the circuit opens for
+    ``recovery_timeout`` seconds. Once that passes a single probe is allowed
+    (half-open); success closes the circuit, failure re-opens it with a
+    doubled timeout up to ``max_recovery_timeout``.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 30.0,
+        max_recovery_timeout: float = 900.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initialize circuit breaker.
+
+        Args:
+            failure_threshold: Consecutive failures that open the circuit
+            recovery_timeout: Initial open period in seconds
+            max_recovery_timeout: Upper bound for the open period
+            clock: Monotonic time source (injectable for tests)
+        """
+        self.failure_threshold = failure_threshold
+        self.initial_recovery_timeout = recovery_timeout
+        self.recovery_timeout = recovery_timeout
+        self.max_recovery_timeout = max_recovery_timeout
+        self.clock = clock
+        self.state = CircuitState.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self.logger = get_logger()
+
+    def allow_request(self) -> bool:
+        """Return True if a request may be sent now (moves OPEN to HALF_OPEN when due)."""
+        if self.state == CircuitState.OPEN and self.time_until_retry() <= 0:
+            self.state = CircuitState.HALF_OPEN
+            self.logger.info("Circuit half-open - sending probe request")
+        return self.state != CircuitState.OPEN
+
+    def time_until_retry(self) -> float:
+        """Seconds until the circuit allows a probe (0 if not open)."""
+        if self.state != CircuitState.OPEN or self.opened_at is None:
+            return 0.0
+        return max(0.0, self.opened_at + self.recovery_timeout - self.clock())
+
+    def record_success(self) -> None:
+        """Record a successful request."""
+        if self.state != CircuitState.CLOSED:
+            self.logger.info("✓ Circuit closed - site is responding again")
+        self.state = CircuitState.CLOSED
+        self.consecutive_failures = 0
+        self.recovery_timeout = self.initial_recovery_timeout
+        self.opened_at = None
+
+    def record_failure(self, force_open: bool = False) -> None:
+        """
+        Record a failed request.
+
+        Args:
+            force_open: Open the circuit regardless of the failure count
+        """
+        self.consecutive_failures += 1
+
+        if self.state == CircuitState.HALF_OPEN:
+            # The probe failed: stay away for longer
+            self.recovery_timeout = min(self.max_recovery_timeout, self.recovery_timeout * 2)
+            self._open()
+        elif force_open or self.consecutive_failures >= self.failure_threshold:
+            if self.state != CircuitState.OPEN:
+                self._open()
+
+    def _open(self) -> None:
+        self.state = CircuitState.OPEN
+        self.opened_at = self.clock()
+        self.logger.warning(
+            f"Circuit open after {self.consecutive_failures} failures - "
+            f"pausing requests for {self.recovery_timeout:.0f} seconds"
+        )
+
+
+class RecoveryAction(Enum):
+    """What the controller should do before the next monitoring cycle."""
+    RETRY = "retry"
+    RENAVIGATE = "renavigate"
+    RELOGIN = "relogin"
+    SUSPEND = "suspend"
+
+
+@dataclass
+class RecoveryDecision:
+    """Outcome of the recovery policy for one error."""
+    action: RecoveryAction
+    delay: float
+    error: BookingSystemError
+
+
+# Backoff per error class; unknown errors fall back to BookingSystemError
+DEFAULT_BACKOFF: Dict[Type[BookingSystemError], BackoffPolicy] = {
+    TransientError: BackoffPolicy(base=0.5, cap=30.0),
+    PageStructureError: BackoffPolicy(base=2.0, cap=60.0, minimum=1.0),
+    SessionExpiredError: BackoffPolicy(base=1.0, cap=120.0),
+    RateLimitedError: BackoffPolicy(base=30.0, cap=600.0, minimum=15.0),
+    SiteMaintenanceError: BackoffPolicy(base=60.0, cap=900.0, minimum=30.0),
+    BookingSystemError: BackoffPolicy(base=5.0, cap=120.0, minimum=1.0),
+}
+
+ACTIONS: Dict[Type[BookingSystemError], RecoveryAction] = {
+    TransientError: RecoveryAction.RETRY,
+    PageStructureError: RecoveryAction.RENAVIGATE,
+    SessionExpiredError: RecoveryAction.RELOGIN,
+    RateLimitedError: RecoveryAction.RETRY,
+    SiteMaintenanceError: RecoveryAction.SUSPEND,
+    BookingSystemError: RecoveryAction.RETRY,
+}
+
+
+class RecoveryPolicy:
+    """Chooses a recovery action and delay for classified errors."""
+
+    def __init__(
+        self,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        backoff: Optional[Dict[Type[BookingSystemError], BackoffPolicy]] = None,
+    ):
+        """
+        Initialize recovery policy.
+
+        Args:
+            circuit_breaker: Circuit breaker shared by all error types
+            backoff: Backoff overrides per error class
+        """
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
+        self.backoff = dict(DEFAULT_BACKOFF)
+        if backoff:
+            self.backoff.update(backoff)
+        self._attempts: Dict[Type[BookingSystemError], int] = {}
+        self.logger = get_logger()
+
+    def record_success(self) -> None:
+        """Reset backoff counters after a healthy monitoring cycle."""
+        self._attempts.clear()
+        self.circuit_breaker.record_success()
+
+    def decide(self, error: BookingSystemError) -> RecoveryDecision:
+        """
+        Decide how to recover from an error.
+
+        Args:
+            error: Classified error from the monitoring loop
+
+        Returns:
+            RecoveryDecision with the action to take and how long to wait
+        """
+        error_class = self._lookup_class(type(error))
+        attempt = self._attempts.get(error_class, 0)
+        self._attempts[error_class] = attempt + 1
+
+        delay = self.backoff[error_class].delay(attempt)
+        if isinstance(error, RateLimitedError) and error.retry_after:
+            delay = max(delay, error.retry_after)
+
+        # Outages and throttling open the circuit immediately; other errors count up
+        self.circuit_breaker.record_failure(
+            force_open=isinstance(error, (RateLimitedError, SiteMaintenanceError))
+        )
+        delay = max(delay, self.circuit_breaker.time_until_retry())
+
+        decision = RecoveryDecision(action=ACTIONS[error_class], delay=delay, error=error)
+        self.logger.debug(
+            f"{type(error).__name__} (attempt {attempt + 1}): "
+            f"{decision.action.value} in {decision.delay:.1f}s "
+            f"(circuit {self.circuit_breaker.state.value})"
+        )
+        return decision
+
+    def _lookup_class(self, error_type: type) -> Type[BookingSystemError]:
+        for klass in error_type.__mro__:
+            if klass in self.backoff:
+                return klass
+        return BookingSystemError
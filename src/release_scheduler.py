@@ -0,0 +1,207 @@
+"""Server-clock synchronised burst polling around known slot release times."""
+import asyncio
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, time as clock_time
+from email.utils import parsedate_to_datetime
+from typing import List, Optional, Tuple
+import aiohttp
+from src.maintenance_schedule import SITE_TIMEZONE, parse_clock_time, site_now
+from src.logger import get_logger
+
+
+class ServerClock:
+    """
+    Estimates the offset between the site's clock and ours from HTTP Date headers.
+
+    A Date header only has one-second resolution, so each sample bounds the
+    offset to an interval: the server stamped ``date`` at some local instant
+    between sending the request (t0) and receiving the response (t1), and its
+    true time was in ``[date, date + 1)``. Intersecting the intervals of
+    samples taken at staggered sub-second phases narrows the offset down to
+    roughly the round-trip jitter.
+    """
+
+    def __init__(self, url: str, samples: int = 8, timeout: float = 5.0):
+        """
+        Initialize server clock.
+
+        Args:
+            url: Site URL to sample (a cheap HEAD request is used)
+            samples: Number of Date samples per measurement
+            timeout: Per-request timeout in seconds
+        """
+        self.url = url
+        self.samples = samples
+        self.timeout = timeout
+        self.offset: float = 0.0  # server time - local time, in seconds
+        self.uncertainty: Optional[float] = None
+        self.measured_at: Optional[float] = None
+        self.logger = get_logger()
+
+    async def measure(self) -> float:
+        """
+        Measure the server clock offset.
+
+        Returns:
+            Offset in seconds (server minus local); 0 if no sample succeeded
+        """
+        low, high = float("-inf"), float("inf")
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+
+        async with aiohttp.ClientSession(timeout=timeout) as session:
+            for i in range(self.samples):
+                # Spread samples over the second so the boundaries bracket the offset
+                if i:
+                    phase = i / self.samples
+                    await asyncio.sleep((phase - time.time() % 1) % 1)
+
+                bounds = await self._sample(session)
+                if bounds:
+                    low, high = max(low, bounds[0]), min(high, bounds[1])
+
+        if low == float("-inf") or low > high:
+            self.logger.warning("Could not measure server clock offset; assuming local clock is correct")
+            self.offset, self.uncertainty = 0.0, None
+        else:
+            self.offset = (low + high) / 2
+            self.uncertainty = (high - low) / 2
+            self.logger.info(
+                f"Server clock offset: {self.offset * 1000:+.0f}ms "
+                f"(±{self.uncertainty * 1000:.0f}ms)"
+            )
+
+        self.measured_at = time.monotonic()
+        return self.offset
+
+    async def _sample(self, session: aiohttp.ClientSession) -> Optional[Tuple[float, float]]:
+        """Return (min_offset, max_offset) implied by one Date header, or None."""
+        try:
+            t0 = time.time()
+            async with session.head(self.url, allow_redirects=False) as response:
+                t1 = time.time()
+                date_header = response.headers.get("Date")
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            self.logger.debug(f"Clock sample failed: {e}")
+            return None
+
+        if not date_header:
+            return None
+
+        try:
+            server_time = parsedate_to_datetime(date_header).timestamp()
+        except (TypeError, ValueError):
+            return None
+
+        return server_time - t1, server_time + 1 - t0
+
+    def age(self) -> Optional[float]:
+        """Seconds since the last measurement (None if never measured)."""
+        if self.measured_at is None:
+            return None
+        return time.monotonic() - self.measured_at
+
+    def server_now(self) -> datetime:
+        """Current time according to the server clock, in the site timezone."""
+        return datetime.fromtimestamp(time.time() + self.offset, SITE_TIMEZONE)
+
+    def seconds_until(self, server_instant: datetime) -> float:
+        """
+        Local seconds to wait until the server clock reaches an instant.
+
+        Args:
+            server_instant: Timezone-aware instant on the server clock
+
+        Returns:
+            Seconds from now (negative if already passed)
+        """
+        return server_instant.timestamp() - (time.time() + self.offset)
+
+
+@dataclass(frozen=True)
+class BurstPlan:
+    """A burst of polls around one release instant."""
+    instant: datetime  # Release time on the server clock
+    preload_at: datetime  # When the page is reloaded to warm everything up
+    end: datetime  # Last poll starts before this
+    interval: float  # Seconds between poll starts
+
+
+class ReleaseSchedule:
+    """Daily release instants (JST) at which new slots tend to appear."""
+
+    def __init__(
+        self,
+        times: List[clock_time],
+        preload_seconds: float = 3.0,
+        duration_seconds: float = 20.0,
+        interval_seconds: float = 0.3,
+    ):
+        """
+        Initialize release schedule.
+
+        Args:
+            times: Daily release times (datetime.time) in JST
+            preload_seconds: Reload the page this long before each instant
+            duration_seconds: Keep burst polling for this long after the instant
+            interval_seconds: Spacing between burst poll starts
+        """
+        self.times = sorted(times)
+        self.preload_seconds = preload_seconds
+        self.duration_seconds = duration_seconds
+        self.interval_seconds = interval_seconds
+
+    @classmethod
+    def parse(cls, spec: str, **kwargs) -> "ReleaseSchedule":
+        """
+        Parse a comma-separated list of HH:MM release times.
+
+        Args:
+            spec: e.g. ``"00:00,09:00"``
+            **kwargs: Burst settings passed to the constructor
+
+        Returns:
+            ReleaseSchedule (empty if spec is blank)
+
+        Raises:
+            ValueError: If a time is malformed
+        """
+        times = []
+        for part in spec.split(","):
+            part = part.strip()
+            if not part:
+                continue
+            try:
+                times.append(parse_clock_time(part))
+            except ValueError as e:
+                raise ValueError(f"Invalid release time '{part}' (expected HH:MM): {e}") from e
+        return cls(times, **kwargs)
+
+    def next_burst(self, now: Optional[datetime] = None) -> Optional[BurstPlan]:
+        """
+        Return the next burst that has not finished yet.
+
+        Args:
+            now: Current server time (defaults to the local site time)
+
+        Returns:
+            BurstPlan, or None if no release times are configured
+        """
+        if not self.times:
+            return None
+
+        now = (now or site_now()).astimezone(SITE_TIMEZONE)
+        duration = timedelta(seconds=self.duration_seconds)
+        # Today's instants first, then tomorrow's
+        for day_offset in (0, 1):
+            day = now.date() + timedelta(days=day_offset)
+            for release_time in self.times:
+                instant = datetime.combine(day, release_time, SITE_TIMEZONE)
+                if instant + duration > now:
+                    return BurstPlan(
+                        instant=instant,
+                        preload_at=instant - timedelta(seconds=self.preload_seconds),
+                        end=instant + duration,
+                        interval=self.interval_seconds,
+                    )
+        return None
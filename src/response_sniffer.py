@@ -0,0 +1,80 @@
+"""Read the slot table from the facility page's HTTP response while Chromium renders it."""
+import time
+from dataclasses import dataclass
+from typing import List, Optional
+from playwright.async_api import Page
+from src.error_handler import PageStructureError, diagnose_page
+from src.grid_parser import ParseCache
+from src.http_poller import _visible_text
+from src.slot_detector import GridSnapshot
+from src.logger import get_logger
+
+
+@dataclass
+class SniffResult:
+    """Slot table parsed from a reload's main document response."""
+    snapshot: GridSnapshot
+    html: str
+    url: str
+    body_ms: float  # Reload start to full response body, before rendering finishes
+
+
+class ResponseSniffer:
+    """
+    Reloads the facility page and parses the raw HTML in Python.
+
+    The reload only waits for the response to commit; the body is read and
+    parsed with FacilityPageParser while Chromium is still building the DOM,
+    so detection does not wait for the load event or network idle. A hit
+    found this way is booked by waiting for its link to be attached (see
+    ``SlotDetector.locate_slot``), which happens as soon as the parser in
+    the browser reaches that cell.
+    """
+
+    def __init__(self, page: Page):
+        """
+        Initialize response sniffer.
+
+        Args:
+            page: Page showing the facility page
+        """
+        self.page = page
+        self.cache = ParseCache()
+        self.logger = get_logger()
+
+    async def reload(self, categories: Optional[List[str]] = None) -> SniffResult:
+        """
+        Reload the page and parse the slot table from the response body.
+
+        Args:
+            categories: Categories to include (None = all)
+
+        Returns:
+            SniffResult for the new page
+
+        Raises:
+            BookingSystemError: If the response is an error, login or maintenance page
+        """
+        started = time.monotonic()
+        response = await self.page.reload(wait_until="commit")
+        if response is None:
+            raise PageStructureError(f"Reload of {self.page.url} returned no response")
+
+        html = await response.text()
+        body_ms = (time.monotonic() - started) * 1000
+        snapshot, _, table_found = self.cache.parse(html, categories)
+
+        status = response.status
+        error = diagnose_page(
+            status,
+            response.url,
+            _visible_text(html) if status >= 400 or not table_found else "",
+            response.headers.get("retry-after"),
+        )
+        if error:
+            raise error
+        if not table_found:
+            raise PageStructureError(f"Slot table not found in response from {response.url}")
+
+        self.logger.debug(f"Sniffed facility page in {body_ms:.0f}ms ({len(snapshot.slots())} target cells)")
+        return SniffResult(snapshot=snapshot, html=html, url=response.url, body_ms=body_ms)
@@ -19,6 +19,9 @@ DATE_HEADER_CELLS = "tr#height_headday td.time--table.time--th--date"
 # Category rows (each row represents a 予約枠名 like 普通車ＡＭ, 準中型車ＡＭ, etc.)
 # Row IDs follow pattern: height_auto_{category_name}
 CATEGORY_ROW_PREFIX = "tr[id^='height_auto_']"
+CATEGORY_ROW_ID_PREFIX = "height_auto_"
+# One category's row (format with category=...); IDs are exact, so no text matching is needed
+CATEGORY_ROW_BY_ID = "tr[id='height_auto_{category}']"
 
 # Slot cell states
 SLOT_CELLS = {
@@ -1,26 +1,35 @@
 """Slot detection logic for available booking slots."""
-from dataclasses import dataclass
-from datetime import datetime
-from typing import List, Optional
-from playwright.async_api import Page, ElementHandle
+from dataclasses import dataclass, field, replace
+from datetime import date, datetime, timedelta
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+from playwright.async_api import Page, ElementHandle, TimeoutError as PlaywrightTimeoutError
+from src.domain import TargetMask, in_range, parse_onclick_date, parse_slot_date, window_reference
+from src.maintenance_schedule import site_now
+from src.handle_arena import HandleArena, HandleStats, release_handle
 from src.logger import get_logger
 from src.selectors import (
     CONSENT_CHECKBOX,
+    CONSENT_CHECKBOX_LABEL,
     SLOT_TABLE,
     DATE_HEADER_CELLS,
     CATEGORY_ROW_PREFIX,
+    CATEGORY_ROW_ID_PREFIX,
+    CATEGORY_ROW_BY_ID,
     SLOT_CELLS,
     AVAILABLE_SLOT_LINK,
-    CATEGORY_NAME_CELL,
 )
 
+if TYPE_CHECKING:
+    from src.event_bus import SlotDiffEvent, SnapshotPublisher
+
 
 @dataclass
 class SlotInfo:
     """Information about a booking slot."""
     category: str  # e.g., "普通車ＡＭ", "準中型車ＡＭ"
     date: str  # e.g., "01/20 (Tue)"
-    element: ElementHandle  # The clickable <a> element
+    element: Optional[ElementHandle]  # The clickable <a> element (None once released)
+    day: Optional[date] = None  # Full date, from the link's selectDate(...) handler
 
 
 @dataclass
@@ -30,75 +39,238 @@ class AvailableSlot:
     detected_at: datetime
 
 
+@dataclass
+class GridSnapshot:
+    """Available (○) cells of the slot table at one point in time."""
+    taken_at: datetime
+    dates: List[str]  # Column headers, e.g. ["01/18 (Sun)", ...]
+    available: Dict[str, List[str]] = field(default_factory=dict)  # category -> dates
+    unchanged: bool = False  # Same table as the previous parse (content hash matched)
+
+    def slots(self) -> List[Tuple[str, str]]:
+        """All available (category, date) pairs."""
+        return [(category, date) for category, dates in self.available.items() for date in dates]
+
+    def days(self, reference: date) -> Dict[str, Optional[date]]:
+        """
+        Parse the column headers into dates.
+
+        Args:
+            reference: A date in the month window, used to infer the year
+
+        Returns:
+            Header text -> date
+        """
+        return {text: parse_slot_date(text, reference) for text in self.dates}
+
+
+# Reads the slot table in one round trip instead of one call per cell.
+# rowSelector picks the rows to read (all category rows, or only the targets).
+SCAN_GRID_SCRIPT = """
+([dateSelector, rowSelector, rowPrefix]) => {
+    const dates = Array.from(document.querySelectorAll(dateSelector))
+        .map(td => td.innerText.split(/\\s+/).filter(Boolean).join(' '));
+    const available = {};
+    for (const row of document.querySelectorAll(rowSelector)) {
+        if (!row.querySelector('td.tdSelect.enable')) continue;
+        const category = row.id.slice(rowPrefix.length);
+        const hits = [];
+        row.querySelectorAll('td').forEach((td, i) => {
+            if (td.classList.contains('tdSelect') && td.classList.contains('enable')
+                    && td.querySelector('a.enable') && i < dates.length) {
+                hits.push(dates[i]);
+            }
+        });
+        if (hits.length) available[category] = hits;
+    }
+    return {dates, available};
+}
+"""
+
+# Row ID, td index and onclick handler of a slot link's cell. The
+# selectDate(...) handler carrying the full date is on the td, not the link.
+LINK_POSITION_SCRIPT = """
+a => {
+    const td = a.closest('td');
+    const row = td.parentElement;
+    return [row.id, Array.from(row.querySelectorAll('td')).indexOf(td), td.getAttribute('onclick')];
+}
+"""
+
+
+def target_row_selector(categories: Optional[List[str]]) -> str:
+    """
+    Selector for the rows of the given categories.
+    
+    Args:
+        categories: Categories to select (None = every category row)
+    
+    Returns:
+        Comma-separated ID selectors (matches nothing for an empty list)
+    """
+    if categories is None:
+        return CATEGORY_ROW_PREFIX
+    if not categories:
+        return ":not(*)"
+    return ", ".join(CATEGORY_ROW_BY_ID.format(category=category) for category in categories)
+
+
 class SlotDetector:
     """Detects available time slots on the facility selection page."""
     
-    def __init__(self, page: Page, target_categories: List[str]):
+    def __init__(
+        self,
+        page: Page,
+        target_categories: List[str],
+        publisher: Optional["SnapshotPublisher"] = None,
+        month_offset: int = 1,
+        cutoff: Optional[date] = None,
+    ):
         """
         Initialize slot detector.
         
         Args:
             page: Playwright page object
             target_categories: List of categories to monitor (e.g., ["準中型車ＡＭ", "普通車ＡＭ"])
+            publisher: Publishes snapshots and diffs to the event bus
+            month_offset: Month window the page shows
+            cutoff: Only cells strictly earlier than this date count (upgrade mode)
         """
         self.page = page
         self.target_categories = target_categories
+        self.publisher = publisher
+        self.month_offset = month_offset
+        self.cutoff = cutoff
+        self.handle_stats = HandleStats()
         self.logger = get_logger()
     
-    async def ensure_consent_checked(self) -> bool:
+    @property
+    def target_categories(self) -> List[str]:
+        """Categories to monitor."""
+        return self._target_categories
+    
+    @target_categories.setter
+    def target_categories(self, categories: List[str]) -> None:
+        # Keep the mask and selectors in step, so a config reload swaps them all at once
+        self._target_categories = list(categories)
+        self.target_mask = TargetMask(categories)
+        self.target_row_selector = target_row_selector(categories)
+        self.target_link_selector = ", ".join(
+            f"{CATEGORY_ROW_BY_ID.format(category=category)} {SLOT_CELLS['available']} {AVAILABLE_SLOT_LINK}"
+            for category in self._target_categories
+        )
+    
+    @property
+    def cutoff(self) -> Optional[date]:
+        """Current booking date in upgrade mode (None = every date counts)."""
+        return self._cutoff
+    
+    @cutoff.setter
+    def cutoff(self, cutoff: Optional[date]) -> None:
+        self._cutoff = cutoff
+        # The next snapshot is filtered differently even if the table is unchanged
+        self._cutoff_moved = True
+    
+    def before_cutoff(self, date_text: str, day: Optional[date] = None, today: Optional[date] = None) -> bool:
+        """
+        Check a cell against the upgrade cutoff.
+        
+        Args:
+            date_text: Date header text, e.g. "01/20 (Tue)"
+            day: Full date if known (e.g. from the cell's onclick)
+            today: Current site date, for the header's year (defaults to today in JST)
+        
+        Returns:
+            True if there is no cutoff or the date is strictly earlier than it
+        """
+        if self._cutoff is None:
+            return True
+        if day is None:
+            day = parse_slot_date(date_text, window_reference(today or site_now().date(), self.month_offset))
+        return in_range(day, end=self._cutoff - timedelta(days=1))
+    
+    def apply_cutoff(self, snapshot: GridSnapshot, today: Optional[date] = None) -> GridSnapshot:
+        """
+        Drop the available cells on or after the upgrade cutoff.
+        
+        Args:
+            snapshot: Snapshot of the target rows
+            today: Current site date, for the headers' year (defaults to today in JST)
+        
+        Returns:
+            The snapshot itself without a cutoff, otherwise a filtered copy
+        """
+        if self._cutoff is None:
+            return snapshot
+        last_day = self._cutoff - timedelta(days=1)
+        days = snapshot.days(window_reference(today or site_now().date(), self.month_offset))
+        available = {}
+        for category, dates in snapshot.available.items():
+            earlier = [text for text in dates if in_range(days.get(text), end=last_day)]
+            if earlier:
+                available[category] = earlier
+        unchanged = snapshot.unchanged and not self._cutoff_moved
+        self._cutoff_moved = False
+        return replace(snapshot, available=available, unchanged=unchanged)
+    
+    async def ensure_consent_checked(self, timeout: float = 0.0) -> bool:
         """
         Ensure the consent checkbox is checked.
         
         The checkbox is hidden and wrapped in a label, so we need to click the label.
         
+        Args:
+            timeout: Seconds to wait for the checkbox to be attached (0 = it must already be there)
+        
         Returns:
             True if checkbox is checked (or was successfully checked), False otherwise
         """
-        try:
-            # First check if checkbox exists
-            checkbox = await self.page.query_selector(CONSENT_CHECKBOX)
-            if not checkbox:
-                self.logger.warning("Consent checkbox not found")
-                return False
-            
-            # Check if already checked
-            is_checked = await checkbox.is_checked()
-            
-            if not is_checked:
-                self.logger.info("Checking consent checkbox")
+        async with HandleArena(self.handle_stats) as arena:
+            try:
+                # First check if checkbox exists
+                checkbox = await self._find(arena, CONSENT_CHECKBOX, timeout)
+                if not checkbox:
+                    self.logger.warning("Consent checkbox not found")
+                    return False
                 
-                # The checkbox is hidden, so we need to click the label instead
-                label = await self.page.query_selector(f"label[for='reserveCaution']")
+                # Check if already checked
+                is_checked = await checkbox.is_checked()
                 
-                if label:
-                    # Click the label (which will check the hidden checkbox)
-                    await label.click()
-                    self.logger.debug("Clicked consent checkbox label")
+                if not is_checked:
+                    self.logger.info("Checking consent checkbox")
+                    
+                    # The checkbox is hidden, so we need to click the label instead
+                    label = await arena.query_selector(self.page, CONSENT_CHECKBOX_LABEL)
+                    
+                    if label:
+                        # Click the label (which will check the hidden checkbox)
+                        await label.click()
+                        self.logger.debug("Clicked consent checkbox label")
+                    else:
+                        # Fallback: try to force check the checkbox
+                        await checkbox.evaluate("el => el.checked = true")
+                        # Trigger change event
+                        await checkbox.evaluate("el => el.dispatchEvent(new Event('change', { bubbles: true }))")
+                        self.logger.debug("Force-checked consent checkbox")
+                    
+                    # Wait a moment for any JavaScript to process
+                    await self.page.wait_for_timeout(500)
+                    
+                    # Verify it's checked
+                    is_checked = await checkbox.is_checked()
+                    if is_checked:
+                        self.logger.info("Consent checkbox successfully checked")
+                    else:
+                        self.logger.error("Failed to check consent checkbox")
+                        return False
                 else:
-                    # Fallback: try to force check the checkbox
-                    await checkbox.evaluate("el => el.checked = true")
-                    # Trigger change event
-                    await checkbox.evaluate("el => el.dispatchEvent(new Event('change', { bubbles: true }))")
-                    self.logger.debug("Force-checked consent checkbox")
+                    self.logger.debug("Consent checkbox already checked")
                 
-                # Wait a moment for any JavaScript to process
-                await self.page.wait_for_timeout(500)
+                return True
                 
-                # Verify it's checked
-                is_checked = await checkbox.is_checked()
-                if is_checked:
-                    self.logger.info("Consent checkbox successfully checked")
-                else:
-                    self.logger.error("Failed to check consent checkbox")
-                    return False
-            else:
-                self.logger.debug("Consent checkbox already checked")
-            
-            return True
-            
-        except Exception as e:
-            self.logger.error(f"Error checking consent checkbox: {e}")
-            return False
+            except Exception as e:
+                self.logger.error(f"Error checking consent checkbox: {e}")
+                return False
     
     async def check_availability(self) -> Optional[AvailableSlot]:
         """
@@ -112,85 +284,166 @@ class SlotDetector:
         """
         self.logger.debug(f"Checking availability for categories: {self.target_categories}")
         
-        try:
-            # Ensure consent is checked first
-            if not await self.ensure_consent_checked():
-                self.logger.warning("Cannot check availability - consent checkbox issue")
-                return None
-            
-            # Get date headers to map column index to date
-            date_headers = await self._get_date_headers()
-            if not date_headers:
-                self.logger.warning("Could not find date headers")
-                return None
-            
-            self.logger.debug(f"Found {len(date_headers)} date columns")
-            
-            # Find all category rows
-            rows = await self.page.query_selector_all(CATEGORY_ROW_PREFIX)
-            
-            for row in rows:
-                # Get the category name from this row
-                category_cell = await row.query_selector(CATEGORY_NAME_CELL)
-                if not category_cell:
-                    continue
+        async with HandleArena(self.handle_stats) as arena:
+            try:
+                # Ensure consent is checked first
+                if not await self.ensure_consent_checked():
+                    self.logger.warning("Cannot check availability - consent checkbox issue")
+                    return None
                 
-                category_text = await category_cell.inner_text()
-                category_text = category_text.strip()
+                # Get date headers to map column index to date
+                date_headers = await self._get_date_headers()
+                if not date_headers:
+                    self.logger.warning("Could not find date headers")
+                    return None
                 
-                # Check if this row matches any of our target categories
-                if category_text not in self.target_categories:
-                    continue
+                self.logger.debug(f"Found {len(date_headers)} date columns")
                 
-                self.logger.debug(f"Checking row for category: {category_text}")
+                # Only the target rows, found by ID, in one query
+                links = await arena.query_selector_all(self.page, self.target_link_selector) if self._target_categories else []
                 
-                # Get all available slot cells in this row
-                available_cells = await row.query_selector_all(SLOT_CELLS["available"])
-                
-                if available_cells:
-                    self.logger.debug(f"Found {len(available_cells)} available slots for {category_text}")
-                    
-                    # Check each available cell
-                    for cell in available_cells:
-                        try:
-                            # Find the clickable link inside the cell
-                            link = await cell.query_selector(AVAILABLE_SLOT_LINK)
-                            
-                            if link:
-                                # Get the column index to determine the date
-                                # We need to count which cell this is in the row
-                                all_cells = await row.query_selector_all("td")
-                                cell_index = -1
-                                
-                                for i, c in enumerate(all_cells):
-                                    if await c.evaluate("(el, target) => el === target", cell):
-                                        cell_index = i
-                                        break
-                                
-                                if cell_index >= 0 and cell_index < len(date_headers):
-                                    date = date_headers[cell_index]
-                                    
-                                    self.logger.info(f"✓ Found available slot: {category_text} on {date}")
-                                    
-                                    slot_info = SlotInfo(
-                                        category=category_text,
-                                        date=date,
-                                        element=link
-                                    )
-                                    
-                                    return AvailableSlot(
-                                        slot_info=slot_info,
-                                        detected_at=datetime.now()
-                                    )
-                        except Exception as e:
-                            self.logger.debug(f"Error checking cell: {e}")
+                for link in links:
+                    try:
+                        # Row ID, column index and date handler of the link's cell, in one round trip
+                        row_id, cell_index, onclick = await link.evaluate(LINK_POSITION_SCRIPT)
+                        if cell_index < 0 or cell_index >= len(date_headers):
+                            continue
+                        
+                        category = row_id[len(CATEGORY_ROW_ID_PREFIX):]
+                        date = date_headers[cell_index]
+                        day = parse_onclick_date(onclick)
+                        if not self.before_cutoff(date, day):
                             continue
+                        self.logger.info(f"✓ Found available slot: {category} on {date}")
+                        
+                        slot_info = SlotInfo(
+                            category=category,
+                            date=date,
+                            element=arena.keep(link),
+                            day=day,
+                        )
+                        
+                        return AvailableSlot(
+                            slot_info=slot_info,
+                            detected_at=datetime.now()
+                        )
+                    except Exception as e:
+                        self.logger.debug(f"Error checking cell: {e}")
+                        continue
+                
+                self.logger.debug("No available slots found")
+                return None
+                
+            except Exception as e:
+                self.logger.error(f"Error checking availability: {e}", exc_info=True)
+                return None
+    
+    async def scan_grid(self, categories: Optional[List[str]] = None) -> GridSnapshot:
+        """
+        Read every available cell of the slot table in a single evaluate call.
+        
+        Only the target rows are read, selected by their IDs.
+        
+        Args:
+            categories: Categories to include (defaults to the configured targets)
+        
+        Returns:
+            GridSnapshot of the current page
+        """
+        row_selector = self.target_row_selector if categories is None else target_row_selector(categories)
+        result = await self.page.evaluate(
+            SCAN_GRID_SCRIPT, [DATE_HEADER_CELLS, row_selector, CATEGORY_ROW_ID_PREFIX]
+        )
+        return GridSnapshot(
+            taken_at=datetime.now(),
+            dates=result["dates"],
+            available=result["available"],
+        )
+    
+    async def scan_and_publish(self) -> Tuple[GridSnapshot, Optional["SlotDiffEvent"]]:
+        """
+        Scan the grid and publish the snapshot and its diff to the event bus.
+        
+        Returns:
+            (snapshot, diff) - diff is None when no publisher is attached
+        """
+        snapshot = self.apply_cutoff(await self.scan_grid())
+        diff = None
+        if self.publisher:
+            diff = await self.publisher.publish(snapshot, self.month_offset)
+        return snapshot, diff
+    
+    async def locate_slot(
+        self,
+        category: str,
+        date: str,
+        dates: Optional[List[str]] = None,
+        timeout: float = 0.0,
+    ) -> Optional[AvailableSlot]:
+        """
+        Find the clickable link for a specific (category, date) cell.
+        
+        With a timeout the link is awaited until it is attached, so a hit
+        read from the raw response can be booked while the page is still
+        rendering; pass the response's date headers as ``dates`` then, since
+        the header row may not be readable yet.
+        
+        Args:
+            category: Category name, e.g. "普通車ＡＭ"
+            date: Date header text, e.g. "01/20 (Tue)"
+            dates: Date headers of the page (read from the DOM if omitted)
+            timeout: Seconds to wait for the link to be attached (0 = it must already be there)
+        
+        Returns:
+            AvailableSlot if the cell is currently available, None otherwise
+        """
+        async with HandleArena(self.handle_stats) as arena:
+            date_headers = dates if dates is not None else await self._get_date_headers()
+            if date not in date_headers:
+                return None
             
-            self.logger.debug("No available slots found")
-            return None
+            column = date_headers.index(date) + 1
+            link = await self._find(
+                arena,
+                f"tr[id='{CATEGORY_ROW_ID_PREFIX}{category}'] td:nth-of-type({column}).tdSelect.enable "
+                f"{AVAILABLE_SLOT_LINK}",
+                timeout,
+            )
+            if not link:
+                return None
             
-        except Exception as e:
-            self.logger.error(f"Error checking availability: {e}", exc_info=True)
+            # Read everything before keeping the handle, so a failed read leaves it to the arena
+            _, _, onclick = await link.evaluate(LINK_POSITION_SCRIPT)
+            return AvailableSlot(
+                slot_info=SlotInfo(
+                    category=category,
+                    date=date,
+                    element=arena.keep(link),
+                    day=parse_onclick_date(onclick),
+                ),
+                detected_at=datetime.now(),
+            )
+    
+    async def release_slot(self, slot: Optional[AvailableSlot]) -> None:
+        """
+        Dispose the link handle kept for a slot once it is no longer needed.
+        
+        Safe to call more than once for the same slot.
+        
+        Args:
+            slot: Slot returned by check_availability or locate_slot
+        """
+        if slot and slot.slot_info.element is not None:
+            await release_handle(slot.slot_info.element, self.handle_stats)
+            slot.slot_info.element = None
+    
+    async def _find(self, arena: HandleArena, selector: str, timeout: float) -> Optional[ElementHandle]:
+        """Query a selector, or wait up to ``timeout`` seconds for it to be attached."""
+        if timeout <= 0:
+            return await arena.query_selector(self.page, selector)
+        try:
+            return arena.track(await self.page.wait_for_selector(selector, state="attached", timeout=timeout * 1000))
+        except PlaywrightTimeoutError:
             return None
     
     async def _get_date_headers(self) -> List[str]:
@@ -201,17 +454,11 @@ class SlotDetector:
             List of date strings (e.g., ["01/18 (Sun)", "01/19 (Mon)", ...])
         """
         try:
-            date_cells = await self.page.query_selector_all(DATE_HEADER_CELLS)
-            dates = []
-            
-            for cell in date_cells:
-                # Get the text content and clean it up
-                text = await cell.inner_text()
-                # Remove extra whitespace and newlines
-                text = " ".join(text.split())
-                dates.append(text)
-            
-            return dates
+            # Read all headers in one call, without creating element handles
+            return await self.page.eval_on_selector_all(
+                DATE_HEADER_CELLS,
+                "tds => tds.map(td => td.innerText.split(/\\s+/).filter(Boolean).join(' '))",
+            )
             
         except Exception as e:
             self.logger.error(f"Error getting date headers: {e}")
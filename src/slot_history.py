@@ -0,0 +1,67 @@
+"""Append-only history of slot availability transitions."""
+import json
+import os
+from datetime import datetime
+from typing import List
+from src.event_bus import SlotDiffEvent
+from src.logger import get_logger
+
+
+class SlotHistory:
+    """
+    Writes one JSON line per appeared/disappeared cell.
+
+    Only transitions are stored, so the file stays small even when polling
+    continuously, and it can be analysed later (e.g. when slots tend to open).
+    """
+
+    def __init__(self, path: str = os.path.join("logs", "slot_history.jsonl")):
+        """
+        Initialize slot history.
+
+        Args:
+            path: JSON-lines file to append to
+        """
+        self.path = path
+        self.logger = get_logger()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    async def on_event(self, event: SlotDiffEvent) -> None:
+        """Event bus handler: append the transitions of a diff."""
+        taken_at = event.snapshot.taken_at.isoformat(timespec="seconds")
+        lines = [
+            self._line(taken_at, "appeared", category, date, event.month_offset)
+            for category, date in event.appeared
+        ] + [
+            self._line(taken_at, "disappeared", category, date, event.month_offset)
+            for category, date in event.disappeared
+        ]
+        if not lines:
+            return
+
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write("".join(lines))
+
+    @staticmethod
+    def _line(taken_at: str, change: str, category: str, date: str, month_offset: int) -> str:
+        return json.dumps({
+            "at": taken_at,
+            "change": change,
+            "category": category,
+            "date": date,
+            "month_offset": month_offset,
+        }, ensure_ascii=False) + "\n"
+
+    def read(self) -> List[dict]:
+        """
+        Load all recorded transitions.
+
+        Returns:
+            List of transition records, oldest first
+        """
+        if not os.path.exists(self.path):
+            return []
+        with open(self.path, encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
@@ -50,38 +50,29 @@ class TelegramNotifier:
         Returns:
             Formatted message string
         """
-        if result.success:
-            message = (
-                "🎉 <b>予約ロック成功！</b>\n\n"
-                f"📋 <b>Category:</b> {result.category}\n"
-                f"📅 <b>Date:</b> {result.date}\n"
-                f"⏰ <b>Time:</b> {result.time}\n\n"
-                "⚠️ <b>重要：</b>\n"
-                "予約はロックされましたが、まだ完了していません。\n\n"
-                "📝 <b>次のステップ：</b>\n"
-                "1. ブラウザで残りのフォームを入力してください\n"
-                "2. すべての情報を入力して送信してください\n"
-                "3. 確認メールが届くまで待ってください\n\n"
-                "💻 ブラウザは開いたままになっています。\n"
-                "今すぐフォームを完成させてください！"
-            )
-        else:
-            message = (
-                "❌ <b>予約失敗</b>\n\n"
-                f"📋 <b>Category:</b> {result.category}\n"
-                f"📅 <b>Date:</b> {result.date}\n"
-                f"⚠️ <b>Error:</b> {result.error_message}\n\n"
-                "システムは引き続き空き枠を監視します。"
-            )
+        return format_booking_result(result)
+    
+    async def send_text(self, message: str) -> bool:
+        """
+        Send an already formatted (HTML) message.
         
-        return message
+        Args:
+            message: Message text to send
+        
+        Returns:
+            True if Telegram accepted the message
+        """
+        return await self._send_message(message)
     
-    async def _send_message(self, message: str) -> None:
+    async def _send_message(self, message: str) -> bool:
         """
         Send a message via Telegram API.
         
         Args:
             message: Message text to send
+        
+        Returns:
+            True if the message was sent
         """
         try:
             self.logger.debug(f"Sending Telegram message: {message[:50]}...")
@@ -99,8 +90,47 @@ class TelegramNotifier:
                     else:
                         error_text = await response.text()
                         self.logger.error(f"Telegram API error: {response.status} - {error_text}")
+                    return response.status == 200
         
         except aiohttp.ClientError as e:
             self.logger.error(f"Failed to send Telegram notification: {e}")
         except Exception as e:
             self.logger.error(f"Unexpected error sending Telegram notification: {e}")
+        return False
+
+
+def format_booking_result(result: BookingResult) -> str:
+    """
+    Format a booking result into an HTML notification message.
+    
+    Args:
+        result: Booking result to format
+    
+    Returns:
+        Formatted message string
+    """
+    if result.success:
+        message = (
+            "🎉 <b>予約ロック成功！</b>\n\n"
+            f"📋 <b>Category:</b> {result.category}\n"
+            f"📅 <b>Date:</b> {result.date}\n"
+            f"⏰ <b>Time:</b> {result.time}\n\n"
+            "⚠️ <b>重要：</b>\n"
+            "予約はロックされましたが、まだ完了していません。\n\n"
+            "📝 <b>次のステップ：</b>\n"
+            "1. ブラウザで残りのフォームを入力してください\n"
+            "2. すべての情報を入力して送信してください\n"
+            "3. 確認メールが届くまで待ってください\n\n"
+            "💻 ブラウザは開いたままになっています。\n"
+            "今すぐフォームを完成させてください！"
+        )
+    else:
+        message = (
+            "❌ <b>予約失敗</b>\n\n"
+            f"📋 <b>Category:</b> {result.category}\n"
+            f"📅 <b>Date:</b> {result.date}\n"
+            f"⚠️ <b>Error:</b> {result.error_message}\n\n"
+            "システムは引き続き空き枠を監視します。"
+        )
+    
+    return message
@@ -0,0 +1,385 @@
+"""Record live browser traffic to a HAR-like archive and replay it offline."""
+import asyncio
+import base64
+import json
+import os
+import re
+import time
+from collections import defaultdict, deque
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from hashlib import sha1
+from typing import Deque, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from urllib.parse import parse_qsl, quote_plus
+from playwright.async_api import BrowserContext, Route
+from src.logger import get_logger
+
+
+SCRUBBED = "[scrubbed]"
+
+# Header values that are never written to an archive
+SENSITIVE_HEADERS = {"cookie", "set-cookie", "authorization", "proxy-authorization"}
+
+# Form fields whose values are secrets wherever they appear later (bodies, URLs)
+SENSITIVE_FIELD = re.compile(r"pass|csrf|token|mail|login|session", re.IGNORECASE)
+
+# Shorter values ("on", "1") would scrub unrelated text
+MIN_SECRET_LENGTH = 4
+
+_TEXT_TYPES = ("text/", "json", "javascript", "xml", "x-www-form-urlencoded")
+_COOKIE_ATTRIBUTES = {"path", "domain", "expires", "max-age", "samesite"}
+
+
+@dataclass
+class TrafficEntry:
+    """One request/response pair with its timing."""
+    started_at: datetime
+    elapsed_ms: float  # Time from request to full response
+    method: str
+    url: str
+    request_headers: Dict[str, str]
+    post_data: Optional[str]
+    status: int
+    response_headers: Dict[str, str]
+    body: bytes = b""
+
+    def to_har(self, secrets: Iterable[str]) -> dict:
+        """HAR 1.2 entry with secrets replaced."""
+        mime_type = self.response_headers.get("content-type", "")
+        content = {"size": len(self.body), "mimeType": mime_type}
+        if _is_text(mime_type):
+            content["text"] = _scrub(self.body.decode("utf-8", errors="replace"), secrets)
+        else:
+            content["text"] = base64.b64encode(self.body).decode("ascii")
+            content["encoding"] = "base64"
+
+        request = {
+            "method": self.method,
+            "url": _scrub(self.url, secrets),
+            "headers": _har_headers(self.request_headers, secrets),
+        }
+        if self.post_data is not None:
+            request["postData"] = {
+                "mimeType": self.request_headers.get("content-type", ""),
+                "text": _scrub(self.post_data, secrets),
+            }
+        return {
+            "startedDateTime": self.started_at.isoformat(timespec="milliseconds"),
+            "time": round(self.elapsed_ms, 1),
+            "request": request,
+            "response": {
+                "status": self.status,
+                "headers": _har_headers(self.response_headers, secrets),
+                "content": content,
+            },
+        }
+
+
+class TrafficRecorder:
+    """
+    Records every request of a browser context through ``context.route``.
+
+    Each request is forwarded with ``route.fetch()`` (redirects are not
+    followed, so the browser sees them as before) and fulfilled with the
+    real response, so the site behaves exactly as without recording.
+
+    Entries are appended to a private JSON-lines spool next to the archive
+    as they arrive, so memory stays flat on long sessions and a killed
+    process loses nothing: the next recorder on the same path continues the
+    spool. ``save()`` converts the spool to the HAR file, with cookies,
+    credentials, CSRF tokens and similar values replaced with
+    ``[scrubbed]`` everywhere, and deletes it. Tokens often appear in a
+    response before they are posted, which is why scrubbing waits for the
+    whole session.
+    """
+
+    def __init__(self, path: str, secrets: Iterable[str] = ()):
+        """
+        Initialize traffic recorder.
+
+        Args:
+            path: HAR file to write
+            secrets: Extra literal values to scrub (e.g. e-mail and password)
+        """
+        self.path = path
+        self.spool_path = path + ".spool.jsonl"
+        self.secrets: Set[str] = {s for s in secrets if s}
+        self.logger = get_logger()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.count = sum(1 for _ in self._read_spool())
+        if os.path.exists(self.spool_path):
+            # Terminate a torn last line so the next entry starts on its own line
+            with open(self.spool_path, "rb+") as f:
+                if f.seek(0, os.SEEK_END):
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b"\n":
+                        f.write(b"\n")
+        if self.count:
+            self.logger.warning(f"Continuing an unsaved recording of {self.count} requests in {self.spool_path}")
+
+    async def attach(self, context: BrowserContext) -> None:
+        """Start recording a browser context (call again for a recycled context)."""
+        await context.route("**/*", self._handle)
+
+    async def _handle(self, route: Route) -> None:
+        request = route.request
+        started_at = datetime.now(timezone.utc)
+        started = time.monotonic()
+        try:
+            response = await route.fetch(max_redirects=0)
+            body = await response.body()
+        except Exception as e:
+            self.logger.debug(f"Recording passthrough failed for {request.url}: {e}")
+            await route.abort()
+            return
+
+        self.add(TrafficEntry(
+            started_at=started_at,
+            elapsed_ms=(time.monotonic() - started) * 1000,
+            method=request.method,
+            url=request.url,
+            request_headers=await request.all_headers(),
+            post_data=request.post_data,
+            status=response.status,
+            response_headers=response.headers,
+            body=body,
+        ))
+        await route.fulfill(response=response, body=body)
+
+    def add(self, entry: TrafficEntry) -> None:
+        """
+        Append an entry to the spool.
+
+        Args:
+            entry: Recorded request/response pair (not scrubbed yet)
+        """
+        record = {
+            "started_at": entry.started_at.isoformat(),
+            "elapsed_ms": entry.elapsed_ms,
+            "method": entry.method,
+            "url": entry.url,
+            "request_headers": entry.request_headers,
+            "post_data": entry.post_data,
+            "status": entry.status,
+            "response_headers": entry.response_headers,
+            "body": base64.b64encode(entry.body).decode("ascii"),
+        }
+        # The spool holds unscrubbed session values until save(), so only we may read it
+        fd = os.open(self.spool_path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o600)
+        with os.fdopen(fd, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.count += 1
+
+    def _read_spool(self) -> Iterator[TrafficEntry]:
+        """Entries in the spool, oldest first (a torn last line is skipped)."""
+        if not os.path.exists(self.spool_path):
+            return
+        with open(self.spool_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # Torn write from a crash
+                record["started_at"] = datetime.fromisoformat(record["started_at"])
+                record["body"] = base64.b64decode(record["body"])
+                yield TrafficEntry(**record)
+
+    def collect_secrets(self) -> Set[str]:
+        """Configured secrets plus cookie values and sensitive form values seen in the traffic."""
+        secrets = set(self.secrets)
+        for entry in self._read_spool():
+            for name, value in list(entry.request_headers.items()) + list(entry.response_headers.items()):
+                if name.lower() in ("cookie", "set-cookie"):
+                    secrets.update(_cookie_values(value))
+            if entry.post_data:
+                secrets.update(
+                    value for name, value in parse_qsl(entry.post_data, keep_blank_values=True)
+                    if SENSITIVE_FIELD.search(name) and value
+                )
+        return secrets
+
+    def save(self) -> Optional[str]:
+        """
+        Write the scrubbed archive from the spool and delete the spool.
+
+        Returns:
+            Path written, or None if nothing was recorded
+        """
+        if not self.count:
+            return None
+
+        secrets = self.collect_secrets()
+        # Entries are streamed from the spool, so the archive is never held in memory
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write('{"log": {"version": "1.2", "creator": {"name": "jp-booking", "version": "1.0"}, "entries": [\n')
+            for i, entry in enumerate(self._read_spool()):
+                if i:
+                    f.write(",\n")
+                f.write(json.dumps(entry.to_har(secrets), ensure_ascii=False))
+            f.write("\n]}}\n")
+        os.remove(self.spool_path)
+
+        self.logger.info(f"Traffic archive saved to {self.path} ({self.count} requests)")
+        self.count = 0
+        return self.path
+
+
+@dataclass
+class ReplayStats:
+    """Counters for a replay session."""
+    served: int = 0
+    repeated: int = 0  # Requests answered with the last response for their URL again
+    missed: List[str] = field(default_factory=list)
+
+
+def body_hash(post_data: Optional[str]) -> str:
+    """Short hash of a request body for replay matching ("" without a body)."""
+    return sha1(post_data.encode("utf-8")).hexdigest()[:16] if post_data else ""
+
+
+class TrafficReplayer:
+    """
+    Serves a recorded archive to a browser context through ``context.route``.
+
+    Requests are matched by method, URL and a hash of the request body, so
+    different POSTs to the same endpoint get their own responses. Live
+    bodies are scrubbed with the same secrets as the recording before they
+    are hashed; a body that still does not match (e.g. a value generated
+    per session) falls back to the responses recorded for its URL.
+    Repeated requests get the recorded responses in order, and once those
+    run out the last one is served again (so a polling loop can run
+    indefinitely). Each response is delayed by its recorded time divided by
+    ``speed``. Unknown requests get a 404 and are listed in ``stats.missed``.
+    """
+
+    def __init__(self, path: str, speed: float = 1.0, secrets: Iterable[str] = ()):
+        """
+        Initialize traffic replayer.
+
+        Args:
+            path: HAR file written by TrafficRecorder
+            speed: Timing factor (2.0 = twice as fast, 0 = no delays)
+            secrets: Values scrubbed from the recording (e.g. e-mail and password)
+        """
+        self.path = path
+        self.speed = speed
+        self.secrets: Set[str] = {s for s in secrets if s}
+        self.stats = ReplayStats()
+        self._queues: Dict[Tuple[str, str, str], Deque[dict]] = defaultdict(deque)
+        self._last: Dict[Tuple[str, str, str], dict] = {}
+        # (method, url) -> body hashes recorded for it, in first-seen order
+        self._bodies: Dict[Tuple[str, str], List[str]] = defaultdict(list)
+        self.logger = get_logger()
+
+        with open(path, encoding="utf-8") as f:
+            entries = json.load(f)["log"]["entries"]
+        for entry in entries:
+            request = entry["request"]
+            digest = body_hash(request.get("postData", {}).get("text"))
+            key = (request["method"], request["url"], digest)
+            if digest not in self._bodies[key[:2]]:
+                self._bodies[key[:2]].append(digest)
+            self._queues[key].append(entry)
+        self.logger.info(f"Replaying {len(entries)} recorded requests from {path}")
+
+    async def attach(self, context: BrowserContext) -> None:
+        """Serve a browser context from the archive (call again for a recycled context)."""
+        await context.route("**/*", self._handle)
+
+    def next_entry(self, method: str, url: str, post_data: Optional[str] = None) -> Optional[dict]:
+        """
+        Pick the response for a request.
+
+        Args:
+            method: HTTP method
+            url: Request URL
+            post_data: Request body, if any
+
+        Returns:
+            HAR entry, or None if the archive has no such request
+        """
+        digest = body_hash(_scrub(post_data, self.secrets)) if post_data else ""
+        entry = self._take((method, url, digest))
+        if entry is None:
+            # Prefer a recorded body whose responses are not used up yet
+            recorded = self._bodies.get((method, url), [])
+            for other in sorted(recorded, key=lambda d: not self._queues.get((method, url, d))):
+                entry = self._take((method, url, other))
+                if entry:
+                    break
+        return entry
+
+    def _take(self, key: Tuple[str, str, str]) -> Optional[dict]:
+        queue = self._queues.get(key)
+        if queue:
+            entry = queue.popleft()
+            self._last[key] = entry
+            return entry
+        entry = self._last.get(key)
+        if entry:
+            self.stats.repeated += 1
+        return entry
+
+    async def _handle(self, route: Route) -> None:
+        request = route.request
+        entry = self.next_entry(request.method, request.url, request.post_data)
+        if entry is None:
+            self.stats.missed.append(f"{request.method} {request.url}")
+            self.logger.debug(f"Not in archive: {request.method} {request.url}")
+            await route.fulfill(status=404, body="")
+            return
+
+        if self.speed > 0:
+            await asyncio.sleep(entry.get("time", 0) / 1000 / self.speed)
+
+        response = entry["response"]
+        content = response["content"]
+        if content.get("encoding") == "base64":
+            body = base64.b64decode(content.get("text", ""))
+        else:
+            body = content.get("text", "").encode("utf-8")
+        headers = {
+            h["name"]: h["value"] for h in response["headers"]
+            if h["name"].lower() not in ("content-length", "content-encoding", "transfer-encoding")
+        }
+        self.stats.served += 1
+        await route.fulfill(status=response["status"], headers=headers, body=body)
+
+    def log_stats(self) -> None:
+        """Log how the archive was used."""
+        self.logger.info(
+            f"Replay: {self.stats.served} served, {self.stats.repeated} repeated, "
+            f"{len(self.stats.missed)} not in archive"
+        )
+
+
+def _is_text(mime_type: str) -> bool:
+    return any(t in mime_type for t in _TEXT_TYPES)
+
+
+def _cookie_values(header: str) -> List[str]:
+    """Values from a Cookie or Set-Cookie header (attributes are ignored)."""
+    values = []
+    for line in header.split("\n"):
+        for part in line.split(";"):
+            name, sep, value = part.strip().partition("=")
+            if sep and value and name.lower() not in _COOKIE_ATTRIBUTES:
+                values.append(value)
+    return values
+
+
+def _scrub(text: str, secrets: Iterable[str]) -> str:
+    # Longest first, so a secret that contains another is replaced whole
+    for secret in sorted(secrets, key=len, reverse=True):
+        if len(secret) >= MIN_SECRET_LENGTH:
+            text = text.replace(secret, SCRUBBED).replace(quote_plus(secret), SCRUBBED)
+    return text
+
+
+def _har_headers(headers: Dict[str, str], secrets: Iterable[str]) -> List[dict]:
+    return [
+        {"name": name, "value": SCRUBBED if name.lower() in SENSITIVE_HEADERS else _scrub(value, secrets)}
+        for name, value in headers.items()
+    ]
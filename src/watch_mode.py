@@ -0,0 +1,179 @@
+"""Watch-only mode: report availability across all categories without booking."""
+import asyncio
+import signal
+import time
+from typing import Optional
+from src.config import Config
+from src.browser_manager import BrowserManager
+from src.browser_profiles import MONITOR_PROFILE
+from src.error_handler import PageStructureError, SessionExpiredError, classify_error, retry_with_backoff
+from src.event_bus import EventBus, GridSnapshotEvent, SlotDiffEvent, SnapshotPublisher
+from src.grid_parser import ParseCache
+from src.http_poller import HttpPoller
+from src.maintenance_schedule import site_now
+from src.metrics import MonitorMetrics
+from src.notifications import NotificationHub, availability_notification, build_channels
+from src.recovery_policy import CircuitBreaker, RecoveryPolicy
+from src.slot_history import SlotHistory
+from src.logger import get_logger
+
+
+class AvailabilityWatcher:
+    """
+    Streams slot transitions for every category and several month windows.
+
+    The browser is only used to log in and capture the facility page request;
+    polling is done over HTTP, and the browser is closed in between. Each
+    poll is diffed per month window and published on the event bus, where
+    notifications, the history file and metrics pick it up.
+    """
+
+    def __init__(self, config: Config):
+        """
+        Initialize availability watcher.
+
+        Args:
+            config: Application configuration
+        """
+        self.config = config
+        self.running = False
+        self.poller: Optional[HttpPoller] = None
+        self.event_bus: Optional[EventBus] = None
+        self.publisher: Optional[SnapshotPublisher] = None
+        self.metrics = MonitorMetrics()
+        self.parse_cache = ParseCache()
+        self.notification_hub: Optional[NotificationHub] = None
+        self.recovery_policy = RecoveryPolicy(
+            circuit_breaker=CircuitBreaker(
+                failure_threshold=config.circuit_failure_threshold,
+                recovery_timeout=config.circuit_recovery_timeout,
+            )
+        )
+        self.logger = get_logger()
+
+    async def start(self) -> None:
+        """Run watch-only mode until stopped."""
+        months = self.config.watch_months
+        self.logger.info(
+            f"Starting watch-only mode: all categories, {months} month window(s), "
+            f"every {self.config.refresh_interval} seconds"
+        )
+        self._setup_signal_handlers()
+
+        self.event_bus = EventBus()
+        self.publisher = SnapshotPublisher(self.event_bus)
+        self.notification_hub = NotificationHub(
+            build_channels(self.config),
+            digest_seconds=self.config.notify_digest_seconds,
+            dedupe_seconds=self.config.notify_dedupe_seconds,
+            rate_per_minute=self.config.notify_rate_per_minute,
+        )
+        self.notification_hub.start()
+        self.event_bus.subscribe("metrics", (GridSnapshotEvent, SlotDiffEvent), self.metrics.on_event)
+        self.event_bus.subscribe("history", (SlotDiffEvent,), SlotHistory().on_event)
+        self.event_bus.subscribe("notifications", (SlotDiffEvent,), self._notify)
+
+        self.running = True
+        try:
+            await self._capture_session()
+            await self._watch_loop()
+        finally:
+            await self._cleanup()
+
+    async def _watch_loop(self) -> None:
+        polls = 0
+        last_status = time.monotonic()
+        needs_session = False
+
+        while self.running:
+            started = time.monotonic()
+            try:
+                circuit = self.recovery_policy.circuit_breaker
+                if not circuit.allow_request():
+                    await asyncio.sleep(circuit.time_until_retry())
+                    continue
+
+                if needs_session:
+                    # A failed re-login lands in the handler below and is retried with backoff
+                    await self._capture_session()
+                    needs_session = False
+
+                snapshots = await self.poller.poll(self.config.watch_months)
+                for i, snapshot in enumerate(snapshots):
+                    await self.publisher.publish(snapshot, self.config.month_offset + i)
+                self.metrics.observe("poll", time.monotonic() - started)
+                self.recovery_policy.record_success()
+                polls += 1
+
+                if time.monotonic() - last_status >= 60:
+                    self.logger.info(f"Watching - {polls} polls")
+                    self.metrics.record_parse_cache(self.parse_cache.stats)
+                    self.metrics.log_summary()
+                    last_status = time.monotonic()
+
+            except Exception as e:
+                error = classify_error(e)
+                decision = self.recovery_policy.decide(error)
+                self.logger.warning(f"Poll failed ({type(error).__name__}): {error}")
+                if isinstance(error, (SessionExpiredError, PageStructureError)):
+                    needs_session = True
+                await asyncio.sleep(decision.delay)
+                continue
+
+            await asyncio.sleep(max(0.0, self.config.refresh_interval - (time.monotonic() - started)))
+
+    async def _capture_session(self) -> None:
+        """Log in with a short-lived browser and hand its session to the HTTP poller."""
+        self.logger.info("Capturing a session for HTTP polling")
+        browser_manager = BrowserManager(
+            headless=self.config.headless,
+            user_email=self.config.user_email,
+            user_password=self.config.user_password,
+            monitor_profile=MONITOR_PROFILE,
+            month_offset=self.config.month_offset,
+        )
+        try:
+            await browser_manager.start()
+            await retry_with_backoff(browser_manager.login, operation_name="Login")
+            await retry_with_backoff(
+                browser_manager.navigate_to_facility_page,
+                operation_name="Navigation to facility page",
+            )
+            captured = await browser_manager.capture_document_request()
+        finally:
+            # Nothing else needs the browser until the session expires
+            await browser_manager.stop()
+
+        if self.poller:
+            await self.poller.close()
+        self.poller = HttpPoller(captured, cache=self.parse_cache)
+        await self.poller.open()
+        self.logger.info(f"✓ HTTP polling {captured.method} {captured.url}")
+
+    async def _notify(self, event: SlotDiffEvent) -> None:
+        """Notification stage: announce every newly available cell."""
+        for category, date in event.disappeared:
+            self.notification_hub.forget(f"slot:{category}:{date}")
+        for category, date in event.appeared:
+            self.logger.info(f"🟢 {category} {date} (month +{event.month_offset}) at {site_now():%H:%M:%S} JST")
+            await self.notification_hub.notify(availability_notification(category, date, event.month_offset))
+
+    async def _cleanup(self) -> None:
+        if self.poller:
+            await self.poller.close()
+        if self.event_bus:
+            self.event_bus.log_stats()
+            self.metrics.record_parse_cache(self.parse_cache.stats)
+            self.metrics.log_summary()
+            await self.event_bus.close(timeout=10)
+        if self.notification_hub:
+            await self.notification_hub.close()
+        self.logger.info("Shutdown complete")
+
+    def _setup_signal_handlers(self) -> None:
+        def signal_handler(signum, frame):
+            self.logger.info(f"Received signal {signum}")
+            self.running = False
+
+        signal.signal(signal.SIGINT, signal_handler)
+        signal.signal(signal.SIGTERM, signal_handler)
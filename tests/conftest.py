@@ -0,0 +1,34 @@
+"""Shared test fixtures."""
+import pytest
+
+from src.config import Config
+
+
+@pytest.fixture
+def config():
+    """Minimal valid configuration that writes nothing to disk."""
+    return Config(
+        telegram_bot_token="token",
+        telegram_chat_id="1",
+        user_email="user@example.test",
+        user_password="secret",
+        target_categories=["準中型車ＡＭ"],
+        refresh_interval=5,
+        headless=True,
+        test_mode=True,
+        evidence_buffer_size=0,
+        booking_journal="",
+    )
+
+
+@pytest.fixture
+async def chromium():
+    """A headless Chromium browser; skips the test when it cannot be launched."""
+    from playwright.async_api import Error as PlaywrightError, async_playwright
+    async with async_playwright() as playwright:
+        try:
+            browser = await playwright.chromium.launch()
+        except PlaywrightError as e:
+            pytest.skip(f"Chromium is not available: {e.message.splitlines()[0]}")
+        yield browser
+        await browser.close()
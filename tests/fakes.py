@@ -0,0 +1,60 @@
+"""Stand-ins for Playwright objects shared by the tests."""
+from contextlib import asynccontextmanager
+
+
+class FakePage:
+    """
+    Stand-in for a Playwright page.
+
+    Args:
+        url: The page URL
+        title: The page title, or titles returned in turn (the last one repeats)
+        evaluate: Results for evaluate() in call order, or a function of (script, arg)
+        elements: Elements (or lists of them) for query_selector()/query_selector_all(),
+            keyed by a substring of the selector
+        response: What reload() returns
+        context: The page's browser context
+    """
+
+    def __init__(self, url="https://dshinsei.e-kanagawa.lg.jp/140007-u/reserve/offerDetail_mailto",
+                 title="予約手続き：申込内容入力", evaluate=(), elements=None, response=None, context=None):
+        self.url = url
+        self.titles = [title] if isinstance(title, str) else list(title)
+        self.results = evaluate if callable(evaluate) else list(evaluate)
+        self.elements = elements or {}
+        self.response = response
+        self.context = context
+        self.calls = []
+        self.reloads = []  # Keyword arguments of each reload()
+        self.viewport = None
+
+    async def evaluate(self, script, arg=None):
+        self.calls.append((script, arg))
+        if callable(self.results):
+            return self.results(script, arg)
+        return self.results.pop(0) if self.results else None
+
+    async def title(self):
+        return self.titles.pop(0) if len(self.titles) > 1 else self.titles[0]
+
+    async def query_selector_all(self, selector):
+        found = next((element for key, element in self.elements.items() if key in selector), [])
+        return list(found) if isinstance(found, list) else [found]
+
+    async def query_selector(self, selector):
+        found = await self.query_selector_all(selector)
+        return found[0] if found else None
+
+    async def reload(self, **kwargs):
+        self.reloads.append(kwargs)
+        return self.response
+
+    async def set_viewport_size(self, viewport):
+        self.viewport = viewport
+
+    async def wait_for_timeout(self, ms):
+        pass
+
+    @asynccontextmanager
+    async def expect_navigation(self, **kwargs):
+        yield
@@ -0,0 +1,155 @@
+"""Browserless stand-in for a Playwright page showing a saved HTML file.
+
+Supports the part of the Page/ElementHandle API the slot detector uses on the
+slot table, with a small CSS matcher for the selector shapes in
+src/selectors.py: compound selectors (tag, #id, .class, [attr='value'])
+joined by descendant spaces, comma lists, and ``:not(*)``.
+"""
+import re
+from html.parser import HTMLParser
+from typing import Dict, List, Optional
+
+from src.slot_detector import LINK_POSITION_SCRIPT
+
+VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "wbr"}
+
+_COMPOUND = re.compile(
+    r"(?P<tag>[a-z0-9]+)?"
+    r"(?P<parts>(?:#[^\s.#\[]+|\.[^\s.#\[]+|\[[a-z-]+(?:[\^]?=['\"][^'\"]*['\"])?\])*)$"
+)
+_PART = re.compile(r"#([^\s.#\[]+)|\.([^\s.#\[]+)|\[([a-z-]+)(?:([\^]?=)['\"]([^'\"]*)['\"])?\]")
+
+
+class Node:
+    def __init__(self, tag: str, attrs: Dict[str, str], parent: Optional["Node"]):
+        self.tag = tag
+        self.attrs = attrs
+        self.parent = parent
+        self.children: List["Node"] = []
+        self.texts: List[str] = []
+
+    @property
+    def classes(self) -> List[str]:
+        return self.attrs.get("class", "").split()
+
+    def text(self) -> str:
+        return " ".join([*self.texts, *(child.text() for child in self.children)])
+
+    def walk(self):
+        for child in self.children:
+            yield child
+            yield from child.walk()
+
+    def ancestors(self):
+        node = self.parent
+        while node is not None:
+            yield node
+            node = node.parent
+
+
+class _TreeBuilder(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.root = Node("#document", {}, None)
+        self.stack = [self.root]
+
+    def handle_starttag(self, tag, attrs):
+        node = Node(tag, {name: value or "" for name, value in attrs}, self.stack[-1])
+        self.stack[-1].children.append(node)
+        if tag not in VOID_TAGS:
+            self.stack.append(node)
+
+    def handle_startendtag(self, tag, attrs):
+        self.stack[-1].children.append(Node(tag, {name: value or "" for name, value in attrs}, self.stack[-1]))
+
+    def handle_endtag(self, tag):
+        for i in range(len(self.stack) - 1, 0, -1):
+            if self.stack[i].tag == tag:
+                del self.stack[i:]
+                return
+
+    def handle_data(self, data):
+        self.stack[-1].texts.append(data)
+
+
+def _matches_compound(node: Node, compound: str) -> bool:
+    match = _COMPOUND.match(compound)
+    if not match:
+        raise ValueError(f"Unsupported selector: {compound}")
+    if match.group("tag") and node.tag != match.group("tag"):
+        return False
+    for element_id, class_name, attr, op, value in _PART.findall(match.group("parts")):
+        if element_id and node.attrs.get("id") != element_id:
+            return False
+        if class_name and class_name not in node.classes:
+            return False
+        if attr:
+            actual = node.attrs.get(attr)
+            if actual is None:
+                return False
+            if op == "=" and actual != value:
+                return False
+            if op == "^=" and not actual.startswith(value):
+                return False
+    return True
+
+
+def _matches(node: Node, compounds: List[str]) -> bool:
+    if not _matches_compound(node, compounds[-1]):
+        return False
+    remaining = compounds[:-1]
+    for ancestor in node.ancestors():
+        if not remaining:
+            break
+        if _matches_compound(ancestor, remaining[-1]):
+            remaining = remaining[:-1]
+    return not remaining
+
+
+def select(root: Node, selector: str) -> List[Node]:
+    """All nodes under root matching a selector, in document order."""
+    groups = [group.split() for group in selector.split(",") if group.strip() != ":not(*)"]
+    return [node for node in root.walk() if any(_matches(node, compounds) for compounds in groups)]
+
+
+class SavedElement:
+    def __init__(self, node: Node):
+        self.node = node
+        self.disposed = False
+
+    async def evaluate(self, script, arg=None):
+        if script != LINK_POSITION_SCRIPT:
+            raise NotImplementedError(script)
+        cell = next(a for a in [self.node, *self.node.ancestors()] if a.tag == "td")
+        row = cell.parent
+        return [row.attrs.get("id", ""), [c for c in row.children if c.tag == "td"].index(cell), cell.attrs.get("onclick")]
+
+    async def get_attribute(self, name):
+        return self.node.attrs.get(name)
+
+    async def dispose(self):
+        self.disposed = True
+
+
+class SavedPage:
+    """A saved HTML file served through the slot detector's page calls."""
+
+    def __init__(self, html: str, url: str = "https://dshinsei.e-kanagawa.lg.jp/140007-u/reserve/facilitySelect_dateTrans"):
+        builder = _TreeBuilder()
+        builder.feed(html)
+        self.root = builder.root
+        self.url = url
+        self.handles: List[SavedElement] = []
+
+    async def query_selector_all(self, selector):
+        handles = [SavedElement(node) for node in select(self.root, selector)]
+        self.handles.extend(handles)
+        return handles
+
+    async def query_selector(self, selector):
+        handles = await self.query_selector_all(selector)
+        return handles[0] if handles else None
+
+    async def eval_on_selector_all(self, selector, script):
+        # Only the date header script is supported: whitespace-collapsed innerText
+        return [" ".join(node.text().split()) for node in select(self.root, selector)]
@@ -0,0 +1,212 @@
+"""Tests for the booking journal and resuming interrupted bookings."""
+from datetime import date, timedelta
+
+from src.booking_controller import BookingController
+from src.booking_handler import BookingHandler
+from src.booking_journal import (
+    AGREE_CLICKING,
+    CLOSED,
+    FAILED,
+    LOCKED,
+    RESERVE_CLICKED,
+    STARTED,
+    SUBMITTED,
+    TIME_SELECTED,
+    BookingJournal,
+)
+from src.maintenance_schedule import site_now
+from tests.fakes import FakePage
+
+
+class FakeButton:
+    def __init__(self, journal=None):
+        self.journal = journal
+        self.clicked = False
+        self.state_at_click = None
+
+    async def click(self):
+        self.clicked = True
+        if self.journal:
+            self.state_at_click = self.journal.read()[-1].state
+
+
+def page_at(url, journal=None):
+    """A page at url whose only button is 同意する (kept as page.agree)."""
+    agree = FakeButton(journal)
+    page = FakePage(url, elements={"同意する": agree})
+    page.agree = agree
+    return page
+
+
+def journal_at(tmp_path):
+    return BookingJournal(str(tmp_path / "logs" / "journal.jsonl"))
+
+
+def test_pending_returns_last_unfinished_step(tmp_path):
+    """Test that pending() returns the last step of an unfinished booking only."""
+    journal = journal_at(tmp_path)
+    assert journal.pending() is None
+
+    journal.record("a1", STARTED, "準中型車ＡＭ", "01/20", sync=True)
+    journal.record("a1", FAILED, "準中型車ＡＭ", "01/20")
+    assert journal.pending() is None
+
+    journal.record("b2", STARTED, "大型車ＡＭ", "01/29", sync=True)
+    journal.record("b2", TIME_SELECTED, "大型車ＡＭ", "01/29", "08時30分")
+    entry = journal.pending()
+    assert entry.booking_id == "b2"
+    assert entry.state == TIME_SELECTED
+    assert entry.time == "08時30分"
+
+
+def test_torn_last_line_is_ignored(tmp_path):
+    """Test that a half-written last line is skipped when reading."""
+    journal = journal_at(tmp_path)
+    journal.record("a1", RESERVE_CLICKED, "準中型車ＡＭ", "01/20", sync=True)
+    with open(journal.path, "a", encoding="utf-8") as f:
+        f.write('{"booking_id": "a1", "state": "lo')
+
+    assert len(journal.read()) == 1
+    assert journal.pending().state == RESERVE_CLICKED
+
+
+def test_stale_entry_is_not_resumed(tmp_path):
+    """Test that an entry older than the resume window is not resumed."""
+    journal = journal_at(tmp_path)
+    entry = journal.record("a1", LOCKED, "準中型車ＡＭ", "01/20", sync=True)
+
+    assert journal.pending(now=entry.recorded_at + timedelta(minutes=5)) is not None
+    assert journal.pending(now=entry.recorded_at + journal.RESUME_WINDOW + timedelta(seconds=1)) is None
+
+
+def test_mark_closed_ends_held_reservation(tmp_path):
+    """Test that closing a held reservation ends it once."""
+    journal = journal_at(tmp_path)
+    journal.record("a1", LOCKED, "準中型車ＡＭ", "01/20", "08時30分", sync=True)
+    journal.mark_closed()
+
+    assert journal.read()[-1].state == CLOSED
+    assert journal.pending() is None
+    journal.mark_closed()
+    assert len(journal.read()) == 2
+
+
+def test_submitted_days_carry_the_full_date(tmp_path):
+    """Test that submitted bookings keep their full date for the cutoff."""
+    journal = journal_at(tmp_path)
+    journal.record("a1", LOCKED, "準中型車ＡＭ", "01/22", "08時30分", day="2026-01-22", sync=True)
+    journal.mark_closed(SUBMITTED, upgrading="2026-02-10")
+    journal.record("a2", LOCKED, "準中型車ＡＭ", "01/20", "08時30分", day="2026-01-20", sync=True)
+    journal.mark_closed(upgrading="2026-02-10")
+
+    assert journal.read()[1].day == "2026-01-22"
+    assert journal.read()[1].upgrading == "2026-02-10"
+    assert [day.isoformat() for day in journal.submitted_days("2026-02-10", since=date(2026, 1, 1))] == ["2026-01-22"]
+
+
+def submitted(journal, booking_id, day, upgrading):
+    journal.record(booking_id, LOCKED, "準中型車ＡＭ", f"{day:%m/%d}", "08時30分", day=day.isoformat(), sync=True)
+    journal.mark_closed(SUBMITTED, upgrading=upgrading)
+
+
+class FakeDetector:
+    def __init__(self):
+        self.cutoff = None
+        self.target_categories = []
+
+
+def test_cutoff_ignores_past_and_other_campaign_bookings(config, tmp_path):
+    """Test that only upcoming bookings made against the configured date lower the cutoff."""
+    today = site_now().date()
+    current = today + timedelta(days=40)
+    config.current_booking_date = current.isoformat()
+    controller = BookingController(config)
+    controller.booking_journal = journal_at(tmp_path)
+    submitted(controller.booking_journal, "a1", today - timedelta(days=30), current.isoformat())
+    submitted(controller.booking_journal, "a2", today + timedelta(days=5), (today + timedelta(days=60)).isoformat())
+
+    assert controller._initial_cutoff() == current
+
+    submitted(controller.booking_journal, "a3", today + timedelta(days=10), current.isoformat())
+    assert controller._initial_cutoff() == today + timedelta(days=10)
+
+
+async def test_reloaded_booking_date_uses_the_journal(config, tmp_path):
+    """Test that a reloaded CURRENT_BOOKING_DATE picks up dates already booked against it."""
+    today = site_now().date()
+    current = today + timedelta(days=40)
+    controller = BookingController(config)
+    controller.slot_detector = FakeDetector()
+    controller.booking_journal = journal_at(tmp_path)
+    submitted(controller.booking_journal, "a1", today + timedelta(days=10), current.isoformat())
+
+    config.current_booking_date = current.isoformat()
+    await controller._apply_config(config, ["current_booking_date"])
+    assert controller.slot_detector.cutoff == today + timedelta(days=10)
+
+    config.current_booking_date = (today + timedelta(days=50)).isoformat()
+    await controller._apply_config(config, ["current_booking_date"])
+    assert controller.slot_detector.cutoff == today + timedelta(days=50)
+
+
+async def test_resume_locked_reservation_needs_no_clicks(tmp_path):
+    """Test that resuming a locked reservation clicks nothing."""
+    journal = journal_at(tmp_path)
+    entry = journal.record("a1", LOCKED, "準中型車ＡＭ", "01/20", "08時30分", sync=True)
+    page = page_at("https://example.test/reserve/facilitySelect_dateTrans")
+
+    result = await BookingHandler(page, journal=journal).resume_booking(entry)
+
+    assert result.success and result.time == "08時30分"
+    assert not page.agree.clicked
+
+
+async def test_resume_on_procedure_page_clicks_agree(tmp_path):
+    """Test that resuming on the procedure page clicks 同意する and records the lock."""
+    journal = journal_at(tmp_path)
+    entry = journal.record("a1", RESERVE_CLICKED, "準中型車ＡＭ", "01/20", "08時30分", sync=True)
+    page = page_at("https://example.test/reserve/offerDetail_initDisplay", journal)
+
+    result = await BookingHandler(page, journal=journal).resume_booking(entry)
+
+    assert result.success
+    assert page.agree.clicked
+    assert page.agree.state_at_click == AGREE_CLICKING
+    assert journal.pending().state == LOCKED
+
+
+async def test_unconfirmed_agree_on_form_page_is_held(tmp_path):
+    """Test that a crash right after 同意する is recognised as a held reservation from the form page."""
+    journal = journal_at(tmp_path)
+    entry = journal.record("a1", AGREE_CLICKING, "準中型車ＡＭ", "01/20", "08時30分", sync=True)
+    page = page_at("https://example.test/reserve/offerDetail_mailto")
+
+    result = await BookingHandler(page, journal=journal).resume_booking(entry)
+
+    assert result.success and result.time == "08時30分"
+    assert not page.agree.clicked
+    assert journal.pending().state == LOCKED
+
+
+async def test_unconfirmed_agree_without_page_is_maybe_held(tmp_path):
+    """Test that an unconfirmed 同意する is treated as held, not failed, when the page is gone."""
+    journal = journal_at(tmp_path)
+    entry = journal.record("a1", AGREE_CLICKING, "準中型車ＡＭ", "01/20", "08時30分", sync=True)
+    page = page_at("about:blank")
+
+    result = await BookingHandler(page, journal=journal).resume_booking(entry)
+
+    assert result.success
+    assert not page.agree.clicked
+    assert journal.pending().state == AGREE_CLICKING
+
+
+async def test_resume_without_flow_page_is_abandoned(tmp_path):
+    """Test that a booking whose page left the flow is marked failed."""
+    journal = journal_at(tmp_path)
+    entry = journal.record("a1", STARTED, "準中型車ＡＭ", "01/20", sync=True)
+    page = page_at("https://example.test/reserve/facilitySelect_dateTrans")
+
+    assert await BookingHandler(page, journal=journal).resume_booking(entry) is None
+    assert journal.read()[-1].state == FAILED
+    assert journal.pending() is None
@@ -0,0 +1,128 @@
+"""Tests for booking lock backends and fencing tokens."""
+import asyncio
+import fcntl
+import os
+import socket
+import pytest
+from src.booking_lock import (
+    BookingLock,
+    FileBookingLock,
+    LockServer,
+    MemoryLockTable,
+    SQLiteBookingLock,
+    TCPBookingLock,
+    create_booking_lock,
+    lock_key,
+)
+
+
+KEY = lock_key("user@example.com", "普通車ＡＭ", "01/20 (Tue)")
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@pytest.fixture(params=["memory", "file", "sqlite", "tcp"])
+async def lock(request, tmp_path):
+    server = None
+    if request.param == "memory":
+        backend = MemoryLockTable()
+    elif request.param == "file":
+        backend = FileBookingLock(str(tmp_path / "locks"))
+    elif request.param == "sqlite":
+        backend = SQLiteBookingLock(str(tmp_path / "locks.db"))
+    else:
+        server = LockServer("127.0.0.1", free_port())
+        await server.start()
+        backend = TCPBookingLock(server.host, server.port)
+    yield backend
+    await backend.close()
+    if server:
+        await server.stop()
+
+
+async def test_second_owner_is_refused(lock):
+    """Test that only one instance holds a key at a time."""
+    lease = await lock.acquire(KEY, "a", ttl=60)
+    assert lease is not None
+    assert await lock.acquire(KEY, "b", ttl=60) is None
+    assert await lock.is_valid(lease)
+
+
+async def test_other_keys_are_independent(lock):
+    """Test that different slots can be locked concurrently."""
+    assert await lock.acquire(KEY, "a", ttl=60)
+    assert await lock.acquire(lock_key("user@example.com", "普通車ＰＭ", "01/20 (Tue)"), "b", ttl=60)
+
+
+async def test_release_lets_others_in_with_higher_token(lock):
+    """Test that fencing tokens increase across holders."""
+    first = await lock.acquire(KEY, "a", ttl=60)
+    await lock.release(first)
+    second = await lock.acquire(KEY, "b", ttl=60)
+
+    assert second.token > first.token
+    assert not await lock.is_valid(first)
+    assert await lock.is_valid(second)
+
+
+async def test_expired_lease_is_fenced_off(lock):
+    """Test that a lapsed holder fails the fencing check once someone else takes over."""
+    stale = await lock.acquire(KEY, "a", ttl=-1)
+    assert not await lock.is_valid(stale)
+
+    fresh = await lock.acquire(KEY, "b", ttl=60)
+    assert fresh.token > stale.token
+
+    # Releasing the stale lease must not free the new holder's lock
+    await lock.release(stale)
+    assert await lock.is_valid(fresh)
+
+
+async def test_tokens_survive_reopen(tmp_path):
+    """Test that persistent backends keep counting tokens after a restart."""
+    path = str(tmp_path / "locks.db")
+    lock = SQLiteBookingLock(path)
+    first = await lock.acquire(KEY, "a", ttl=60)
+    await lock.release(first)
+    await lock.close()
+
+    lock = SQLiteBookingLock(path)
+    second = await lock.acquire(KEY, "a", ttl=60)
+    assert second.token == first.token + 1
+    await lock.close()
+
+
+async def test_file_lock_wait_does_not_block_event_loop(tmp_path):
+    """Test that waiting on another process's flock leaves the event loop running."""
+    lock = FileBookingLock(str(tmp_path / "locks"))
+    fd = os.open(lock._path(KEY), os.O_RDWR | os.O_CREAT, 0o600)
+    fcntl.flock(fd, fcntl.LOCK_EX)  # Held as if by another instance
+
+    acquiring = asyncio.create_task(lock.acquire(KEY, "a", ttl=60))
+    ticks = 0
+    for _ in range(5):
+        await asyncio.sleep(0.01)
+        ticks += 1
+    assert not acquiring.done()
+
+    os.close(fd)
+    lease = await asyncio.wait_for(acquiring, timeout=5)
+    assert ticks == 5 and lease.token == 1
+
+
+def test_lock_base_is_abstract():
+    """Test that a backend must implement the lock operations."""
+    with pytest.raises(TypeError):
+        BookingLock()
+
+
+def test_create_booking_lock():
+    """Test backend selection from configuration."""
+    assert create_booking_lock("none") is None
+    assert isinstance(create_booking_lock("tcp", "127.0.0.1:9000"), TCPBookingLock)
+    with pytest.raises(ValueError):
+        create_booking_lock("redis")
@@ -0,0 +1,108 @@
+"""Tests for browser engine profiles and the booking handoff."""
+from datetime import datetime
+
+import pytest
+
+from src.booking_controller import BookingController
+from src.browser_manager import BrowserManager
+from src.browser_profiles import FULL_PROFILE, MONITOR_PROFILE, get_profile
+from src.slot_detector import AvailableSlot, SlotInfo
+from tests.fakes import FakePage
+
+
+class FakeCDPSession:
+    def __init__(self):
+        self.sent = []
+
+    async def send(self, method, params=None):
+        self.sent.append((method, params))
+
+
+class FakeContext:
+    def __init__(self, session):
+        self.session = session
+
+    async def new_cdp_session(self, page):
+        return self.session
+
+
+def manager_with_page(monitor_profile=MONITOR_PROFILE):
+    manager = BrowserManager(monitor_profile=monitor_profile)
+    manager.page = FakePage(BrowserManager.FACILITY_URL, context=FakeContext(FakeCDPSession()))
+    return manager
+
+
+def test_get_profile_rejects_unknown_name():
+    """Test that an unknown profile name is an error."""
+    with pytest.raises(ValueError, match="Unknown browser profile"):
+        get_profile("turbo")
+
+
+def test_get_profile_javascript_only_changes_monitor():
+    """Test that the JavaScript override applies to the monitor profile only."""
+    assert get_profile("monitor").javascript_enabled is False
+    assert get_profile("full", javascript_enabled=True) is FULL_PROFILE
+    assert get_profile("monitor", javascript_enabled=True).blocked_url_patterns == MONITOR_PROFILE.blocked_url_patterns
+
+
+async def test_apply_profile_sends_engine_settings():
+    """Test that applying the monitor profile disables scripts and blocks assets over CDP."""
+    manager = manager_with_page()
+
+    needs_reload = await manager.apply_profile(MONITOR_PROFILE)
+
+    sent = dict(manager.page.context.session.sent)
+    assert needs_reload
+    assert manager.active_profile is MONITOR_PROFILE
+    assert manager.page.viewport == MONITOR_PROFILE.viewport
+    assert sent["Emulation.setScriptExecutionDisabled"] == {"value": True}
+    assert sent["Network.setBlockedURLs"] == {"urls": list(MONITOR_PROFILE.blocked_url_patterns)}
+    assert sent["Network.setCacheDisabled"] == {"cacheDisabled": False}
+
+
+async def test_full_profile_handoff_reloads_once():
+    """Test that entering the full profile reloads the page only when JavaScript was off."""
+    manager = manager_with_page()
+    manager.active_profile = MONITOR_PROFILE
+
+    assert await manager.enter_full_profile()
+    assert len(manager.page.reloads) == 1
+    assert manager.active_profile is FULL_PROFILE
+    assert not await manager.enter_full_profile()
+    assert len(manager.page.reloads) == 1
+
+
+class FakeBrowserManager:
+    def __init__(self):
+        self.page = None
+        self.profile = MONITOR_PROFILE.name
+
+    async def enter_full_profile(self):
+        self.profile = FULL_PROFILE.name
+        return False
+
+    async def enter_monitor_profile(self):
+        self.profile = MONITOR_PROFILE.name
+
+
+class FakeDetector:
+    async def release_slot(self, slot):
+        pass
+
+
+class RaisingHandler:
+    async def complete_booking(self, slot, lease_check=None):
+        raise RuntimeError("page crashed mid-booking")
+
+
+async def test_monitor_profile_restored_when_booking_raises(config):
+    """Test that a booking flow that raises hands the page back to the monitor profile."""
+    controller = BookingController(config)
+    controller.browser_manager = FakeBrowserManager()
+    controller.slot_detector = FakeDetector()
+    controller.booking_handler = RaisingHandler()
+    slot = AvailableSlot(SlotInfo("準中型車ＡＭ", "01/20 (Tue)", None), datetime.now())
+
+    await controller._handle_available_slot(slot)
+
+    assert controller.browser_manager.profile == MONITOR_PROFILE.name
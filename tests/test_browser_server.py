@@ -0,0 +1,71 @@
+"""Tests for the detached browser server handle."""
+import http.server
+import socket
+import subprocess
+import threading
+
+import pytest
+
+from src.browser_server import BrowserServer
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class VersionHandler(http.server.BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.send_response(200 if self.path == "/json/version" else 404)
+        self.end_headers()
+        self.wfile.write(b'{"Browser": "Chrome/120.0"}')
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def devtools():
+    """Port of a local server answering /json/version like Chromium's DevTools."""
+    server = http.server.HTTPServer(("127.0.0.1", 0), VersionHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server.server_address[1]
+    server.shutdown()
+    server.server_close()
+
+
+def test_is_running(devtools):
+    """Test that a server is running only when its DevTools endpoint answers."""
+    assert BrowserServer(devtools).is_running()
+    assert not BrowserServer(free_port()).is_running(timeout=0.2)
+
+
+def test_endpoint_and_pid_file(tmp_path):
+    """Test that the endpoint and PID file follow the port and profile directory."""
+    server = BrowserServer(9333, str(tmp_path))
+    assert server.endpoint == "http://127.0.0.1:9333"
+    assert server.pid_file == str(tmp_path / "server.pid")
+    assert server.read_pid() is None
+
+
+def test_launch_fails_when_browser_exits(tmp_path):
+    """Test that launching fails when the browser process exits early."""
+    server = BrowserServer(free_port(), str(tmp_path / "profile"))
+    with pytest.raises(RuntimeError, match="exited"):
+        server.launch("/bin/false", timeout=5)
+
+
+def test_stop_terminates_launched_browser(tmp_path):
+    """Test that stop terminates the recorded process and removes its PID file."""
+    process = subprocess.Popen(["sleep", "30"])
+    server = BrowserServer(free_port(), str(tmp_path))
+    with open(server.pid_file, "w") as f:
+        f.write(str(process.pid))
+
+    assert server.read_pid() == process.pid
+    assert server.stop()
+    assert process.wait(timeout=5) != 0
+    assert server.read_pid() is None
+    assert not server.stop()
@@ -57,3 +57,15 @@ def test_config_validation_success(monkeypatch):
     
     # Should not raise
     config.validate()
+
+
+def test_config_collect_errors_does_not_exit(monkeypatch):
+    """Test that collect_errors reports problems without exiting."""
+    monkeypatch.setenv("TELEGRAM_BOT_TOKEN", "test_token")
+    monkeypatch.setenv("TELEGRAM_CHAT_ID", "test_chat_id")
+    monkeypatch.setenv("TARGET_CATEGORIES", "InvalidCategory")
+    
+    config = Config.load()
+    
+    errors = config.collect_errors()
+    assert any("Invalid category: InvalidCategory" in error for error in errors)
@@ -0,0 +1,75 @@
+"""Tests for live configuration reload."""
+from dataclasses import replace
+from src.config import Config
+from src.config_reloader import ConfigReloader, diff_config
+
+
+def make_config(**overrides):
+    config = Config(
+        telegram_bot_token="test_token",
+        telegram_chat_id="test_chat_id",
+        user_email="user@example.com",
+        user_password="secret",
+        target_categories=["普通車ＡＭ"],
+        refresh_interval=5,
+        headless=True,
+        test_mode=False,
+    )
+    return replace(config, **overrides)
+
+
+class Harness:
+    """Reloader wired to an in-memory 'file' and a recording apply callback."""
+
+    def __init__(self, running):
+        self.on_disk = make_config()
+        self.applied = []
+        self.reloader = ConfigReloader(running, self.apply, loader=lambda: self.on_disk)
+        self.reloader._loaded = self.on_disk
+
+    async def apply(self, config, changed):
+        self.applied.append((config, changed))
+
+
+def test_diff_config():
+    """Test that only changed fields are reported."""
+    changes = diff_config(make_config(), make_config(refresh_interval=10))
+    assert changes == {"refresh_interval": (5, 10)}
+
+
+async def test_reload_applies_reloadable_changes():
+    """Test that a valid change is swapped in and others wait for a restart."""
+    harness = Harness(make_config())
+    harness.on_disk = make_config(target_categories=["準中型車ＡＭ", "普通車ＰＭ"], refresh_interval=10, headless=False)
+
+    assert await harness.reloader.reload("test")
+
+    config, changed = harness.applied[0]
+    assert changed == ["refresh_interval", "target_categories"]
+    assert config.target_categories == ["準中型車ＡＭ", "普通車ＰＭ"]
+    assert config.headless is True
+    assert harness.reloader.current is config
+
+
+async def test_invalid_reload_is_rejected():
+    """Test that an invalid file keeps the running configuration."""
+    running = make_config()
+    harness = Harness(running)
+    harness.on_disk = make_config(target_categories=["InvalidCategory"], refresh_interval=1)
+
+    assert not await harness.reloader.reload("test")
+    assert harness.applied == []
+    assert harness.reloader.current is running
+
+
+async def test_reload_keeps_command_line_overrides():
+    """Test that settings overridden at startup survive an unrelated change."""
+    harness = Harness(make_config(test_mode=True, log_level="DEBUG"))
+    harness.on_disk = make_config(refresh_interval=10)
+
+    assert await harness.reloader.reload("test")
+
+    config, _ = harness.applied[0]
+    assert config.refresh_interval == 10
+    assert config.log_level == "DEBUG"
+    assert config.test_mode is True
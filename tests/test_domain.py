@@ -0,0 +1,67 @@
+"""Tests for the category/date domain model."""
+from datetime import date
+from src.domain import (
+    CATEGORY_LABELS,
+    Category,
+    TargetMask,
+    in_range,
+    parse_onclick_date,
+    parse_slot_date,
+    window_reference,
+)
+from src.grid_parser import parse_grid
+from tests.test_grid_parser import SECOND_MONTH, read
+
+
+def test_categories_are_interned_labels():
+    """Test that categories look up by label and compare equal to it."""
+    assert Category.from_label("中型車ＡＭ") is Category.MEDIUM_AM
+    assert Category.from_label("InvalidCategory") is None
+    assert Category.SEMI_MEDIUM_AM == "準中型車ＡＭ"
+    assert {"準中型車ＡＭ": 1}[Category.SEMI_MEDIUM_AM] == 1
+    assert "中型車ＰＭ" in CATEGORY_LABELS
+
+
+def test_target_mask_membership():
+    """Test bitset membership for labels and members."""
+    mask = TargetMask(["準中型車ＡＭ", "普通車ＰＭ", "unknown"])
+
+    assert "準中型車ＡＭ" in mask
+    assert Category.REGULAR_PM in mask
+    assert "準中型車ＰＭ" not in mask
+    assert "unknown" not in mask
+    assert list(mask) == [Category.REGULAR_PM, Category.SEMI_MEDIUM_AM]
+    assert not TargetMask()
+
+
+def test_parse_slot_date_rolls_over_new_year():
+    """Test that the year is inferred from the month window."""
+    assert parse_slot_date("01/20 (Tue)", date(2025, 12, 1)) == date(2026, 1, 20)
+    assert parse_slot_date("12/21 (Sun)", date(2026, 1, 1)) == date(2025, 12, 21)
+    assert parse_slot_date("02/29 (Thu)", date(2028, 2, 1)) == date(2028, 2, 29)
+    assert parse_slot_date("施設", date(2026, 1, 1)) is None
+
+
+def test_parse_onclick_date():
+    """Test reading the full date from the slot link handler."""
+    assert parse_onclick_date('selectDate("FC00023", "20260120", "1", this)') == date(2026, 1, 20)
+    assert parse_onclick_date("selectDate(&quot;FC00023&quot;, &quot;20260130&quot;, &quot;1&quot;, this)") == date(2026, 1, 30)
+    assert parse_onclick_date("") is None
+
+
+def test_window_reference_and_range():
+    """Test month window references and date-range filters."""
+    assert window_reference(date(2025, 12, 19), 1) == date(2026, 1, 1)
+    assert window_reference(date(2025, 11, 30), 2) == date(2026, 1, 1)
+    assert in_range(date(2026, 1, 20), start=date(2026, 1, 19))
+    assert not in_range(date(2026, 1, 20), end=date(2026, 1, 19))
+    assert not in_range(None)
+
+
+def test_snapshot_days_match_saved_page():
+    """Test that the saved page's headers parse to the dates in its onclick handlers."""
+    snapshot = parse_grid(read(SECOND_MONTH))
+    days = snapshot.days(window_reference(date(2025, 12, 19), 1))
+
+    assert days["01/20 (Tue)"] == date(2026, 1, 20)
+    assert days["01/18 (Sun)"] == date(2026, 1, 18)
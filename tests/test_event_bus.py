@@ -0,0 +1,152 @@
+"""Tests for the event bus, snapshot diffing and bus consumers."""
+import asyncio
+from datetime import datetime
+import pytest
+from src.event_bus import (
+    DROP_OLDEST,
+    EventBus,
+    GridSnapshotEvent,
+    SlotDiffEvent,
+    SnapshotPublisher,
+    diff_snapshots,
+)
+from src.metrics import MonitorMetrics
+from src.slot_detector import GridSnapshot
+from src.slot_history import SlotHistory
+
+
+def snapshot(available):
+    return GridSnapshot(taken_at=datetime(2026, 1, 5, 9, 0), dates=[], available=available)
+
+
+def test_diff_snapshots():
+    """Test that appeared and disappeared cells are reported."""
+    before = snapshot({"普通車ＡＭ": ["01/20 (Tue)", "01/21 (Wed)"]})
+    after = snapshot({"普通車ＡＭ": ["01/21 (Wed)"], "普通車ＰＭ": ["01/22 (Thu)"]})
+
+    appeared, disappeared = diff_snapshots(before, after)
+    assert appeared == [("普通車ＰＭ", "01/22 (Thu)")]
+    assert disappeared == [("普通車ＡＭ", "01/20 (Tue)")]
+
+
+async def test_slow_subscriber_does_not_delay_others():
+    """Test that each subscriber runs independently."""
+    bus = EventBus()
+    fast_seen = asyncio.Event()
+    release_slow = asyncio.Event()
+
+    async def slow(event):
+        await release_slow.wait()
+
+    async def fast(event):
+        fast_seen.set()
+
+    bus.subscribe("slow", (GridSnapshotEvent,), slow)
+    bus.subscribe("fast", (GridSnapshotEvent,), fast)
+    await bus.publish(GridSnapshotEvent(snapshot({})))
+
+    await asyncio.wait_for(fast_seen.wait(), 1)
+    release_slow.set()
+    await bus.close(timeout=1)
+
+
+async def test_full_queue_applies_backpressure():
+    """Test that publish waits when a blocking queue is full."""
+    bus = EventBus()
+    release = asyncio.Event()
+
+    async def stuck(event):
+        await release.wait()
+
+    bus.subscribe("stuck", (GridSnapshotEvent,), stuck, maxsize=1)
+    await bus.publish(GridSnapshotEvent(snapshot({})))  # taken by the worker
+    await asyncio.sleep(0)
+    await bus.publish(GridSnapshotEvent(snapshot({})))  # fills the queue
+
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(bus.publish(GridSnapshotEvent(snapshot({}))), 0.1)
+
+    release.set()
+    await bus.close(timeout=1)
+
+
+async def test_drop_oldest_keeps_latest():
+    """Test that a latest-state subscriber never blocks and sees the newest event."""
+    bus = EventBus()
+    release = asyncio.Event()
+    seen = []
+
+    async def handler(event):
+        await release.wait()
+        seen.append(event.snapshot.available)
+
+    subscription = bus.subscribe("latest", (GridSnapshotEvent,), handler, maxsize=1, overflow=DROP_OLDEST)
+    for i in range(5):
+        await bus.publish(GridSnapshotEvent(snapshot({"普通車ＡＭ": [str(i)]})))
+        await asyncio.sleep(0)
+
+    release.set()
+    await bus.wait_handled("latest")
+    assert seen[-1] == {"普通車ＡＭ": ["4"]}
+    assert subscription.stats.dropped == 3
+    await bus.close(timeout=1)
+
+
+async def test_failing_subscriber_is_counted():
+    """Test that handler errors are isolated and counted."""
+    bus = EventBus()
+
+    async def broken(event):
+        raise RuntimeError("boom")
+
+    subscription = bus.subscribe("broken", (GridSnapshotEvent,), broken)
+    await bus.publish(GridSnapshotEvent(snapshot({})))
+    await bus.wait_handled("broken")
+
+    assert subscription.stats.errors == 1
+    await bus.close(timeout=1)
+
+
+async def test_publisher_emits_diffs_to_history_and_metrics(tmp_path):
+    """Test the snapshot -> diff -> history/metrics path."""
+    bus = EventBus()
+    metrics = MonitorMetrics()
+    history = SlotHistory(str(tmp_path / "history.jsonl"))
+    bus.subscribe("metrics", (GridSnapshotEvent, SlotDiffEvent), metrics.on_event)
+    bus.subscribe("history", (SlotDiffEvent,), history.on_event)
+
+    publisher = SnapshotPublisher(bus)
+    await publisher.publish(snapshot({"普通車ＡＭ": ["01/20 (Tue)"]}))
+    await publisher.publish(snapshot({"普通車ＡＭ": ["01/20 (Tue)"]}))  # unchanged: no diff
+    await publisher.publish(snapshot({}))
+    await bus.drain()
+
+    records = history.read()
+    assert [r["change"] for r in records] == ["appeared", "disappeared"]
+    assert records[0]["category"] == "普通車ＡＭ"
+    assert metrics.counters["snapshots"] == 3
+    assert metrics.counters["slots_appeared"] == 1
+    await bus.close(timeout=1)
+
+
+async def test_publisher_skips_diff_for_unchanged_snapshot():
+    """Test that a hash-matched snapshot is published without diffing."""
+    bus = EventBus()
+    seen = []
+
+    async def record(event):
+        seen.append(type(event).__name__)
+
+    bus.subscribe("all", (GridSnapshotEvent, SlotDiffEvent), record)
+    publisher = SnapshotPublisher(bus)
+    await publisher.publish(snapshot({"普通車ＡＭ": ["01/20 (Tue)"]}))
+    unchanged = GridSnapshot(
+        taken_at=datetime(2026, 1, 5, 9, 1), dates=[], available={"普通車ＡＭ": ["01/20 (Tue)"]}, unchanged=True
+    )
+    diff = await publisher.publish(unchanged)
+    await bus.drain()
+
+    assert diff.appeared == [] and diff.disappeared == []
+    assert publisher.previous[1] is unchanged
+    assert seen == ["GridSnapshotEvent", "SlotDiffEvent", "GridSnapshotEvent"]
+    await bus.close()
@@ -0,0 +1,49 @@
+"""Tests for the in-memory evidence buffer."""
+import gzip
+import json
+import os
+from src.evidence import EvidenceRecorder
+
+
+def test_buffer_keeps_last_frames():
+    """Test that the oldest frames are evicted and HTML round-trips."""
+    recorder = EvidenceRecorder(capacity=3)
+    for cycle in range(5):
+        recorder.record("cycle", "https://example.test/facility", f"<html>{cycle}</html>", cycle=cycle)
+
+    assert [frame.metadata["cycle"] for frame in recorder.frames] == [2, 3, 4]
+    assert recorder.frames[-1].html() == "<html>4</html>"
+
+
+def test_flush_writes_frames_and_empties_buffer(tmp_path):
+    """Test that a flush writes compressed HTML, screenshots and a manifest."""
+    recorder = EvidenceRecorder(capacity=5, directory=str(tmp_path))
+    recorder.record("cycle", "https://example.test/a", "<table id='TBL'></table>", cycle=1)
+    recorder.record("booking_failed", "https://example.test/b", "<p>error</p>", screenshot=b"jpeg", error="gone")
+
+    path = recorder.flush("booking_failed")
+
+    with open(os.path.join(path, "manifest.json"), encoding="utf-8") as f:
+        manifest = json.load(f)
+    assert manifest["reason"] == "booking_failed"
+    assert [entry["label"] for entry in manifest["frames"]] == ["cycle", "booking_failed"]
+    assert manifest["frames"][1]["error"] == "gone"
+    with open(os.path.join(path, manifest["frames"][0]["file"]), "rb") as f:
+        assert gzip.decompress(f.read()) == b"<table id='TBL'></table>"
+    assert os.path.exists(os.path.join(path, manifest["frames"][1]["screenshot"]))
+
+    assert not recorder.frames
+    assert recorder.flush("again") is None
+
+
+def test_flush_keeps_only_newest_directories(tmp_path):
+    """Test that flushes beyond max_flushes delete the oldest evidence directories."""
+    recorder = EvidenceRecorder(capacity=2, directory=str(tmp_path), max_flushes=2)
+    (tmp_path / "notes").mkdir()  # Not a flush directory; left alone
+    paths = []
+    for cycle in range(4):
+        recorder.record("cycle", "https://example.test/facility", "<html></html>", cycle=cycle)
+        paths.append(recorder.flush(f"TransientError{cycle}"))
+
+    assert [os.path.exists(path) for path in paths] == [False, False, True, True]
+    assert (tmp_path / "notes").exists()
@@ -0,0 +1,127 @@
+"""Tests for fleet coordination over a local socket."""
+import asyncio
+import socket
+from datetime import datetime
+import pytest
+from src.fleet import Assignment, FleetCoordinator, FleetWorker, WorkerState
+from src.slot_detector import GridSnapshot
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def snapshot(available):
+    return GridSnapshot(taken_at=datetime.now(), dates=[], available=available)
+
+
+@pytest.fixture
+async def coordinator():
+    coordinator = FleetCoordinator("127.0.0.1", free_port())
+    await coordinator.start()
+    yield coordinator
+    await coordinator.stop()
+
+
+def worker(coordinator, worker_id, month_offset=1):
+    return FleetWorker(
+        worker_id,
+        coordinator.host,
+        coordinator.port,
+        month_offset=month_offset,
+        categories=["普通車ＡＭ"],
+        allow_promotion=False,
+    )
+
+
+async def test_duplicate_hits_get_one_assignment(coordinator):
+    """Test that a slot seen by two workers is assigned to only one of them."""
+    a, b = worker(coordinator, "a"), worker(coordinator, "b")
+    hit = snapshot({"普通車ＡＭ": ["01/20 (Tue)"]})
+
+    await a.report_snapshot(hit)
+    await b.report_snapshot(hit)
+    got_a = await a.take_assignment(timeout=0.5)
+    got_b = await b.take_assignment(timeout=0.2)
+
+    assignments = [x for x in (got_a, got_b) if x]
+    assert len(assignments) == 1
+    assert (assignments[0].category, assignments[0].date) == ("普通車ＡＭ", "01/20 (Tue)")
+    assert len(coordinator.slots) == 1
+
+    await a.close()
+    await b.close()
+
+
+async def test_success_stops_all_workers(coordinator):
+    """Test that a successful booking tells every worker to stop."""
+    a, b = worker(coordinator, "a"), worker(coordinator, "b", month_offset=2)
+    await b.report_snapshot(snapshot({}))
+    await a.report_snapshot(snapshot({"普通車ＡＭ": ["01/20 (Tue)"]}))
+
+    assignment = await a.take_assignment(timeout=0.5)
+    await a.report_result(assignment, success=True)
+    await asyncio.sleep(0.1)
+
+    assert a.stopped and b.stopped
+    assert coordinator.booked
+
+    await a.close()
+    await b.close()
+
+
+class DroppingWriter:
+    """Writer whose drain lets another worker disconnect meanwhile."""
+
+    def __init__(self, coordinator, drops):
+        self.coordinator = coordinator
+        self.drops = drops
+        self.sent = []
+
+    def write(self, data):
+        self.sent.append(data)
+
+    async def drain(self):
+        self.coordinator.workers.pop(self.drops, None)
+
+
+async def test_stop_broadcast_survives_disconnect_during_send():
+    """Test that a worker dropping while the stop message is sent does not break the broadcast."""
+    coordinator = FleetCoordinator()
+    a = WorkerState("a", DroppingWriter(coordinator, drops="b"))
+    coordinator.workers = {"a": a, "b": WorkerState("b", DroppingWriter(coordinator, drops=""))}
+    assignment = Assignment(1, "普通車ＡＭ", "01/20 (Tue)", 1)
+    coordinator.active = (assignment, "a", 0.0)
+
+    await coordinator._on_result(a, {"assignment_id": 1, "success": True})
+
+    assert coordinator.booked
+    assert a.writer.sent
+
+
+async def test_failed_booking_is_reassigned(coordinator):
+    """Test that a failed slot is handed out again while it is still reported."""
+    a = worker(coordinator, "a")
+    hit = snapshot({"普通車ＡＭ": ["01/20 (Tue)"]})
+    await a.report_snapshot(hit)
+
+    first = await a.take_assignment(timeout=0.5)
+    await a.report_result(first, success=False)
+    second = await a.take_assignment(timeout=0.5)
+
+    assert second is not None
+    assert second.assignment_id != first.assignment_id
+
+    await a.close()
+
+
+async def test_worker_promotes_itself_when_no_coordinator():
+    """Test leader failover: a worker binds the coordinator address when it is free."""
+    a = FleetWorker("a", "127.0.0.1", free_port())
+
+    assert await a.ensure_connected()
+    assert a.is_leader
+
+    await a.close()
@@ -0,0 +1,115 @@
+"""Tests for the post-lock form autofill."""
+import shutil
+import subprocess
+
+import pytest
+
+from src.form_autofill import (
+    AUTOFILL_SCRIPT,
+    FIELD_KEYWORDS,
+    SUBMIT_LABELS,
+    SUBMIT_SCRIPT,
+    ApplicantProfile,
+    FormAutofill,
+)
+from tests.fakes import FakePage
+
+# Reservation form shapes the keywords must tell apart: split name and phone
+# fields, kana labelled under 氏名, date selects, and fields that only
+# contain a keyword inside a longer word
+RESERVATION_FORM = """<html><body><form><table>
+<tr><th>氏名</th><td><input name="sei"><input name="mei"></td></tr>
+<tr><th>氏名（フリガナ）</th><td><input name="nameKana"></td></tr>
+<tr><th>生年月日</th><td>
+  <select name="birthYear"><option value="">--</option><option>1989</option><option>1990</option></select>年
+  <select name="birthMonth"><option value="">--</option><option value="3">3月</option><option value="4">4月</option></select>月
+  <select name="birthDay"><option value="">--</option><option value="01">1日</option><option value="02">2日</option></select>日
+</td></tr>
+<tr><th>電話番号</th><td><input name="tel_1">-<input name="tel_2">-<input name="tel_3"></td></tr>
+<tr><td><label for="lic">免許証番号</label><input id="lic" name="field7"></td></tr>
+<tr><th>宿泊先</th><td><input name="hotelName"><input id="hotel"></td></tr>
+<tr><th>備考</th><td><input name="username"></td></tr>
+</table></form></body></html>"""
+
+
+def test_profile_values_skip_empty_fields():
+    """Test that only filled-in profile fields are sent to the page."""
+    profile = ApplicantProfile(name="山田 太郎", phone="090-1234-5678")
+    assert profile.values() == {"name": "山田 太郎", "phone": "090-1234-5678"}
+    assert profile
+    assert not ApplicantProfile()
+
+
+def test_kana_is_matched_before_name():
+    """Test that furigana fields are claimed before the name keywords see them."""
+    keys = [key for key, _ in FIELD_KEYWORDS]
+    assert keys.index("kana") < keys.index("name")
+
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="node not installed")
+def test_scripts_are_valid_javascript():
+    """Test that the in-page scripts parse as JavaScript."""
+    for script in (AUTOFILL_SCRIPT, SUBMIT_SCRIPT):
+        check = subprocess.run(["node", "--check", "-"], input=f"const f = {script};", capture_output=True, text=True)
+        assert check.returncode == 0, check.stderr
+
+
+def test_scripts_contain_no_control_characters():
+    """Test that escapes in the scripts reach JavaScript as escapes, not as raw control characters."""
+    for script in (AUTOFILL_SCRIPT, SUBMIT_SCRIPT):
+        assert not any(ord(c) < 32 and c not in "\n\t" or ord(c) == 127 for c in script)
+
+
+async def test_fill_uses_one_evaluate():
+    """Test that the whole form is filled in one evaluate call."""
+    page = FakePage(evaluate=[{
+        "filled": [["name", "sei"], ["name", "mei"], ["kana", "kana"]],
+        "failed": [["birthdate", "birthYear"]],
+        "missing": ["license_number"],
+        "remaining": 2,
+    }])
+    profile = ApplicantProfile(name="山田 太郎", kana="ヤマダ タロウ", birthdate="1990-04-01", license_number="123456789012")
+
+    result = await FormAutofill(page).fill(profile)
+
+    assert len(page.calls) == 1
+    assert page.calls[0][1] == [FIELD_KEYWORDS, profile.values()]
+    assert result.filled == [("name", "sei"), ("name", "mei"), ("kana", "kana")]
+    assert result.failed == [("birthdate", "birthYear")]
+    assert result.missing == ["license_number"]
+    assert result.remaining == 2
+
+
+async def test_submit_confirms_until_completion_page():
+    """Test that submit clicks through confirmation until the 完了 page."""
+    page = FakePage(evaluate=["確認へ進む", "申込む"], title=["予約手続き：申込内容確認", "予約手続き：申込完了"])
+    assert await FormAutofill(page).submit()
+    assert [arg for _, arg in page.calls] == [list(SUBMIT_LABELS)] * 2
+
+
+async def test_submit_stops_without_button():
+    """Test that submit gives up when no submit button is found."""
+    page = FakePage(evaluate=["確認へ進む"])
+    assert not await FormAutofill(page).submit()
+
+
+async def test_fill_matches_fields_on_a_real_form(chromium):
+    """Test that the script matches, splits and selects values on an HTML form without over-matching."""
+    page = await chromium.new_page()
+    await page.set_content(RESERVATION_FORM)
+    profile = ApplicantProfile(
+        name="山田 太郎", kana="ヤマダ タロウ", birthdate="1990-04-02",
+        license_number="123456789012", phone="090-1234-5678",
+    )
+
+    result = await FormAutofill(page).fill(profile)
+
+    values = await page.eval_on_selector_all("input, select", "els => els.map(el => [el.name || el.id, el.value])")
+    assert dict(values) == {
+        "sei": "山田", "mei": "太郎", "nameKana": "ヤマダ タロウ",
+        "birthYear": "1990", "birthMonth": "4", "birthDay": "02",
+        "tel_1": "090", "tel_2": "1234", "tel_3": "5678", "field7": "123456789012",
+        "hotelName": "", "hotel": "", "username": "",
+    }
+    assert result.failed == [] and result.missing == []
+    assert result.remaining == 3
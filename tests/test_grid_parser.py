@@ -0,0 +1,107 @@
+"""Tests for parsing the saved facility pages without a browser."""
+from pathlib import Path
+from src.grid_parser import ParseCache, TableEndScanner, hidden_fields, parse_grid, parse_page, table_digest
+from src.http_poller import _paging_form
+
+
+PAGES = Path(__file__).resolve().parent.parent / "target-pages"
+FIRST_MONTH = PAGES / "【e-kanagawa電子申請［面談×予約］】予約手続き：施設選択・予定日選択.html"
+SECOND_MONTH = PAGES / "【e-kanagawa電子申請［面談×予約］】予約手続き：施設選択・予定日選択2.html"
+
+
+def read(path):
+    return path.read_text(encoding="utf-8")
+
+
+def test_parse_page_without_availability():
+    """Test that a fully booked page yields dates but no cells."""
+    snapshot, form_fields, table_found = parse_page(read(FIRST_MONTH))
+
+    assert table_found
+    assert len(snapshot.dates) == 14
+    assert snapshot.dates[0] == "12/21 (Sun)"
+    assert snapshot.available == {}
+    assert [name for name, _ in form_fields][:2] == ["_reserveCaution", "serialFacilitySelectForm"]
+    assert "_csrf" in dict(form_fields)
+
+
+def test_parse_page_with_availability():
+    """Test that enabled cells are mapped to their column dates."""
+    snapshot = parse_grid(read(SECOND_MONTH))
+
+    assert sum(len(dates) for dates in snapshot.available.values()) == 31
+    assert snapshot.available["準中型車ＡＭ"] == ["01/20 (Tue)", "01/22 (Thu)", "01/30 (Fri)"]
+    assert "普通車ＡＭ" not in snapshot.available
+
+
+def test_parse_grid_filters_categories():
+    """Test that only requested category rows are collected."""
+    snapshot = parse_grid(read(SECOND_MONTH), ["大型車ＡＭ"])
+    assert snapshot.available == {"大型車ＡＭ": ["01/29 (Thu)"]}
+
+
+def test_paging_form_adds_consent():
+    """Test that month paging submits the consent checkbox."""
+    _, form_fields, _ = parse_page(read(SECOND_MONTH))
+    assert _paging_form(form_fields)[-1] == ("reserveCaution", "on")
+
+
+def test_hidden_fields_match_full_parse():
+    """Test that the fast hidden-field scan returns what the parser collects."""
+    for path in PAGES.glob("*.html"):
+        html = read(path)
+        assert hidden_fields(html) == parse_page(html)[1], path.name
+
+
+def test_table_digest_ignores_volatile_tokens():
+    """Test that whitespace and session tokens do not change the digest, but slots do."""
+    html = read(SECOND_MONTH)
+    noisy = html.replace("tempSeq=50909", "tempSeq=61234").replace("<tr", "\n  <tr")
+    stamped = html.replace("2026年", "2026年 2026/01/05 09:12:33", 1)
+    restamped = html.replace("2026年", "2026年 2026/01/05 09:47:02", 1)
+
+    assert table_digest(html) == table_digest(noisy)
+    assert table_digest(stamped) == table_digest(restamped)
+    assert table_digest(html) != table_digest(read(FIRST_MONTH))
+    assert table_digest("<html><body>login</body></html>") is None
+
+
+def test_parse_cache_short_circuits_unchanged_tables():
+    """Test that an unchanged table reuses the snapshot and is counted as a hit."""
+    cache = ParseCache()
+    html = read(SECOND_MONTH)
+
+    first, fields, found = cache.parse(html, ["大型車ＡＭ"])
+    second, cached_fields, cached_found = cache.parse(html, ["大型車ＡＭ"])
+
+    assert not first.unchanged and second.unchanged
+    assert second.available == first.available == {"大型車ＡＭ": ["01/29 (Thu)"]}
+    assert cached_fields == fields and cached_found and found
+    assert (cache.stats.hits, cache.stats.misses) == (1, 1)
+    assert cache.stats.hit_rate == 0.5
+    assert cache.stats.saved_seconds > 0
+
+    # Other categories, or another month under the same key, need a real parse
+    assert not cache.parse(html, ["普通車ＡＭ"])[0].unchanged
+    assert not cache.parse(read(FIRST_MONTH), ["普通車ＡＭ"])[0].unchanged
+    # Separate keys don't evict each other
+    cache.parse(html, None, key=1)
+    assert cache.parse(html, None, key=1)[0].unchanged
+
+
+def test_table_end_scanner_finds_split_closing_tag():
+    """Test that the end of table#TBL is found whatever the chunk boundaries."""
+    html = read(SECOND_MONTH)
+    end = html.index("</table>", html.index('id="TBL"')) + len("</table>")
+
+    for size in (7, 1000, 16384):
+        scanner = TableEndScanner()
+        read_to = 0
+        for start in range(0, len(html), size):
+            read_to = start + size
+            if scanner.feed(html[start:read_to]):
+                break
+        assert scanner.closed
+        assert end <= read_to < end + size
+
+    assert not TableEndScanner().feed("<html><body>ログイン</body></html>")
@@ -0,0 +1,56 @@
+"""Tests for scoped ElementHandle disposal."""
+from src.handle_arena import HandleArena, HandleStats, release_handle
+from tests.fakes import FakePage
+
+
+class FakeHandle:
+    def __init__(self, fail=False):
+        self.disposed = False
+        self.fail = fail
+
+    async def dispose(self):
+        self.disposed = True
+        if self.fail:
+            raise RuntimeError("Target closed")
+
+
+def page_with_handles():
+    """A page with one consent checkbox and three slot links, the second failing to dispose."""
+    return FakePage(elements={
+        "input": FakeHandle(),
+        "a.enable": [FakeHandle(), FakeHandle(fail=True), FakeHandle()],
+    })
+
+
+async def test_arena_disposes_everything_but_kept_handles():
+    """Test that a scope disposes its handles and leaves the kept one alive."""
+    page = page_with_handles()
+    stats = HandleStats()
+
+    async with HandleArena(stats) as arena:
+        checkbox = await arena.query_selector(page, "input#reserveCaution")
+        links = await arena.query_selector_all(page, "a.enable")
+        kept = arena.keep(links[0])
+
+    assert [h.disposed for h in [checkbox, *links]] == [True, False, True, True]
+    assert stats.created == 4
+    assert stats.live == 1
+    assert stats.kept == 1
+
+    await release_handle(kept, stats)
+    assert kept.disposed
+    assert stats.live == 0
+    assert stats.kept == 0
+
+
+async def test_live_count_stays_flat_across_cycles():
+    """Test that repeated cycles do not accumulate handles."""
+    page = page_with_handles()
+    stats = HandleStats()
+
+    for _ in range(50):
+        async with HandleArena(stats) as arena:
+            await arena.query_selector_all(page, "a.enable")
+
+    assert stats.created == 150
+    assert stats.live == 0
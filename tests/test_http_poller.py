@@ -0,0 +1,107 @@
+"""Tests for HTTP polling with streamed, early-terminating reads."""
+import asyncio
+import time
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from src.grid_parser import parse_page
+from src.http_poller import CHUNK_SIZE, CapturedRequest, HttpPoller
+from tests.test_grid_parser import FIRST_MONTH, SECOND_MONTH, read
+
+
+async def start_server(pages, posts):
+    async def handler(request):
+        if request.method == "POST":
+            posts.append(dict(await request.post()))
+        body = pages[len(posts) if request.method == "POST" else 0].encode("utf-8")
+        response = web.StreamResponse(headers={"Content-Type": "text/html; charset=utf-8"})
+        await response.prepare(request)
+        for i in range(0, len(body), 8192):
+            await response.write(body[i:i + 8192])
+        await response.write_eof()
+        return response
+
+    app = web.Application()
+    app.router.add_route("*", "/reserve/{tail:.*}", handler)
+    server = TestServer(app)
+    await server.start_server()
+    return server
+
+
+def captured(server):
+    return CapturedRequest(method="GET", url=str(server.make_url("/reserve/facilitySelect_dateTrans")), headers={})
+
+
+async def test_fetch_stops_after_slot_table():
+    """Test that a streamed fetch returns only the HTML up to the end of table#TBL."""
+    html = read(SECOND_MONTH)
+    server = await start_server([html], [])
+    poller = HttpPoller(captured(server))
+    try:
+        body = await poller.fetch("GET", poller.captured.url, stop_after_table=True)
+        again = await poller.fetch("GET", poller.captured.url)
+    finally:
+        await poller.close()
+        await server.close()
+
+    assert again == html
+    assert "</table>" in body
+    assert len(body) < html.index("</table>") + CHUNK_SIZE + 8
+    assert parse_page(body)[0].available == parse_page(html)[0].available
+
+
+async def test_fetch_returns_before_the_rest_of_the_body_arrives():
+    """Test that fetch returns once the table has arrived, without waiting for the slow tail of the body."""
+    html = read(SECOND_MONTH).encode("utf-8")
+    split = html.index(b"</table>") + len(b"</table>")
+    delay = 1.0
+    peers = []
+
+    async def handler(request):
+        peers.append(request.transport.get_extra_info("peername"))
+        response = web.StreamResponse(headers={"Content-Type": "text/html; charset=utf-8"})
+        response.content_length = len(html)
+        await response.prepare(request)
+        await response.write(html[:split])
+        await asyncio.sleep(delay)
+        await response.write(html[split:])
+        await response.write_eof()
+        return response
+
+    app = web.Application()
+    app.router.add_get("/reserve/{tail:.*}", handler)
+    server = TestServer(app)
+    await server.start_server()
+    poller = HttpPoller(captured(server))
+    try:
+        started = time.perf_counter()
+        body = await poller.fetch("GET", poller.captured.url, stop_after_table=True)
+        elapsed = time.perf_counter() - started
+        # The tail is drained in the background and the connection goes back to the pool
+        await asyncio.gather(*poller._drains)
+        await poller.fetch("GET", poller.captured.url, stop_after_table=True)
+    finally:
+        await poller.close()
+        await server.close()
+
+    assert elapsed < delay / 2
+    assert "</table>" in body
+    assert parse_page(body)[0].available == parse_page(html.decode("utf-8"))[0].available
+    assert peers[0] == peers[1]
+
+
+async def test_poll_reads_paging_fields_before_last_window():
+    """Test that earlier windows are read in full so their hidden fields can page on."""
+    posts = []
+    server = await start_server([read(FIRST_MONTH), read(SECOND_MONTH)], posts)
+    poller = HttpPoller(captured(server))
+    try:
+        first, second = await poller.poll(months=2)
+    finally:
+        await poller.close()
+        await server.close()
+
+    assert first.available == {}
+    assert sum(len(dates) for dates in second.available.values()) == 31
+    assert posts[0]["reserveCaution"] == "on"
+    assert posts[0]["_csrf"] == dict(parse_page(read(FIRST_MONTH))[1])["_csrf"]
@@ -52,3 +52,156 @@ def test_import_booking_controller():
     """Test importing booking controller module."""
     from src.booking_controller import BookingController
     assert BookingController is not None
+
+
+def test_import_memory_watchdog():
+    """Test importing memory watchdog module."""
+    from src.memory_watchdog import MemoryWatchdog, MemorySample, RecycleAction
+    assert MemoryWatchdog is not None
+    assert MemorySample is not None
+    assert RecycleAction is not None
+
+
+def test_import_browser_profiles():
+    """Test importing browser profiles module."""
+    from src.browser_profiles import BrowserProfile, FULL_PROFILE, MONITOR_PROFILE, get_profile
+    assert BrowserProfile is not None
+    assert get_profile("full") is FULL_PROFILE
+    assert get_profile("monitor") is MONITOR_PROFILE
+    assert get_profile("monitor", javascript_enabled=True).javascript_enabled is True
+
+
+def test_import_recovery_policy():
+    """Test importing recovery policy module."""
+    from src.recovery_policy import CircuitBreaker, RecoveryPolicy, BackoffPolicy
+    assert CircuitBreaker is not None
+    assert RecoveryPolicy is not None
+    assert BackoffPolicy is not None
+
+
+def test_import_maintenance_schedule():
+    """Test importing maintenance schedule module."""
+    from src.maintenance_schedule import MaintenanceSchedule, MaintenanceWindow
+    assert MaintenanceSchedule is not None
+    assert MaintenanceWindow is not None
+
+
+def test_import_release_scheduler():
+    """Test importing release scheduler module."""
+    from src.release_scheduler import ReleaseSchedule, ServerClock, BurstPlan
+    assert ReleaseSchedule is not None
+    assert ServerClock is not None
+    assert BurstPlan is not None
+
+
+def test_import_fleet():
+    """Test importing fleet module."""
+    from src.fleet import FleetCoordinator, FleetWorker, Assignment
+    assert FleetCoordinator is not None
+    assert FleetWorker is not None
+    assert Assignment is not None
+
+
+def test_import_booking_lock():
+    """Test importing booking lock module."""
+    from src.booking_lock import BookingLock, Lease, create_booking_lock, lock_key
+    assert BookingLock is not None
+    assert Lease is not None
+    assert create_booking_lock("none") is None
+    assert lock_key("a", "b", "c") == "a|b|c"
+
+
+def test_import_event_bus():
+    """Test importing event bus and its consumers."""
+    from src.event_bus import EventBus, SnapshotPublisher, GridSnapshotEvent, SlotDiffEvent
+    from src.metrics import MonitorMetrics
+    from src.slot_history import SlotHistory
+    assert EventBus is not None
+    assert SnapshotPublisher is not None
+    assert GridSnapshotEvent is not None
+    assert SlotDiffEvent is not None
+    assert MonitorMetrics is not None
+    assert SlotHistory is not None
+
+
+def test_import_notifications():
+    """Test importing notifications module."""
+    from src.notifications import NotificationHub, TelegramChannel, WebhookChannel, EmailChannel
+    assert NotificationHub is not None
+    assert TelegramChannel is not None
+    assert WebhookChannel is not None
+    assert EmailChannel is not None
+
+
+def test_import_watch_mode():
+    """Test importing watch-only mode modules."""
+    from src.grid_parser import FacilityPageParser, parse_grid
+    from src.http_poller import HttpPoller, CapturedRequest
+    from src.watch_mode import AvailabilityWatcher
+    assert FacilityPageParser is not None
+    assert parse_grid is not None
+    assert HttpPoller is not None
+    assert CapturedRequest is not None
+    assert AvailabilityWatcher is not None
+
+
+def test_import_evidence():
+    """Test importing evidence module."""
+    from src.evidence import EvidenceRecorder, EvidenceFrame
+    assert EvidenceRecorder is not None
+    assert EvidenceFrame is not None
+
+
+def test_import_traffic_archive():
+    """Test importing traffic archive module."""
+    from src.traffic_archive import TrafficRecorder, TrafficReplayer
+    assert TrafficRecorder is not None
+    assert TrafficReplayer is not None
+
+
+def test_import_handle_arena():
+    """Test importing handle arena module."""
+    from src.handle_arena import HandleArena, HandleStats
+    assert HandleArena is not None
+    assert HandleStats is not None
+
+
+def test_import_response_sniffer():
+    """Test importing response sniffer module."""
+    from src.response_sniffer import ResponseSniffer, SniffResult
+    assert ResponseSniffer is not None
+    assert SniffResult is not None
+
+
+def test_import_inpage_poller():
+    """Test importing in-page poller module."""
+    from src.inpage_poller import InPagePoller, IN_PAGE_POLL_SCRIPT
+    assert InPagePoller is not None
+    assert IN_PAGE_POLL_SCRIPT is not None
+
+
+def test_import_browser_server():
+    """Test importing browser server module."""
+    from src.browser_server import BrowserServer
+    assert BrowserServer is not None
+
+
+def test_import_booking_journal():
+    """Test importing booking journal module."""
+    from src.booking_journal import BookingJournal, JournalEntry
+    assert BookingJournal is not None
+    assert JournalEntry is not None
+
+
+def test_import_lock_keeper():
+    """Test importing lock keeper module."""
+    from src.lock_keeper import LockKeeper, countdown_notification
+    assert LockKeeper is not None
+    assert countdown_notification is not None
+
+
+def test_import_form_autofill():
+    """Test importing form autofill module."""
+    from src.form_autofill import ApplicantProfile, FormAutofill
+    assert ApplicantProfile is not None
+    assert FormAutofill is not None
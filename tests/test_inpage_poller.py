@@ -0,0 +1,123 @@
+"""Tests for in-page fetch polling."""
+import pytest
+from src.error_handler import PageStructureError, RateLimitedError, SessionExpiredError
+from src.http_poller import CapturedRequest
+from src.inpage_poller import IN_PAGE_POLL_SCRIPT, InPagePoller
+from src.slot_detector import SCAN_GRID_SCRIPT
+from tests.fakes import FakePage
+
+FACILITY_URL = "https://dshinsei.e-kanagawa.lg.jp/140007-u/reserve/facilitySelect_dateTrans?movePage=oneMonthLater"
+
+
+def summary(**overrides):
+    result = {
+        "status": 200,
+        "url": FACILITY_URL,
+        "retryAfter": None,
+        "swapped": True,
+        "text": "",
+        "dates": ["01/19 (Mon)", "01/20 (Tue)"],
+        "available": {"普通車ＡＭ": ["01/20 (Tue)"]},
+    }
+    result.update(overrides)
+    return result
+
+
+def capturer():
+    captured = []
+
+    async def capture():
+        captured.append(1)
+        return CapturedRequest(
+            method="POST",
+            url=FACILITY_URL,
+            headers={"content-type": "application/x-www-form-urlencoded"},
+            post_data="_csrf=abcd&serialOffer=1",
+        )
+    return capture, captured
+
+
+def test_script_embeds_grid_scan():
+    """Test that the in-page script reads the swapped table like the regular scan."""
+    assert SCAN_GRID_SCRIPT.strip() in IN_PAGE_POLL_SCRIPT
+    assert "DOMParser" in IN_PAGE_POLL_SCRIPT
+    assert "replaceWith" in IN_PAGE_POLL_SCRIPT
+
+
+async def test_poll_captures_request_once_and_returns_summary():
+    """Test that the request is captured once and replayed by every poll."""
+    capture, captured = capturer()
+    page = FakePage(FACILITY_URL, evaluate=[summary(), summary(available={})])
+    poller = InPagePoller(page, capture)
+
+    first = await poller.poll(["普通車ＡＭ"])
+    second = await poller.poll(["普通車ＡＭ"])
+
+    assert len(captured) == 1
+    assert first.slots() == [("普通車ＡＭ", "01/20 (Tue)")]
+    assert second.available == {}
+    method, url, body, content_type, table, _, rows, _ = page.calls[0][1]
+    assert (method, url, body) == ("POST", FACILITY_URL, "_csrf=abcd&serialOffer=1")
+    assert content_type == "application/x-www-form-urlencoded"
+    assert table == "table#TBL.time--table"
+    assert rows == "tr[id='height_auto_普通車ＡＭ']"
+
+
+async def test_poll_classifies_responses():
+    """Test that error responses and missing tables raise classified errors."""
+    capture, _ = capturer()
+    poller = InPagePoller(FakePage(FACILITY_URL, evaluate=[
+        summary(status=429, retryAfter="7", swapped=False),
+        summary(url="https://dshinsei.e-kanagawa.lg.jp/140007-u/profile/userLogin", swapped=False),
+        summary(swapped=False),
+    ]), capture)
+
+    with pytest.raises(RateLimitedError) as rate_limited:
+        await poller.poll()
+    assert rate_limited.value.retry_after == 7.0
+    with pytest.raises(SessionExpiredError):
+        await poller.poll()
+    with pytest.raises(PageStructureError):
+        await poller.poll()
+
+
+async def test_reset_recaptures_for_new_page():
+    """Test that a recycled page gets its request captured again."""
+    capture, captured = capturer()
+    poller = InPagePoller(FakePage(FACILITY_URL, evaluate=[summary()]), capture)
+    await poller.poll()
+
+    new_page = FakePage(FACILITY_URL, evaluate=[summary()])
+    poller.reset(new_page)
+    await poller.poll()
+
+    assert len(captured) == 2
+    assert len(new_page.calls) == 1
+
+
+def facility_html(token):
+    return f"""<html><body>
+<form id="f" method="post"><input type="hidden" name="_csrf" value="{token}"><input type="hidden" name="serialOffer" value="1"></form>
+<table id="TBL" class="time--table"><tr id="height_headday"><td class="time--table time--th--date">01/20<br>(Tue)</td></tr>
+<tr id="height_auto_普通車ＡＭ"><th>普通車ＡＭ</th><td class="time--table time--th--date disable"></td></tr></table>
+</body></html>"""
+
+
+async def test_poll_sends_the_token_from_the_last_response(chromium):
+    """Test that each poll posts the CSRF token the previous response rotated in."""
+    page = await chromium.new_page()
+    bodies = []
+
+    async def fulfil(route):
+        bodies.append(route.request.post_data)
+        await route.fulfill(content_type="text/html", body=facility_html(f"token{len(bodies)}"))
+
+    await page.route(FACILITY_URL, fulfil)
+    await page.goto(FACILITY_URL)
+    capture, _ = capturer()
+    poller = InPagePoller(page, capture)
+
+    await poller.poll(["普通車ＡＭ"])
+    await poller.poll(["普通車ＡＭ"])
+
+    assert bodies[1:] == ["_csrf=token1&serialOffer=1", "_csrf=token2&serialOffer=1"]
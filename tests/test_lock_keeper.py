@@ -0,0 +1,191 @@
+"""Tests for holding a locked reservation."""
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from src import booking_controller
+from src.booking_controller import BookingController
+from src.booking_handler import BookingResult
+from src.booking_journal import CLOSED, LOCKED, SUBMITTED, BookingJournal
+from src.browser_manager import BrowserManager
+from src.lock_keeper import COMPLETED, LAPSED, PAGE_TEXT_SCRIPT, RELEASED, STOPPED, LockKeeper
+from tests.fakes import FakePage
+
+
+def form_page(text="申込内容入力", **kwargs):
+    """The reservation form showing text, whose keepalive fetch answers 200 from the URL it asked for."""
+    def evaluate(script, url):
+        return text if script == PAGE_TEXT_SCRIPT else {"status": 200, "url": url}
+    return FakePage(evaluate=evaluate, **kwargs)
+
+
+class StepClock:
+    """Advances by a fixed step on every read."""
+
+    def __init__(self, step=timedelta(seconds=30)):
+        self.now = datetime(2026, 1, 20, 9, 0)
+        self.step = step
+
+    def __call__(self):
+        self.now += self.step
+        return self.now
+
+
+def keeper(page, sent, hold_minutes=12, clock=None, **kwargs):
+    async def notify(notification):
+        sent.append(notification)
+
+    lock_keeper = LockKeeper(
+        page, "準中型車ＡＭ", "01/20", hold_minutes * 60, notify,
+        clock=clock or StepClock(), **kwargs,
+    )
+    lock_keeper.TICK_SECONDS = 0
+    return lock_keeper
+
+
+async def test_lapses_at_deadline_with_escalating_reminders():
+    """Test that the hold lapses at the deadline after reminders that turn urgent."""
+    sent = []
+    outcome = await keeper(form_page("セッションがタイムアウトしました"), sent, keepalive_seconds=0).keep(lambda: False)
+
+    assert outcome == LAPSED
+    assert [(n.key.rsplit(":", 1)[1], n.urgent) for n in sent] == [
+        ("10", False), ("5", True), ("2", True), ("1", True),
+    ]
+    assert "残り10分" in sent[0].text
+
+
+async def test_keepalive_runs_and_detects_expired_session():
+    """Test that keepalives run on schedule and a login redirect ends the hold."""
+    sent = []
+    page = form_page()
+    lock_keeper = keeper(page, sent, keepalive_seconds=120, warning_minutes=())
+    assert await lock_keeper.keep(lambda: len(page.calls) >= 3) == STOPPED
+    assert not lock_keeper.session_expired
+
+    page = FakePage(evaluate=lambda script, url: {"status": 200, "url": BrowserManager.LOGIN_URL})
+    lock_keeper = keeper(page, sent, keepalive_seconds=120, warning_minutes=())
+    assert await lock_keeper.keep(lambda: False) == LAPSED
+    assert lock_keeper.session_expired
+    assert sent == []
+
+
+async def test_released_when_form_is_left_or_completed():
+    """Test that leaving the form releases the hold and a 完了 page completes it."""
+    sent = []
+    page = form_page()
+    lock_keeper = keeper(page, sent, keepalive_seconds=0)
+
+    def leave_form():
+        if len(sent) == 1:
+            page.url = "https://dshinsei.e-kanagawa.lg.jp/140007-u/favorite/myPageTop_initDisplay"
+        return False
+
+    assert await lock_keeper.keep(leave_form) == RELEASED
+    assert len(sent) == 1
+
+    completed = form_page(title="予約手続き：申込完了")
+    assert await keeper(completed, [], keepalive_seconds=0).keep(lambda: False) == COMPLETED
+
+
+async def test_deadline_counts_from_lock_time():
+    """Test that the deadline counts from when the slot was locked."""
+    clock = StepClock(step=timedelta(seconds=10))
+    locked_at = clock.now - timedelta(minutes=11)
+    sent = []
+    page = FakePage(BrowserManager.FACILITY_URL)
+    lock_keeper = keeper(page, sent, clock=clock, locked_at=locked_at, keepalive_seconds=0)
+
+    assert lock_keeper.remaining < timedelta(minutes=1)
+    assert await lock_keeper.keep(lambda: False) == LAPSED
+    assert [n.key.rsplit(":", 1)[1] for n in sent] == ["1"]
+
+
+async def test_live_form_is_kept_past_the_deadline():
+    """Test that a hold past its estimated deadline is kept while the site still shows the form."""
+    page = form_page()
+    lock_keeper = keeper(page, [], hold_minutes=1, keepalive_seconds=0, warning_minutes=())
+    lock_keeper.HOLD_CHECK_SECONDS = 60
+
+    def checks():
+        return [arg for script, arg in page.calls if script != PAGE_TEXT_SCRIPT]
+
+    assert await lock_keeper.keep(lambda: len(checks()) >= 3) == STOPPED
+    assert checks() == [LockKeeper.KEEPALIVE_URL] * 3
+    assert not lock_keeper.session_expired
+
+
+async def test_error_page_after_the_deadline_lapses_the_hold():
+    """Test that the hold lapses once the form page shows the site dropped it."""
+    lock_keeper = keeper(form_page("再度ログインしてください"), [], hold_minutes=1, keepalive_seconds=0)
+
+    assert await lock_keeper.keep(lambda: False) == LAPSED
+    assert lock_keeper.session_expired
+
+
+class FixedOutcomeKeeper:
+    """LockKeeper stand-in that ends the hold with a given outcome."""
+
+    outcome = RELEASED
+
+    def __init__(self, *args, **kwargs):
+        self.session_expired = False
+
+    async def keep(self, should_stop):
+        return self.outcome
+
+
+class FakeDetector:
+    def __init__(self, cutoff):
+        self.cutoff = cutoff
+
+
+class FakeHub:
+    async def notify(self, notification):
+        pass
+
+
+@pytest.fixture
+def holding_controller(config, tmp_path, monkeypatch):
+    """Controller holding a locked 01/20 reservation in upgrade mode, cutoff 02/10."""
+    monkeypatch.setattr(booking_controller, "LockKeeper", FixedOutcomeKeeper)
+    config.current_booking_date = "2026-02-10"
+    controller = BookingController(config)
+    controller.browser_manager = BrowserManager()
+    controller.browser_manager.page = FakePage()
+    controller.notification_hub = FakeHub()
+    controller.slot_detector = FakeDetector(date(2026, 2, 10))
+    controller.booking_journal = BookingJournal(str(tmp_path / "journal.jsonl"))
+    controller.booking_journal.record("a1", LOCKED, "準中型車ＡＭ", "01/20", "08時30分", day="2026-01-20", sync=True)
+    controller.recoveries = 0
+
+    async def recover_session(relogin):
+        controller.recoveries += 1
+    controller._recover_session = recover_session
+    return controller
+
+
+HELD = BookingResult(success=True, category="準中型車ＡＭ", date="01/20", time="08時30分", day=date(2026, 1, 20))
+
+
+@pytest.mark.parametrize("outcome, submitted, cutoff", [
+    (COMPLETED, False, date(2026, 1, 20)),
+    (RELEASED, True, date(2026, 1, 20)),
+    (RELEASED, False, date(2026, 2, 10)),
+])
+async def test_only_a_finished_form_moves_the_cutoff(holding_controller, monkeypatch, outcome, submitted, cutoff):
+    """Test that a hold released without a 完了 page or a submit is closed and keeps the cutoff."""
+    monkeypatch.setattr(FixedOutcomeKeeper, "outcome", outcome)
+
+    async def autofill_form():
+        return submitted
+    holding_controller._autofill_form = autofill_form
+
+    await holding_controller._hold_reservation(HELD)
+
+    assert holding_controller.slot_detector.cutoff == cutoff
+    assert holding_controller.running
+    assert holding_controller.recoveries == 1
+    booked = holding_controller.booking_journal.submitted_days("2026-02-10", since=date(2026, 1, 1))
+    assert booked == ([date(2026, 1, 20)] if cutoff == date(2026, 1, 20) else [])
+    assert holding_controller.booking_journal.read()[-1].state == (SUBMITTED if booked else CLOSED)
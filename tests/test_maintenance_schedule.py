@@ -0,0 +1,56 @@
+"""Tests for maintenance window parsing and lookup."""
+from datetime import datetime
+import pytest
+from src.maintenance_schedule import MaintenanceSchedule, MaintenanceWindow, SITE_TIMEZONE
+
+
+def jst(*args):
+    return datetime(*args, tzinfo=SITE_TIMEZONE)
+
+
+def test_parse_daily_window():
+    """Test that a bare time range applies every day."""
+    window = MaintenanceWindow.parse("01:00-05:00")
+    assert window.weekdays == frozenset(range(7))
+
+
+def test_parse_day_ranges():
+    """Test day names, ranges and lists."""
+    assert MaintenanceWindow.parse("sun 02:00-06:00").weekdays == {6}
+    assert MaintenanceWindow.parse("mon-fri 00:00-06:00").weekdays == {0, 1, 2, 3, 4}
+    assert MaintenanceWindow.parse("sat/sun 00:00-06:00").weekdays == {5, 6}
+    assert MaintenanceWindow.parse("fri-mon 00:00-06:00").weekdays == {4, 5, 6, 0}
+
+
+def test_parse_invalid_window():
+    """Test that malformed windows raise ValueError."""
+    with pytest.raises(ValueError):
+        MaintenanceSchedule.parse("someday 01:00-02:00")
+    with pytest.raises(ValueError):
+        MaintenanceSchedule.parse("sun 1-2")
+
+
+def test_window_crossing_midnight():
+    """Test a window that starts late in the evening and ends next morning."""
+    schedule = MaintenanceSchedule.parse("sat 23:00-06:00")
+    # 2026-01-03 is a Saturday
+    assert schedule.current_window(jst(2026, 1, 3, 22, 59)) is None
+    start, end = schedule.current_window(jst(2026, 1, 4, 2, 0))
+    assert start == jst(2026, 1, 3, 23, 0)
+    assert end == jst(2026, 1, 4, 6, 0)
+    assert schedule.current_window(jst(2026, 1, 4, 6, 0)) is None
+
+
+def test_chained_windows_are_merged():
+    """Test that back-to-back windows report the combined end."""
+    schedule = MaintenanceSchedule.parse("daily 00:00-06:00, sun 06:00-09:00")
+    # 2026-01-04 is a Sunday
+    _, end = schedule.current_window(jst(2026, 1, 4, 1, 0))
+    assert end == jst(2026, 1, 4, 9, 0)
+    _, end = schedule.current_window(jst(2026, 1, 5, 1, 0))
+    assert end == jst(2026, 1, 5, 6, 0)
+
+
+def test_empty_schedule():
+    """Test that an empty spec never suspends."""
+    assert MaintenanceSchedule.parse("").current_window(jst(2026, 1, 1, 3, 0)) is None
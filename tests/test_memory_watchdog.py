@@ -0,0 +1,84 @@
+"""Tests for the memory watchdog recycle decisions."""
+from datetime import datetime, timedelta
+from src.memory_watchdog import MemoryWatchdog, MemorySample, RecycleAction
+from src import process_stats
+from src.process_stats import collect_chromium_stats, is_supported
+
+
+def _sample(renderer=100.0, browser=200.0, heap=50.0, minutes=0):
+    return MemorySample(
+        taken_at=datetime(2025, 1, 1) + timedelta(minutes=minutes),
+        browser_rss_mb=browser,
+        renderer_rss_mb=renderer,
+        js_heap_used_mb=heap,
+        js_heap_total_mb=heap * 2,
+    )
+
+
+def test_below_limits_does_nothing():
+    """Test that samples under every limit do not trigger a recycle."""
+    watchdog = MemoryWatchdog(renderer_limit_mb=500, js_heap_limit_mb=100, browser_limit_mb=800)
+    assert watchdog.evaluate(_sample()) == RecycleAction.NONE
+
+
+def test_renderer_over_limit_recycles_page():
+    """Test that renderer growth recycles only the page."""
+    watchdog = MemoryWatchdog(renderer_limit_mb=500, js_heap_limit_mb=100, browser_limit_mb=800)
+    assert watchdog.evaluate(_sample(renderer=600)) == RecycleAction.RECYCLE_PAGE
+    assert watchdog.evaluate(_sample(heap=150)) == RecycleAction.RECYCLE_PAGE
+
+
+def test_browser_over_limit_recycles_context():
+    """Test that browser process growth recycles the context."""
+    watchdog = MemoryWatchdog(renderer_limit_mb=500, js_heap_limit_mb=100, browser_limit_mb=800)
+    assert watchdog.evaluate(_sample(browser=900)) == RecycleAction.RECYCLE_CONTEXT
+
+
+def test_escalates_when_page_recycling_does_not_help():
+    """Test escalation to a context recycle after repeated page recycles."""
+    watchdog = MemoryWatchdog(renderer_limit_mb=500, js_heap_limit_mb=100, browser_limit_mb=800)
+
+    for _ in range(MemoryWatchdog.ESCALATE_AFTER):
+        assert watchdog.evaluate(_sample(renderer=600)) == RecycleAction.RECYCLE_PAGE
+        watchdog.record_recycle(RecycleAction.RECYCLE_PAGE)
+
+    assert watchdog.evaluate(_sample(renderer=600)) == RecycleAction.RECYCLE_CONTEXT
+
+
+def test_zero_limits_disable_checks():
+    """Test that a limit of 0 disables that check."""
+    watchdog = MemoryWatchdog(renderer_limit_mb=0, js_heap_limit_mb=0, browser_limit_mb=0)
+    assert watchdog.evaluate(_sample(renderer=5000, browser=5000, heap=5000)) == RecycleAction.NONE
+
+
+def test_collect_chromium_stats_without_browser():
+    """Test that stats collection works when no Chromium is running below us."""
+    stats = collect_chromium_stats()
+    if not is_supported():
+        assert stats is None
+    else:
+        assert stats.renderer_count == 0
+        assert stats.total_rss_mb == 0.0
+
+
+def test_collect_chromium_stats_from_detached_browser(tmp_path, monkeypatch):
+    """Test that a detached browser root is counted together with its renderers."""
+    def process(pid, ppid, args, rss_kb):
+        directory = tmp_path / str(pid)
+        directory.mkdir()
+        (directory / "stat").write_text(f"{pid} (chrome) S {ppid} 0 0 0 0 0 0 0 0 0 5 5 0 0")
+        (directory / "cmdline").write_bytes("\0".join(args).encode() + b"\0")
+        (directory / "status").write_text(f"Name:\tchrome\nVmRSS:\t  {rss_kb} kB\n")
+
+    (tmp_path / "self").mkdir()
+    process(500, 1, ["/opt/chromium/chrome", "--remote-debugging-port=9222"], 204800)
+    process(501, 500, ["/opt/chromium/chrome", "--type=renderer"], 102400)
+    process(502, 1, ["/opt/chromium/chrome", "--type=renderer"], 999999)  # Another browser's
+    monkeypatch.setattr(process_stats, "PROC_ROOT", str(tmp_path))
+
+    stats = collect_chromium_stats(500)
+
+    assert stats.pids == [500, 501]
+    assert stats.browser_rss_mb == 200.0
+    assert stats.renderer_rss_mb == 100.0
+    assert stats.renderer_count == 1
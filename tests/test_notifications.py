@@ -0,0 +1,145 @@
+"""Tests for notification fan-out, digests, de-duplication and rate limits."""
+import pytest
+from src.booking_handler import BookingResult
+from src.notifications import (
+    NotificationChannel,
+    NotificationHub,
+    TokenBucket,
+    availability_notification,
+    booking_notification,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class RecordingChannel(NotificationChannel):
+    def __init__(self, name="fake", succeed=True):
+        self.name = name
+        self.succeed = succeed
+        self.sent = []
+
+    async def send(self, title, notifications):
+        self.sent.append((title, [n.key for n in notifications]))
+        return self.succeed
+
+
+def hub_with(*channels, clock=None, **kwargs):
+    return NotificationHub(list(channels), clock=clock or FakeClock(), **kwargs)
+
+
+async def test_availability_is_coalesced_into_digest():
+    """Test that bursts of new slots become one message per channel."""
+    clock = FakeClock()
+    a, b = RecordingChannel("a"), RecordingChannel("b")
+    hub = hub_with(a, b, clock=clock, digest_seconds=10)
+
+    await hub.notify(availability_notification("普通車ＡＭ", "01/20 (Tue)"))
+    await hub.notify(availability_notification("普通車ＰＭ", "01/20 (Tue)"))
+    await hub.flush_due()
+    assert a.sent == []
+
+    clock.now += 10
+    await hub.flush_due()
+    assert len(a.sent) == 1 and len(b.sent) == 1
+    assert a.sent[0][0] == "2件の通知"
+    assert len(a.sent[0][1]) == 2
+
+
+async def test_duplicates_are_suppressed_until_forgotten():
+    """Test that the same slot is only announced once per dedupe window."""
+    clock = FakeClock()
+    channel = RecordingChannel()
+    hub = hub_with(channel, clock=clock, digest_seconds=0, dedupe_seconds=300)
+
+    await hub.notify(availability_notification("普通車ＡＭ", "01/20 (Tue)"))
+    await hub.notify(availability_notification("普通車ＡＭ", "01/20 (Tue)"))
+    await hub.flush_due()
+    assert len(channel.sent) == 1
+
+    hub.forget("slot:普通車ＡＭ:01/20 (Tue)")
+    await hub.notify(availability_notification("普通車ＡＭ", "01/20 (Tue)"))
+    await hub.flush_due()
+    assert len(channel.sent) == 2
+
+
+async def test_booking_result_is_sent_immediately():
+    """Test that urgent notifications skip the digest wait."""
+    channel = RecordingChannel()
+    hub = hub_with(channel, digest_seconds=60)
+
+    result = BookingResult(success=True, category="普通車ＡＭ", date="01/20 (Tue)", time="08:30")
+    await hub.notify(booking_notification(result))
+
+    assert len(channel.sent) == 1
+    assert channel.sent[0][0] == "予約ロック成功"
+
+
+async def test_rate_limited_channel_keeps_merging():
+    """Test that a channel out of tokens merges events instead of sending each one."""
+    clock = FakeClock()
+    channel = RecordingChannel()
+    hub = hub_with(channel, clock=clock, digest_seconds=0, rate_per_minute=1)
+
+    await hub.notify(availability_notification("普通車ＡＭ", "01/20 (Tue)"))
+    await hub.flush_due()
+    for day in range(21, 26):
+        await hub.notify(availability_notification("普通車ＡＭ", f"01/{day}"))
+        await hub.flush_due()
+    assert len(channel.sent) == 1
+
+    clock.now += 60
+    await hub.flush_due()
+    assert len(channel.sent) == 2
+    assert len(channel.sent[1][1]) == 5
+
+
+async def test_failed_send_is_retried():
+    """Test that a failed delivery stays pending for the next attempt."""
+    clock = FakeClock()
+    channel = RecordingChannel(succeed=False)
+    hub = hub_with(channel, clock=clock, digest_seconds=0)
+
+    await hub.notify(availability_notification("普通車ＡＭ", "01/20 (Tue)"))
+    await hub.flush_due()
+    channel.succeed = True
+    clock.now += 10
+    await hub.flush_due()
+
+    assert len(channel.sent) == 2
+    assert channel.sent[1][1] == ["slot:普通車ＡＭ:01/20 (Tue)"]
+
+
+def test_token_bucket():
+    """Test token refill and pausing."""
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2, per=60, clock=clock)
+    assert bucket.try_acquire() and bucket.try_acquire()
+    assert not bucket.try_acquire()
+
+    clock.now += 30
+    assert bucket.try_acquire()
+
+    bucket.pause(10)
+    clock.now += 60
+    assert bucket.try_acquire()
+
+
+def test_plain_text_strips_markup():
+    """Test that HTML markup is removed for plain-text channels."""
+    notification = availability_notification("普通車ＡＭ", "01/20 (Tue)", month_offset=2)
+    assert notification.plain_text() == "🟢 普通車ＡＭ 01/20 (Tue) (+2か月)"
+
+
+def test_channel_must_implement_send():
+    """Test that a channel without send cannot be created."""
+    class Silent(NotificationChannel):
+        name = "silent"
+
+    with pytest.raises(TypeError):
+        Silent()
@@ -0,0 +1,118 @@
+"""Tests for error classification, backoff and the circuit breaker."""
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+from src.error_handler import (
+    BookingSystemError,
+    PageStructureError,
+    RateLimitedError,
+    SessionExpiredError,
+    SiteMaintenanceError,
+    TransientError,
+    classify_error,
+    diagnose_page,
+)
+from src.recovery_policy import (
+    BackoffPolicy,
+    CircuitBreaker,
+    CircuitState,
+    RecoveryAction,
+    RecoveryPolicy,
+)
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_classify_playwright_timeout_as_transient():
+    """Test that Playwright timeouts are transient."""
+    error = classify_error(PlaywrightTimeoutError("Timeout 30000ms exceeded"))
+    assert isinstance(error, TransientError)
+
+
+def test_classify_keeps_classified_errors():
+    """Test that already classified errors pass through unchanged."""
+    original = SessionExpiredError("gone")
+    assert classify_error(original) is original
+
+
+def test_classify_unknown_error():
+    """Test that unknown errors map onto the base class."""
+    assert type(classify_error(ValueError("boom"))) is BookingSystemError
+
+
+def test_diagnose_page():
+    """Test page diagnosis for each error kind."""
+    facility = "https://example/reserve/facilitySelect_dateTrans"
+    assert diagnose_page(200, facility) is None
+    assert isinstance(diagnose_page(429, facility, retry_after="120"), RateLimitedError)
+    assert diagnose_page(429, facility, retry_after="120").retry_after == 120.0
+    assert isinstance(diagnose_page(503, facility), SiteMaintenanceError)
+    assert isinstance(diagnose_page(200, facility, "ただいまシステムメンテナンス中です"), SiteMaintenanceError)
+    assert isinstance(diagnose_page(200, "https://example/profile/userLogin"), SessionExpiredError)
+    assert isinstance(diagnose_page(502, facility), TransientError)
+
+
+def test_backoff_is_capped_and_jittered():
+    """Test that backoff delays stay within [minimum, cap]."""
+    policy = BackoffPolicy(base=1.0, cap=10.0, minimum=0.5)
+    for attempt in range(20):
+        delay = policy.delay(attempt)
+        assert 0.5 <= delay <= 10.0
+
+
+def test_circuit_opens_and_recovers():
+    """Test circuit breaker state transitions."""
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=3, recovery_timeout=10, clock=clock)
+
+    for _ in range(3):
+        assert breaker.allow_request()
+        breaker.record_failure()
+    assert breaker.state == CircuitState.OPEN
+    assert not breaker.allow_request()
+
+    clock.now = 10
+    assert breaker.allow_request()
+    assert breaker.state == CircuitState.HALF_OPEN
+
+    # Failed probe doubles the open period
+    breaker.record_failure()
+    assert breaker.state == CircuitState.OPEN
+    assert breaker.time_until_retry() == 20
+
+    clock.now = 30
+    assert breaker.allow_request()
+    breaker.record_success()
+    assert breaker.state == CircuitState.CLOSED
+
+
+def test_policy_actions():
+    """Test that each error type maps to its recovery action."""
+    policy = RecoveryPolicy(circuit_breaker=CircuitBreaker(failure_threshold=100, clock=FakeClock()))
+    assert policy.decide(TransientError("t")).action == RecoveryAction.RETRY
+    assert policy.decide(SessionExpiredError("s")).action == RecoveryAction.RELOGIN
+    assert policy.decide(PageStructureError("p")).action == RecoveryAction.RENAVIGATE
+
+
+def test_maintenance_opens_circuit_immediately():
+    """Test that maintenance pages stop requests straight away."""
+    clock = FakeClock()
+    policy = RecoveryPolicy(circuit_breaker=CircuitBreaker(recovery_timeout=60, clock=clock))
+    decision = policy.decide(SiteMaintenanceError("down"))
+
+    assert decision.action == RecoveryAction.SUSPEND
+    assert decision.delay >= 60
+    assert policy.circuit_breaker.state == CircuitState.OPEN
+
+
+def test_rate_limit_respects_retry_after():
+    """Test that Retry-After is used as a lower bound."""
+    policy = RecoveryPolicy(circuit_breaker=CircuitBreaker(recovery_timeout=1, clock=FakeClock()))
+    decision = policy.decide(RateLimitedError("slow down", retry_after=700))
+    assert decision.delay >= 700
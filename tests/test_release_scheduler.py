@@ -0,0 +1,76 @@
+"""Tests for release-time burst planning."""
+import asyncio
+from datetime import datetime, timedelta
+import pytest
+from src.booking_controller import BookingController
+from src.maintenance_schedule import SITE_TIMEZONE
+from src.release_scheduler import ReleaseSchedule, ServerClock
+
+
+def jst(*args):
+    return datetime(*args, tzinfo=SITE_TIMEZONE)
+
+
+def test_next_burst_today():
+    """Test that the next upcoming instant today is chosen."""
+    schedule = ReleaseSchedule.parse("00:00,09:00", preload_seconds=3, duration_seconds=20)
+    plan = schedule.next_burst(jst(2026, 1, 5, 8, 59, 50))
+
+    assert plan.instant == jst(2026, 1, 5, 9, 0)
+    assert plan.preload_at == jst(2026, 1, 5, 8, 59, 57)
+    assert plan.end == jst(2026, 1, 5, 9, 0, 20)
+
+
+def test_next_burst_in_progress():
+    """Test that a burst still running is returned until it ends."""
+    schedule = ReleaseSchedule.parse("09:00", duration_seconds=20)
+    assert schedule.next_burst(jst(2026, 1, 5, 9, 0, 10)).instant == jst(2026, 1, 5, 9, 0)
+
+
+def test_next_burst_rolls_over_to_tomorrow():
+    """Test that instants wrap around midnight."""
+    schedule = ReleaseSchedule.parse("00:00")
+    plan = schedule.next_burst(jst(2026, 1, 5, 12, 0))
+    assert plan.instant == jst(2026, 1, 6, 0, 0)
+
+
+def test_empty_schedule_has_no_bursts():
+    """Test that no release times means no bursts."""
+    assert ReleaseSchedule.parse("").next_burst(jst(2026, 1, 5, 12, 0)) is None
+
+
+def test_invalid_release_time():
+    """Test that malformed times raise ValueError."""
+    with pytest.raises(ValueError):
+        ReleaseSchedule.parse("9am")
+
+
+def test_seconds_until_uses_offset():
+    """Test that the server offset shifts the local wait time."""
+    clock = ServerClock("http://localhost")
+    instant = clock.server_now() + timedelta(seconds=10)
+
+    clock.offset = 2.0  # Server is 2 seconds ahead of us
+    assert clock.seconds_until(instant) == pytest.approx(8.0, abs=0.1)
+
+
+async def test_clock_resync_runs_in_background(config):
+    """Test that a stale server clock is re-measured without holding up the check cycle."""
+    config.release_times = "00:00"
+    controller = BookingController(config)
+    started = asyncio.Event()
+
+    async def slow_measure():
+        started.set()
+        await asyncio.sleep(3600)
+
+    controller.server_clock.measure = slow_measure
+    controller.server_clock.seconds_until = lambda instant: 3600.0
+
+    assert not await asyncio.wait_for(controller._run_burst_if_due(), timeout=1)
+    await started.wait()
+    assert not controller._clock_sync.done()
+    await controller._run_burst_if_due()  # A measurement in flight is not started twice
+
+    await controller._cleanup()
+    assert controller._clock_sync.cancelled()
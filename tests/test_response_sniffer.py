@@ -0,0 +1,92 @@
+"""Tests for slot detection from the raw facility page response."""
+import pytest
+from src.error_handler import PageStructureError, SessionExpiredError, SiteMaintenanceError
+from src.response_sniffer import ResponseSniffer
+from src.slot_detector import SlotDetector
+from tests.fakes import FakePage
+from tests.test_grid_parser import SECOND_MONTH, read
+
+FACILITY_URL = "https://dshinsei.e-kanagawa.lg.jp/140007-u/reserve/offerList_detail"
+
+
+class FakeResponse:
+    def __init__(self, body, status=200, url=FACILITY_URL, headers=None):
+        self.body = body
+        self.status = status
+        self.url = url
+        self.headers = headers or {}
+
+    async def text(self):
+        return self.body
+
+
+class FakeLink:
+    async def evaluate(self, script):
+        return ["height_auto_普通車ＡＭ", 1, 'selectDate("FC00023","20260120","1",this)']
+
+    async def dispose(self):
+        pass
+
+
+class AttachPage:
+    def __init__(self):
+        self.waits = []
+
+    async def wait_for_selector(self, selector, state="visible", timeout=None):
+        self.waits.append((selector, state, timeout))
+        return FakeLink()
+
+
+async def test_reload_parses_body_without_waiting_for_load():
+    """Test that a reload only waits for commit and parses the response HTML."""
+    page = FakePage(FACILITY_URL, response=FakeResponse(read(SECOND_MONTH)))
+
+    result = await ResponseSniffer(page).reload()
+
+    assert page.reloads == [{"wait_until": "commit"}]
+    assert len(result.snapshot.slots()) == 31
+    assert result.url == FACILITY_URL
+    assert result.body_ms >= 0
+
+
+async def test_reload_filters_categories():
+    """Test that only the requested rows are collected."""
+    page = FakePage(FACILITY_URL, response=FakeResponse(read(SECOND_MONTH)))
+
+    result = await ResponseSniffer(page).reload(["けん引車ＡＭ"])
+
+    assert set(result.snapshot.available) <= {"けん引車ＡＭ"}
+
+
+async def test_reload_classifies_error_pages():
+    """Test that maintenance, login and table-less responses raise classified errors."""
+    maintenance = FakePage(FACILITY_URL, response=FakeResponse("<html>ただいまメンテナンス中です</html>", status=503))
+    with pytest.raises(SiteMaintenanceError):
+        await ResponseSniffer(maintenance).reload()
+
+    login = FakePage(FACILITY_URL, response=FakeResponse("<html>login</html>", url="https://dshinsei.e-kanagawa.lg.jp/140007-u/profile/userLogin"))
+    with pytest.raises(SessionExpiredError):
+        await ResponseSniffer(login).reload()
+
+    empty = FakePage(FACILITY_URL, response=FakeResponse("<html><body>no table</body></html>"))
+    with pytest.raises(PageStructureError):
+        await ResponseSniffer(empty).reload()
+
+
+async def test_locate_slot_waits_for_attached_link():
+    """Test that a sniffed hit is located by waiting for its link, using the response's dates."""
+    page = AttachPage()
+    detector = SlotDetector(page, ["普通車ＡＭ"])
+    dates = ["01/19 (Mon)", "01/20 (Tue)"]
+
+    slot = await detector.locate_slot("普通車ＡＭ", "01/20 (Tue)", dates, timeout=5)
+
+    selector, state, timeout = page.waits[0]
+    assert state == "attached"
+    assert timeout == 5000
+    assert "td:nth-of-type(2)" in selector
+    assert slot.slot_info.day.isoformat() == "2026-01-20"
+    assert detector.handle_stats.kept == 1
+
+    await detector.release_slot(slot)
+    assert detector.handle_stats.live == 0
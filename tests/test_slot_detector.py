@@ -0,0 +1,160 @@
+"""Tests for slot detection on the saved facility page and the upgrade-mode cutoff."""
+from datetime import date
+
+import pytest
+
+from src.grid_parser import parse_grid
+from src.slot_detector import SlotDetector
+from tests.saved_dom import SavedElement, SavedPage
+from tests.test_grid_parser import SECOND_MONTH, read
+
+TODAY = date(2025, 12, 19)  # The saved page's second month is January 2026
+
+
+@pytest.fixture(params=["saved-dom", "chromium"])
+async def facility_page(request):
+    """The saved second-month facility page, parsed in Python or loaded into Chromium."""
+    html = read(SECOND_MONTH)
+    if request.param == "saved-dom":
+        yield SavedPage(html)
+        return
+    from playwright.async_api import Error as PlaywrightError, async_playwright
+    async with async_playwright() as playwright:
+        try:
+            browser = await playwright.chromium.launch()
+        except PlaywrightError as e:
+            pytest.skip(f"Chromium is not available: {e.message.splitlines()[0]}")
+        page = await browser.new_page(java_script_enabled=False)
+        await page.set_content(html, wait_until="domcontentloaded")
+        yield page
+        await browser.close()
+
+
+def detector_for(page, categories):
+    detector = SlotDetector(page, categories)
+
+    async def consent_checked(timeout=0.0):
+        return True
+
+    detector.ensure_consent_checked = consent_checked
+    return detector
+
+
+async def test_check_availability_maps_link_to_row_and_date(facility_page):
+    """Test that the first target link maps to its row's category and its column's date header."""
+    detector = detector_for(facility_page, ["大型車ＡＭ", "準中型車ＡＭ"])
+
+    slot = await detector.check_availability()
+
+    # Links come back in document order; the 準中型車ＡＭ row is above 大型車ＡＭ
+    assert (slot.slot_info.category, slot.slot_info.date) == ("準中型車ＡＭ", "01/20 (Tue)")
+    assert slot.slot_info.day == date(2026, 1, 20)
+    assert detector.handle_stats.live == detector.handle_stats.kept == 1
+    await detector.release_slot(slot)
+    assert detector.handle_stats.live == 0
+
+
+async def test_check_availability_reads_late_column(facility_page):
+    """Test the column-to-date mapping near the end of the row."""
+    detector = detector_for(facility_page, ["大型車ＡＭ"])
+
+    slot = await detector.check_availability()
+
+    assert (slot.slot_info.date, slot.slot_info.day) == ("01/29 (Thu)", date(2026, 1, 29))
+    await detector.release_slot(slot)
+
+
+@pytest.mark.parametrize("categories", [["二輪車ＡＭ"], ["普通車ＡＭ"], []], ids=["no-row", "no-link", "no-targets"])
+async def test_check_availability_without_target_link(facility_page, categories):
+    """Test that a missing target row, a row without ○ links, or no targets finds nothing."""
+    detector = detector_for(facility_page, categories)
+
+    assert await detector.check_availability() is None
+    assert detector.handle_stats.live == 0
+
+
+class DetachingElement(SavedElement):
+    """A link whose node went away between the query and the read."""
+
+    async def evaluate(self, script, arg=None):
+        raise RuntimeError("Element is not attached to the DOM")
+
+
+class DetachingPage(SavedPage):
+    async def query_selector_all(self, selector):
+        handles = [DetachingElement(handle.node) for handle in await super().query_selector_all(selector)]
+        self.handles = handles
+        return handles
+
+
+async def test_failed_link_read_keeps_no_handle():
+    """Test that a link whose cell cannot be read is disposed, never kept."""
+    page = DetachingPage(read(SECOND_MONTH))
+    detector = detector_for(page, ["準中型車ＡＭ"])
+
+    assert await detector.check_availability() is None
+    assert detector.handle_stats.kept == 0
+    assert detector.handle_stats.live == 0
+    assert page.handles and all(handle.disposed for handle in page.handles)
+
+
+async def test_failed_link_read_in_locate_slot_keeps_no_handle():
+    """Test that locate_slot disposes a link whose cell cannot be read."""
+    link = DetachingElement(None)
+
+    class AttachPage:
+        async def wait_for_selector(self, selector, state="visible", timeout=None):
+            return link
+
+    detector = SlotDetector(AttachPage(), ["準中型車ＡＭ"])
+
+    with pytest.raises(RuntimeError):
+        await detector.locate_slot("準中型車ＡＭ", "01/20 (Tue)", ["01/20 (Tue)"], timeout=1)
+    assert detector.handle_stats.kept == 0
+    assert link.disposed
+
+
+def test_cutoff_keeps_only_strictly_earlier_cells():
+    """Test that cells on or after the cutoff are dropped."""
+    snapshot = parse_grid(read(SECOND_MONTH))
+    detector = SlotDetector(None, ["準中型車ＡＭ", "大型車ＡＭ"], cutoff=date(2026, 1, 22))
+
+    filtered = detector.apply_cutoff(snapshot, today=TODAY)
+
+    assert filtered.available["準中型車ＡＭ"] == ["01/20 (Tue)"]
+    assert "大型車ＡＭ" not in filtered.available
+    assert all(text < "01/22" for _, text in filtered.slots())
+    assert snapshot.available["準中型車ＡＭ"] == ["01/20 (Tue)", "01/22 (Thu)", "01/30 (Fri)"]
+
+
+def test_no_cutoff_keeps_snapshot():
+    """Test that without a cutoff every cell counts."""
+    snapshot = parse_grid(read(SECOND_MONTH))
+    detector = SlotDetector(None, ["準中型車ＡＭ"])
+
+    assert detector.apply_cutoff(snapshot) is snapshot
+    assert detector.before_cutoff("01/30 (Fri)")
+
+
+def test_moved_cutoff_resets_unchanged():
+    """Test that an unchanged table is re-evaluated once after the cutoff moves."""
+    snapshot = parse_grid(read(SECOND_MONTH))
+    snapshot.unchanged = True
+    detector = SlotDetector(None, ["準中型車ＡＭ"], cutoff=date(2026, 1, 31))
+    assert not detector.apply_cutoff(snapshot, today=TODAY).unchanged
+    assert detector.apply_cutoff(snapshot, today=TODAY).unchanged
+
+    detector.cutoff = date(2026, 1, 22)
+    filtered = detector.apply_cutoff(snapshot, today=TODAY)
+
+    assert not filtered.unchanged
+    assert filtered.available["準中型車ＡＭ"] == ["01/20 (Tue)"]
+
+
+def test_before_cutoff():
+    """Test the per-cell check with header text and with a known date."""
+    detector = SlotDetector(None, ["準中型車ＡＭ"], cutoff=date(2026, 1, 22))
+
+    assert detector.before_cutoff("01/20 (Tue)", today=TODAY)
+    assert not detector.before_cutoff("01/22 (Thu)", today=TODAY)
+    assert not detector.before_cutoff("", day=date(2026, 2, 1))
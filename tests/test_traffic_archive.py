@@ -0,0 +1,108 @@
+"""Tests for the traffic archive recorder and replayer (without a browser)."""
+import json
+import os
+from datetime import datetime, timezone
+from src.traffic_archive import SCRUBBED, TrafficEntry, TrafficRecorder, TrafficReplayer
+
+
+FACILITY_URL = "https://example.test/reserve/facilitySelect_dateTrans?movePage=oneMonthLater"
+
+
+def entry(method, url, body, post_data=None, request_headers=None, response_headers=None, elapsed_ms=50.0):
+    return TrafficEntry(
+        started_at=datetime(2026, 1, 5, tzinfo=timezone.utc),
+        elapsed_ms=elapsed_ms,
+        method=method,
+        url=url,
+        request_headers=request_headers or {},
+        post_data=post_data,
+        status=200,
+        response_headers=response_headers or {"content-type": "text/html; charset=UTF-8"},
+        body=body,
+    )
+
+
+def record(tmp_path, entries, secrets=()):
+    recorder = TrafficRecorder(str(tmp_path / "session.har"), secrets=secrets)
+    for item in entries:
+        recorder.add(item)
+    return recorder.save()
+
+
+def test_save_scrubs_secrets(tmp_path):
+    """Test that credentials, cookies and CSRF tokens never reach the archive."""
+    path = record(tmp_path, [
+        entry(
+            "POST", "https://example.test/profile/userLogin",
+            b"<p>Welcome user@example.com</p><input name='_csrf' value='csrf-123456'>",
+            post_data="userId=user%40example.com&password=hunter22&_csrf=csrf-123456",
+            request_headers={"content-type": "application/x-www-form-urlencoded", "cookie": "JSESSIONID=abcdef"},
+            response_headers={"content-type": "text/html", "set-cookie": "JSESSIONID=abcdef; Path=/"},
+        ),
+        entry("GET", FACILITY_URL, b"<table id='TBL'></table> session abcdef"),
+    ], secrets=("user@example.com", "hunter22"))
+
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    for secret in ("user@example.com", "user%40example.com", "hunter22", "csrf-123456", "abcdef"):
+        assert secret not in text
+
+    entries = json.loads(text)["log"]["entries"]
+    assert entries[0]["request"]["postData"]["text"] == f"userId={SCRUBBED}&password={SCRUBBED}&_csrf={SCRUBBED}"
+    assert {"name": "set-cookie", "value": SCRUBBED} in entries[0]["response"]["headers"]
+    assert "<table id='TBL'>" in entries[1]["response"]["content"]["text"]
+
+
+def test_replayer_serves_in_order_then_repeats(tmp_path):
+    """Test that repeated requests replay the recording in order and then the last response."""
+    path = record(tmp_path, [
+        entry("GET", FACILITY_URL, b"first"),
+        entry("GET", FACILITY_URL, b"second"),
+        entry("GET", "https://example.test/logo.png", b"\x89PNG", response_headers={"content-type": "image/png"}),
+    ])
+    replayer = TrafficReplayer(path, speed=0)
+
+    bodies = [replayer.next_entry("GET", FACILITY_URL)["response"]["content"]["text"] for _ in range(3)]
+    assert bodies == ["first", "second", "second"]
+    assert replayer.stats.repeated == 1
+    assert replayer.next_entry("GET", "https://example.test/other") is None
+    assert replayer.next_entry("GET", "https://example.test/logo.png")["response"]["content"]["encoding"] == "base64"
+
+
+def test_recording_is_spooled_and_survives_a_crash(tmp_path):
+    """Test that entries go to disk as they arrive and an unsaved spool is picked up again."""
+    path = str(tmp_path / "session.har")
+    crashed = TrafficRecorder(path, secrets=("hunter22",))
+    crashed.add(entry("GET", FACILITY_URL, b"first"))
+    with open(crashed.spool_path, "a", encoding="utf-8") as f:
+        f.write('{"started_at": "2026-')  # Torn last line
+
+    recorder = TrafficRecorder(path, secrets=("hunter22",))
+    recorder.add(entry("POST", "https://example.test/login", b"ok", post_data="password=hunter22"))
+    assert recorder.count == 2
+    assert recorder.save() == path
+
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    entries = json.loads(text)["log"]["entries"]
+    assert [e["request"]["method"] for e in entries] == ["GET", "POST"]
+    assert "hunter22" not in text
+    assert not os.path.exists(recorder.spool_path)
+
+
+def test_replayer_matches_post_bodies(tmp_path):
+    """Test that different POST bodies to one endpoint get their own responses."""
+    url = "https://example.test/reserve/offerList_movePage"
+    path = record(tmp_path, [
+        entry("POST", url, b"january", post_data="month=1&userId=user%40example.com"),
+        entry("POST", url, b"february", post_data="month=2&userId=user%40example.com"),
+    ], secrets=("user@example.com",))
+    replayer = TrafficReplayer(path, speed=0, secrets=("user@example.com",))
+
+    def body(post_data):
+        return replayer.next_entry("POST", url, post_data)["response"]["content"]["text"]
+
+    assert body("month=2&userId=user%40example.com") == "february"
+    assert body("month=1&userId=user%40example.com") == "january"
+    assert body("month=2&userId=user%40example.com") == "february"
+    assert body("month=3&userId=user%40example.com") in ("january", "february")  # Falls back to the URL
@@ -0,0 +1,49 @@
+"""Tests for watch-only mode's polling loop."""
+import asyncio
+
+from src.error_handler import SessionExpiredError
+from src.watch_mode import AvailabilityWatcher
+
+
+class ExpiringPoller:
+    """Fails with an expired session once, then stops the watcher on the next poll."""
+
+    def __init__(self, watcher):
+        self.watcher = watcher
+        self.polls = 0
+
+    async def poll(self, months):
+        self.polls += 1
+        if self.polls == 1:
+            raise SessionExpiredError("Redirected to login")
+        self.watcher.running = False
+        return []
+
+
+async def test_failed_recapture_is_retried_with_backoff(config, monkeypatch):
+    """Test that a failed re-login goes back through the recovery policy instead of ending the watcher."""
+    real_sleep = asyncio.sleep
+    delays = []
+
+    async def fast_sleep(delay):
+        delays.append(delay)
+        await real_sleep(0)
+
+    monkeypatch.setattr(asyncio, "sleep", fast_sleep)
+    watcher = AvailabilityWatcher(config)
+    watcher.poller = ExpiringPoller(watcher)
+    captures = []
+
+    async def capture_session():
+        captures.append(len(captures))
+        if len(captures) == 1:
+            raise RuntimeError("browser failed to launch")
+
+    watcher._capture_session = capture_session
+    watcher.running = True
+
+    await watcher._watch_loop()
+
+    assert len(captures) == 2
+    assert watcher.poller.polls == 2
+    assert len([d for d in delays if d > 0]) >= 2  # Backoff after the poll and the re-login failure